@@ -4,13 +4,19 @@ v2.0: Integrado com XTTSService (SOLID architecture)
 """
 import asyncio
 import logging
+import time
+
+from celery.signals import worker_init
 
 from .celery_config import celery_app
+from .metrics import start_worker_metrics_server
 from .models import Job, VoiceProfile
 from .processor import VoiceProcessor
 from .redis_store import RedisJobStore
 from .settings import get_settings
 from .services.xtts_service import XTTSService
+from .tracing import observe_stage, extracted_context, init_tracing
+from .warmup import configure_compile_cache
 
 logger = logging.getLogger(__name__)
 
@@ -28,15 +34,29 @@ def get_xtts_service() -> XTTSService:
     global _xtts_service
     if _xtts_service is None:
         logger.info("🔧 Initializing XTTS service for worker...")
-        _xtts_service = XTTSService(
-            model_name=settings.xtts_model_name,
-            device=settings.xtts_device,
-            models_dir=settings.models_dir
-        )
-        _xtts_service.load_model()
+        # Mesma configuração do processo da API (XTTS_CPU_*, cuDNN, normalização)
+        try:
+            configure_compile_cache(settings.xtts_compile_cache_dir)
+        except OSError as e:
+            logger.warning(f"⚠️ torch.compile cache disabled: {e}")
+        _xtts_service = XTTSService.from_settings(settings)
+        _xtts_service.initialize()
     return _xtts_service
 
 
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    """
+    Estágios (pickup … disk_write) e capacidade das sínteses de /jobs ficam
+    no registry do worker: expostos em :WORKER_METRICS_PORT/metrics.
+    
+    worker_init roda no processo principal: com --pool=solo (docker-compose)
+    as tasks rodam nele; no pool prefork cada filho teria seu próprio registry.
+    """
+    if settings.worker_metrics_port:
+        start_worker_metrics_server(settings.worker_metrics_port)
+
+
 def get_processor() -> VoiceProcessor:
     """
     Retorna instância do VoiceProcessor com XTTS service injetado.
@@ -44,6 +64,8 @@ def get_processor() -> VoiceProcessor:
     global _processor
     if _processor is None:
         logger.info("🔧 Initializing VoiceProcessor (with XTTSService)...")
+        if settings.otel_enabled:
+            init_tracing(f"{settings.otel_service_name}-worker", settings.otel_exporter_endpoint)
         xtts_service = get_xtts_service()
         _processor = VoiceProcessor(xtts_service=xtts_service)
         _processor.job_store = job_store
@@ -67,13 +89,18 @@ def run_async_task(coro):
 
 
 @celery_app.task(bind=True, name='app.celery_tasks.dubbing_task')
-def dubbing_task(self, job_dict: dict):
+def dubbing_task(self, job_dict: dict, enqueued_at: float = None, trace_context: dict = None):
     """
     Task Celery para processar dublagem
     
     Args:
         job_dict: Job serializado como dict
+        enqueued_at: time.time() do enqueue (mede espera na fila)
+        trace_context: Contexto OpenTelemetry da API (app/tracing.py)
     """
+    if enqueued_at is not None:
+        observe_stage("pickup", time.time() - enqueued_at)
+
     async def _process():
         try:
             # DEBUG: Log do dict recebido
@@ -92,7 +119,8 @@ def dubbing_task(self, job_dict: dict):
                     raise ValueError(f"Voice profile not found: {job.voice_id}")
             
             # Processa
-            job = await get_processor().process_dubbing_job(job, voice_profile)
+            with extracted_context(trace_context):
+                job = await get_processor().process_dubbing_job(job, voice_profile)
             
             logger.info(f"✅ Celery dubbing task completed for job {job.id}")
             return {"status": "completed", "job_id": job.id}
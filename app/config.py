@@ -59,6 +59,17 @@ def get_settings():
                 'device': os.getenv('XTTS_DEVICE', None),  # None = auto-detect
                 'fallback_to_cpu': os.getenv('XTTS_FALLBACK_CPU', 'true').lower() == 'true',
                 'model_name': os.getenv('XTTS_MODEL', 'tts_models/multilingual/multi-dataset/xtts_v2'),
+                # CPU inference mode (nós sem GPU)
+                'cpu_quantize': os.getenv('XTTS_CPU_QUANTIZE', 'true').lower() == 'true',
+                'cpu_threads': int(os.getenv('XTTS_CPU_THREADS', '0')),  # 0 = quota do cgroup
+                'cpu_interop_threads': int(os.getenv('XTTS_CPU_INTEROP_THREADS', '0')),  # 0 = 1
+                'cpu_compile_vocoder': os.getenv('XTTS_CPU_COMPILE_VOCODER', 'false').lower() == 'true',
+                # Normalização PT do dataset de treino (app/text_normalizer.py)
+                'text_normalization': os.getenv('XTTS_TEXT_NORMALIZATION', 'true').lower() == 'true',
+            },
+            # XTTS + HiFi-GAN vocoder em ONNX Runtime (CPU EP)
+            'xtts_onnx': {
+                'threads': int(os.getenv('XTTS_ONNX_THREADS', '0')),  # 0 = padrão do ORT
             }
         },
         
@@ -0,0 +1,218 @@
+"""
+CPU Inference Mode - XTTS-v2 em nós sem GPU
+
+Otimizações aplicadas quando o XTTS roda em device='cpu':
+- Threads do PyTorch (intra-op e inter-op) limitadas à quota de CPU do cgroup
+  (evita oversubscription em containers com `cpus: N`)
+- Quantização dinâmica int8 do GPT decoder e das camadas lineares
+- torch.compile opcional para o vocoder HiFi-GAN
+
+Uso:
+    from app.cpu_inference import configure_cpu_threads, apply_cpu_optimizations
+
+    configure_cpu_threads()
+    apply_cpu_optimizations(tts.synthesizer.tts_model, quantize=True)
+"""
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import torch
+import torch.nn as nn
+
+logger = logging.getLogger(__name__)
+
+# cgroup v2 e v1 (Docker / Proxmox LXC)
+CGROUP_V2_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+CGROUP_V1_QUOTA = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+CGROUP_V1_PERIOD = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+
+# Estado global: interop threads só pode ser definido uma vez por processo
+_interop_configured = False
+
+
+def read_cgroup_cpu_quota(
+    cpu_max_path: Path = CGROUP_V2_CPU_MAX,
+    quota_path: Path = CGROUP_V1_QUOTA,
+    period_path: Path = CGROUP_V1_PERIOD
+) -> Optional[float]:
+    """
+    Lê a quota de CPU do cgroup (em número de CPUs, pode ser fracionário).
+
+    Returns:
+        Quota em CPUs (ex: 2.5) ou None se não houver limite
+    """
+    # cgroup v2: "<quota> <period>" ou "max <period>"
+    try:
+        if cpu_max_path.exists():
+            quota, period = cpu_max_path.read_text().split()[:2]
+            if quota == "max":
+                return None
+            return int(quota) / int(period)
+    except (OSError, ValueError) as e:
+        logger.debug(f"Failed to read {cpu_max_path}: {e}")
+
+    # cgroup v1: quota=-1 significa sem limite
+    try:
+        if quota_path.exists() and period_path.exists():
+            quota = int(quota_path.read_text().strip())
+            period = int(period_path.read_text().strip())
+            if quota <= 0 or period <= 0:
+                return None
+            return quota / period
+    except (OSError, ValueError) as e:
+        logger.debug(f"Failed to read {quota_path}: {e}")
+
+    return None
+
+
+def get_effective_cpu_count() -> int:
+    """
+    Número de CPUs realmente utilizáveis pelo processo.
+
+    Considera afinidade (taskset/cpuset) e quota do cgroup, o que
+    os.cpu_count() ignora.
+    """
+    try:
+        available = len(os.sched_getaffinity(0))
+    except AttributeError:
+        available = os.cpu_count() or 1
+
+    quota = read_cgroup_cpu_quota()
+    if quota is not None:
+        available = min(available, max(1, math.ceil(quota)))
+
+    return max(1, available)
+
+
+def configure_cpu_threads(
+    num_threads: Optional[int] = None,
+    interop_threads: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Fixa threads intra-op e inter-op do PyTorch.
+
+    Args:
+        num_threads: Threads intra-op (None/0 = quota efetiva do cgroup)
+        interop_threads: Threads inter-op (None/0 = 1, o GPT é sequencial)
+
+    Returns:
+        Dict com os valores aplicados
+    """
+    global _interop_configured
+
+    if not num_threads:
+        num_threads = get_effective_cpu_count()
+    if not interop_threads:
+        interop_threads = 1
+
+    torch.set_num_threads(num_threads)
+
+    # set_num_interop_threads falha se chamado após início de trabalho paralelo
+    if not _interop_configured:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+            _interop_configured = True
+        except RuntimeError as e:
+            logger.warning(f"⚠️ Could not set interop threads: {e}")
+
+    applied = {
+        "num_threads": torch.get_num_threads(),
+        "interop_threads": torch.get_num_interop_threads(),
+    }
+    logger.info(
+        f"CPU threads configured: intra-op={applied['num_threads']}, "
+        f"inter-op={applied['interop_threads']}"
+    )
+    return applied
+
+
+def _conv1d_to_linear(module: nn.Module) -> int:
+    """
+    Substitui transformers Conv1D (usado pelo GPT-2) por nn.Linear equivalente.
+
+    quantize_dynamic só reconhece nn.Linear; sem essa conversão as camadas
+    de atenção/MLP do GPT-2 continuariam em fp32.
+
+    Returns:
+        Número de camadas convertidas
+    """
+    try:
+        from transformers.pytorch_utils import Conv1D
+    except ImportError:
+        return 0
+
+    converted = 0
+    for name, child in list(module.named_children()):
+        if isinstance(child, Conv1D):
+            # Conv1D: y = x @ W + b, com W de shape (in, out)
+            in_features, out_features = child.weight.shape
+            linear = nn.Linear(in_features, out_features, bias=child.bias is not None)
+            linear.weight.data = child.weight.data.t().contiguous()
+            if child.bias is not None:
+                linear.bias.data = child.bias.data.clone()
+            setattr(module, name, linear)
+            converted += 1
+        else:
+            converted += _conv1d_to_linear(child)
+    return converted
+
+
+def quantize_dynamic_int8(module: nn.Module) -> nn.Module:
+    """
+    Aplica quantização dinâmica int8 (pesos int8, ativações fp32) em nn.Linear.
+
+    Args:
+        module: Módulo PyTorch (modificado in-place)
+
+    Returns:
+        Módulo quantizado
+    """
+    converted = _conv1d_to_linear(module)
+    if converted:
+        logger.debug(f"Converted {converted} Conv1D layers to nn.Linear")
+
+    return torch.ao.quantization.quantize_dynamic(
+        module, {nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+
+
+def apply_cpu_optimizations(
+    tts_model: nn.Module,
+    quantize: bool = True,
+    compile_vocoder: bool = False
+) -> Dict[str, bool]:
+    """
+    Aplica otimizações de CPU no modelo XTTS carregado.
+
+    Args:
+        tts_model: Modelo Xtts (TTS.synthesizer.tts_model)
+        quantize: Quantiza GPT decoder em int8
+        compile_vocoder: Usa torch.compile no HiFi-GAN decoder
+
+    Returns:
+        Dict com as otimizações efetivamente aplicadas
+    """
+    applied = {"quantized": False, "vocoder_compiled": False}
+
+    if quantize and getattr(tts_model, "gpt", None) is not None:
+        try:
+            quantize_dynamic_int8(tts_model.gpt)
+            applied["quantized"] = True
+            logger.info("✅ XTTS GPT decoder quantized (dynamic int8)")
+        except Exception as e:
+            logger.warning(f"⚠️ int8 quantization failed, keeping fp32: {e}")
+
+    if compile_vocoder and getattr(tts_model, "hifigan_decoder", None) is not None:
+        try:
+            tts_model.hifigan_decoder = torch.compile(
+                tts_model.hifigan_decoder, dynamic=True
+            )
+            applied["vocoder_compiled"] = True
+            logger.info("✅ HiFi-GAN vocoder compiled (torch.compile)")
+        except Exception as e:
+            logger.warning(f"⚠️ torch.compile unavailable for vocoder: {e}")
+
+    return applied
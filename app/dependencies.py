@@ -22,6 +22,11 @@ def set_xtts_service(service: XTTSService) -> None:
     _xtts_service = service
 
 
+def get_current_xtts_service() -> Optional[XTTSService]:
+    """Instância global (pode não estar pronta); None antes do startup"""
+    return _xtts_service
+
+
 async def get_xtts_service() -> XTTSService:
     """
     Dependency para injetar XTTSService nos endpoints.
@@ -5,12 +5,14 @@ Single-engine TTS architecture for audio-voice service (XTTS only)
 from .base import TTSEngine
 from .factory import create_engine, create_engine_with_fallback, clear_engine_cache
 from .xtts_engine import XttsEngine
+from .xtts_onnx_engine import XttsOnnxEngine
 
 __all__ = [
     'TTSEngine',
     'create_engine',
     'create_engine_with_fallback',
     'clear_engine_cache',
-    'XttsEngine'
+    'XttsEngine',
+    'XttsOnnxEngine'
 ]
 
@@ -2,7 +2,8 @@
 Factory for creating TTS engines with singleton caching
 
 This module implements the Factory pattern with singleton caching to efficiently
-manage TTS engine instances. Supports XTTS engine with graceful fallback mechanisms.
+manage TTS engine instances. Supports XTTS engine (and its ONNX Runtime vocoder
+variant) with graceful fallback mechanisms.
 
 Key Features:
     - Singleton caching: Engines are created once and reused
@@ -19,6 +20,7 @@ Author: Audio Voice Service Team
 Date: December 6, 2025
 """
 import logging
+from pathlib import Path
 from typing import Dict, Optional, Type
 from .base import TTSEngine
 from ..exceptions import TTSEngineException
@@ -31,6 +33,7 @@ _ENGINE_CACHE: Dict[str, TTSEngine] = {}
 # Engine registry for lazy loading (populated on first use)
 _ENGINE_REGISTRY: Dict[str, Optional[Type[TTSEngine]]] = {
     'xtts': None,        # Loaded lazily: XttsEngine
+    'xtts_onnx': None,   # Loaded lazily: XttsOnnxEngine (ONNX Runtime vocoder)
 }
 
 
@@ -43,7 +46,7 @@ def create_engine(
     Factory method to create TTS engines with caching.
     
     Args:
-        engine_type: Engine identifier ('xtts')
+        engine_type: Engine identifier ('xtts' or 'xtts_onnx')
         settings: Application settings dict
         force_recreate: If True, recreate even if cached
     
@@ -75,10 +78,26 @@ def create_engine(
                 fallback_to_cpu=xtts_config.get('fallback_to_cpu', True),
                 model_name=xtts_config.get('model_name', 'tts_models/multilingual/multi-dataset/xtts_v2')
             )
+        elif engine_type == 'xtts_onnx':
+            if _ENGINE_REGISTRY['xtts_onnx'] is None:
+                from .xtts_onnx_engine import XttsOnnxEngine
+                _ENGINE_REGISTRY['xtts_onnx'] = XttsOnnxEngine
+            
+            engine_class = _ENGINE_REGISTRY['xtts_onnx']
+            xtts_config = settings.get('tts_engines', {}).get('xtts', {})
+            onnx_config = settings.get('tts_engines', {}).get('xtts_onnx', {})
+            models_dir = Path(settings.get('models_dir', '/app/models'))
+            engine = engine_class(
+                device=xtts_config.get('device'),
+                fallback_to_cpu=xtts_config.get('fallback_to_cpu', True),
+                model_name=xtts_config.get('model_name', 'tts_models/multilingual/multi-dataset/xtts_v2'),
+                onnx_cache_dir=models_dir / 'onnx',
+                onnx_threads=onnx_config.get('threads', 0)
+            )
         else:
             raise ValueError(
                 f"Unknown engine type: {engine_type}. "
-                f"Only 'xtts' is supported (F5-TTS has been removed)"
+                f"Supported: {list(_ENGINE_REGISTRY)} (F5-TTS has been removed)"
             )
         
         # Cache engine
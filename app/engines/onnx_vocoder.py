@@ -0,0 +1,186 @@
+"""
+ONNX Runtime backend for the XTTS HiFi-GAN vocoder
+
+The vocoder runs once per output sample window and is a pure convolutional
+graph (no autoregressive loop), which makes it a good fit for ONNX Runtime
+graph optimizations on CPU. The GPT decoder stays in PyTorch.
+
+Flow:
+    1. export_hifigan_to_onnx(): HifiDecoder.forward → ONNX (dynamic time axis)
+    2. The exported file is cached under models_dir/onnx, keyed by a weight
+       fingerprint, so re-exports only happen when the checkpoint changes
+    3. OnnxHifiganVocoder replaces tts_model.hifigan_decoder; Xtts.inference()
+       calls it exactly like the PyTorch module
+
+Author: Audio Voice Service Team
+"""
+import hashlib
+import logging
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+logger = logging.getLogger(__name__)
+
+# Optional dependency (requirements: onnxruntime)
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ort = None
+    ONNXRUNTIME_AVAILABLE = False
+
+ONNX_OPSET = 17
+
+
+def vocoder_fingerprint(decoder: nn.Module) -> str:
+    """
+    Short hash of the waveform decoder weights (cache key for the export).
+
+    Args:
+        decoder: HifiDecoder module
+
+    Returns:
+        16-char hex digest
+    """
+    waveform_decoder = getattr(decoder, "waveform_decoder", decoder)
+    digest = hashlib.sha256()
+    for name, tensor in sorted(waveform_decoder.state_dict().items()):
+        digest.update(name.encode())
+        digest.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+class _DecoderExportWrapper(nn.Module):
+    """Exports only the latent → waveform path (speaker encoder stays in PyTorch)"""
+
+    def __init__(self, decoder: nn.Module):
+        super().__init__()
+        self.decoder = decoder
+
+    def forward(self, latents, g):
+        return self.decoder(latents, g=g)
+
+
+def export_hifigan_to_onnx(decoder: nn.Module, output_path: Path) -> Path:
+    """
+    Export HifiDecoder to ONNX with a dynamic time axis.
+
+    Args:
+        decoder: HifiDecoder (tts_model.hifigan_decoder)
+        output_path: Target .onnx file
+
+    Returns:
+        Path of the exported model
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(".onnx.tmp")
+
+    # GPT latent size / speaker embedding size (XTTS-v2: 1024 / 512)
+    latent_dim = decoder.waveform_decoder.conv_pre.in_channels
+    speaker_dim = decoder.waveform_decoder.cond_layer.in_channels
+
+    wrapper = _DecoderExportWrapper(decoder).eval().cpu()
+    dummy_latents = torch.randn(1, 32, latent_dim)
+    dummy_g = torch.randn(1, speaker_dim, 1)
+
+    logger.info(f"Exporting HiFi-GAN vocoder to ONNX: {output_path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            wrapper,
+            (dummy_latents, dummy_g),
+            str(tmp_path),
+            input_names=["latents", "g"],
+            output_names=["waveform"],
+            dynamic_axes={
+                "latents": {1: "frames"},
+                "waveform": {2: "samples"},
+            },
+            opset_version=ONNX_OPSET,
+            dynamo=False,
+        )
+
+    # Atomic rename: a crashed export never leaves a truncated cache entry
+    tmp_path.replace(output_path)
+    logger.info(f"✅ Vocoder exported ({output_path.stat().st_size / 1e6:.1f}MB)")
+    return output_path
+
+
+def get_or_export_onnx_vocoder(decoder: nn.Module, cache_dir: Path) -> Path:
+    """
+    Return the cached ONNX vocoder for these weights, exporting if missing.
+
+    Args:
+        decoder: HifiDecoder module
+        cache_dir: Directory for exported models (models_dir/onnx)
+
+    Returns:
+        Path of the .onnx file
+    """
+    onnx_path = Path(cache_dir) / f"hifigan_{vocoder_fingerprint(decoder)}.onnx"
+    if onnx_path.exists():
+        logger.info(f"Using cached ONNX vocoder: {onnx_path}")
+        return onnx_path
+    return export_hifigan_to_onnx(decoder, onnx_path)
+
+
+class OnnxHifiganVocoder(nn.Module):
+    """
+    Drop-in replacement for HifiDecoder backed by ONNX Runtime (CPU EP).
+
+    Keeps a reference to the PyTorch speaker encoder, which Xtts uses to
+    compute speaker embeddings during conditioning.
+    """
+
+    def __init__(self, onnx_path: Path, torch_decoder: nn.Module, num_threads: int = 0):
+        """
+        Args:
+            onnx_path: Exported vocoder
+            torch_decoder: Original HifiDecoder (speaker encoder + config)
+            num_threads: ORT intra-op threads (0 = ORT default)
+        """
+        super().__init__()
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("onnxruntime is not installed")
+
+        self.onnx_path = Path(onnx_path)
+        self.speaker_encoder = torch_decoder.speaker_encoder
+        self.speaker_encoder_audio_config = torch_decoder.speaker_encoder_audio_config
+        self.output_sample_rate = torch_decoder.output_sample_rate
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            str(self.onnx_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+    @property
+    def device(self):
+        return next(self.speaker_encoder.parameters()).device
+
+    def forward(self, latents: torch.Tensor, g: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """
+        Args:
+            latents: GPT latents [B, T, C]
+            g: Speaker embedding [B, C, 1]
+
+        Returns:
+            Waveform [B, 1, samples] on the same device as `latents`
+        """
+        outputs = self.session.run(
+            None,
+            {
+                "latents": latents.detach().float().cpu().numpy(),
+                "g": g.detach().float().cpu().numpy(),
+            },
+        )
+        return torch.from_numpy(np.ascontiguousarray(outputs[0])).to(latents.device)
+
+    def inference(self, c, g):
+        return self.forward(c, g=g)
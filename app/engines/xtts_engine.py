@@ -24,8 +24,11 @@ Author: Audio Voice Service Team
 Date: November 27, 2025
 Sprint: 3 - XTTS Refactoring
 """
+import contextvars
+import functools
 import logging
 import os
+import time
 import torch
 import torchaudio
 import soundfile as sf
@@ -54,6 +57,9 @@ from ..exceptions import InvalidAudioException, TTSEngineException
 from ..resilience import retry_async, with_timeout
 from ..vram_manager import vram_manager
 from ..config import get_settings
+from ..cpu_inference import configure_cpu_threads, apply_cpu_optimizations
+from ..tracing import instrument_xtts_model, synthesis_labels, observe_rtf
+from ..text_normalizer import normalize_for_synthesis
 
 logger = logging.getLogger(__name__)
 
@@ -135,6 +141,7 @@ class XttsEngine(TTSEngine):
                     gpu=gpu,
                     progress_bar=False
                 )
+                self._on_model_loaded()
                 logger.info(f"✅ XTTS model loaded: {self.model_name}")
             
         except Exception as e:
@@ -167,10 +174,33 @@ class XttsEngine(TTSEngine):
                 gpu=gpu,
                 progress_bar=False
             )
+            self._on_model_loaded()
             self._model_loaded = True
             logger.info("✅ XTTS model loaded (lazy)")
         return self.tts
     
+    def _on_model_loaded(self):
+        """Hook chamado após carregar o modelo (eager ou lazy)"""
+        self._apply_cpu_mode()
+        self._instrument_model()
+    
+    def _instrument_model(self):
+        """Histogramas por estágio da síntese (ver app/tracing.py)"""
+        if self.tts is not None and hasattr(self.tts, 'synthesizer'):
+            instrument_xtts_model(self.tts.synthesizer.tts_model)
+    
+    def _apply_cpu_mode(self):
+        """Threads pela quota do cgroup + GPT int8 quando rodando em CPU"""
+        if self.device != 'cpu' or self.tts is None:
+            return
+        xtts_config = get_settings()['tts_engines']['xtts']
+        configure_cpu_threads(xtts_config.get('cpu_threads'), xtts_config.get('cpu_interop_threads'))
+        apply_cpu_optimizations(
+            self.tts.synthesizer.tts_model,
+            quantize=xtts_config.get('cpu_quantize', True),
+            compile_vocoder=xtts_config.get('cpu_compile_vocoder', False)
+        )
+    
     @property
     def engine_name(self) -> str:
         """Engine identifier"""
@@ -238,6 +268,10 @@ class XttsEngine(TTSEngine):
                 f"Supported: {supported_langs}"
             )
         
+        # Texto na forma vista no treino ("3%" → "três porcento")
+        if get_settings()['tts_engines']['xtts'].get('text_normalization', True):
+            text = normalize_for_synthesis(text, normalized_lang)
+        
         logger.info(
             f"XTTS synthesis: text_len={len(text)}, lang={normalized_lang}, "
             f"voice={voice_profile.name if voice_profile else 'default'}, "
@@ -331,13 +365,24 @@ class XttsEngine(TTSEngine):
             loop = asyncio.get_event_loop()
             settings = get_settings()
             
+            # Labels das métricas de capacidade; o executor não herda
+            # contextvars, então o contexto é copiado com os labels
+            labels = {
+                "language": normalized_lang,
+                "quality_profile": getattr(quality_profile, 'value', quality_profile) or "balanced",
+                "device": self.device
+            }
+            with synthesis_labels(**labels):
+                synthesize = functools.partial(contextvars.copy_context().run, self._synthesize_blocking)
+            synthesis_start = time.perf_counter()
+            
             # LOW_VRAM mode: load model → synthesize → unload
             if settings.get('low_vram_mode'):
                 with vram_manager.load_model('xtts', self._load_model):
                     await with_timeout(
                         loop.run_in_executor(
                             None,
-                            self._synthesize_blocking,
+                            synthesize,
                             text,
                             output_path,
                             speaker_wav,
@@ -351,7 +396,7 @@ class XttsEngine(TTSEngine):
                 await with_timeout(
                     loop.run_in_executor(
                         None,
-                        self._synthesize_blocking,
+                        synthesize,
                         text,
                         output_path,
                         speaker_wav,
@@ -361,6 +406,8 @@ class XttsEngine(TTSEngine):
                     timeout_seconds=300
                 )
             
+            synthesis_seconds = time.perf_counter() - synthesis_start
+            
             # Read generated audio
             audio_data, sr = sf.read(output_path)
             
@@ -371,6 +418,8 @@ class XttsEngine(TTSEngine):
             
             # Calculate duration
             duration = len(audio_data) / sr
+            with synthesis_labels(**labels):
+                observe_rtf(synthesis_seconds, duration)
             
             # Cleanup
             if os.path.exists(output_path):
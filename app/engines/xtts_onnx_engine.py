@@ -0,0 +1,95 @@
+"""
+XTTS v2 Engine with ONNX Runtime vocoder
+
+Same synthesis pipeline as XttsEngine (GPT decoder in PyTorch), but the
+HiFi-GAN vocoder is exported to ONNX and executed by ONNX Runtime on the
+CPU execution provider.
+
+The exported graph is cached under `<models_dir>/onnx/hifigan_<hash>.onnx`
+and reused across restarts while the checkpoint weights are unchanged.
+
+Author: Audio Voice Service Team
+"""
+import logging
+from pathlib import Path
+from typing import Optional
+
+from .xtts_engine import XttsEngine
+from .onnx_vocoder import ONNXRUNTIME_AVAILABLE, OnnxHifiganVocoder, get_or_export_onnx_vocoder
+from ..exceptions import TTSEngineException
+
+logger = logging.getLogger(__name__)
+
+
+class XttsOnnxEngine(XttsEngine):
+    """
+    XTTS v2 engine variant with ONNX Runtime HiFi-GAN vocoder.
+
+    Recommended for CPU-only nodes, where the vocoder is a significant
+    share of the synthesis time.
+    """
+
+    DEFAULT_ONNX_CACHE_DIR = Path('/app/models/onnx')
+
+    def __init__(
+        self,
+        device: Optional[str] = None,
+        fallback_to_cpu: bool = True,
+        model_name: str = "tts_models/multilingual/multi-dataset/xtts_v2",
+        onnx_cache_dir: Optional[Path] = None,
+        onnx_threads: int = 0
+    ):
+        """
+        Initialize XTTS engine with ONNX vocoder.
+
+        Args:
+            device: Device for the GPT decoder ('cuda', 'cpu', or None for auto-detect)
+            fallback_to_cpu: If True, fallback to CPU when CUDA unavailable
+            model_name: TTS model name
+            onnx_cache_dir: Directory for exported ONNX models (default: /app/models/onnx)
+            onnx_threads: ONNX Runtime intra-op threads (0 = ORT default)
+        """
+        if not ONNXRUNTIME_AVAILABLE:
+            raise TTSEngineException(
+                "onnxruntime is not installed (pip install onnxruntime)"
+            )
+
+        # Set before super().__init__(), which loads the model and fires the hook
+        self.onnx_cache_dir = Path(onnx_cache_dir) if onnx_cache_dir else self.DEFAULT_ONNX_CACHE_DIR
+        self.onnx_threads = onnx_threads
+        self.onnx_path: Optional[Path] = None
+
+        super().__init__(
+            device=device,
+            fallback_to_cpu=fallback_to_cpu,
+            model_name=model_name
+        )
+
+    @property
+    def engine_name(self) -> str:
+        """Engine identifier"""
+        return 'xtts_onnx'
+
+    def _on_model_loaded(self):
+        """Replace the PyTorch vocoder with the ONNX Runtime session"""
+        super()._on_model_loaded()
+        self._install_onnx_vocoder()
+        self._instrument_model()  # vocoder ONNX substituiu o instrumentado
+
+    def _install_onnx_vocoder(self):
+        tts_model = self.tts.synthesizer.tts_model
+        torch_decoder = tts_model.hifigan_decoder
+        if isinstance(torch_decoder, OnnxHifiganVocoder):
+            return
+
+        try:
+            self.onnx_path = get_or_export_onnx_vocoder(torch_decoder, self.onnx_cache_dir)
+            tts_model.hifigan_decoder = OnnxHifiganVocoder(
+                self.onnx_path,
+                torch_decoder,
+                num_threads=self.onnx_threads
+            )
+            logger.info(f"✅ HiFi-GAN vocoder running on ONNX Runtime: {self.onnx_path.name}")
+        except Exception as e:
+            logger.error(f"ONNX vocoder setup failed: {e}", exc_info=True)
+            raise TTSEngineException(f"ONNX vocoder initialization failed: {e}") from e
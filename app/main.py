@@ -4,6 +4,7 @@ Microserviço de Dublagem e Clonagem de Voz com XTTS (Coqui TTS)
 """
 import asyncio
 import os
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
@@ -34,6 +35,7 @@ from .processor import VoiceProcessor
 from .redis_store import RedisJobStore
 from .finetune_api import router as finetune_router  # Fine-tuning endpoints
 from .training_api import router as training_router  # Training management endpoints
+from .profiling import router as profiling_router  # On-demand profiling (admin)
 from .settings import get_settings, is_language_supported, get_voice_presets, is_voice_preset_valid, get_supported_languages
 from .logging_config import setup_logging, get_logger
 from .exceptions import (
@@ -42,6 +44,11 @@ from .exceptions import (
 )
 from .services.xtts_service import XTTSService
 from .dependencies import set_xtts_service, get_xtts_service
+from .startup import startup_tracker, load_model_in_background
+from .warmup import run_warmup_suite, configure_compile_cache, parse_csv
+from .tracing import stage, observe_stage, inject_context, init_tracing
+from .metrics import capacity_summary, fetch_metric_families
+from .telemetry import telemetry_sampler
 
 # Configuração
 settings = get_settings()
@@ -60,12 +67,18 @@ from app.middleware import error_handler_middleware
 app.middleware("http")(error_handler_middleware)
 logger.info("✅ Error handling middleware registered")
 
+# Métricas HTTP por template de rota (registrado por último = mais externo,
+# mede também as respostas de erro do middleware acima)
+from app.metrics import PrometheusMiddleware
+app.add_middleware(PrometheusMiddleware)
+
 # Exception handlers
 app.add_exception_handler(VoiceServiceException, exception_handler)
 
 # Include routers
 app.include_router(finetune_router)
 app.include_router(training_router)
+app.include_router(profiling_router)
 
 # Include advanced features and metrics routers (Sprint 7)
 try:
@@ -208,25 +221,52 @@ async def root():
     return {"service": "audio-voice", "status": "running", "version": "1.0.0"}
 
 
+async def _run_warmup(xtts_service: XTTSService) -> None:
+    """Suíte de warm-up: idiomas configurados x tamanhos de texto (não crítico)"""
+    if not settings.xtts_warmup_enabled:
+        return
+    try:
+        await run_warmup_suite(
+            xtts_service,
+            speaker_wav=settings.xtts_warmup_speaker_wav,
+            languages=parse_csv(settings.xtts_warmup_languages) or [settings.xtts_default_language],
+            text_lengths=[int(n) for n in parse_csv(settings.xtts_warmup_text_lengths)],
+            quality_profile=settings.xtts_warmup_quality_profile,
+            compile_cache_dir=settings.xtts_compile_cache_dir
+        )
+    except Exception as e:
+        logger.warning(f"Warm-up failed (non-critical): {e}")
+
+
 @app.on_event("startup")
 async def startup_event():
-    """Inicializa sistema com eager loading de modelos"""
+    """
+    Inicializa sistema.
+    
+    Liveness (`/health`) responde imediatamente; o XTTS é carregado em
+    background (app/startup.py) e `/ready` só retorna 200 ao final.
+    Com XTTS_BACKGROUND_LOAD=false o startup aguarda a carga (comportamento antigo).
+    """
     global processor
     import time
     start_time = time.time()
     
     logger.info("🚀 Starting Audio Voice Service...")
+    startup_tracker.record("app_import", start_time - startup_tracker.started_at)
     
-    # Inicializar XTTS Service com eager loading
-    logger.info("Loading XTTS-v2 model (eager load)...")
-    xtts_service = XTTSService(
-        model_name=settings.xtts_model_name,
-        device=settings.xtts_device,
-        models_dir=settings.models_dir
-    )
-    xtts_service.initialize()
+    if settings.otel_enabled:
+        init_tracing(settings.otel_service_name, settings.otel_exporter_endpoint)
+    
+    # Antes do primeiro torch.compile (o Inductor lê o cache dir no import)
+    try:
+        configure_compile_cache(settings.xtts_compile_cache_dir)
+    except OSError as e:
+        logger.warning(f"⚠️ torch.compile cache disabled: {e}")
+    
+    xtts_service = XTTSService.from_settings(settings)
     
     # Registrar service globalmente para dependency injection
+    # (get_xtts_service retorna 503 até o modelo estar carregado)
     set_xtts_service(xtts_service)
     
     # Criar processor com XTTS service injetado
@@ -234,35 +274,48 @@ async def startup_event():
     processor = VoiceProcessor(xtts_service=xtts_service)
     processor.job_store = job_store
     
-    # Warm-up: primeira síntese para pré-alocar CUDA
-    try:
-        default_voice = Path("/app/voice_profiles/default.wav")
-        if default_voice.exists():
-            logger.info("Warm-up: running test synthesis...")
-            await xtts_service.synthesize(
-                text="Test warmup",
-                speaker_wav=default_voice,
-                language="pt"
-            )
-            logger.info("✅ Warm-up complete")
-    except Exception as e:
-        logger.warning(f"Warm-up failed (non-critical): {e}")
-    
     # Iniciar cleanup task do Redis
     await job_store.start_cleanup_task()
     
-    elapsed = time.time() - start_time
-    logger.info(f"✅ Audio Voice Service started in {elapsed:.1f}s")
-    logger.info(f"   XTTS ready on {xtts_service.device}")
-    
     # Armazenar start time para uptime
     app.state.start_time = start_time
+    
+    if settings.telemetry_enabled:
+        telemetry_sampler.configure(settings.telemetry_interval_seconds, settings.telemetry_window_seconds)
+        telemetry_sampler.watch_queue(
+            "cpu_pool", lambda: xtts_service.pool.queue_depth if xtts_service.pool else 0
+        )
+        telemetry_sampler.start()
+    
+    loader = load_model_in_background(
+        xtts_service,
+        warmup=lambda: _run_warmup(xtts_service)
+    )
+    if settings.xtts_background_load:
+        logger.info("Loading XTTS-v2 model in background...")
+        app.state.model_loader = asyncio.create_task(loader)
+    else:
+        logger.info("Loading XTTS-v2 model (eager load)...")
+        await loader
+    
+    elapsed = time.time() - start_time
+    logger.info(f"✅ Audio Voice Service accepting requests in {elapsed:.1f}s")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Para sistema"""
     await job_store.stop_cleanup_task()
+    await telemetry_sampler.stop()
+    
+    loader = getattr(app.state, "model_loader", None)
+    if loader is not None and not loader.done():
+        loader.cancel()
+    
+    from .dependencies import _xtts_service
+    if _xtts_service is not None:
+        _xtts_service.shutdown()
+    
     logger.info("🛑 Audio Voice Service stopped")
 
 
@@ -286,7 +339,13 @@ def submit_processing_task(job: Job):
         if job.mode == JobMode.CLONE_VOICE:
             task = clone_voice_task.apply_async(args=[job_dict], task_id=job.id)
         else:
-            task = dubbing_task.apply_async(args=[job_dict], task_id=job.id)
+            # enqueued_at: worker mede espera na fila (estágio 'pickup')
+            with stage("enqueue"):
+                task = dubbing_task.apply_async(
+                    args=[job_dict],
+                    kwargs={"enqueued_at": time.time(), "trace_context": inject_context()},
+                    task_id=job.id
+                )
         
         logger.info(f"📤 Job {job.id} sent to Celery: {task.id}")
     except Exception as e:
@@ -329,6 +388,7 @@ async def create_job(
     - Se None, usa perfil padrão XTTS
     - Use GET /quality-profiles para listar perfis disponíveis
     """
+    create_started = time.perf_counter()
     try:
         # ===== SPRINT-06: Validação de Enums =====
         from app.utils.form_parsers import validate_enum_string
@@ -424,6 +484,7 @@ async def create_job(
         
         # Salva e processa
         job_store.save_job(new_job)
+        observe_stage("create_job", time.perf_counter() - create_started)
         submit_processing_task(new_job)
         
         logger.info(f"Job created: {new_job.id}")
@@ -932,6 +993,13 @@ async def get_stats():
             "total_size_mb": round(total_size / (1024 * 1024), 2)
         }
     
+    # Capacidade por language/quality_profile/device (chave "pt/balanced/cuda"),
+    # somando as sínteses de /jobs do worker Celery (WORKER_METRICS_URL)
+    worker_families = []
+    if settings.worker_metrics_url:
+        worker_families = await asyncio.to_thread(fetch_metric_families, settings.worker_metrics_url)
+    stats["synthesis"] = capacity_summary(worker_families)
+    
     return stats
 
 
@@ -984,13 +1052,17 @@ async def health_check():
                 "status": "ok",
                 "device": xtts_status["device"],
                 "model": xtts_status["model_name"],
-                "gpu": xtts_status.get("gpu", {})
+                "gpu": xtts_status.get("gpu", {}),
+                "first_requests": xtts_status.get("first_requests", {})
             }
         else:
             health_status["checks"]["xtts"] = {
                 "status": "loading",
                 "message": "XTTS service initializing"
             }
+        health_status["checks"]["startup"] = startup_tracker.summary()
+        # Janela do sampler em background (sem chamadas CUDA aqui)
+        health_status["checks"]["telemetry"] = telemetry_sampler.summary()
     except Exception as e:
         health_status["checks"]["xtts"] = {"status": "error", "message": str(e)}
         is_healthy = False
@@ -3,11 +3,18 @@ Prometheus Metrics for Monitoring
 Sprint 7 - Monitoring & Observability
 """
 
-from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import Counter, Histogram, Gauge, generate_latest, start_http_server, CONTENT_TYPE_LATEST
+from prometheus_client.metrics_core import Metric
+from prometheus_client.parser import text_string_to_metric_families
 from fastapi import APIRouter, Response
 from functools import wraps
 import time
-from typing import Callable
+import urllib.request
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
 
 router = APIRouter(tags=["monitoring"])
 
@@ -70,6 +77,37 @@ audio_generation_duration_seconds = Histogram(
     buckets=[0.5, 1, 2, 5, 10, 20, 30]
 )
 
+synthesis_stage_duration_seconds = Histogram(
+    'synthesis_stage_duration_seconds',
+    'Duration of each synthesis pipeline stage in seconds (see app/tracing.py)',
+    ['stage'],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+)
+
+# Capacidade: labels language/quality_profile/device (ver app/tracing.py)
+SYNTHESIS_LABELS = ['language', 'quality_profile', 'device']
+
+synthesis_rtf = Histogram(
+    'synthesis_rtf',
+    'Real-time factor per request (wall seconds / audio seconds, <1 = faster than real time)',
+    SYNTHESIS_LABELS,
+    buckets=[0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10]
+)
+
+gpt_tokens_per_second = Histogram(
+    'gpt_tokens_per_second',
+    'GPT audio tokens decoded per second',
+    SYNTHESIS_LABELS,
+    buckets=[5, 10, 20, 40, 60, 80, 100, 150, 200, 300, 500, 1000]
+)
+
+vocoder_samples_per_second = Histogram(
+    'vocoder_samples_per_second',
+    'Vocoder output samples per second (24kHz: 24000 = real time)',
+    SYNTHESIS_LABELS,
+    buckets=[12000, 24000, 48000, 120000, 240000, 480000, 1200000, 2400000, 4800000, 12000000]
+)
+
 audio_file_size_bytes = Histogram(
     'audio_file_size_bytes',
     'Generated audio file size in bytes',
@@ -89,6 +127,30 @@ gpu_utilization_percent = Gauge(
     ['gpu_id']
 )
 
+gpu_memory_reserved_bytes = Gauge(
+    'gpu_memory_reserved_bytes',
+    'GPU memory reserved by the PyTorch caching allocator in bytes',
+    ['gpu_id']
+)
+
+# Process / event loop (TelemetrySampler, app/telemetry.py)
+# RSS já é exportado pelo ProcessCollector padrão (process_resident_memory_bytes)
+process_cpu_percent = Gauge(
+    'process_cpu_percent',
+    'API process CPU utilization percentage (100 = one core)'
+)
+
+event_loop_lag_seconds = Gauge(
+    'event_loop_lag_seconds',
+    'Delay of the telemetry sampler wake-up (event loop blocked time)'
+)
+
+executor_queue_depth = Gauge(
+    'executor_queue_depth',
+    'Tasks waiting in executor queues',
+    ['executor']
+)
+
 # Cache metrics
 cache_hits_total = Counter(
     'cache_hits_total',
@@ -110,6 +172,29 @@ api_latency_seconds = Histogram(
     buckets=[0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10]
 )
 
+# HTTP sizes / concorrência (labels: template da rota, ver PrometheusMiddleware)
+_SIZE_BUCKETS = [100, 1000, 10000, 100000, 1000000, 10000000, 100000000]
+
+http_request_size_bytes = Histogram(
+    'http_request_size_bytes',
+    'HTTP request body size in bytes',
+    ['method', 'endpoint'],
+    buckets=_SIZE_BUCKETS
+)
+
+http_response_size_bytes = Histogram(
+    'http_response_size_bytes',
+    'HTTP response body size in bytes',
+    ['method', 'endpoint'],
+    buckets=_SIZE_BUCKETS
+)
+
+http_requests_in_flight = Gauge(
+    'http_requests_in_flight',
+    'HTTP requests currently being served',
+    ['method', 'endpoint']
+)
+
 # ==================== HELPER FUNCTIONS ====================
 
 def track_request(method: str, endpoint: str, status: int):
@@ -152,6 +237,106 @@ def track_gpu_metrics(gpu_id: int, memory_used: int, utilization: float):
     gpu_utilization_percent.labels(gpu_id=str(gpu_id)).set(utilization)
 
 
+def start_worker_metrics_server(port: int) -> None:
+    """
+    Exporter HTTP do registry padrão em :port/metrics.
+
+    Para processos sem FastAPI (worker Celery): as sínteses de /jobs
+    registram estágios e capacidade no registry do próprio worker.
+    """
+    start_http_server(port)
+    logger.info(f"📈 Worker metrics exporter on :{port}/metrics")
+
+
+def fetch_metric_families(url: str, timeout: float = 2.0) -> List[Metric]:
+    """
+    Lê um endpoint /metrics de outro processo (exporter do worker Celery).
+
+    Indisponível = lista vazia (logado): /admin/stats segue com os dados locais.
+    """
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            text = response.read().decode("utf-8")
+        return list(text_string_to_metric_families(text))
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Metrics unavailable at {url}: {e}")
+        return []
+
+
+def summarize_histogram(histogram: Histogram, extra_families: Iterable[Metric] = ()) -> Dict[str, Dict[str, float]]:
+    """
+    Resumo por conjunto de labels: count, mean e p50/p95 aproximados pelos buckets.
+
+    Args:
+        extra_families: Métricas de outros processos (fetch_metric_families);
+            séries com o mesmo nome do histograma são somadas às locais
+
+    Returns:
+        {"pt/balanced/cuda": {"count": n, "mean": x, "p50": y, "p95": z}, ...}
+    """
+    families = list(histogram.collect())
+    names = {metric.name for metric in families}
+    families += [metric for metric in extra_families if metric.name in names]
+    # Ordem da definição (o parser de texto ordena os labels por nome)
+    label_names = histogram._labelnames
+
+    series: Dict[tuple, Dict] = {}
+    for metric in families:
+        for sample in metric.samples:
+            labels = dict(sample.labels)
+            le = labels.pop('le', None)
+            key = tuple(labels[name] for name in label_names if name in labels)
+            entry = series.setdefault(key, {"buckets": {}, "count": 0.0, "sum": 0.0})
+            if sample.name.endswith('_bucket'):
+                bound = float(le)
+                entry["buckets"][bound] = entry["buckets"].get(bound, 0.0) + sample.value
+            elif sample.name.endswith('_count'):
+                entry["count"] += sample.value
+            elif sample.name.endswith('_sum'):
+                entry["sum"] += sample.value
+
+    summary = {}
+    for key, entry in series.items():
+        count = entry["count"]
+        if not count:
+            continue
+        buckets = sorted(entry["buckets"].items())
+        summary["/".join(key)] = {
+            "count": int(count),
+            "mean": round(entry["sum"] / count, 4),
+            "p50": _bucket_quantile(buckets, count, 0.50),
+            "p95": _bucket_quantile(buckets, count, 0.95),
+        }
+    return summary
+
+
+def capacity_summary(worker_families: Iterable[Metric] = ()) -> Dict[str, Dict]:
+    """
+    RTF, GPT tokens/s e vocoder samples/s por language/quality_profile/device.
+
+    Args:
+        worker_families: Métricas do worker Celery (sínteses de /jobs),
+            somadas às do processo atual
+    """
+    worker_families = list(worker_families)
+    return {
+        "rtf": summarize_histogram(synthesis_rtf, worker_families),
+        "gpt_tokens_per_second": summarize_histogram(gpt_tokens_per_second, worker_families),
+        "vocoder_samples_per_second": summarize_histogram(vocoder_samples_per_second, worker_families),
+    }
+
+
+def _bucket_quantile(buckets: List[Tuple[float, float]], count: float, q: float) -> float:
+    """Quantil aproximado (limite superior do bucket, como histogram_quantile sem interpolação)"""
+    rank = q * count
+    previous_bound = 0.0
+    for bound, cumulative in buckets:
+        if cumulative >= rank:
+            return bound if bound != float('inf') else previous_bound
+        previous_bound = bound
+    return previous_bound
+
+
 # ==================== DECORATORS ====================
 
 def track_latency(endpoint: str):
@@ -190,6 +375,9 @@ async def metrics():
           - targets: ['localhost:8005']
         metrics_path: '/metrics'
         scrape_interval: 15s
+      - job_name: 'tts-webui-worker'  # sínteses de /jobs (WORKER_METRICS_PORT)
+        static_configs:
+          - targets: ['celery-worker:9108']
     ```
     """
     return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -204,10 +392,13 @@ async def health():
     """
     from datetime import datetime
     
+    from app.telemetry import telemetry_sampler
+    
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
-        "service": "tts-webui"
+        "service": "tts-webui",
+        "telemetry": telemetry_sampler.latest()
     }
 
 
@@ -216,20 +407,25 @@ async def readiness():
     """
     Readiness check endpoint for Kubernetes
     
-    Returns 200 OK if service is ready to accept traffic.
+    Returns 200 OK if service is ready to accept traffic, 503 otherwise.
     Checks:
-    - GPU availability
+    - GPU availability (ignorado quando o serviço roda em CPU)
     - Redis connection
-    - Model loading status
+    - Model loading status (background load em app/startup.py)
     """
     import torch
+    from fastapi.responses import JSONResponse
     from app.main import job_store
+    from app.dependencies import _xtts_service
+    from app.startup import startup_tracker
     
     checks = {
         "gpu": torch.cuda.is_available(),
         "redis": False,
-        "models": True  # TODO: Check if models are loaded
+        "models": bool(startup_tracker.is_ready and _xtts_service and _xtts_service.is_ready),
     }
+    if _xtts_service is not None and _xtts_service.device == "cpu":
+        checks.pop("gpu")
     
     try:
         job_store.redis.ping()
@@ -239,39 +435,103 @@ async def readiness():
     
     all_ready = all(checks.values())
     
-    return {
-        "ready": all_ready,
-        "checks": checks
-    }, 200 if all_ready else 503
+    return JSONResponse(
+        content={
+            "ready": all_ready,
+            "checks": checks,
+            "startup": startup_tracker.summary()
+        },
+        status_code=200 if all_ready else 503
+    )
 
 
 # ==================== BACKGROUND GPU MONITORING ====================
 
-async def monitor_gpu_metrics():
+def collect_gpu_metrics() -> List[Dict]:
     """
-    Background task to monitor GPU metrics
+    Lê memória alocada/reservada e utilização de cada GPU e atualiza os gauges.
+    
+    Chamado pelo TelemetrySampler (app/telemetry.py) em background, nunca
+    no caminho da requisição.
     
-    Call this periodically (e.g., every 10 seconds) to update GPU metrics.
+    Returns:
+        Lista de {"gpu_id", "memory_allocated", "memory_reserved", "utilization"}
     """
+    gpus = []
     try:
         import torch
         if torch.cuda.is_available():
             for i in range(torch.cuda.device_count()):
                 memory_allocated = torch.cuda.memory_allocated(i)
                 memory_reserved = torch.cuda.memory_reserved(i)
-                utilization = torch.cuda.utilization(i) if hasattr(torch.cuda, 'utilization') else 0
+                try:
+                    # Requer pynvml
+                    utilization = torch.cuda.utilization(i)
+                except Exception:
+                    utilization = 0
                 
                 track_gpu_metrics(i, memory_allocated, utilization)
+                gpu_memory_reserved_bytes.labels(gpu_id=str(i)).set(memory_reserved)
+                gpus.append({
+                    "gpu_id": i,
+                    "memory_allocated": memory_allocated,
+                    "memory_reserved": memory_reserved,
+                    "utilization": utilization,
+                })
     except Exception as e:
-        print(f"Error monitoring GPU metrics: {e}")
+        logger.warning(f"⚠️ Error monitoring GPU metrics: {e}")
+    return gpus
+
+
+async def monitor_gpu_metrics():
+    """
+    Background task to monitor GPU metrics
+    
+    Agendado pelo TelemetrySampler (app/telemetry.py); mantido por compatibilidade.
+    """
+    collect_gpu_metrics()
 
 
 # ==================== MIDDLEWARE ====================
 
+# Requisições que não casam com nenhuma rota (404 de scanners, typos...)
+# compartilham um único label: cardinalidade limitada ao número de rotas
+UNMATCHED_ROUTE = "__unmatched__"
+
+
+def resolve_route_template(app, scope) -> str:
+    """
+    Template da rota que atende a requisição (`/jobs/{job_id}/download`).
+
+    Usa o mesmo matching do router do FastAPI/Starlette. Mounts (StaticFiles)
+    são agrupados sob `<mount>/{path:path}`; método não permitido (405)
+    usa o template da rota cujo path casou.
+    """
+    from starlette.routing import Match, Mount
+
+    router = getattr(app, "router", None)
+    partial = None
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.NONE:
+            continue
+        template = f"{route.path}/{{path:path}}" if isinstance(route, Mount) else route.path
+        if match == Match.FULL:
+            return template
+        if partial is None:
+            partial = template
+    return partial or UNMATCHED_ROUTE
+
+
 class PrometheusMiddleware:
     """
     Middleware to automatically track all HTTP requests
     
+    Labels usam o template da rota (não o path bruto), então o número de
+    séries é limitado por rotas x métodos x status, independente do volume
+    de jobs. Registra também tamanho de request/response e requisições em
+    andamento por rota.
+    
     Usage in main.py:
     ```python
     from app.metrics import PrometheusMiddleware
@@ -282,22 +542,41 @@ class PrometheusMiddleware:
         self.app = app
     
     async def __call__(self, scope, receive, send):
-        if scope["type"] == "http":
-            start_time = time.time()
-            
-            async def send_wrapper(message):
-                if message["type"] == "http.response.start":
-                    duration = time.time() - start_time
-                    method = scope["method"]
-                    path = scope["path"]
-                    status = message["status"]
-                    
-                    # Track request
-                    track_request(method, path, status)
-                    api_latency_seconds.labels(method=method, endpoint=path).observe(duration)
-                
-                await send(message)
-            
-            await self.app(scope, receive, send_wrapper)
-        else:
+        if scope["type"] != "http":
             await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        endpoint = resolve_route_template(scope.get("app"), scope)
+        in_flight = http_requests_in_flight.labels(method=method, endpoint=endpoint)
+        request_size = 0
+        response_size = 0
+        status = 500
+        
+        async def receive_wrapper():
+            nonlocal request_size
+            message = await receive()
+            if message["type"] == "http.request":
+                request_size += len(message.get("body", b""))
+            return message
+        
+        async def send_wrapper(message):
+            nonlocal response_size, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+        
+        in_flight.inc()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            # Latência até o fim do corpo (inclui streaming de arquivos)
+            duration = time.perf_counter() - start_time
+            in_flight.dec()
+            track_request(method, endpoint, status)
+            api_latency_seconds.labels(method=method, endpoint=endpoint).observe(duration)
+            http_request_size_bytes.labels(method=method, endpoint=endpoint).observe(request_size)
+            http_response_size_bytes.labels(method=method, endpoint=endpoint).observe(response_size)
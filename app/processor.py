@@ -12,6 +12,8 @@ from .exceptions import DubbingException, VoiceCloneException
 from .resilience import CircuitBreaker
 from .quality_profile_mapper import map_quality_profile_for_fallback
 from .services.xtts_service import XTTSService
+from .tracing import stage
+from .metrics import audio_file_size_bytes
 
 logger = logging.getLogger(__name__)
 
@@ -129,8 +131,10 @@ class VoiceProcessor:
             processed_dir.mkdir(exist_ok=True, parents=True)
             
             output_path = processed_dir / f"{job.id}.wav"
-            with open(output_path, 'wb') as f:
-                f.write(audio_bytes)
+            with stage("disk_write"):
+                with open(output_path, 'wb') as f:
+                    f.write(audio_bytes)
+            audio_file_size_bytes.observe(len(audio_bytes))
             
             job.output_file = str(output_path)
             job.duration = duration
@@ -0,0 +1,308 @@
+"""
+Profiling API - captura sob demanda dentro do processo em produção
+
+Endpoints admin, com a autenticação do app (JWT `Authorization: Bearer` ou
+`X-API-Key`, ver `get_current_user` em advanced_features.py) + usuário em
+PROFILING_ADMIN_USERS (vazio = endpoints desabilitados):
+
+- POST /admin/profile:  captura por `duration` segundos
+    - torch: trace do torch.profiler (CPU + CUDA quando disponível),
+      exportado como Chrome trace (chrome://tracing, Perfetto) + tabela de ops.
+      O torch.profiler só registra ops da thread que o iniciou: ele é
+      iniciado e exportado na thread do modelo do XTTSService
+      (run_in_model_thread), onde as sínteses rodam
+    - stack: amostragem das pilhas Python de todas as threads (estilo
+      py-spy), em formato "folded" (flamegraph.pl, speedscope)
+- GET  /admin/profile:  lista capturas
+- GET  /admin/profile/{profile_id}/{artifact}: download de um artefato
+
+Artefatos ficam em temp/profiles/<profile_id>/, com retenção automática
+por quantidade e idade. Uma captura por vez (409 se já houver outra).
+
+Só o processo da API é perfilado: sínteses de jobs rodam no worker Celery
+(outro processo) e não aparecem nas capturas; para elas, rode o worker com
+py-spy / torch.profiler localmente. O mesmo vale para os processos do
+CPUInferencePool (XTTS_CPU_WORKERS > 1).
+"""
+import asyncio
+import json
+import secrets
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from .advanced_features import get_current_user
+from .dependencies import get_current_xtts_service
+from .logging_config import get_logger
+from .settings import get_settings
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/admin/profile", tags=["admin"])
+
+PROFILE_MODES = ("torch", "stack", "both")
+
+_capture_lock = asyncio.Lock()
+
+
+def get_profiles_dir() -> Path:
+    return get_settings().temp_dir / "profiles"
+
+
+# ==================== AUTH ====================
+
+async def require_admin(user: str = Depends(get_current_user)) -> str:
+    """Usuário autenticado (JWT ou API key) presente em PROFILING_ADMIN_USERS"""
+    admins = {name.strip() for name in get_settings().profiling_admin_users.split(",") if name.strip()}
+    if not admins:
+        raise HTTPException(status_code=403, detail="Profiling disabled (PROFILING_ADMIN_USERS not set)")
+    if user not in admins:
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return user
+
+
+# ==================== STACK SAMPLER ====================
+
+def _format_stack(frame) -> List[str]:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class StackSampler(threading.Thread):
+    """
+    Amostra `sys._current_frames()` a cada `interval` segundos.
+
+    Cada amostra vira uma linha "thread;frame;frame..." no contador
+    (formato folded); a raiz é o nome da thread, então as threads do
+    executor de síntese aparecem separadas do event loop.
+    """
+
+    def __init__(self, interval: float = 0.01, thread_prefix: str = ""):
+        super().__init__(name="profiling-stack-sampler", daemon=True)
+        self.interval = interval
+        self.thread_prefix = thread_prefix
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                name = names.get(thread_id, str(thread_id))
+                if thread_id == own_id or not name.startswith(self.thread_prefix):
+                    continue
+                self.stacks[";".join([name] + _format_stack(frame))] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def write_folded(self, path: Path) -> Path:
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        path.write_text("\n".join(lines) + "\n" if lines else "")
+        return path
+
+
+# ==================== TORCH PROFILER ====================
+
+def _start_torch_profiler():
+    import torch
+    from torch.profiler import ProfilerActivity, profile
+
+    activities = [ProfilerActivity.CPU]
+    if torch.cuda.is_available():
+        activities.append(ProfilerActivity.CUDA)
+    profiler = profile(activities=activities, record_shapes=True, profile_memory=True)
+    profiler.__enter__()
+    return profiler, activities
+
+
+def _export_torch_profile(profiler, activities, output_dir: Path) -> List[str]:
+    import torch
+    from torch.profiler import ProfilerActivity
+
+    if ProfilerActivity.CUDA in activities:
+        torch.cuda.synchronize()
+    profiler.__exit__(None, None, None)
+
+    profiler.export_chrome_trace(str(output_dir / "torch_trace.json"))
+    sort_by = "self_cuda_time_total" if ProfilerActivity.CUDA in activities else "self_cpu_time_total"
+    table = profiler.key_averages().table(sort_by=sort_by, row_limit=50)
+    (output_dir / "torch_ops.txt").write_text(table)
+    return ["torch_trace.json", "torch_ops.txt"]
+
+
+# ==================== CAPTURE ====================
+
+async def _run_inline(fn: Callable[..., Any], *args) -> Any:
+    return fn(*args)
+
+
+async def capture_profile(
+    duration: float,
+    mode: str = "both",
+    output_root: Optional[Path] = None,
+    sample_interval: float = 0.01,
+    thread_prefix: str = "",
+    model_thread: Optional[Callable[..., Awaitable[Any]]] = None
+) -> Dict:
+    """
+    Captura perfis por `duration` segundos sem bloquear o event loop.
+
+    Args:
+        model_thread: Executor da thread do modelo (XTTSService.run_in_model_thread);
+            o torch.profiler é iniciado/exportado nela. None = thread do event loop
+            (só ops executadas no próprio loop aparecem)
+
+    Returns:
+        Metadados da captura (também gravados em summary.json)
+    """
+    output_root = Path(output_root or get_profiles_dir())
+    profile_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(3)}"
+    output_dir = output_root / profile_id
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    sampler = None
+    profiler = None
+    activities = []
+    artifacts: List[str] = []
+    errors: Dict[str, str] = {}
+
+    if mode in ("stack", "both"):
+        sampler = StackSampler(sample_interval, thread_prefix)
+        sampler.start()
+    run = model_thread or _run_inline
+    if mode in ("torch", "both"):
+        try:
+            # Espera a síntese em andamento terminar (thread do modelo é FIFO)
+            profiler, activities = await run(_start_torch_profiler)
+        except Exception as e:
+            errors["torch"] = str(e)
+            logger.warning(f"⚠️ torch.profiler unavailable: {e}")
+
+    started = time.time()
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        if sampler is not None:
+            sampler.stop()
+            artifacts.append(sampler.write_folded(output_dir / "stacks.folded").name)
+        if profiler is not None:
+            try:
+                artifacts += await run(_export_torch_profile, profiler, activities, output_dir)
+            except Exception as e:
+                errors["torch"] = str(e)
+                logger.warning(f"⚠️ torch.profiler export failed: {e}")
+
+    summary = {
+        "profile_id": profile_id,
+        "mode": mode,
+        "started_at": datetime.fromtimestamp(started).isoformat(),
+        "duration_seconds": round(time.time() - started, 3),
+        "activities": [str(activity).split(".")[-1] for activity in activities],
+        "stack_samples": sampler.samples if sampler else 0,
+        "artifacts": artifacts,
+        "errors": errors,
+    }
+    (output_dir / "summary.json").write_text(json.dumps(summary, indent=2))
+    logger.info(f"⏱️ Profile {profile_id} captured ({mode}, {duration:g}s): {', '.join(artifacts)}")
+    return summary
+
+
+def prune_profiles(root: Path, keep: int, max_age_hours: float) -> List[str]:
+    """Remove capturas além das `keep` mais recentes ou mais velhas que `max_age_hours`"""
+    if not root.exists():
+        return []
+    profiles = sorted((p for p in root.iterdir() if p.is_dir()), key=lambda p: p.stat().st_mtime, reverse=True)
+    cutoff = time.time() - max_age_hours * 3600
+    removed = []
+    for index, path in enumerate(profiles):
+        if index >= keep or path.stat().st_mtime < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(path.name)
+    return removed
+
+
+def list_profiles(root: Path) -> List[Dict]:
+    profiles = []
+    if root.exists():
+        for summary_path in sorted(root.glob("*/summary.json"), reverse=True):
+            try:
+                profiles.append(json.loads(summary_path.read_text()))
+            except (OSError, ValueError):
+                continue
+    return profiles
+
+
+# ==================== ENDPOINTS ====================
+
+@router.post("", dependencies=[Depends(require_admin)])
+async def create_profile(
+    duration: float = Query(10.0, gt=0, description="Capture duration in seconds"),
+    mode: str = Query("both", description="torch, stack or both"),
+    thread_prefix: str = Query("", description="Only sample threads whose name starts with this prefix")
+):
+    """
+    Captura perfil do processo em execução por `duration` segundos.
+
+    Para a thread do modelo use `thread_prefix=xtts-synthesis`
+    (XTTSService.run_in_model_thread).
+    Jobs do worker Celery não aparecem: só o processo da API é perfilado.
+    """
+    settings = get_settings()
+    if mode not in PROFILE_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid mode '{mode}'. Use: {', '.join(PROFILE_MODES)}")
+    if duration > settings.profiling_max_duration_seconds:
+        raise HTTPException(
+            status_code=400,
+            detail=f"duration must be <= {settings.profiling_max_duration_seconds}s"
+        )
+    if _capture_lock.locked():
+        raise HTTPException(status_code=409, detail="Another profile capture is in progress")
+
+    async with _capture_lock:
+        root = get_profiles_dir()
+        service = get_current_xtts_service()
+        summary = await capture_profile(
+            duration, mode, root,
+            sample_interval=settings.profiling_sample_interval_ms / 1000,
+            thread_prefix=thread_prefix,
+            model_thread=service.run_in_model_thread if service is not None else None
+        )
+        prune_profiles(root, settings.profiling_retention_count, settings.profiling_retention_hours)
+    return summary
+
+
+@router.get("", dependencies=[Depends(require_admin)])
+async def get_profiles():
+    """Lista capturas disponíveis (mais recentes primeiro)"""
+    settings = get_settings()
+    root = get_profiles_dir()
+    prune_profiles(root, settings.profiling_retention_count, settings.profiling_retention_hours)
+    return {"profiles": list_profiles(root)}
+
+
+@router.get("/{profile_id}/{artifact}", dependencies=[Depends(require_admin)])
+async def download_profile_artifact(profile_id: str, artifact: str):
+    """Download de um artefato (torch_trace.json, torch_ops.txt, stacks.folded, summary.json)"""
+    root = get_profiles_dir().resolve()
+    path = (root / profile_id / artifact).resolve()
+    if path.parent.parent != root or not path.is_file():
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return FileResponse(path, filename=f"{profile_id}_{artifact}")
@@ -0,0 +1,236 @@
+"""
+CPU Inference Pool - múltiplos processos XTTS compartilhando pesos
+
+Em nós sem GPU, um único processo Python não usa todos os cores de forma
+eficiente (o GPT é autoregressivo). Este pool distribui sínteses entre N
+processos, cada um com seu próprio limite de threads, mas com UMA cópia
+física dos pesos:
+
+1. Pesos exportados uma vez para safetensors (models_dir/shared/)
+2. Cada worker monta o modelo e faz load_state_dict(assign=True) sobre o
+   arquivo mapeado em memória (app/shared_weights.py)
+3. Páginas dos pesos ficam no page cache, compartilhadas copy-on-write
+
+O RSS total cresce apenas com ativações/KV-cache por worker, não com o
+tamanho do modelo.
+
+Workers do pool NÃO aplicam a quantização int8 dinâmica (XTTS_CPU_QUANTIZE):
+quantize_dynamic cria pesos novos em cada processo, o que desfaz o
+compartilhamento via mmap. O GPT roda em fp32 sobre os pesos compartilhados.
+"""
+import asyncio
+import gc
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from ..logging_config import get_logger
+from ..exceptions import TTSEngineException
+
+logger = get_logger(__name__)
+
+# Estado por processo worker (inicializado em _init_worker)
+_worker_model = None
+_worker_latents: Dict[Tuple[str, float], tuple] = {}
+
+
+def split_threads(num_workers: int, total_cpus: int) -> int:
+    """Threads intra-op por worker (divisão da quota de CPU, mínimo 1)"""
+    return max(1, total_cpus // max(1, num_workers))
+
+
+def shared_weights_path(weights_dir: Path, model_name: str) -> Path:
+    """Arquivo safetensors do modelo (um por model_name)"""
+    return Path(weights_dir) / f"{model_name.replace('/', '--')}.safetensors"
+
+
+def _resolve_checkpoint_dir(model_name: str) -> Path:
+    """Diretório com config.json/vocab.json do modelo (baixa se necessário)"""
+    from TTS.utils.manage import ModelManager
+    model_path, _, _ = ModelManager(progress_bar=False).download_model(model_name)
+    return Path(model_path)
+
+
+def _export_weights(model_name: str, weights_path: str) -> None:
+    """Roda em processo descartável: carrega o checkpoint e grava safetensors"""
+    os.environ['COQUI_TOS_AGREED'] = '1'
+    from TTS.api import TTS
+    from ..shared_weights import save_shared_state_dict
+
+    tts = TTS(model_name=model_name, gpu=False, progress_bar=False)
+    save_shared_state_dict(tts.synthesizer.tts_model.state_dict(), Path(weights_path))
+
+
+def _init_worker(checkpoint_dir: str, weights_path: str, num_threads: int) -> None:
+    """Initializer do ProcessPoolExecutor: limita threads e monta o modelo"""
+    global _worker_model
+
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(num_threads)
+
+    import torch
+    from TTS.tts.configs.xtts_config import XttsConfig
+    from TTS.tts.layers.xtts.tokenizer import VoiceBpeTokenizer
+    from TTS.tts.models.xtts import Xtts
+    from ..shared_weights import load_shared_state_dict
+
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(1)
+
+    checkpoint_dir = Path(checkpoint_dir)
+    config = XttsConfig()
+    config.load_json(str(checkpoint_dir / "config.json"))
+
+    # Mesmo fluxo de Xtts.load_checkpoint(), mas sem ler model.pth
+    model = Xtts.init_from_config(config)
+    model.tokenizer = VoiceBpeTokenizer(vocab_file=str(checkpoint_dir / "vocab.json"))
+    model.init_models()
+    model.gpt.init_gpt_for_inference(kv_cache=model.args.kv_cache)
+
+    # assign=True: parâmetros passam a ser os tensores do mmap (zero-copy);
+    # os pesos aleatórios do init são liberados
+    model.load_state_dict(load_shared_state_dict(Path(weights_path)), assign=True)
+    model.eval()
+    gc.collect()
+
+    _worker_model = model
+
+
+def _worker_ping() -> Dict:
+    """Confirma worker pronto e reporta uso de memória"""
+    import psutil
+    mem = psutil.Process().memory_info()
+    return {"pid": os.getpid(), "rss_mb": round(mem.rss / 1e6, 1)}
+
+
+def _worker_synthesize(text: str, speaker_wav: str, language: str, params: Dict) -> np.ndarray:
+    """Síntese dentro do worker (latentes do speaker cacheados por arquivo)"""
+    key = (speaker_wav, os.path.getmtime(speaker_wav))
+    if key not in _worker_latents:
+        _worker_latents.clear()
+        _worker_latents[key] = _worker_model.get_conditioning_latents(audio_path=[speaker_wav])
+    gpt_cond_latent, speaker_embedding = _worker_latents[key]
+
+    out = _worker_model.inference(
+        text,
+        language,
+        gpt_cond_latent,
+        speaker_embedding,
+        temperature=params["temperature"],
+        speed=params["speed"],
+        top_p=params["top_p"],
+        repetition_penalty=params["repetition_penalty"],
+    )
+    return np.asarray(out["wav"], dtype=np.float32)
+
+
+class CPUInferencePool:
+    """
+    Pool de processos XTTS em CPU com pesos compartilhados via mmap.
+
+    Uso:
+        pool = CPUInferencePool(model_name, num_workers=4, weights_dir=Path("/app/models/shared"))
+        pool.start()
+        audio = await pool.synthesize(text, speaker_wav, "pt", params)
+        pool.shutdown()
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        num_workers: int,
+        weights_dir: Path,
+        threads_per_worker: int = 0
+    ):
+        """
+        Args:
+            model_name: Nome do modelo XTTS no Coqui TTS
+            num_workers: Número de processos
+            weights_dir: Diretório do safetensors compartilhado
+            threads_per_worker: Threads intra-op por processo (0 = quota / workers)
+        """
+        from ..cpu_inference import get_effective_cpu_count
+
+        self.model_name = model_name
+        self.num_workers = num_workers
+        self.weights_path = shared_weights_path(weights_dir, model_name)
+        self.threads_per_worker = threads_per_worker or split_threads(
+            num_workers, get_effective_cpu_count()
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._workers: Dict[int, Dict] = {}
+
+    def start(self) -> None:
+        """Exporta pesos (se necessário) e inicia os workers"""
+        # spawn: fork após inicializar torch/OpenMP pode travar
+        ctx = mp.get_context("spawn")
+
+        if not self.weights_path.exists():
+            logger.info(f"Exporting shared weights to {self.weights_path}...")
+            exporter = ctx.Process(
+                target=_export_weights, args=(self.model_name, str(self.weights_path))
+            )
+            exporter.start()
+            exporter.join()
+            if exporter.exitcode != 0 or not self.weights_path.exists():
+                raise TTSEngineException(
+                    f"Shared weights export failed (exit code {exporter.exitcode})"
+                )
+
+        checkpoint_dir = _resolve_checkpoint_dir(self.model_name)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(str(checkpoint_dir), str(self.weights_path), self.threads_per_worker),
+        )
+
+        # Força criação e inicialização de todos os workers agora (eager load)
+        futures = [self._executor.submit(_worker_ping) for _ in range(self.num_workers)]
+        for future in futures:
+            info = future.result()
+            self._workers[info["pid"]] = info
+
+        logger.info(
+            f"✅ CPU inference pool ready: {len(self._workers)} workers x "
+            f"{self.threads_per_worker} threads (weights: {self.weights_path.name})"
+        )
+
+    async def synthesize(self, text: str, speaker_wav: Path, language: str, params: Dict) -> np.ndarray:
+        """Executa síntese em um worker livre"""
+        if self._executor is None:
+            raise TTSEngineException("CPU inference pool not started")
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, _worker_synthesize, text, str(speaker_wav), language, params
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            logger.info("🛑 CPU inference pool stopped")
+
+    @property
+    def is_running(self) -> bool:
+        return self._executor is not None
+
+    @property
+    def queue_depth(self) -> int:
+        """Sínteses submetidas e ainda não concluídas (em execução + aguardando)"""
+        if self._executor is None:
+            return 0
+        return len(getattr(self._executor, "_pending_work_items", ()))
+
+    def get_status(self) -> Dict:
+        return {
+            "workers": self.num_workers,
+            "threads_per_worker": self.threads_per_worker,
+            "weights_path": str(self.weights_path),
+            "worker_pids": sorted(self._workers),
+        }
@@ -4,25 +4,34 @@ XTTS-v2 Service - Single Responsibility Principle
 Responsável APENAS por síntese TTS, sem HTTP, sem processamento de jobs.
 Implementa eager loading para eliminar atraso da primeira request.
 """
+import asyncio
+import contextvars
+import functools
+import importlib.util
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Tuple
-import torch
+from typing import Any, Callable, Optional, Dict, Tuple, TYPE_CHECKING
 import numpy as np
-import soundfile as sf
-import io
-from TTS.api import TTS
 
 from ..logging_config import get_logger
 from ..exceptions import TTSEngineException
+from ..warmup import FirstRequestsRecorder
+from ..tracing import stage, instrument_xtts_model, synthesis_labels, observe_rtf
+from ..metrics import audio_generation_duration_seconds
+from ..text_normalizer import normalize_for_synthesis
+
+if TYPE_CHECKING:
+    from TTS.api import TTS
 
 logger = get_logger(__name__)
 
-# Lazy import for noisereduce (optional dependency)
-try:
-    import noisereduce as nr
-    DENOISE_AVAILABLE = True
-except ImportError:
-    DENOISE_AVAILABLE = False
+# torch, Coqui TTS e noisereduce são importados sob demanda (initialize /
+# _apply_denoise) para que o import do app não custe ~15s no cold start
+
+# noisereduce (optional dependency)
+DENOISE_AVAILABLE = importlib.util.find_spec("noisereduce") is not None
+if not DENOISE_AVAILABLE:
     logger.warning("noisereduce not installed - denoise disabled")
 
 
@@ -36,11 +45,25 @@ class XTTSService:
     - Stateless: Sem cache interno (use Redis se necessário)
     """
     
+    # Speaker padrão para dublagem sem voz clonada (mesmo do XttsEngine)
+    DEFAULT_SPEAKER_PATH = "/app/uploads/default_speaker.wav"
+    
+    # Thread única que executa o modelo (ver run_in_model_thread)
+    SYNTHESIS_THREAD_PREFIX = "xtts-synthesis"
+    
     def __init__(
         self,
         model_name: str = "tts_models/multilingual/multi-dataset/xtts_v2",
         device: str = "cuda",
-        models_dir: Optional[Path] = None
+        models_dir: Optional[Path] = None,
+        cpu_quantize: bool = True,
+        cpu_threads: int = 0,
+        cpu_interop_threads: int = 0,
+        cpu_compile_vocoder: bool = False,
+        cpu_workers: int = 0,
+        cudnn_benchmark: bool = False,
+        first_requests_limit: int = 20,
+        text_normalization: bool = True
     ):
         """
         Inicializa XTTS service.
@@ -49,13 +72,46 @@ class XTTSService:
             model_name: Nome do modelo XTTS no Coqui TTS
             device: 'cuda' ou 'cpu'
             models_dir: Diretório para cache de modelos (opcional)
+            cpu_quantize: Quantização int8 do GPT quando device='cpu'
+            cpu_threads: Threads intra-op em CPU (0 = quota do cgroup)
+            cpu_interop_threads: Threads inter-op em CPU (0 = 1)
+            cpu_compile_vocoder: torch.compile no vocoder quando device='cpu'
+            cpu_workers: Processos de inferência com pesos compartilhados
+                (device='cpu', >1 ativa o CPUInferencePool)
+            cudnn_benchmark: torch.backends.cudnn.benchmark em GPU
+            first_requests_limit: Nº de sínteses iniciais medidas (p50/p99)
+            text_normalization: Normalizar texto PT como no dataset de treino
+                (números/símbolos por extenso, ver app/text_normalizer.py)
         """
         self.model_name = model_name
         self.device = device
         self.models_dir = models_dir
-        self.tts: Optional[TTS] = None
+        self.tts: Optional["TTS"] = None
         self._initialized = False
         
+        # Uma instância do modelo = uma inferência por vez: chamadas
+        # concorrentes disputariam threads de CPU/VRAM e misturariam os
+        # hooks de tracing da instância. Um worker serializa (fila FIFO)
+        self._model_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=self.SYNTHESIS_THREAD_PREFIX
+        )
+        
+        # CPU inference mode (ver app/cpu_inference.py)
+        self.cpu_quantize = cpu_quantize
+        self.cpu_threads = cpu_threads
+        self.cpu_interop_threads = cpu_interop_threads
+        self.cpu_compile_vocoder = cpu_compile_vocoder
+        self.cpu_optimizations: Dict[str, bool] = {}
+        self.cpu_workers = cpu_workers
+        self.pool = None  # CPUInferencePool (ver app/services/cpu_pool.py)
+        self.cudnn_benchmark = cudnn_benchmark
+        
+        # Mesmo preprocessamento de texto do dataset de fine-tuning
+        self.text_normalization = text_normalization
+        
+        # Latência das primeiras requisições reais (ver app/warmup.py)
+        self.first_requests = FirstRequestsRecorder(first_requests_limit)
+        
         # Quality profiles (fast/balanced/high_quality)
         self.quality_profiles = {
             "fast": {
@@ -81,6 +137,28 @@ class XTTSService:
             }
         }
     
+    @classmethod
+    def from_settings(cls, settings) -> "XTTSService":
+        """
+        Service configurado pelas Settings do app (XTTS_*).
+        
+        Única fábrica para a API (startup) e o worker Celery: opções de
+        CPU/GPU e normalização valem nos dois processos.
+        """
+        return cls(
+            model_name=settings.xtts_model_name,
+            device=settings.xtts_device,
+            models_dir=settings.models_dir,
+            cpu_quantize=settings.xtts_cpu_quantize,
+            cpu_threads=settings.xtts_cpu_threads,
+            cpu_interop_threads=settings.xtts_cpu_interop_threads,
+            cpu_compile_vocoder=settings.xtts_cpu_compile_vocoder,
+            cpu_workers=settings.xtts_cpu_workers,
+            cudnn_benchmark=settings.xtts_cudnn_benchmark,
+            first_requests_limit=settings.xtts_first_requests_window,
+            text_normalization=settings.xtts_text_normalization
+        )
+    
     def initialize(self) -> None:
         """
         Eager load do modelo no startup.
@@ -97,6 +175,10 @@ class XTTSService:
         import os
         os.environ['COQUI_TOS_AGREED'] = '1'
         
+        import torch
+        from TTS.api import TTS
+        from ..cpu_inference import configure_cpu_threads, apply_cpu_optimizations
+        
         logger.info(f"🚀 Loading XTTS-v2 model: {self.model_name}")
         logger.info(f"   Device: {self.device}")
         
@@ -106,6 +188,21 @@ class XTTSService:
                 logger.warning("CUDA not available, falling back to CPU")
                 self.device = "cpu"
             
+            # Multi-processo em CPU: workers montam o modelo sobre pesos mmap,
+            # o processo da API não mantém cópia própria
+            if self.device == "cpu" and self.cpu_workers > 1:
+                self._start_cpu_pool()
+                self._initialized = True
+                return
+            
+            # Autotune de kernels cuDNN (a suíte de warm-up cobre os shapes comuns)
+            if self.device == "cuda" and self.cudnn_benchmark:
+                torch.backends.cudnn.benchmark = True
+            
+            # Threads antes de carregar (evita oversubscription no load)
+            if self.device == "cpu":
+                configure_cpu_threads(self.cpu_threads, self.cpu_interop_threads)
+            
             # Carregar modelo
             gpu = (self.device == "cuda")
             self.tts = TTS(
@@ -114,6 +211,17 @@ class XTTSService:
                 progress_bar=False
             )
             
+            # CPU inference mode: int8 GPT + vocoder compilado
+            if self.device == "cpu":
+                self.cpu_optimizations = apply_cpu_optimizations(
+                    self.tts.synthesizer.tts_model,
+                    quantize=self.cpu_quantize,
+                    compile_vocoder=self.cpu_compile_vocoder
+                )
+            
+            # Histogramas por estágio (normalization/conditioning/gpt_decode/vocoder)
+            instrument_xtts_model(self.tts.synthesizer.tts_model)
+            
             # Se models_dir especificado, configurar cache
             if self.models_dir:
                 self.models_dir.mkdir(parents=True, exist_ok=True)
@@ -131,6 +239,59 @@ class XTTSService:
             logger.error(f"Failed to load XTTS model: {e}", exc_info=True)
             raise TTSEngineException(f"XTTS initialization failed: {e}") from e
     
+    def ensure_model_files(self) -> Optional[Path]:
+        """
+        Garante que os arquivos do modelo estão no cache local (baixa se faltar).
+        
+        Returns:
+            Diretório do modelo, ou None se não for possível resolvê-lo
+        """
+        import os
+        os.environ['COQUI_TOS_AGREED'] = '1'
+        
+        from TTS.utils.manage import ModelManager
+        try:
+            model_path, _, _ = ModelManager(progress_bar=False).download_model(self.model_name)
+        except Exception as e:
+            logger.warning(f"Could not resolve model files for {self.model_name}: {e}")
+            return None
+        model_path = Path(model_path)
+        return model_path if model_path.is_dir() else model_path.parent
+    
+    def _start_cpu_pool(self) -> None:
+        """Inicia CPUInferencePool com pesos compartilhados em models_dir/shared"""
+        from .cpu_pool import CPUInferencePool
+        
+        if self.cpu_quantize:
+            # Quantizar criaria uma cópia dos pesos por processo (ver cpu_pool.py)
+            logger.warning("⚠️ XTTS_CPU_QUANTIZE ignored with XTTS_CPU_WORKERS > 1 (int8 would break shared mmap weights)")
+        weights_dir = (self.models_dir or Path("/app/models")) / "shared"
+        self.pool = CPUInferencePool(
+            model_name=self.model_name,
+            num_workers=self.cpu_workers,
+            weights_dir=weights_dir,
+            threads_per_worker=self.cpu_threads
+        )
+        self.pool.start()
+    
+    def shutdown(self) -> None:
+        """Libera o modelo e encerra processos do CPUInferencePool (se ativo)"""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        self.tts = None
+        self._initialized = False
+    
+    async def run_in_model_thread(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Executa `fn` na thread única do modelo (FIFO, uma chamada por vez).
+        
+        O contexto (contextvars) é copiado: labels de tracing/métricas
+        definidos pelo chamador valem dentro da thread.
+        """
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._model_executor, call)
+    
     async def synthesize(
         self,
         text: str,
@@ -153,7 +314,7 @@ class XTTSService:
         Raises:
             TTSEngineException: Se serviço não inicializado ou erro na síntese
         """
-        if not self._initialized or self.tts is None:
+        if not self.is_ready:
             raise TTSEngineException(
                 "XTTS service not initialized. Call initialize() first."
             )
@@ -168,36 +329,58 @@ class XTTSService:
         # Normalizar linguagem (pt-BR → pt)
         language = self._normalize_language(language)
         
+        # Texto na forma vista no treino ("3%" → "três porcento")
+        if self.text_normalization:
+            text = normalize_for_synthesis(text, language)
+        
         # Obter parâmetros do perfil
         params = self._get_profile_params(quality_profile)
+        profile_label = quality_profile if quality_profile in self.quality_profiles else "balanced"
         
+        start = time.perf_counter()
         try:
             logger.info(
                 f"Synthesizing: {len(text)} chars, lang={language}, "
                 f"profile={quality_profile}, speaker={speaker_wav.name}"
             )
             
-            # Síntese XTTS
-            wav = self.tts.tts(
-                text=text,
-                speaker_wav=str(speaker_wav),
-                language=language,
-                temperature=params["temperature"],
-                speed=params["speed"],
-                top_p=params["top_p"],
-                repetition_penalty=params["repetition_penalty"]
-            )
+            # Labels das métricas de capacidade (RTF, tokens/s, samples/s)
+            with synthesis_labels(language, profile_label, self.device):
+                if self.pool is not None:
+                    # Síntese em worker do pool (processo separado)
+                    audio_array = await self.pool.synthesize(
+                        text, speaker_wav, language, params
+                    )
+                else:
+                    # Síntese XTTS (bloqueante) na thread do modelo: não
+                    # trava o event loop (/health, /ready) e não roda em
+                    # paralelo com outra síntese na mesma instância
+                    wav = await self.run_in_model_thread(
+                        self.tts.tts,
+                        text=text,
+                        speaker_wav=str(speaker_wav),
+                        language=language,
+                        temperature=params["temperature"],
+                        speed=params["speed"],
+                        top_p=params["top_p"],
+                        repetition_penalty=params["repetition_penalty"]
+                    )
+                
+                    # Converter para numpy array
+                    audio_array = np.array(wav, dtype=np.float32)
+                sample_rate = 24000  # XTTS sempre usa 24kHz
             
-            # Converter para numpy array
-            audio_array = np.array(wav, dtype=np.float32)
-            sample_rate = 24000  # XTTS sempre usa 24kHz
+                # Denoise se high_quality
+                if params.get("denoise", False):
+                    with stage("denoise"):
+                        audio_array = self._apply_denoise(audio_array, sample_rate)
             
-            # Denoise se high_quality
-            if params.get("denoise", False):
-                audio_array = self._apply_denoise(audio_array, sample_rate)
-            
-            duration = len(audio_array) / sample_rate
-            logger.info(f"✅ Synthesis complete: {duration:.2f}s audio generated")
+                duration = len(audio_array) / sample_rate
+                logger.info(f"✅ Synthesis complete: {duration:.2f}s audio generated")
+                elapsed = time.perf_counter() - start
+                audio_generation_duration_seconds.observe(elapsed)
+                observe_rtf(elapsed, duration)
+                self.first_requests.record(elapsed)
             
             return audio_array, sample_rate
             
@@ -205,6 +388,43 @@ class XTTSService:
             logger.error(f"Synthesis failed: {e}", exc_info=True)
             raise TTSEngineException(f"XTTS synthesis error: {e}") from e
     
+    async def synthesize_async(
+        self,
+        text: str,
+        language: str = "pt",
+        speaker_wav: Optional[Path] = None,
+        quality_profile_id: Optional[str] = None
+    ) -> bytes:
+        """
+        Sintetiza e retorna WAV em bytes (usado por VoiceProcessor.process_dubbing_job).
+        
+        Args:
+            text: Texto para sintetizar
+            language: Código da linguagem
+            speaker_wav: Áudio de referência (None = DEFAULT_SPEAKER_PATH)
+            quality_profile_id: ID do quality profile ('xtts_balanced', ...) ou
+                nome do perfil do service ('fast', 'balanced', 'high_quality')
+        
+        Returns:
+            bytes: Arquivo WAV
+        """
+        import io
+        import soundfile as sf
+        
+        speaker = Path(speaker_wav) if speaker_wav else Path(self.DEFAULT_SPEAKER_PATH)
+        profile = (quality_profile_id or "balanced").removeprefix("xtts_")
+        
+        audio_array, sample_rate = await self.synthesize(
+            text=text,
+            speaker_wav=speaker,
+            language=language,
+            quality_profile=profile
+        )
+        with stage("encode"):
+            buffer = io.BytesIO()
+            sf.write(buffer, audio_array, sample_rate, format="WAV")
+            return buffer.getvalue()
+    
     def _normalize_language(self, language: str) -> str:
         """
         Normaliza código de linguagem para formato XTTS.
@@ -255,6 +475,8 @@ class XTTSService:
             return audio
         
         try:
+            import noisereduce as nr
+
             logger.debug("Applying denoise (spectral gating)")
             denoised = nr.reduce_noise(
                 y=audio,
@@ -278,6 +500,8 @@ class XTTSService:
     @property
     def is_ready(self) -> bool:
         """Healthcheck: retorna True se modelo carregado"""
+        if self.pool is not None:
+            return self._initialized and self.pool.is_running
         return self._initialized and self.tts is not None
     
     def get_status(self) -> Dict:
@@ -287,11 +511,14 @@ class XTTSService:
         Returns:
             Dict com informações de status
         """
+        import torch
+        
         status = {
             "initialized": self._initialized,
             "device": self.device,
             "model_name": self.model_name,
-            "ready": self.is_ready
+            "ready": self.is_ready,
+            "first_requests": self.first_requests.summary()
         }
         
         if self.device == "cuda" and torch.cuda.is_available():
@@ -307,5 +534,11 @@ class XTTSService:
             }
         else:
             status["gpu"] = {"available": False}
+            status["cpu"] = {
+                "num_threads": torch.get_num_threads(),
+                **self.cpu_optimizations
+            }
+            if self.pool is not None:
+                status["cpu"]["pool"] = self.pool.get_status()
         
         return status
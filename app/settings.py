@@ -6,8 +6,7 @@ Carrega de .env automaticamente.
 """
 from pathlib import Path
 from typing import Optional, Dict, Any
-import torch
-from pydantic import Field, field_validator
+from pydantic import AliasChoices, Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -38,6 +37,51 @@ class Settings(BaseSettings):
     xtts_sample_rate: int = Field(default=24000, description="XTTS sample rate (fixed)")
     xtts_default_language: str = Field(default="pt", description="Default language")
     
+    # === CPU INFERENCE (nós sem GPU) ===
+    xtts_cpu_quantize: bool = Field(default=True, description="Dynamic int8 quantization of GPT on CPU")
+    xtts_cpu_threads: int = Field(default=0, ge=0, description="Intra-op threads (0 = cgroup CPU quota)")
+    xtts_cpu_interop_threads: int = Field(default=0, ge=0, description="Inter-op threads (0 = 1)")
+    xtts_cpu_compile_vocoder: bool = Field(default=False, description="torch.compile HiFi-GAN on CPU")
+    xtts_cpu_workers: int = Field(default=0, ge=0, description="Inference processes sharing mmap weights (0/1 = in-process)")
+    xtts_background_load: bool = Field(default=True, description="Load XTTS in background (liveness before readiness)")
+    
+    # === WARM-UP (latência das primeiras requisições) ===
+    xtts_warmup_enabled: bool = Field(default=True, description="Run warm-up suite before readiness")
+    xtts_warmup_speaker_wav: Path = Field(default=Path("/app/voice_profiles/default.wav"))
+    xtts_warmup_languages: str = Field(default="", description="Comma-separated languages (empty = xtts_default_language)")
+    xtts_warmup_text_lengths: str = Field(default="20,120", description="Comma-separated text lengths (chars)")
+    xtts_warmup_quality_profile: str = Field(default="balanced")
+    xtts_compile_cache_dir: Path = Field(default=Path("/app/models/compile_cache"), description="Persistent torch.compile cache")
+    xtts_cudnn_benchmark: bool = Field(default=False, description="cuDNN autotune (shapes covered by warm-up)")
+    xtts_first_requests_window: int = Field(default=20, ge=1, description="First-N requests measured for p50/p99")
+    
+    # === NORMALIZAÇÃO DE TEXTO (app/text_normalizer.py) ===
+    xtts_text_normalization: bool = Field(default=True, description="Normalize PT text like the training dataset")
+    
+    # === TRACING (OpenTelemetry, opcional) ===
+    otel_enabled: bool = Field(default=False, description="Export per-stage synthesis spans via OTLP")
+    otel_exporter_endpoint: str = Field(default="http://localhost:4317", description="OTLP gRPC collector")
+    otel_service_name: str = Field(default="tts-webui")
+    
+    # === TELEMETRIA (sampler em background, app/telemetry.py) ===
+    telemetry_enabled: bool = Field(default=True, description="Sample GPU/CPU/event-loop metrics in background")
+    telemetry_interval_seconds: float = Field(default=5.0, gt=0, description="Sampling interval")
+    telemetry_window_seconds: float = Field(default=300.0, gt=0, description="Rolling in-memory window")
+    
+    # === MÉTRICAS DO WORKER CELERY (estágios/capacidade de /jobs) ===
+    worker_metrics_port: int = Field(default=9108, ge=0, description="Prometheus exporter of the Celery worker (0 = disabled)")
+    worker_metrics_url: str = Field(default="", description="Worker exporter merged into /admin/stats (empty = API process only)")
+    
+    # === PROFILING (app/profiling.py, /admin/profile) ===
+    profiling_admin_users: str = Field(
+        default="",
+        description="Comma-separated users (JWT sub, or api_key_user for API keys) allowed on /admin/profile (empty = disabled)"
+    )
+    profiling_max_duration_seconds: float = Field(default=60.0, gt=0, description="Max capture duration")
+    profiling_sample_interval_ms: float = Field(default=10.0, gt=0, description="Python stack sampling interval")
+    profiling_retention_count: int = Field(default=20, ge=1, description="Captures kept in temp/profiles")
+    profiling_retention_hours: float = Field(default=72.0, gt=0, description="Max capture age")
+    
     # === REDIS & CELERY ===
     redis_host: str = Field(default="redis", env="REDIS_HOST")
     redis_port: int = Field(default=6379, env="REDIS_PORT")
@@ -66,6 +110,13 @@ class Settings(BaseSettings):
         default_factory=lambda: ["wav", "mp3", "ogg", "flac", "m4a", "opus"]
     )
     
+    # === LOW VRAM (lido por app/vram_manager.py) ===
+    low_vram_mode: bool = Field(
+        default=False,
+        validation_alias=AliasChoices("LOW_VRAM", "LOW_VRAM_MODE"),
+        description="Load/unload models on demand"
+    )
+    
     # === FEATURE FLAGS ===
     enable_metrics: bool = Field(default=True, description="Enable Prometheus metrics")
     enable_webui: bool = Field(default=True, description="Enable WebUI")
@@ -92,12 +143,12 @@ class Settings(BaseSettings):
     @field_validator("xtts_device")
     @classmethod
     def validate_device(cls, v: str) -> str:
-        """Valida device CUDA"""
-        if v == "cuda":
-            if not torch.cuda.is_available():
-                print("WARNING: CUDA not available, falling back to CPU")
-                return "cpu"
-        return v
+        """
+        Normaliza o device. A disponibilidade de CUDA (fallback para CPU) é
+        verificada em XTTSService.initialize / XttsEngine, na carga do modelo:
+        get_settings() roda no import do app e não pode importar torch.
+        """
+        return v.strip().lower()
     
     @field_validator("train_sample_rate")
     @classmethod
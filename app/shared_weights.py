@@ -0,0 +1,134 @@
+"""
+Shared Model Weights - pesos em safetensors mapeados em memória
+
+Permite que vários processos de inferência (CPU) compartilhem uma única cópia
+física dos pesos do XTTS (~1.8GB):
+
+- save_shared_state_dict(): grava state_dict em safetensors (tensores que
+  compartilham storage são gravados uma vez, com aliases no metadata)
+- load_shared_state_dict(): abre o arquivo com np.memmap(mode='c') e cria
+  tensores zero-copy sobre o mapeamento. As páginas vêm do page cache e são
+  compartilhadas entre processos; uma escrita gera cópia privada só daquela
+  página (copy-on-write)
+
+Combinado com `module.load_state_dict(state, assign=True)`, os parâmetros do
+modelo passam a apontar diretamente para o arquivo mapeado.
+"""
+import json
+import logging
+import struct
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+ALIASES_METADATA_KEY = "aliases"
+
+# safetensors dtype → (numpy dtype usado no memmap, torch dtype final)
+_DTYPES = {
+    "F64": (np.float64, torch.float64),
+    "F32": (np.float32, torch.float32),
+    "F16": (np.float16, torch.float16),
+    "BF16": (np.int16, torch.bfloat16),  # numpy não tem bfloat16: view após o mmap
+    "I64": (np.int64, torch.int64),
+    "I32": (np.int32, torch.int32),
+    "I16": (np.int16, torch.int16),
+    "I8": (np.int8, torch.int8),
+    "U8": (np.uint8, torch.uint8),
+    "BOOL": (np.bool_, torch.bool),
+}
+
+
+def _dedupe_shared_tensors(state_dict: Dict[str, torch.Tensor]):
+    """
+    Separa tensores únicos de aliases (mesmo storage/offset/shape).
+
+    Returns:
+        (tensors, aliases) onde aliases = {nome_alias: nome_canônico}
+    """
+    tensors: Dict[str, torch.Tensor] = {}
+    aliases: Dict[str, str] = {}
+    seen: Dict[tuple, str] = {}
+
+    for name, tensor in state_dict.items():
+        key = (
+            tensor.untyped_storage().data_ptr(),
+            tensor.storage_offset(),
+            tuple(tensor.shape),
+            tensor.dtype,
+        )
+        if key in seen:
+            aliases[name] = seen[key]
+            continue
+        seen[key] = name
+        tensors[name] = tensor.detach().cpu().contiguous().clone()
+
+    return tensors, aliases
+
+
+def save_shared_state_dict(state_dict: Dict[str, torch.Tensor], path: Path) -> Path:
+    """
+    Grava state_dict em safetensors para carregamento via mmap.
+
+    Args:
+        state_dict: Pesos do modelo (model.state_dict())
+        path: Arquivo .safetensors de destino
+
+    Returns:
+        Path do arquivo gravado
+    """
+    from safetensors.torch import save_file
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".safetensors.tmp")
+
+    tensors, aliases = _dedupe_shared_tensors(state_dict)
+    save_file(tensors, str(tmp_path), metadata={ALIASES_METADATA_KEY: json.dumps(aliases)})
+    tmp_path.replace(path)
+
+    logger.info(
+        f"✅ Shared weights saved: {path} ({path.stat().st_size / 1e9:.2f}GB, "
+        f"{len(tensors)} tensors, {len(aliases)} aliases)"
+    )
+    return path
+
+
+def load_shared_state_dict(path: Path) -> Dict[str, torch.Tensor]:
+    """
+    Carrega safetensors como tensores zero-copy sobre um mmap copy-on-write.
+
+    Args:
+        path: Arquivo gravado por save_shared_state_dict()
+
+    Returns:
+        state_dict com tensores apontando para o arquivo mapeado
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        (header_size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_size))
+
+    metadata = header.pop("__metadata__", None) or {}
+    aliases = json.loads(metadata.get(ALIASES_METADATA_KEY, "{}"))
+
+    # mode='c': leitura compartilhada, escrita vira cópia privada da página
+    mapped = np.memmap(path, dtype=np.uint8, mode="c", offset=8 + header_size)
+
+    state_dict: Dict[str, torch.Tensor] = {}
+    for name, info in header.items():
+        np_dtype, torch_dtype = _DTYPES[info["dtype"]]
+        begin, end = info["data_offsets"]
+        array = mapped[begin:end].view(np_dtype).reshape(info["shape"])
+        tensor = torch.from_numpy(array)
+        if torch_dtype != tensor.dtype:
+            tensor = tensor.view(torch_dtype)
+        state_dict[name] = tensor
+
+    for alias, canonical in aliases.items():
+        state_dict[alias] = state_dict[canonical]
+
+    return state_dict
@@ -0,0 +1,207 @@
+"""
+Startup Pipeline - liveness imediata, modelo carregado em background
+
+O processo HTTP começa a responder assim que o FastAPI sobe; o XTTS é
+carregado em uma task de background com fases cronometradas:
+
+    import_runtime  → torch + TTS (imports pesados, em thread)
+    model_download  → garante arquivos do modelo no cache
+    model_load      ┐ em paralelo: carga dos pesos e verificação de
+    model_verify    ┘ integridade dos arquivos (checksums)
+    warmup          → suíte de warm-up (app/warmup.py)
+
+Readiness (`/ready`) só retorna 200 quando todas as fases terminam.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CHECKSUM_MANIFEST = ".checksums.json"
+
+
+class StartupTracker:
+    """Registra estado e duração de cada fase do startup"""
+
+    STARTING = "starting"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self):
+        self.state = self.STARTING
+        self.error: Optional[str] = None
+        self.started_at = time.time()
+        self.ready_at: Optional[float] = None
+        self.phases: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        """Cronometra uma fase (`with tracker.phase("model_load"): ...`)"""
+        start = time.perf_counter()
+        self.phases[name] = {"status": "running"}
+        try:
+            yield
+        except Exception as e:
+            self.phases[name] = {
+                "status": "failed",
+                "seconds": round(time.perf_counter() - start, 3),
+                "error": str(e),
+            }
+            raise
+        self.phases[name] = {
+            "status": "done",
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        logger.info(f"⏱️ Startup phase '{name}': {self.phases[name]['seconds']:.2f}s")
+
+    def record(self, name: str, seconds: float) -> None:
+        """Registra fase medida externamente (ex: tempo de import do app)"""
+        self.phases[name] = {"status": "done", "seconds": round(seconds, 3)}
+
+    async def run_phase(self, name: str, fn: Callable, *args) -> Any:
+        """Executa função bloqueante em thread, dentro de uma fase cronometrada"""
+        loop = asyncio.get_running_loop()
+        with self.phase(name):
+            return await loop.run_in_executor(None, fn, *args)
+
+    def mark_ready(self) -> None:
+        self.state = self.READY
+        self.ready_at = time.time()
+        logger.info(f"✅ Service ready in {self.ready_at - self.started_at:.1f}s")
+
+    def mark_failed(self, error: Exception) -> None:
+        self.state = self.FAILED
+        self.error = str(error)
+        logger.error(f"❌ Startup failed: {error}")
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == self.READY
+
+    def summary(self) -> Dict[str, Any]:
+        summary = {
+            "state": self.state,
+            "phases": self.phases,
+        }
+        if self.ready_at is not None:
+            summary["time_to_ready_seconds"] = round(self.ready_at - self.started_at, 3)
+        if self.error:
+            summary["error"] = self.error
+        return summary
+
+
+# Singleton do processo (consultado por /ready e /health)
+startup_tracker = StartupTracker()
+
+
+def _sha256(path: Path, chunk_size: int = 8 * 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verify_model_files(model_dir: Path) -> Dict[str, int]:
+    """
+    Verifica integridade dos arquivos do modelo contra manifest de checksums.
+
+    - Arquivo com size/mtime iguais ao manifest: aceito sem reler
+    - Arquivo alterado ou novo: sha256 recalculado; se havia hash registrado
+      e ele difere, o arquivo está corrompido
+    - Primeira execução: hashes calculados e gravados (trust on first use)
+
+    Args:
+        model_dir: Diretório do modelo (config.json, model.pth, vocab.json...)
+
+    Returns:
+        Dict com contagem de arquivos {"checked": n, "hashed": m}
+
+    Raises:
+        ValueError: Se algum arquivo não confere com o checksum registrado
+    """
+    model_dir = Path(model_dir)
+    manifest_path = model_dir / CHECKSUM_MANIFEST
+    manifest: Dict[str, Dict] = {}
+    if manifest_path.exists():
+        try:
+            manifest = json.loads(manifest_path.read_text())
+        except (OSError, ValueError):
+            manifest = {}
+
+    updated: Dict[str, Dict] = {}
+    hashed = 0
+    for path in sorted(p for p in model_dir.iterdir() if p.is_file()):
+        if path.name == CHECKSUM_MANIFEST:
+            continue
+        stat = path.stat()
+        entry = manifest.get(path.name)
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            updated[path.name] = entry
+            continue
+
+        digest = _sha256(path)
+        hashed += 1
+        if entry and entry.get("sha256") != digest:
+            raise ValueError(f"Checksum mismatch for {path.name} (model file corrupted?)")
+        updated[path.name] = {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": digest}
+
+    if updated != manifest:
+        try:
+            manifest_path.write_text(json.dumps(updated, indent=2))
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write checksum manifest: {e}")
+
+    return {"checked": len(updated), "hashed": hashed}
+
+
+def _import_runtime() -> None:
+    """Imports pesados (torch, Coqui TTS) fora do event loop"""
+    import torch  # noqa: F401
+    from TTS.api import TTS  # noqa: F401
+
+
+async def load_model_in_background(
+    xtts_service,
+    tracker: StartupTracker = startup_tracker,
+    warmup: Optional[Callable[[], Awaitable[None]]] = None
+) -> None:
+    """
+    Carrega XTTSService com fases cronometradas e marca readiness ao final.
+
+    Args:
+        xtts_service: Instância de XTTSService (ainda não inicializada)
+        tracker: StartupTracker a atualizar
+        warmup: Corrotina opcional executada após a carga
+    """
+    tracker.state = StartupTracker.LOADING
+    try:
+        await tracker.run_phase("import_runtime", _import_runtime)
+        model_dir = await tracker.run_phase("model_download", xtts_service.ensure_model_files)
+
+        # Carga dos pesos e verificação leem os mesmos arquivos em paralelo
+        tasks = [tracker.run_phase("model_load", xtts_service.initialize)]
+        if model_dir is not None:
+            tasks.append(tracker.run_phase("model_verify", verify_model_files, model_dir))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        errors = [r for r in results if isinstance(r, Exception)]
+        if errors:
+            # Pesos podem ter carregado mesmo com checksum inválido: descarta
+            xtts_service.shutdown()
+            raise errors[0]
+
+        if warmup is not None:
+            with tracker.phase("warmup"):
+                await warmup()
+
+        tracker.mark_ready()
+    except Exception as e:
+        tracker.mark_failed(e)
@@ -0,0 +1,185 @@
+"""
+Telemetry Sampler - amostragem periódica de GPU/CPU/event loop em background
+
+Uma task asyncio (iniciada no startup_event) registra a cada `interval`
+segundos:
+
+- GPU: memória alocada/reservada e utilização por device
+- Processo: RSS e utilização de CPU (psutil)
+- Event loop: atraso do wake-up da própria task (lag = bloqueio do loop,
+  ex: síntese in-process rodando no thread principal)
+- Filas: profundidade do executor padrão do loop e do CPUInferencePool
+
+As amostras ficam numa janela circular em memória: `/health` e controle
+de admissão leem `latest()`/`summary()` sem tocar CUDA no caminho da
+requisição. Os mesmos valores alimentam os gauges Prometheus.
+
+torch só é consultado se já estiver importado (não força o import durante
+o carregamento em background do modelo).
+"""
+import asyncio
+import sys
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+from .logging_config import get_logger
+from .metrics import (
+    collect_gpu_metrics,
+    event_loop_lag_seconds,
+    executor_queue_depth,
+    process_cpu_percent,
+)
+
+logger = get_logger(__name__)
+
+# Função sem argumentos que retorna o número de tarefas aguardando
+QueueDepthFn = Callable[[], int]
+
+
+def default_executor_depth(loop: asyncio.AbstractEventLoop) -> int:
+    """Tarefas na fila do ThreadPoolExecutor padrão do loop (run_in_executor(None, ...))"""
+    executor = getattr(loop, "_default_executor", None)
+    work_queue = getattr(executor, "_work_queue", None)
+    return work_queue.qsize() if work_queue is not None else 0
+
+
+class TelemetrySampler:
+    """Amostrador em background com janela circular de amostras"""
+
+    def __init__(self, interval: float = 5.0, window_seconds: float = 300.0):
+        self.interval = interval
+        self.samples: Deque[Dict] = deque(maxlen=max(1, int(window_seconds / interval)))
+        self._queues: Dict[str, QueueDepthFn] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._process = None
+
+    def configure(self, interval: float, window_seconds: float) -> None:
+        """Ajusta intervalo e tamanho da janela (antes de start())"""
+        self.interval = interval
+        self.samples = deque(self.samples, maxlen=max(1, int(window_seconds / interval)))
+
+    def watch_queue(self, name: str, depth: QueueDepthFn) -> None:
+        """Registra uma fila de executor (ex: "cpu_pool") para amostragem"""
+        self._queues[name] = depth
+
+    # ==================== SAMPLING ====================
+
+    def _process_sample(self) -> Dict:
+        try:
+            import psutil
+        except ImportError:
+            return {}
+        if self._process is None:
+            self._process = psutil.Process()
+            # Primeira chamada de cpu_percent() só inicializa o contador
+            self._process.cpu_percent(None)
+        with self._process.oneshot():
+            return {
+                "rss_bytes": self._process.memory_info().rss,
+                "cpu_percent": self._process.cpu_percent(None),
+            }
+
+    def _queue_sample(self) -> Dict[str, int]:
+        depths = {}
+        for name, depth in self._queues.items():
+            try:
+                depths[name] = int(depth())
+            except Exception:
+                depths[name] = 0
+        return depths
+
+    def sample(self, loop_lag: float = 0.0) -> Dict:
+        """Coleta uma amostra, atualiza os gauges e anexa à janela"""
+        process = self._process_sample()
+        queues = self._queue_sample()
+        gpus: List[Dict] = collect_gpu_metrics() if "torch" in sys.modules else []
+
+        event_loop_lag_seconds.set(loop_lag)
+        if "cpu_percent" in process:
+            process_cpu_percent.set(process["cpu_percent"])
+        for name, depth in queues.items():
+            executor_queue_depth.labels(executor=name).set(depth)
+
+        sample = {
+            "timestamp": time.time(),
+            "loop_lag_seconds": round(loop_lag, 4),
+            "process": process,
+            "queues": queues,
+            "gpus": gpus,
+        }
+        self.samples.append(sample)
+        return sample
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        expected = loop.time()
+        while True:
+            try:
+                # Lag: quanto o wake-up atrasou em relação ao agendado
+                lag = max(0.0, loop.time() - expected)
+                self.sample(lag)
+            except Exception as e:
+                logger.warning(f"⚠️ Telemetry sample failed: {e}")
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        loop = asyncio.get_running_loop()
+        self.watch_queue("default", lambda: default_executor_depth(loop))
+        self._task = loop.create_task(self._run())
+        logger.info(f"✅ Telemetry sampler started (every {self.interval:g}s, {self.samples.maxlen} samples)")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    # ==================== READ ====================
+
+    def latest(self) -> Optional[Dict]:
+        """Última amostra (None antes da primeira)"""
+        return self.samples[-1] if self.samples else None
+
+    def window(self) -> List[Dict]:
+        return list(self.samples)
+
+    def summary(self) -> Dict:
+        """Resumo da janela: última amostra + máximos de lag/fila/memória GPU"""
+        samples = list(self.samples)
+        if not samples:
+            return {"samples": 0}
+
+        lags = [s["loop_lag_seconds"] for s in samples]
+        summary = {
+            "samples": len(samples),
+            "window_seconds": round(samples[-1]["timestamp"] - samples[0]["timestamp"], 1),
+            "latest": samples[-1],
+            "loop_lag_seconds": {
+                "mean": round(sum(lags) / len(lags), 4),
+                "max": round(max(lags), 4),
+            },
+            "max_queue_depth": {
+                name: max(s["queues"].get(name, 0) for s in samples)
+                for name in samples[-1]["queues"]
+            },
+        }
+        peak_reserved = [gpu["memory_reserved"] for s in samples for gpu in s["gpus"]]
+        if peak_reserved:
+            summary["max_gpu_memory_reserved"] = max(peak_reserved)
+        return summary
+
+
+# Instância do processo da API (lida por /health e admissão)
+telemetry_sampler = TelemetrySampler()
@@ -0,0 +1,340 @@
+"""
+Text Normalizer - normalização de texto PT-BR compilada uma vez
+
+Mesmas regras do preprocessamento do dataset de treino, compartilhadas
+pelo pipeline de treino (train/scripts/transcribe_audio.py) e pelo caminho
+de síntese (XTTSService / XttsEngine), para o modelo fine-tuned receber
+texto na mesma forma em que foi treinado:
+
+1. lowercase
+2. números e símbolos por extenso ("3%" -> "três porcento", "b80" -> "oitenta");
+   na síntese, "-", "/" e "$" só fora de palavras, valores em R$, decimais
+   ("3,5"), horários ("14:30"), milhares ("1.500") e telefones por extenso, e letras
+   coladas em números ficam ("G20", "H2O")
+3. pontuação via tabela `replacements`
+4. caracteres fora de `allowed_chars` viram espaço (opcional)
+5. espaços colapsados
+6. limpeza de palavras quebradas nas bordas (cortes de segmento; só no treino)
+
+Tudo é compilado no construtor: regex pré-compiladas, símbolos numa única
+classe de caracteres, todos os replacements numa única alternação regex
+(uma varredura em C, callback só onde há ocorrência; `str.translate` com
+tabela de strings é mais lento por olhar cada caractere num dict) e
+`num2words` em cache (LRU). Texto sem dígitos pula as etapas de números.
+
+Uso:
+    normalizer = get_normalizer(config["text_processing"])  # cache por config
+    normalizer.normalize("O PIB cresceu 3% em 2025")
+"""
+import json
+import re
+from functools import lru_cache
+from typing import Dict, Mapping, Optional
+
+try:
+    from num2words import num2words
+except ImportError:
+    num2words = None
+
+# Mapeamento de símbolos para forma falada
+SYMBOLS_TO_WORDS_PT_BR = {
+    "@": "arroba",
+    "%": "porcento",
+    "&": "e comercial",
+    "+": "mais",
+    "-": "menos",
+    "/": "barra",
+    "#": "jogo da velha",
+    "$": "dólar",
+    "=": "igual",
+}
+
+# Sempre com espaços ao redor para não colar nas palavras vizinhas
+_SYMBOL_WORDS = {symbol: f" {word} " for symbol, word in SYMBOLS_TO_WORDS_PT_BR.items()}
+_SYMBOL_RE = re.compile("[" + re.escape("".join(SYMBOLS_TO_WORDS_PT_BR)) + "]")
+
+# Síntese (contextual_symbols): "-", "/" e "$" só são falados quando
+# realmente lidos em voz alta; dentro de palavras ("segunda-feira",
+# "e-mail", "R$") ficam como estão
+_CONTEXTUAL_SYMBOLS = {"-", "/", "$"}
+# "R$ 10,50", "US$ 3", "$5" (milhar com ponto, centavos com vírgula)
+_CURRENCY_RE = re.compile(r"(?<![^\s(])(R|US)?\$\s?(\d{1,3}(?:\.\d{3})+|\d+)(?:,(\d{2}))?(?!\d)", re.IGNORECASE)
+_CURRENCY_UNITS = {"r": ("real", "reais"), "us": ("dólar", "dólares"), "": ("dólar", "dólares")}
+# "1.500" (milhar com ponto), "3,5" / "3,5%" (decimal com vírgula), "14:30"
+_THOUSANDS_RE = re.compile(r"(?<![\d.,])\d{1,3}(?:\.\d{3})+(?![\d.,])")
+_DECIMAL_RE = re.compile(r"(?<![\d.,])(\d+),(\d+)(?![\d.,])(\s*%)?")
+# Telefone ("98765-4321", "3333-4444"): dígito a dígito
+_PHONE_RE = re.compile(r"(?<![\d-])\d{4,5}-\d{4}(?![\d-])")
+_TIME_RE = re.compile(r"(?<![\d:])([01]?\d|2[0-3]):([0-5]\d)(?![\d:])")
+# Horas são femininas: "uma hora", "duas e trinta"
+_FEMININE_HOURS = {"um": "uma", "dois": "duas"}
+
+_DIGIT_RE = re.compile(r"\d")
+# Ruído comum: consoante solta grudada em número (b80, k200) -> só o número
+_GLUED_CONSONANT_RE = re.compile(r"\b([bcdfghjklmnpqrstvwxyz])(?=\d)", re.IGNORECASE)
+_NUMBER_PERCENT_RE = re.compile(r"\b(\d+)\s*%")
+_NUMBER_RE = re.compile(r"\d+")
+
+_EDGE_NON_LETTER_RE = re.compile(r"[^a-záéíóúâêôãõç]")
+_EDGE_VOWEL_RE = re.compile(r"[aeiouáéíóúâêôãõ]")
+_EDGE_SINGLE_LETTERS = {"a", "e", "o", "é"}
+
+
+@lru_cache(maxsize=65536)
+def number_to_words(number: str, lang: str = "pt_BR") -> Optional[str]:
+    """Número por extenso (cache LRU); None se não for possível converter"""
+    if num2words is None:
+        return None
+    try:
+        return num2words(int(number), lang=lang)
+    except Exception:
+        return None
+
+
+def _overlaps(a: str, b: str) -> bool:
+    """Um sufixo próprio de `a` é prefixo de `b` (ocorrências podem se sobrepor)"""
+    return any(a.endswith(b[:i]) for i in range(1, min(len(a), len(b))))
+
+
+class TextNormalizer:
+    """Normalizador compilado a partir da config `text_processing`"""
+
+    def __init__(
+        self,
+        lowercase: bool = True,
+        expand_numbers: bool = True,
+        numbers_lang: str = "pt_BR",
+        replacements: Optional[Mapping[str, str]] = None,
+        allowed_chars: Optional[str] = None,
+        cleanup_edges: bool = True,
+        contextual_symbols: bool = False,
+    ):
+        self.lowercase = lowercase
+        self.contextual_symbols = contextual_symbols
+        self.expand_numbers = expand_numbers
+        self.numbers_lang = numbers_lang
+        self.cleanup_edges = cleanup_edges
+        self._compile_replacements(dict(replacements or {}))
+        self._disallowed_re = (
+            re.compile(f"[^{re.escape(allowed_chars)}]+") if allowed_chars else None
+        )
+
+    @classmethod
+    def from_config(cls, text_config: Mapping) -> "TextNormalizer":
+        return cls(
+            lowercase=text_config.get("lowercase", True),
+            expand_numbers=text_config.get("expand_numbers", True),
+            numbers_lang=text_config.get("numbers_lang", "pt_BR"),
+            replacements=(
+                text_config.get("replacements", {}) if text_config.get("normalize_punctuation", True) else {}
+            ),
+            allowed_chars=(
+                text_config.get("allowed_chars") if text_config.get("remove_special_chars", False) else None
+            ),
+            cleanup_edges=text_config.get("cleanup_segment_edges", True),
+            contextual_symbols=text_config.get("contextual_symbols", False),
+        )
+
+    def _compile_replacements(self, replacements: Dict[str, str]) -> None:
+        """
+        Replacements sem interação entre si viram uma única regex;
+        caso contrário, aplicação sequencial na ordem da config (mesmo
+        resultado do loop de str.replace original).
+
+        Sem interação: nenhum valor vazio ou com caractere de alguma chave
+        (uma troca não cria ocorrência de outra chave) e nenhuma chave
+        contém/sobrepõe outra (a ordem não importa).
+        """
+        items = [(old, new) for old, new in replacements.items() if old]
+        keys = [old for old, _ in items]
+        key_chars = set("".join(keys))
+        interacting = any(not new or key_chars & set(new) for _, new in items) or any(
+            a != b and (a in b or _overlaps(a, b)) for a in keys for b in keys
+        )
+
+        self._sequential = items if interacting else []
+        merged = [] if interacting else sorted(keys, key=len, reverse=True)
+        self._merged = {old: replacements[old] for old in merged}
+        self._merged_re = re.compile("|".join(map(re.escape, merged))) if merged else None
+
+    # ==================== ETAPAS ====================
+
+    def _percent(self, match: re.Match) -> str:
+        spoken = number_to_words(match.group(1), self.numbers_lang)
+        return f"{spoken} porcento" if spoken is not None else match.group(0)
+
+    def _number(self, match: re.Match) -> str:
+        spoken = number_to_words(match.group(0), self.numbers_lang)
+        if spoken is None:
+            return match.group(0)
+
+        # Espaço quando o vizinho (no texto atual) é letra ou número
+        start, end = match.span()
+        text = match.string
+        if start > 0 and text[start - 1].isalnum():
+            spoken = " " + spoken
+        if end < len(text) and text[end].isalnum():
+            spoken = spoken + " "
+        return spoken
+
+    def _currency(self, match: re.Match) -> str:
+        singular, plural = _CURRENCY_UNITS[(match.group(1) or "").lower()]
+        amount = match.group(2).replace(".", "")
+        spoken = number_to_words(amount, self.numbers_lang)
+        if spoken is None:
+            return match.group(0)
+        spoken = f"{spoken} {singular if int(amount) == 1 else plural}"
+        cents = match.group(3)
+        if cents and int(cents):
+            spoken_cents = number_to_words(cents, self.numbers_lang)
+            if spoken_cents is None:
+                return match.group(0)
+            spoken += f" e {spoken_cents} {'centavo' if int(cents) == 1 else 'centavos'}"
+        return spoken
+
+    def _decimal(self, match: re.Match) -> str:
+        integer, fraction, percent = match.groups()
+        spoken_integer = number_to_words(integer, self.numbers_lang)
+        # Zeros à esquerda da parte decimal são falados: "3,05" -> "três vírgula zero cinco"
+        digits = fraction.lstrip("0")
+        spoken_fraction = ["zero"] * (len(fraction) - len(digits))
+        if digits:
+            spoken_fraction.append(number_to_words(digits, self.numbers_lang))
+        if spoken_integer is None or None in spoken_fraction:
+            return match.group(0)
+        spoken = f" {spoken_integer} vírgula {' '.join(spoken_fraction)} "
+        return spoken + "porcento " if percent else spoken
+
+    def _phone(self, match: re.Match) -> str:
+        spoken = [number_to_words(digit, self.numbers_lang) for digit in match.group(0) if digit != "-"]
+        return match.group(0) if None in spoken else f" {' '.join(spoken)} "
+
+    def _time(self, match: re.Match) -> str:
+        hours, minutes = int(match.group(1)), int(match.group(2))
+        spoken_hours = number_to_words(str(hours), self.numbers_lang)
+        spoken_minutes = number_to_words(str(minutes), self.numbers_lang)
+        if spoken_hours is None or spoken_minutes is None:
+            return match.group(0)
+        words = spoken_hours.split(" ")
+        words[-1] = _FEMININE_HOURS.get(words[-1], words[-1])
+        spoken_hours = " ".join(words)
+        if minutes == 0:
+            return f" {spoken_hours} {'hora' if hours == 1 else 'horas'} "
+        return f" {spoken_hours} e {spoken_minutes} "
+
+    @staticmethod
+    def _contextual_symbol(match: re.Match) -> str:
+        """Símbolo falado só onde é lido em voz alta (texto de requisição)"""
+        symbol = match.group(0)
+        if symbol not in _CONTEXTUAL_SYMBOLS:
+            return _SYMBOL_WORDS[symbol]
+        text, start, end = match.string, match.start(), match.end()
+        before = text[start - 1] if start > 0 else " "
+        after = text[end] if end < len(text) else " "
+        if symbol == "-":
+            if before.isdigit() and after.isdigit():
+                # "98765-4321", "10-20": separador, não "menos"
+                return " "
+            # Sinal negativo ("-5", "(-3)"); hífen de palavra fica
+            spoken = after.isdigit() and (before.isspace() or before in "(=")
+        else:
+            # "/" e "$" soltos ("a / b"); dentro de palavras/números ("1/2", "R$") ficam
+            spoken = not before.isalnum() and not after.isalnum()
+        return _SYMBOL_WORDS[symbol] if spoken else symbol
+
+    def _numbers_and_symbols(self, text: str) -> str:
+        has_digit = self.expand_numbers and _DIGIT_RE.search(text) is not None
+        if has_digit:
+            if self.contextual_symbols:
+                # Texto do usuário: letras antes de números são conteúdo ("G20", "H2O"),
+                # não ruído de transcrição
+                text = _CURRENCY_RE.sub(self._currency, text)
+                text = _PHONE_RE.sub(self._phone, text)
+                text = _THOUSANDS_RE.sub(lambda m: m.group(0).replace(".", ""), text)
+                text = _DECIMAL_RE.sub(self._decimal, text)
+                text = _TIME_RE.sub(self._time, text)
+            else:
+                text = _GLUED_CONSONANT_RE.sub("", text)
+            text = _NUMBER_PERCENT_RE.sub(self._percent, text)
+        if self.contextual_symbols:
+            text = _SYMBOL_RE.sub(self._contextual_symbol, text)
+        else:
+            text = _SYMBOL_RE.sub(lambda m: _SYMBOL_WORDS[m.group(0)], text)
+        if has_digit:
+            text = _NUMBER_RE.sub(self._number, text)
+        return text
+
+    def _replace(self, text: str) -> str:
+        for old, new in self._sequential:
+            text = text.replace(old, new)
+        if self._merged_re is not None:
+            text = self._merged_re.sub(lambda m: self._merged[m.group(0)], text)
+        return text
+
+    @staticmethod
+    def _is_probably_broken(word: str) -> bool:
+        letters = _EDGE_NON_LETTER_RE.sub("", word)
+        if not letters:
+            return False
+        # só consoantes e tamanho >= 3 -> provavelmente bug
+        if len(letters) >= 3 and not _EDGE_VOWEL_RE.search(letters):
+            return True
+        # tokens de 1 letra que não são comuns em pt-BR
+        return len(letters) == 1 and letters not in _EDGE_SINGLE_LETTERS
+
+    def _cleanup_segment_edges(self, text: str) -> str:
+        """Remove palavras claramente quebradas no começo/fim (cortes no meio de palavras)"""
+        # Caso comum: bordas intactas, sem dividir o texto inteiro
+        first = text.split(" ", 1)[0]
+        last = text.rsplit(" ", 1)[-1]
+        if not self._is_probably_broken(first) and not self._is_probably_broken(last):
+            return text
+
+        words = text.split(" ")
+        start, end = 0, len(words)
+        while start < end and self._is_probably_broken(words[start]):
+            start += 1
+        while end > start and self._is_probably_broken(words[end - 1]):
+            end -= 1
+        return " ".join(words[start:end])
+
+    def normalize(self, text: str) -> str:
+        if self.lowercase:
+            text = text.lower()
+        text = self._numbers_and_symbols(text)
+        text = self._replace(text)
+        if self._disallowed_re is not None:
+            text = self._disallowed_re.sub(" ", text)
+        text = " ".join(text.split())
+        if self.cleanup_edges and text:
+            text = self._cleanup_segment_edges(text)
+        return text
+
+    __call__ = normalize
+
+
+_NORMALIZERS: Dict[str, TextNormalizer] = {}
+
+
+def get_normalizer(text_config: Mapping) -> TextNormalizer:
+    """Normalizador compilado para a config (cache por conteúdo da config)"""
+    key = json.dumps(text_config, sort_keys=True, default=str)
+    normalizer = _NORMALIZERS.get(key)
+    if normalizer is None:
+        normalizer = _NORMALIZERS[key] = TextNormalizer.from_config(text_config)
+    return normalizer
+
+
+# Síntese: mesmas regras do treino, sem limpeza de bordas (texto do usuário
+# não é corte de áudio), com símbolos só onde são falados ("segunda-feira",
+# "e-mail" e "R$ 10,50" não viram "menos"/"dólar") e sem as regras de ruído
+# de transcrição ("G20" não perde o "g")
+SYNTHESIS_TEXT_CONFIG = {"lowercase": True, "cleanup_segment_edges": False, "contextual_symbols": True}
+
+
+def normalize_for_synthesis(text: str, language: str) -> str:
+    """Normaliza texto de requisição PT antes do XTTS (outros idiomas inalterados)"""
+    if not language.lower().startswith("pt"):
+        return text
+    normalized = get_normalizer(SYNTHESIS_TEXT_CONFIG).normalize(text)
+    return normalized or text
@@ -0,0 +1,213 @@
+"""
+Synthesis Tracing - latência por estágio do pipeline de síntese
+
+Cada estágio de um job registra sua duração no histograma Prometheus
+`synthesis_stage_duration_seconds{stage=...}` e, se habilitado, em um span
+OpenTelemetry exportado via OTLP para um collector local:
+
+    create_job → enqueue → pickup → normalization → conditioning →
+    gpt_decode → vocoder → denoise → encode → disk_write
+
+Os estágios internos do XTTS (normalization, conditioning, gpt_decode,
+vocoder) são medidos envolvendo os métodos do modelo já carregado
+(instrument_xtts_model), sem reimplementar Xtts.inference().
+
+Métricas de capacidade (RTF, GPT tokens/s, vocoder samples/s) usam os
+labels language/quality_profile/device da requisição corrente, definidos
+com `synthesis_labels(...)` (contextvar: propagar com contextvars.copy_context
+ao rodar o modelo em thread pool).
+
+OpenTelemetry é opcional: sem os pacotes `opentelemetry-sdk` e
+`opentelemetry-exporter-otlp`, só as métricas Prometheus são registradas.
+"""
+import contextvars
+import functools
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Optional
+
+from .logging_config import get_logger
+from .metrics import (
+    synthesis_stage_duration_seconds,
+    synthesis_rtf,
+    gpt_tokens_per_second,
+    vocoder_samples_per_second,
+)
+
+logger = get_logger(__name__)
+
+try:
+    from opentelemetry import trace, propagate
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+
+_tracer = None
+
+# Atributo marcando métodos já instrumentados (instrument_xtts_model é idempotente)
+_TRACED_ATTR = "_synthesis_stage"
+
+_UNKNOWN_LABELS = {"language": "unknown", "quality_profile": "unknown", "device": "unknown"}
+_synthesis_labels: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar(
+    "synthesis_labels", default=_UNKNOWN_LABELS
+)
+
+
+def init_tracing(service_name: str = "tts-webui", endpoint: str = "http://localhost:4317") -> bool:
+    """
+    Configura exportação OTLP (gRPC) de spans para o collector.
+
+    Returns:
+        True se spans OpenTelemetry estão ativos
+    """
+    global _tracer
+    if not OTEL_AVAILABLE:
+        logger.warning("⚠️ OpenTelemetry not installed - stage spans disabled (Prometheus only)")
+        return False
+
+    try:
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        logger.warning(f"⚠️ OpenTelemetry SDK/OTLP exporter not installed - stage spans disabled: {e}")
+        return False
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint, insecure=True)))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("app.tracing")
+    logger.info(f"✅ OpenTelemetry tracing enabled: {service_name} → {endpoint}")
+    return True
+
+
+@contextmanager
+def stage(name: str, **attributes: Any):
+    """
+    Mede um estágio (`with stage("vocoder"): ...`).
+
+    A duração é observada mesmo se o estágio falhar.
+    """
+    span = _tracer.start_as_current_span(f"synthesis.{name}", attributes=attributes) if _tracer else nullcontext()
+    start = time.perf_counter()
+    with span:
+        try:
+            yield
+        finally:
+            synthesis_stage_duration_seconds.labels(stage=name).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def synthesis_labels(language: str, quality_profile: str, device: str):
+    """Labels das métricas de capacidade para a síntese em andamento"""
+    token = _synthesis_labels.set({
+        "language": str(language),
+        "quality_profile": str(quality_profile),
+        "device": str(device),
+    })
+    try:
+        yield
+    finally:
+        _synthesis_labels.reset(token)
+
+
+def observe_rtf(wall_seconds: float, audio_seconds: float) -> None:
+    """RTF da requisição (tempo de parede / duração do áudio)"""
+    if audio_seconds > 0:
+        synthesis_rtf.labels(**_synthesis_labels.get()).observe(wall_seconds / audio_seconds)
+
+
+def _observe_gpt_rate(codes: Any, seconds: float) -> None:
+    # gpt.generate retorna [batch, tokens]
+    shape = getattr(codes, "shape", None)
+    if shape and seconds > 0:
+        gpt_tokens_per_second.labels(**_synthesis_labels.get()).observe(shape[-1] / seconds)
+
+
+def _observe_vocoder_rate(wav: Any, seconds: float) -> None:
+    shape = getattr(wav, "shape", None)
+    if shape and seconds > 0:
+        vocoder_samples_per_second.labels(**_synthesis_labels.get()).observe(shape[-1] / seconds)
+
+
+def observe_stage(name: str, seconds: float) -> None:
+    """Registra estágio medido externamente (ex: espera na fila do Celery)"""
+    if seconds >= 0:
+        synthesis_stage_duration_seconds.labels(stage=name).observe(seconds)
+
+
+def _traced(name: str, fn: Callable, on_result: Optional[Callable[[Any, float], None]] = None) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        with stage(name):
+            result = fn(*args, **kwargs)
+            if getattr(result, "is_cuda", False):
+                # Kernels CUDA são assíncronos: medir até o resultado existir
+                import torch
+                torch.cuda.synchronize(result.device)
+        if on_result is not None:
+            on_result(result, time.perf_counter() - start)
+        return result
+    setattr(wrapper, _TRACED_ATTR, name)
+    return wrapper
+
+
+def _wrap(owner: Any, attr: str, name: str, on_result: Optional[Callable] = None) -> bool:
+    fn = getattr(owner, attr, None)
+    if fn is None or getattr(fn, _TRACED_ATTR, None) == name:
+        return False
+    # Atributo de instância: não afeta outras instâncias da classe
+    setattr(owner, attr, _traced(name, fn, on_result))
+    return True
+
+
+def instrument_xtts_model(tts_model: Any) -> int:
+    """
+    Instrumenta estágios internos de um modelo Xtts carregado.
+
+    - normalization: tokenizer.encode (limpeza de texto + tokenização)
+    - conditioning:  get_conditioning_latents (latentes do speaker)
+    - gpt_decode:    gpt.generate (decodificação autoregressiva) + tokens/s
+    - vocoder:       hifigan_decoder.forward (HiFi-GAN ou ONNX) + samples/s
+
+    Pode ser chamado de novo após trocar submódulos (ex: vocoder ONNX).
+
+    Returns:
+        Número de métodos instrumentados nesta chamada
+    """
+    wrapped = 0
+    tokenizer = getattr(tts_model, "tokenizer", None)
+    if tokenizer is not None:
+        wrapped += _wrap(tokenizer, "encode", "normalization")
+    wrapped += _wrap(tts_model, "get_conditioning_latents", "conditioning")
+    gpt = getattr(tts_model, "gpt", None)
+    if gpt is not None:
+        wrapped += _wrap(gpt, "generate", "gpt_decode", _observe_gpt_rate)
+    decoder = getattr(tts_model, "hifigan_decoder", None)
+    if decoder is not None:
+        wrapped += _wrap(decoder, "forward", "vocoder", _observe_vocoder_rate)
+    return wrapped
+
+
+def inject_context() -> Dict[str, str]:
+    """Contexto do span atual serializado (propagação para o worker Celery)"""
+    carrier: Dict[str, str] = {}
+    if _tracer is not None:
+        propagate.inject(carrier)
+    return carrier
+
+
+@contextmanager
+def extracted_context(carrier: Optional[Dict[str, str]]):
+    """Continua o trace iniciado no processo da API (lado do worker)"""
+    if _tracer is None or not carrier:
+        yield
+        return
+    from opentelemetry import context
+    token = context.attach(propagate.extract(carrier))
+    try:
+        yield
+    finally:
+        context.detach(token)
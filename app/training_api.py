@@ -276,10 +276,11 @@ async def get_dataset_stats(folder: str = "train/data"):
                     with open(duration_file, "r") as f:
                         duration_data = json.load(f)
                         # duration.json has structure {"duration": [float, float, ...]}
-                        if isinstance(duration_data, dict) and "duration" in duration_data:
-                            dataset_duration = sum(duration_data["duration"])
-                        elif isinstance(duration_data, dict) and "total_duration" in duration_data:
+                        # (build_ljs_dataset also precomputes "total_duration")
+                        if isinstance(duration_data, dict) and "total_duration" in duration_data:
                             dataset_duration = duration_data["total_duration"]
+                        elif isinstance(duration_data, dict) and "duration" in duration_data:
+                            dataset_duration = sum(duration_data["duration"])
                 except Exception as e:
                     logger.error(f"Error reading duration: {e}")
                     dataset_duration = dataset_files * 10  # Estimate 10s per file
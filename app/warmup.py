@@ -0,0 +1,247 @@
+"""
+Warm-up Suite - reduz latência das primeiras requisições
+
+A primeira síntese de cada idioma/tamanho de texto ainda paga custos de
+"cold path": seleção de kernels CUDA, crescimento do caching allocator,
+compilação do torch.compile, imports tardios do tokenizer (ja/zh/ko).
+Este módulo:
+
+- Gera uma suíte de warm-up (cada idioma x faixa de tamanhos de texto)
+- Persiste artefatos do torch.compile (FX graph cache, Inductor/Triton e
+  "mega-cache" de torch.compiler) em disco, para que restarts não recompilem
+- Mede p50/p99 das primeiras N requisições reais (FirstRequestsRecorder)
+"""
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+COMPILE_ARTIFACTS_FILE = "torch_compile_artifacts.bin"
+
+# Frase base por idioma (repetida até o tamanho alvo)
+WARMUP_SENTENCES = {
+    "pt": "Olá, este é um teste de aquecimento do serviço de voz.",
+    "en": "Hello, this is a warm-up test for the voice service.",
+    "es": "Hola, esta es una prueba de calentamiento del servicio de voz.",
+    "fr": "Bonjour, ceci est un test de préchauffage du service vocal.",
+    "de": "Hallo, dies ist ein Aufwärmtest für den Sprachdienst.",
+    "it": "Ciao, questo è un test di riscaldamento del servizio vocale.",
+    "pl": "Cześć, to jest test rozgrzewający usługi głosowej.",
+    "tr": "Merhaba, bu ses hizmeti için bir ısınma testidir.",
+    "ru": "Привет, это разминочный тест голосового сервиса.",
+    "nl": "Hallo, dit is een opwarmtest voor de spraakdienst.",
+    "cs": "Ahoj, toto je zahřívací test hlasové služby.",
+    "ar": "مرحبا، هذا اختبار إحماء لخدمة الصوت.",
+    "zh-cn": "你好，这是语音服务的预热测试。",
+    "ja": "こんにちは、これは音声サービスのウォームアップテストです。",
+    "hu": "Helló, ez a hangszolgáltatás bemelegítő tesztje.",
+    "ko": "안녕하세요, 이것은 음성 서비스의 워밍업 테스트입니다.",
+}
+
+
+def parse_csv(value: str) -> List[str]:
+    """'pt, en,,es' → ['pt', 'en', 'es']"""
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def build_warmup_text(language: str, length: int) -> str:
+    """Texto no idioma com aproximadamente `length` caracteres (frases inteiras)"""
+    sentence = WARMUP_SENTENCES.get(language, WARMUP_SENTENCES["en"])
+    repeats = max(1, round(length / len(sentence)))
+    return " ".join([sentence] * repeats)
+
+
+def build_warmup_cases(
+    languages: Sequence[str],
+    text_lengths: Sequence[int]
+) -> List[Tuple[str, str]]:
+    """
+    Suíte de warm-up: cada idioma x cada tamanho de texto.
+
+    Ordem por tamanho (curtos primeiro): o allocator cresce gradualmente e
+    os primeiros casos já cobrem os imports tardios de cada idioma.
+
+    Returns:
+        Lista de (language, text)
+    """
+    cases = []
+    for length in sorted(set(text_lengths)):
+        for language in languages:
+            cases.append((language, build_warmup_text(language, length)))
+    return cases
+
+
+# ==================== COMPILE CACHE ====================
+
+def configure_compile_cache(cache_dir: Path) -> Dict[str, str]:
+    """
+    Aponta caches do torch.compile para `cache_dir` (persistente entre restarts).
+
+    Deve ser chamado antes do primeiro torch.compile: o Inductor lê essas
+    variáveis ao importar `torch._inductor`. Variáveis já definidas no
+    ambiente não são sobrescritas.
+
+    Returns:
+        Variáveis de ambiente efetivas
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    defaults = {
+        "TORCHINDUCTOR_CACHE_DIR": str(cache_dir / "inductor"),
+        "TORCHINDUCTOR_FX_GRAPH_CACHE": "1",
+        "TORCHINDUCTOR_AUTOGRAD_CACHE": "1",
+        "TRITON_CACHE_DIR": str(cache_dir / "triton"),
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+    return {key: os.environ[key] for key in defaults}
+
+
+def load_compile_artifacts(cache_dir: Path) -> bool:
+    """Carrega artefatos do torch.compile gravados por save_compile_artifacts()"""
+    import torch
+
+    path = Path(cache_dir) / COMPILE_ARTIFACTS_FILE
+    if not path.exists() or not hasattr(torch.compiler, "load_cache_artifacts"):
+        return False
+    try:
+        torch.compiler.load_cache_artifacts(path.read_bytes())
+        logger.info(f"✅ torch.compile artifacts loaded from {path}")
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Could not load torch.compile artifacts: {e}")
+        return False
+
+
+def save_compile_artifacts(cache_dir: Path) -> Optional[Path]:
+    """Grava artefatos do torch.compile produzidos nesta execução (se houver)"""
+    import torch
+
+    if not hasattr(torch.compiler, "save_cache_artifacts"):
+        return None
+    try:
+        artifacts = torch.compiler.save_cache_artifacts()
+    except Exception as e:
+        logger.warning(f"⚠️ Could not collect torch.compile artifacts: {e}")
+        return None
+    if not artifacts:
+        return None
+
+    path = Path(cache_dir) / COMPILE_ARTIFACTS_FILE
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(artifacts[0])
+    tmp_path.replace(path)
+    logger.info(f"✅ torch.compile artifacts saved to {path}")
+    return path
+
+
+# ==================== LATENCY ====================
+
+class FirstRequestsRecorder:
+    """Latências das primeiras N sínteses após o startup (p50/p99)"""
+
+    def __init__(self, limit: int = 20):
+        self.limit = limit
+        self.latencies: List[float] = []
+
+    def record(self, seconds: float) -> None:
+        if len(self.latencies) >= self.limit:
+            return
+        self.latencies.append(seconds)
+        if len(self.latencies) == self.limit:
+            summary = self.summary()
+            logger.info(
+                f"⏱️ First {self.limit} requests: p50={summary['p50_seconds']:.2f}s "
+                f"p99={summary['p99_seconds']:.2f}s"
+            )
+
+    def reset(self) -> None:
+        self.latencies = []
+
+    def summary(self) -> Dict:
+        summary = {"requests": len(self.latencies), "limit": self.limit}
+        if self.latencies:
+            values = np.asarray(self.latencies)
+            summary["p50_seconds"] = round(float(np.percentile(values, 50)), 3)
+            summary["p99_seconds"] = round(float(np.percentile(values, 99)), 3)
+        return summary
+
+
+# ==================== SUITE ====================
+
+async def run_warmup_suite(
+    xtts_service,
+    speaker_wav: Path,
+    languages: Sequence[str],
+    text_lengths: Sequence[int],
+    quality_profile: str = "balanced",
+    compile_cache_dir: Optional[Path] = None
+) -> Dict:
+    """
+    Executa a suíte de warm-up no XTTSService já inicializado.
+
+    Falhas individuais não interrompem a suíte (warm-up não é crítico).
+    Ao final, o FirstRequestsRecorder do serviço é zerado para que as
+    métricas reflitam apenas requisições reais.
+
+    Returns:
+        Dict com casos executados, falhas e duração por caso
+    """
+    speaker_wav = Path(speaker_wav)
+    if not speaker_wav.exists():
+        logger.warning(f"⚠️ Warm-up skipped: speaker WAV not found ({speaker_wav})")
+        return {"skipped": True, "reason": f"speaker WAV not found: {speaker_wav}"}
+
+    if compile_cache_dir is not None:
+        load_compile_artifacts(compile_cache_dir)
+
+    supported = set(xtts_service.get_supported_languages())
+    languages = [lang for lang in languages if lang in supported]
+    cases = build_warmup_cases(languages, text_lengths)
+    logger.info(f"Warm-up: {len(cases)} cases ({len(languages)} languages x {len(set(text_lengths))} lengths)")
+
+    start = time.perf_counter()
+    results = []
+    failures = 0
+    for language, text in cases:
+        case_start = time.perf_counter()
+        try:
+            await xtts_service.synthesize(
+                text=text,
+                speaker_wav=speaker_wav,
+                language=language,
+                quality_profile=quality_profile
+            )
+            status = "ok"
+        except Exception as e:
+            failures += 1
+            status = f"error: {e}"
+            logger.warning(f"Warm-up case failed ({language}, {len(text)} chars): {e}")
+        results.append({
+            "language": language,
+            "chars": len(text),
+            "seconds": round(time.perf_counter() - case_start, 3),
+            "status": status,
+        })
+
+    if compile_cache_dir is not None:
+        save_compile_artifacts(compile_cache_dir)
+
+    recorder = getattr(xtts_service, "first_requests", None)
+    if recorder is not None:
+        recorder.reset()
+
+    total = time.perf_counter() - start
+    logger.info(f"✅ Warm-up complete: {len(cases) - failures}/{len(cases)} cases in {total:.1f}s")
+    return {
+        "skipped": False,
+        "cases": results,
+        "failures": failures,
+        "total_seconds": round(total, 3),
+    }
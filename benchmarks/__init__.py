@@ -0,0 +1,13 @@
+"""
+Benchmarks reproduzíveis do TTS WebUI.
+
+Executar a partir da raiz do repositório:
+    python -m benchmarks.cpu_quantization --speaker-wav train/test/audio/reference_test.wav
+    python -m benchmarks.e2e_synthesis --mode stub --concurrency 1 4
+    python -m benchmarks.segment_vad --hours 2
+    python -m benchmarks.transcribe_whisper --limit 128 --model base
+    python -m benchmarks.text_normalization --sentences 1000000
+
+Resultados em benchmarks/results/ (JSON com metadados do ambiente);
+`--compare <json>` no e2e_synthesis detecta regressões entre commits.
+"""
@@ -0,0 +1,174 @@
+"""
+Utilitários compartilhados pelos benchmarks.
+
+Todos os benchmarks gravam um JSON com metadados do ambiente
+(versões, threads, CPU) para permitir comparação entre execuções.
+"""
+import json
+import os
+import platform
+import subprocess
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def percentiles(values: List[float], points=(50, 95, 99)) -> Dict[str, float]:
+    """Retorna {'p50': ..., 'p95': ..., 'p99': ...} (vazio se sem amostras)"""
+    if not values:
+        return {}
+    arr = np.asarray(values, dtype=np.float64)
+    return {f"p{p}": float(np.percentile(arr, p)) for p in points}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            stderr=subprocess.DEVNULL,
+            text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_info() -> Dict[str, Any]:
+    """Metadados do ambiente para tornar resultados comparáveis"""
+    info: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_revision": _git_revision(),
+    }
+    try:
+        import torch
+        info["torch"] = torch.__version__
+        info["torch_num_threads"] = torch.get_num_threads()
+        info["cuda_available"] = torch.cuda.is_available()
+    except ImportError:
+        pass
+    return info
+
+
+def write_results(name: str, results: Dict[str, Any], output: Optional[Path] = None) -> Path:
+    """
+    Grava resultados em JSON.
+
+    Args:
+        name: Nome do benchmark (prefixo do arquivo)
+        results: Métricas coletadas
+        output: Caminho do arquivo (default: benchmarks/results/<name>_<timestamp>.json)
+
+    Returns:
+        Caminho do arquivo gravado
+    """
+    if output is None:
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output = DEFAULT_RESULTS_DIR / f"{name}_{stamp}.json"
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    payload = {
+        "benchmark": name,
+        "timestamp": datetime.now().isoformat(),
+        "environment": environment_info(),
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+    return output
+
+
+class Timer:
+    """Context manager simples: `with Timer() as t: ...; t.elapsed`"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        return False
+
+
+class PeakRSSSampler:
+    """
+    Amostra o RSS do processo em thread de fundo e guarda o pico.
+
+    Uso: `with PeakRSSSampler() as rss: ...; rss.peak_mb`
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        import psutil
+        process = psutil.Process()
+        while True:
+            self.peak_bytes = max(self.peak_bytes, process.memory_info().rss)
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    @property
+    def peak_mb(self) -> float:
+        return round(self.peak_bytes / 1e6, 1)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.10) -> List[str]:
+    """
+    Compara métricas numéricas de dois resultados (mesma estrutura).
+
+    Métricas de latência/RTF/memória maiores que baseline*(1+tolerance) e
+    throughput menor que baseline*(1-tolerance) são regressões.
+
+    Returns:
+        Lista de regressões legíveis ("path: baseline → atual (+x%)")
+    """
+    regressions: List[str] = []
+
+    def walk(base, cur, path):
+        if isinstance(base, dict) and isinstance(cur, dict):
+            for key in base.keys() & cur.keys():
+                walk(base[key], cur[key], f"{path}.{key}" if path else key)
+            return
+        if isinstance(base, bool) or not isinstance(base, (int, float)) or not isinstance(cur, (int, float)):
+            return
+        if base <= 0:
+            return
+        change = (cur - base) / base
+        if "throughput" in path:
+            regressed = change < -tolerance
+        else:
+            regressed = _is_cost_metric(path) and change > tolerance
+        if regressed:
+            regressions.append(f"{path}: {base:.4g} → {cur:.4g} ({change:+.1%})")
+
+    walk(baseline, current, "")
+    return regressions
+
+
+def _is_cost_metric(path: str) -> bool:
+    """Latência, RTF e memória: quanto menor, melhor"""
+    return any(key in path for key in ("latency", "rtf", "rss"))
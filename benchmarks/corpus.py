@@ -0,0 +1,40 @@
+"""
+Corpora fixos para benchmarks de síntese.
+
+Textos estáveis entre commits: alterar um corpus invalida a comparação
+com resultados anteriores (o nome do corpus é gravado no JSON).
+"""
+from typing import Dict, List, Tuple
+
+CORPORA: Dict[str, List[Tuple[str, str]]] = {
+    # Rápido, para CI / smoke test
+    "smoke": [
+        ("pt", "Olá, tudo bem?"),
+        ("pt", "O serviço de voz está funcionando."),
+        ("en", "Hello world."),
+    ],
+    # PT-BR com distribuição de tamanhos parecida com produção
+    "pt_br": [
+        ("pt", "Bom dia!"),
+        ("pt", "Seu pedido foi confirmado e será entregue amanhã."),
+        ("pt", "Por favor, aguarde enquanto processamos a sua solicitação."),
+        ("pt", "A síntese de voz neural transforma texto em fala natural, preservando a entonação "
+               "e o timbre do locutor de referência."),
+        ("pt", "Hoje vamos falar sobre a história do Brasil, desde a chegada dos portugueses em "
+               "mil e quinhentos até a proclamação da república, passando pelo ciclo do ouro e "
+               "pela independência."),
+        ("pt", "Obrigado!"),
+        ("pt", "O relatório trimestral mostra um crescimento de doze por cento nas vendas."),
+        ("pt", "Se você tiver dúvidas, entre em contato com o nosso suporte pelo site ou pelo "
+               "telefone, de segunda a sexta-feira, das oito às dezoito horas."),
+    ],
+    # Vários idiomas suportados pelo XTTS
+    "multilingual": [
+        ("pt", "A reunião foi adiada para a próxima semana."),
+        ("en", "The quarterly report is ready for review."),
+        ("es", "¿Podrías enviarme el documento antes de la reunión?"),
+        ("fr", "Merci beaucoup pour votre aide."),
+        ("de", "Der Zug hat heute leider zwanzig Minuten Verspätung."),
+        ("it", "Il treno per Roma parte alle otto."),
+    ],
+}
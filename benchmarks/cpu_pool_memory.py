@@ -0,0 +1,96 @@
+"""
+Benchmark: memória do CPUInferencePool vs número de workers
+
+Para cada contagem de workers, inicia o pool, mede RSS e PSS (proportional
+set size: páginas compartilhadas divididas entre os processos) de todos os
+workers, opcionalmente roda uma síntese por worker, e encerra o pool.
+
+Com pesos compartilhados via mmap, o PSS total deve crescer bem menos que
+N x tamanho do modelo.
+
+Uso:
+    python -m benchmarks.cpu_pool_memory --workers 1 2 4 \\
+        --speaker-wav train/test/audio/reference_test.wav
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+import psutil
+
+from app.services.cpu_pool import CPUInferencePool
+from app.services.xtts_service import XTTSService
+from benchmarks.common import Timer, write_results
+
+logger = logging.getLogger("benchmarks.cpu_pool_memory")
+
+
+def measure_workers(pids: List[int]) -> Dict:
+    """Soma RSS/PSS (MB) dos processos worker"""
+    rss = pss = 0
+    for pid in pids:
+        info = psutil.Process(pid).memory_full_info()
+        rss += info.rss
+        pss += getattr(info, "pss", info.rss)
+    return {"rss_mb": round(rss / 1e6, 1), "pss_mb": round(pss / 1e6, 1)}
+
+
+async def synthesize_once_per_worker(pool: CPUInferencePool, speaker_wav: Path, workers: int):
+    params = XTTSService(device="cpu")._get_profile_params("fast")
+    await asyncio.gather(*[
+        pool.synthesize("Teste de memória do pool de inferência.", speaker_wav, "pt", params)
+        for _ in range(workers)
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPUInferencePool memory scaling")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--speaker-wav", type=Path, default=None,
+                        help="Se informado, roda uma síntese por worker antes de medir")
+    parser.add_argument("--weights-dir", type=Path,
+                        default=Path(tempfile.gettempdir()) / "tts_shared_weights")
+    parser.add_argument("--model-name", default="tts_models/multilingual/multi-dataset/xtts_v2")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    os.environ["COQUI_TOS_AGREED"] = "1"
+
+    rows = []
+    for workers in args.workers:
+        pool = CPUInferencePool(args.model_name, num_workers=workers, weights_dir=args.weights_dir)
+        with Timer() as startup:
+            pool.start()
+        pids = pool.get_status()["worker_pids"]
+        idle = measure_workers(pids)
+
+        loaded = None
+        if args.speaker_wav:
+            asyncio.run(synthesize_once_per_worker(pool, args.speaker_wav, workers))
+            loaded = measure_workers(pids)
+
+        pool.shutdown()
+        row = {
+            "workers": workers,
+            "threads_per_worker": pool.threads_per_worker,
+            "startup_seconds": round(startup.elapsed, 2),
+            "idle": idle,
+            "after_synthesis": loaded,
+        }
+        rows.append(row)
+        logger.info(
+            f"{workers} workers: RSS {idle['rss_mb']:.0f}MB | PSS {idle['pss_mb']:.0f}MB "
+            f"| startup {startup.elapsed:.1f}s"
+        )
+
+    path = write_results("cpu_pool_memory", {"model_name": args.model_name, "runs": rows}, args.output)
+    logger.info(f"✅ Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
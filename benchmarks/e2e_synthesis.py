@@ -0,0 +1,289 @@
+"""
+Benchmark end-to-end de síntese: service, engine, processor e HTTP
+
+Cenários (mesmo corpus fixo em todos):
+- service:   XTTSService.synthesize()
+- engine:    XttsEngine.generate_dubbing()
+- processor: VoiceProcessor.process_dubbing_job() (inclui escrita em disco)
+- http:      POST /synthesize-direct (in-process via ASGI ou --base-url)
+
+Modos:
+- stub: StubTTS determinístico (benchmarks/stub_model.py) mede apenas o
+  overhead do framework; `--stub-rtf` simula custo de inferência
+- real: modelo XTTS-v2 carregado (--device cuda/cpu)
+
+Para cada cenário e nível de concorrência reporta RTF, latência
+p50/p95/p99, throughput e pico de RSS. Com --compare, compara com um JSON
+anterior e sai com código 1 se houver regressão acima da tolerância.
+
+Uso:
+    python -m benchmarks.e2e_synthesis --mode stub --corpus pt_br --concurrency 1 4
+    python -m benchmarks.e2e_synthesis --mode real --device cuda \\
+        --speaker-wav train/test/audio/reference_test.wav --scenarios service http
+    python -m benchmarks.e2e_synthesis --mode stub --compare benchmarks/results/e2e_synthesis_<ts>.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+import soundfile as sf
+
+from benchmarks.common import PeakRSSSampler, Timer, compare_results, percentiles, write_results
+from benchmarks.corpus import CORPORA
+
+logger = logging.getLogger("benchmarks.e2e_synthesis")
+
+SCENARIOS = ("service", "engine", "processor", "http")
+
+# Cada chamada sintetiza (language, text) e retorna a duração do áudio (s)
+SynthesisCall = Callable[[str, str], Awaitable[float]]
+
+
+async def run_load(
+    call: SynthesisCall,
+    corpus: List[Tuple[str, str]],
+    concurrency: int,
+    repeats: int = 1
+) -> Dict:
+    """
+    Executa o corpus `repeats` vezes com até `concurrency` requisições simultâneas.
+
+    Returns:
+        Dict com latência, RTF, throughput e pico de RSS
+    """
+    items = list(corpus) * repeats
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    rtfs: List[float] = []
+    audio_seconds = 0.0
+
+    async def one(language: str, text: str):
+        nonlocal audio_seconds
+        async with semaphore:
+            start = time.perf_counter()
+            duration = await call(language, text)
+            elapsed = time.perf_counter() - start
+        latencies.append(elapsed)
+        rtfs.append(elapsed / duration if duration > 0 else float("nan"))
+        audio_seconds += duration
+
+    with PeakRSSSampler() as rss, Timer() as wall:
+        await asyncio.gather(*(one(language, text) for language, text in items))
+
+    return {
+        "requests": len(items),
+        "concurrency": concurrency,
+        "wall_seconds": round(wall.elapsed, 4),
+        "latency_seconds": percentiles(latencies, (50, 95, 99)),
+        "rtf": {
+            "overall": sum(latencies) / audio_seconds if audio_seconds else None,
+            **percentiles(rtfs, (50, 95, 99)),
+        },
+        "throughput": {
+            "requests_per_second": len(items) / wall.elapsed,
+            "audio_seconds_per_second": audio_seconds / wall.elapsed,
+        },
+        "peak_rss_mb": rss.peak_mb,
+    }
+
+
+# ==================== CENÁRIOS ====================
+
+def build_service(args):
+    if args.mode == "stub":
+        from benchmarks.stub_model import make_stub_service
+        return make_stub_service(args.stub_rtf)
+
+    from app.services.xtts_service import XTTSService
+    service = XTTSService(device=args.device)
+    service.initialize()
+    return service
+
+
+def build_engine(args):
+    if args.mode == "stub":
+        from benchmarks.stub_model import make_stub_engine
+        return make_stub_engine(args.stub_rtf)
+
+    from app.engines.xtts_engine import XttsEngine
+    return XttsEngine(device=args.device)
+
+
+def make_voice_profile(speaker_wav: Path):
+    from app.models import VoiceProfile
+    return VoiceProfile.create_new(
+        name="benchmark",
+        language="pt",
+        source_audio_path=str(speaker_wav),
+        profile_path=str(speaker_wav),
+    )
+
+
+def service_scenario(service, speaker_wav: Path, args) -> SynthesisCall:
+    async def call(language, text):
+        audio, sample_rate = await service.synthesize(
+            text=text, speaker_wav=speaker_wav, language=language, quality_profile=args.quality_profile
+        )
+        return len(audio) / sample_rate
+    return call
+
+
+def engine_scenario(engine, speaker_wav: Path, args) -> SynthesisCall:
+    voice_profile = make_voice_profile(speaker_wav)
+
+    async def call(language, text):
+        _, duration = await engine.generate_dubbing(
+            text=text, language=language, voice_profile=voice_profile,
+            quality_profile=f"xtts_{args.quality_profile}"
+        )
+        return duration
+    return call
+
+
+def processor_scenario(service, speaker_wav: Path, args, work_dir: Path) -> SynthesisCall:
+    from app.models import Job, JobMode
+    from app.processor import VoiceProcessor
+
+    processor = VoiceProcessor(xtts_service=service)
+    processor.settings = processor.settings.model_copy(update={"processed_dir": work_dir / "processed"})
+    voice_profile = make_voice_profile(speaker_wav)
+
+    async def call(language, text):
+        job = Job.create_new(
+            mode=JobMode.DUBBING_WITH_CLONE,
+            text=text,
+            source_language=language,
+            voice_id=voice_profile.id,
+        )
+        job.quality_profile = f"xtts_{args.quality_profile}"
+        job = await processor.process_dubbing_job(job, voice_profile)
+        return job.duration
+    return call
+
+
+def http_scenario(service, speaker_wav: Path, args):
+    """Cliente httpx: in-process (ASGITransport) ou servidor em --base-url"""
+    import httpx
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=600)
+    else:
+        from app.dependencies import get_xtts_service
+        from app.main import app
+        app.dependency_overrides[get_xtts_service] = lambda: service
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=600)
+
+    speaker_bytes = speaker_wav.read_bytes()
+
+    async def call(language, text):
+        response = await client.post(
+            "/synthesize-direct",
+            data={"text": text, "language": language, "quality_profile": args.quality_profile},
+            files={"speaker_wav": ("speaker.wav", speaker_bytes, "audio/wav")},
+        )
+        response.raise_for_status()
+        info = sf.info(io.BytesIO(response.content))
+        return info.frames / info.samplerate
+    return call, client
+
+
+async def run_scenarios(args) -> Dict:
+    corpus = CORPORA[args.corpus]
+    work_dir = Path(tempfile.mkdtemp(prefix="e2e_bench_"))
+
+    if args.mode == "stub":
+        from benchmarks.stub_model import write_reference_wav
+        speaker_wav = write_reference_wav(work_dir / "speaker.wav")
+    else:
+        speaker_wav = args.speaker_wav
+
+    service = None
+    if {"service", "processor"} & set(args.scenarios) or ("http" in args.scenarios and not args.base_url):
+        service = build_service(args)
+
+    results: Dict[str, Dict] = {}
+    for scenario in args.scenarios:
+        client = None
+        if scenario == "service":
+            call = service_scenario(service, speaker_wav, args)
+        elif scenario == "engine":
+            call = engine_scenario(build_engine(args), speaker_wav, args)
+        elif scenario == "processor":
+            call = processor_scenario(service, speaker_wav, args, work_dir)
+        else:
+            call, client = http_scenario(service, speaker_wav, args)
+
+        results[scenario] = {}
+        try:
+            # Aquecimento fora da medição (primeira chamada paga imports/caches)
+            await call(*corpus[0])
+            for concurrency in args.concurrency:
+                run = await run_load(call, corpus, concurrency, args.repeats)
+                results[scenario][f"c{concurrency}"] = run
+                logger.info(
+                    f"{scenario:>9} c={concurrency}: p50={run['latency_seconds']['p50'] * 1000:.1f}ms "
+                    f"p99={run['latency_seconds']['p99'] * 1000:.1f}ms "
+                    f"rtf={run['rtf']['overall']:.3f} "
+                    f"{run['throughput']['requests_per_second']:.1f} req/s "
+                    f"rss={run['peak_rss_mb']:.0f}MB"
+                )
+        except Exception as e:
+            logger.error(f"❌ Scenario '{scenario}' failed: {e}")
+            results[scenario] = {"error": str(e)}
+        finally:
+            if client is not None:
+                await client.aclose()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end synthesis benchmark")
+    parser.add_argument("--mode", choices=["stub", "real"], default="stub")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--corpus", choices=sorted(CORPORA), default="pt_br")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeats", type=int, default=1, help="Repetições do corpus por nível de concorrência")
+    parser.add_argument("--quality-profile", default="balanced")
+    parser.add_argument("--stub-rtf", type=float, default=0.0, help="Custo simulado do stub (s de CPU por s de áudio)")
+    parser.add_argument("--device", default="cuda", help="Modo real: cuda ou cpu")
+    parser.add_argument("--speaker-wav", type=Path, default=Path("train/test/audio/reference_test.wav"))
+    parser.add_argument("--base-url", default=None, help="Cenário http contra servidor já rodando")
+    parser.add_argument("--compare", type=Path, default=None, help="JSON anterior para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    scenarios = asyncio.run(run_scenarios(args))
+    results = {
+        "mode": args.mode,
+        "corpus": args.corpus,
+        "device": args.device if args.mode == "real" else "stub",
+        "stub_rtf": args.stub_rtf if args.mode == "stub" else None,
+        "quality_profile": args.quality_profile,
+        "scenarios": scenarios,
+    }
+    path = write_results(f"e2e_synthesis_{args.mode}", results, args.output)
+    logger.info(f"✅ Results written to {path}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())["results"]["scenarios"]
+        regressions = compare_results(baseline, scenarios, args.tolerance)
+        for regression in regressions:
+            logger.warning(f"⚠️ Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        logger.info(f"✅ No regressions vs {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
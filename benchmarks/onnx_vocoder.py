@@ -0,0 +1,121 @@
+"""
+Benchmark: HiFi-GAN vocoder, PyTorch vs ONNX Runtime (CPU EP)
+
+Mede o RTF apenas do estágio de vocoder (latentes GPT → waveform) para
+vários comprimentos de áudio, além do erro máximo entre as duas saídas.
+
+Por padrão usa a arquitetura do XTTS-v2 com pesos aleatórios (o custo
+computacional independe dos pesos, e não requer download do modelo).
+Com --from-model, usa o vocoder do checkpoint real.
+
+Uso:
+    python -m benchmarks.onnx_vocoder --runs 5
+    python -m benchmarks.onnx_vocoder --from-model --threads 4
+"""
+import argparse
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+import torch
+
+from app.cpu_inference import configure_cpu_threads
+from app.engines.onnx_vocoder import OnnxHifiganVocoder, get_or_export_onnx_vocoder
+from benchmarks.common import Timer, percentiles, write_results
+
+logger = logging.getLogger("benchmarks.onnx_vocoder")
+
+SAMPLE_RATE = 24000
+# Cada frame de latente GPT ≈ 1024 amostras a 24kHz (~43ms)
+FRAME_COUNTS = [50, 150, 300]
+
+
+def load_decoder(from_model: bool, model_name: str):
+    """HifiDecoder do XTTS-v2 (real ou com pesos aleatórios)"""
+    if from_model:
+        os.environ["COQUI_TOS_AGREED"] = "1"
+        from TTS.api import TTS
+        return TTS(model_name=model_name, gpu=False, progress_bar=False).synthesizer.tts_model.hifigan_decoder
+
+    from TTS.tts.layers.xtts.hifigan_decoder import HifiDecoder
+    torch.manual_seed(0)
+    return HifiDecoder().eval()
+
+
+def time_backend(fn, latents, g, runs: int) -> List[float]:
+    """Retorna RTFs de `runs` execuções (após 1 warm-up)"""
+    fn(latents, g)
+    rtfs = []
+    for _ in range(runs):
+        with Timer() as t:
+            wav = fn(latents, g)
+        rtfs.append(t.elapsed / (wav.shape[-1] / SAMPLE_RATE))
+    return rtfs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HiFi-GAN vocoder: PyTorch vs ONNX Runtime")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=0, help="Threads intra-op (0 = cgroup)")
+    parser.add_argument("--from-model", action="store_true", help="Usar pesos do checkpoint XTTS-v2")
+    parser.add_argument("--model-name", default="tts_models/multilingual/multi-dataset/xtts_v2")
+    parser.add_argument("--cache-dir", type=Path, default=None, help="Cache de export ONNX")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    threads = configure_cpu_threads(args.threads)
+
+    decoder = load_decoder(args.from_model, args.model_name)
+    cache_dir = args.cache_dir or Path(tempfile.gettempdir()) / "tts_onnx_bench"
+    with Timer() as export_timer:
+        onnx_path = get_or_export_onnx_vocoder(decoder, cache_dir)
+    vocoder = OnnxHifiganVocoder(onnx_path, decoder, num_threads=threads["num_threads"])
+
+    latent_dim = decoder.waveform_decoder.conv_pre.in_channels
+    speaker_dim = decoder.waveform_decoder.cond_layer.in_channels
+
+    def run_torch(latents, g):
+        with torch.inference_mode():
+            return decoder(latents, g=g)
+
+    per_length: List[Dict] = []
+    for frames in FRAME_COUNTS:
+        torch.manual_seed(frames)
+        latents = torch.randn(1, frames, latent_dim)
+        g = torch.randn(1, speaker_dim, 1)
+
+        torch_rtf = time_backend(run_torch, latents, g, args.runs)
+        onnx_rtf = time_backend(vocoder, latents, g, args.runs)
+        max_abs_diff = float((run_torch(latents, g) - vocoder(latents, g)).abs().max())
+
+        entry = {
+            "frames": frames,
+            "audio_seconds": run_torch(latents, g).shape[-1] / SAMPLE_RATE,
+            "pytorch_rtf": percentiles(torch_rtf),
+            "onnx_rtf": percentiles(onnx_rtf),
+            "speedup_p50": percentiles(torch_rtf)["p50"] / percentiles(onnx_rtf)["p50"],
+            "max_abs_diff": max_abs_diff,
+        }
+        per_length.append(entry)
+        logger.info(
+            f"{entry['audio_seconds']:6.2f}s audio | PyTorch RTF {entry['pytorch_rtf']['p50']:.3f} "
+            f"| ONNX RTF {entry['onnx_rtf']['p50']:.3f} | speedup {entry['speedup_p50']:.2f}x "
+            f"| max diff {max_abs_diff:.2e}"
+        )
+
+    results = {
+        "threads": threads,
+        "weights": "checkpoint" if args.from_model else "random",
+        "export_or_cache_seconds": export_timer.elapsed,
+        "onnx_path": str(onnx_path),
+        "lengths": per_length,
+    }
+    path = write_results("onnx_vocoder", results, args.output)
+    logger.info(f"✅ Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
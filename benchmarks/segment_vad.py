@@ -0,0 +1,241 @@
+"""
+Benchmark dos backends de VAD (train/scripts/segment_audio.py)
+
+Compara, em horas de áudio sintético (rajadas de "fala" com pausas de
+tamanhos variados e ruído de fundo):
+
+- legacy:    loop Python por frame (implementação original, mantida aqui
+             como referência de paridade)
+- vectorized: RMSVoiceDetector (soma cumulativa + runs) em streaming
+- stream:     iter_voice_regions lendo um WAV do disco (inclui decode)
+- silero / webrtc (--backends): backends neurais em streaming, mesmos
+  chunks; pulados se o pacote não estiver instalado. Tons sintéticos não
+  são fala: para esses backends só a velocidade é significativa, não o
+  número de regiões.
+
+Reporta velocidade em x tempo real (segundos de áudio por segundo) e o
+número de regiões detectadas.
+
+Uso:
+    python -m benchmarks.segment_vad --hours 2
+    python -m benchmarks.segment_vad --hours 4 --skip-legacy --with-file
+    python -m benchmarks.segment_vad --hours 0.5 --skip-legacy --backends silero webrtc
+"""
+import argparse
+import logging
+import math
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.common import PeakRSSSampler, write_results
+
+logger = logging.getLogger("benchmarks.segment_vad")
+
+DEFAULT_SEG_CONFIG = {
+    "use_vad": True,
+    "vad_threshold": -40.0,
+    "vad_frame_size": 512,
+    "vad_chunk_duration": 10.0,
+    "min_silence_duration": 0.3,
+}
+
+
+def reference_detect_voice_in_chunk(
+    audio_chunk: np.ndarray,
+    sr: int,
+    seg_config: dict,
+) -> List[Tuple[float, float]]:
+    """VAD original (loop por frame), referência para paridade e baseline"""
+    frame_size = int(seg_config.get("vad_frame_size", 512))
+    hop_size = frame_size // 2
+    threshold_db = float(seg_config.get("vad_threshold", -40.0))
+    min_silence_duration = float(seg_config.get("min_silence_duration", 0.3))
+
+    num_frames = max(0, (len(audio_chunk) - frame_size) // hop_size + 1)
+
+    segments = []
+    in_voice = False
+    voice_start = 0.0
+
+    min_silence_frames = max(1, int(min_silence_duration * sr / hop_size))
+    silence_count = 0
+    eps = 1e-10
+
+    for i in range(num_frames):
+        start_idx = i * hop_size
+        frame = audio_chunk[start_idx:start_idx + frame_size]
+
+        rms = float(np.sqrt(np.mean(frame * frame) + eps))
+        db = 20.0 * math.log10(rms + eps)
+
+        has_voice = db > threshold_db
+        t = start_idx / sr
+
+        if has_voice:
+            if not in_voice:
+                voice_start = t
+                in_voice = True
+            silence_count = 0
+        elif in_voice:
+            silence_count += 1
+            if silence_count >= min_silence_frames:
+                if t > voice_start:
+                    segments.append((voice_start, t))
+                in_voice = False
+                silence_count = 0
+
+    if in_voice:
+        voice_end = (num_frames * hop_size) / sr
+        if voice_end > voice_start:
+            segments.append((voice_start, voice_end))
+
+    return segments
+
+
+def synthetic_speech_chunks(
+    total_seconds: float,
+    sr: int = 22050,
+    chunk_seconds: float = 10.0,
+    seed: int = 0
+) -> Iterator[np.ndarray]:
+    """
+    Áudio sintético em chunks: rajadas de tom modulado (0.2-4s) separadas
+    por pausas (0.05-1.5s) sobre ruído de fundo a ~-60 dB.
+    """
+    rng = np.random.default_rng(seed)
+    chunk_samples = int(chunk_seconds * sr)
+    remaining = int(total_seconds * sr)
+    voiced = True
+    state_left = 0
+    while remaining > 0:
+        n = min(chunk_samples, remaining)
+        out = (rng.standard_normal(n) * 0.001).astype(np.float32)
+        pos = 0
+        while pos < n:
+            if state_left == 0:
+                voiced = not voiced
+                seconds = rng.uniform(0.2, 4.0) if voiced else rng.uniform(0.05, 1.5)
+                state_left = int(seconds * sr)
+            take = min(state_left, n - pos)
+            if voiced:
+                t = np.arange(take, dtype=np.float32) / sr
+                out[pos:pos + take] += 0.2 * np.sin(2 * np.pi * 180 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+            pos += take
+            state_left -= take
+        remaining -= n
+        yield out
+
+
+def run_detector(name: str, chunks_fn, detect, sr: int, total_seconds: float) -> Dict:
+    with PeakRSSSampler() as rss:
+        start = time.perf_counter()
+        regions = detect(chunks_fn())
+        elapsed = time.perf_counter() - start
+    result = {
+        "seconds": round(elapsed, 3),
+        "x_realtime": round(total_seconds / elapsed, 1),
+        "regions": len(regions),
+        "peak_rss_mb": rss.peak_mb,
+    }
+    logger.info(f"{name:>10}: {elapsed:.2f}s ({result['x_realtime']:.0f}x real time), {len(regions)} regions")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Energy VAD benchmark on synthetic audio")
+    parser.add_argument("--hours", type=float, default=2.0)
+    parser.add_argument("--sample-rate", type=int, default=22050)
+    parser.add_argument("--skip-legacy", action="store_true", help="Não medir o loop por frame (lento)")
+    parser.add_argument("--with-file", action="store_true", help="Também medir iter_voice_regions lendo WAV do disco")
+    parser.add_argument("--backends", nargs="*", choices=["silero", "webrtc"], default=[],
+                        help="Backends neurais a comparar com o RMS")
+    parser.add_argument("--vad-batch-size", type=int, default=16, help="Lote do backend silero")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    from train.scripts.segment_audio import RMSVoiceDetector, create_voice_detector, iter_voice_regions
+
+    sr = args.sample_rate
+    total_seconds = args.hours * 3600
+    seg_config = dict(DEFAULT_SEG_CONFIG, vad_batch_size=args.vad_batch_size)
+    chunk_seconds = seg_config["vad_chunk_duration"]
+
+    def chunks():
+        return synthetic_speech_chunks(total_seconds, sr, chunk_seconds)
+
+    def legacy(chunk_iter):
+        regions = []
+        offset = 0.0
+        for chunk in chunk_iter:
+            regions += [(offset + s, offset + e) for s, e in reference_detect_voice_in_chunk(chunk, sr, seg_config)]
+            offset += len(chunk) / sr
+        return regions
+
+    def vectorized(chunk_iter):
+        detector = RMSVoiceDetector(sr, seg_config)
+        regions = []
+        for chunk in chunk_iter:
+            regions += detector.process(chunk)
+        return regions + detector.flush()
+
+    # Geração do áudio sintético fora da medição
+    cached = list(chunks())
+    logger.info(f"Synthetic audio: {args.hours:g}h @ {sr}Hz ({len(cached)} chunks)")
+
+    runs: Dict[str, Dict] = {}
+    runs["vectorized"] = run_detector("vectorized", lambda: iter(cached), vectorized, sr, total_seconds)
+    if not args.skip_legacy:
+        runs["legacy"] = run_detector("legacy", lambda: iter(cached), legacy, sr, total_seconds)
+        runs["speedup"] = round(runs["legacy"]["seconds"] / runs["vectorized"]["seconds"], 1)
+        logger.info(f"⚡ Speedup: {runs['speedup']}x")
+
+    for backend in args.backends:
+        backend_config = dict(seg_config, vad_backend=backend)
+        try:
+            create_voice_detector(sr, backend_config)
+        except ImportError as e:
+            logger.warning(f"⚠️ Skipping {backend}: {e}")
+            continue
+
+        def streamed(chunk_iter, config=backend_config):
+            detector = create_voice_detector(sr, config)
+            regions = []
+            for chunk in chunk_iter:
+                regions += detector.process(chunk)
+            return regions + detector.flush()
+
+        runs[backend] = run_detector(backend, lambda: iter(cached), streamed, sr, total_seconds)
+        runs[backend]["vs_rms"] = round(runs["vectorized"]["seconds"] / runs[backend]["seconds"], 3)
+
+    if args.with_file:
+        with tempfile.TemporaryDirectory(prefix="vad_bench_") as tmp:
+            path = Path(tmp) / "synthetic.wav"
+            with sf.SoundFile(str(path), "w", samplerate=sr, channels=1, subtype="PCM_16") as f:
+                for chunk in cached:
+                    f.write(chunk)
+            total_frames = sf.info(str(path)).frames
+            runs["stream"] = run_detector(
+                "stream", lambda: None,
+                lambda _: list(iter_voice_regions(path, seg_config, sr, total_frames)),
+                sr, total_seconds
+            )
+    del cached
+
+    path = write_results("segment_vad", {
+        "hours": args.hours,
+        "sample_rate": sr,
+        "seg_config": seg_config,
+        "runs": runs,
+    }, args.output)
+    logger.info(f"✅ Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
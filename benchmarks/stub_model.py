@@ -0,0 +1,72 @@
+"""
+Modelo stub determinístico para benchmarks de overhead do framework.
+
+StubTTS imita a interface usada de `TTS.api.TTS` (`tts()` e
+`tts_to_file()`), gerando um tom cuja duração depende apenas do texto.
+Com `rtf > 0`, bloqueia a thread por `rtf x duração` para simular o custo
+de inferência (inclusive o bloqueio do event loop quando chamado direto).
+"""
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+SAMPLE_RATE = 24000
+
+
+class StubTTS:
+    """Substitui TTS.api.TTS nos benchmarks (mesmo texto → mesmo áudio)"""
+
+    def __init__(self, rtf: float = 0.0, chars_per_second: float = 15.0):
+        self.rtf = rtf
+        self.chars_per_second = chars_per_second
+
+    def _render(self, text: str, speed: float = 1.0) -> np.ndarray:
+        duration = max(0.2, len(text) / self.chars_per_second / speed)
+        t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+        freq = 110 + zlib.crc32(text.encode("utf-8")) % 200
+        if self.rtf > 0:
+            time.sleep(self.rtf * duration)
+        return (0.1 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+    def tts(self, text: str, speaker_wav=None, language=None, speed: float = 1.0, **kwargs) -> list:
+        # TTS.api.TTS.tts() retorna lista de floats
+        return self._render(text, speed).tolist()
+
+    def tts_to_file(self, text: str, file_path: str, speaker_wav=None, language=None,
+                    speed: float = 1.0, **kwargs) -> str:
+        sf.write(file_path, self._render(text, speed), SAMPLE_RATE)
+        return file_path
+
+
+def write_reference_wav(path: Path, seconds: float = 6.0) -> Path:
+    """WAV de referência sintético (speaker_wav precisa existir em disco)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    sf.write(path, (0.1 * np.sin(2 * np.pi * 220 * t)).astype(np.float32), SAMPLE_RATE)
+    return path
+
+
+def make_stub_service(rtf: float = 0.0):
+    """XTTSService pronto para uso, com StubTTS no lugar do modelo"""
+    from app.services.xtts_service import XTTSService
+
+    service = XTTSService(device="cpu")
+    service.tts = StubTTS(rtf)
+    service._initialized = True
+    return service
+
+
+def make_stub_engine(rtf: float = 0.0):
+    """XttsEngine sem carregar checkpoint (StubTTS no lugar de TTS.api.TTS)"""
+    from app.engines.xtts_engine import XttsEngine
+
+    engine = XttsEngine.__new__(XttsEngine)
+    engine.device = "cpu"
+    engine.model_name = "stub"
+    engine.tts = StubTTS(rtf)
+    engine._model_loaded = True
+    return engine
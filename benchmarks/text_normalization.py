@@ -0,0 +1,168 @@
+"""
+Benchmark da normalização de texto PT-BR (app/text_normalizer.py)
+
+Frases sintéticas a partir do corpus pt_br com números, porcentagens,
+símbolos e ruído de transcrição ("b80", "80mil"), normalizadas por:
+
+- legacy:   preprocess_text original do transcribe_audio.py (regex
+            recompiladas por chamada, num2words sem cache, replacements em
+            loop), mantido aqui como referência de paridade e baseline
+- compiled: TextNormalizer (compilado uma vez da config)
+
+Reporta frases/s e o número de divergências entre os dois (esperado: 0).
+O legacy roda numa amostra (--legacy-sample) para não dominar o tempo.
+
+Uso:
+    python -m benchmarks.text_normalization --sentences 1000000
+    python -m benchmarks.text_normalization --sentences 100000 --legacy-sample 100000
+"""
+import argparse
+import logging
+import random
+import re
+from typing import Dict, List, Tuple
+
+from benchmarks.common import PeakRSSSampler, Timer, write_results
+from benchmarks.corpus import CORPORA
+
+logger = logging.getLogger("benchmarks.text_normalization")
+
+# Config do pipeline de treino + replacements típicos de pontuação
+DEFAULT_TEXT_CONFIG = {
+    "expand_numbers": True,
+    "lowercase": True,
+    "replacements": {"…": "...", "“": '"', "”": '"', "–": ",", "—": ","},
+}
+
+_NOISE = ["{n}", "{n}%", "{n} %", "b{n}", "{n}mil", "R$ {n}", "{n}/{m}", "a+b", "@{n}", "#{n}", "x={n}", "—"]
+
+
+def reference_preprocess_text(text: str, text_config: dict) -> str:
+    """preprocess_text original (sem limpeza de vocabulário/OOV), referência para paridade"""
+    from num2words import num2words
+
+    symbols = {
+        "@": "arroba", "%": "porcento", "&": "e comercial", "+": "mais", "-": "menos",
+        "/": "barra", "#": "jogo da velha", "$": "dólar", "=": "igual",
+    }
+    lang = text_config.get("numbers_lang", "pt_BR")
+
+    if text_config.get("lowercase", True):
+        text = text.lower()
+
+    text = re.sub(r"\b([bcdfghjklmnpqrstvwxyz])(?=\d)", "", text, flags=re.IGNORECASE)
+
+    def repl_number_percent(match):
+        try:
+            return f"{num2words(int(match.group(1)), lang=lang)} porcento"
+        except Exception:
+            return match.group(0)
+
+    text = re.sub(r"\b(\d+)\s*%", repl_number_percent, text)
+    text = re.sub(r"[@%&+\-/#$=]", lambda m: f" {symbols[m.group(0)]} ", text)
+
+    def repl_number(match):
+        try:
+            spoken = num2words(int(match.group(0)), lang=lang)
+        except Exception:
+            return match.group(0)
+        start, end = match.span()
+        src = match.string
+        if start > 0 and src[start - 1].isalnum():
+            spoken = " " + spoken
+        if end < len(src) and src[end].isalnum():
+            spoken = spoken + " "
+        return spoken
+
+    text = re.sub(r"\d+", repl_number, text)
+
+    if text_config.get("normalize_punctuation", True):
+        for old, new in text_config.get("replacements", {}).items():
+            text = text.replace(old, new)
+
+    if text_config.get("remove_special_chars", False):
+        allowed_chars = text_config.get("allowed_chars")
+        if allowed_chars:
+            allowed = set(allowed_chars)
+            text = "".join(c if c in allowed else " " for c in text)
+
+    text = re.sub(r"\s+", " ", text).strip()
+
+    if text_config.get("cleanup_segment_edges", True):
+        def is_probably_broken(w):
+            w_clean = re.sub(r"[^a-záéíóúâêôãõç]", "", w)
+            if not w_clean:
+                return False
+            if len(w_clean) >= 3 and not re.search(r"[aeiouáéíóúâêôãõ]", w_clean):
+                return True
+            return len(w_clean) == 1 and w_clean not in {"a", "e", "o", "é"}
+
+        words = text.split()
+        while words and is_probably_broken(words[0]):
+            words.pop(0)
+        while words and is_probably_broken(words[-1]):
+            words.pop()
+        text = " ".join(words)
+
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def generate_sentences(count: int, seed: int = 0) -> List[str]:
+    """Frases do corpus pt_br com números/símbolos inseridos (determinístico)"""
+    rng = random.Random(seed)
+    base = [text for lang, text in CORPORA["pt_br"] if lang == "pt"]
+    sentences = []
+    for _ in range(count):
+        words = rng.choice(base).split()
+        for _ in range(rng.randint(0, 3)):
+            noise = rng.choice(_NOISE).format(n=rng.choice([rng.randint(0, 100), rng.randint(0, 3000)]), m=rng.randint(1, 12))
+            words.insert(rng.randint(0, len(words)), noise)
+        sentences.append(" ".join(words))
+    return sentences
+
+
+def run(name: str, normalize, sentences: List[str]) -> Tuple[Dict, List[str]]:
+    with PeakRSSSampler() as rss, Timer() as wall:
+        outputs = [normalize(s) for s in sentences]
+    result = {
+        "sentences": len(sentences),
+        "wall_seconds": round(wall.elapsed, 3),
+        "sentences_per_second": round(len(sentences) / wall.elapsed, 1),
+        "peak_rss_mb": rss.peak_mb,
+    }
+    logger.info(f"{name:>9}: {result['sentences_per_second']:,.0f} frases/s ({wall.elapsed:.1f}s)")
+    return result, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PT-BR text normalization throughput benchmark")
+    parser.add_argument("--sentences", type=int, default=1_000_000)
+    parser.add_argument("--legacy-sample", type=int, default=50_000, help="Frases medidas no legacy (0 = pular)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    from app.text_normalizer import TextNormalizer
+
+    sentences = generate_sentences(args.sentences, args.seed)
+    logger.info(f"{len(sentences):,} frases sintéticas")
+
+    normalizer = TextNormalizer.from_config(DEFAULT_TEXT_CONFIG)
+    runs: Dict[str, Dict] = {}
+    runs["compiled"], compiled = run("compiled", normalizer.normalize, sentences)
+
+    if args.legacy_sample:
+        sample = sentences[:args.legacy_sample]
+        runs["legacy"], legacy = run("legacy", lambda s: reference_preprocess_text(s, DEFAULT_TEXT_CONFIG), sample)
+        runs["mismatches"] = sum(a != b for a, b in zip(legacy, compiled))
+        runs["speedup"] = round(runs["compiled"]["sentences_per_second"] / runs["legacy"]["sentences_per_second"], 1)
+        logger.info(f"⚡ Speedup: {runs['speedup']}x, divergências: {runs['mismatches']}")
+
+    path = write_results("text_normalization", {"seed": args.seed, "text_config": DEFAULT_TEXT_CONFIG, "runs": runs}, args.output)
+    logger.info(f"✅ Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmark de transcrição Whisper: segmentos/s por estratégia
+
+Mesmo conjunto de WAVs (padrão: train/data/processed/wavs) em:
+
+- sequential: transcribe_audio.transcribe_with_whisper (um model.transcribe
+              por arquivo, caminho original do transcribe_audio.py)
+- pool:       transcribe_audio_parallel (um modelo por thread, --workers)
+- batched:    BatchedWhisperTranscriber (um modelo, lotes por duração,
+              prefetch), um run por valor de --batch-sizes
+
+Carga de modelo fora da medição. Reporta segmentos/s, segundos de áudio
+por segundo, pico de RSS e pico de memória CUDA.
+
+Uso:
+    python -m benchmarks.transcribe_whisper --limit 128 --model base
+    python -m benchmarks.transcribe_whisper --scenarios batched --batch-sizes 8 16 32
+"""
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import soundfile as sf
+
+from benchmarks.common import PeakRSSSampler, Timer, write_results
+
+logger = logging.getLogger("benchmarks.transcribe_whisper")
+
+SCENARIOS = ("sequential", "pool", "batched")
+
+
+def _cuda_reset(device: str) -> None:
+    if device.startswith("cuda"):
+        import torch
+        torch.cuda.synchronize()
+        torch.cuda.reset_peak_memory_stats()
+
+
+def _cuda_peak_mb(device: str):
+    if not device.startswith("cuda"):
+        return None
+    import torch
+    torch.cuda.synchronize()
+    return round(torch.cuda.max_memory_allocated() / 1024 / 1024, 1)
+
+
+def measure(name: str, run: Callable[[], int], segments: int, audio_seconds: float, device: str) -> Dict:
+    """Executa `run` (retorna nº de textos não vazios) e mede throughput"""
+    _cuda_reset(device)
+    with PeakRSSSampler() as rss, Timer() as wall:
+        transcribed = run()
+    result = {
+        "wall_seconds": round(wall.elapsed, 3),
+        "segments": segments,
+        "transcribed": transcribed,
+        "segments_per_second": round(segments / wall.elapsed, 2),
+        "audio_seconds_per_second": round(audio_seconds / wall.elapsed, 1),
+        "peak_rss_mb": rss.peak_mb,
+        "peak_cuda_mb": _cuda_peak_mb(device),
+    }
+    logger.info(
+        f"{name:>12}: {result['segments_per_second']:.2f} seg/s "
+        f"({result['audio_seconds_per_second']:.0f}s áudio/s), {wall.elapsed:.1f}s"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whisper transcription throughput benchmark")
+    parser.add_argument("--audio-dir", type=Path, default=Path("train/data/processed/wavs"))
+    parser.add_argument("--limit", type=int, default=128, help="Número de segmentos (WAVs)")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--device", default=None, help="cuda ou cpu (padrão: cuda se disponível)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--workers", type=int, default=2, help="Modelos/threads no cenário pool")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 16])
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    import torch
+
+    from train.scripts import transcribe_audio
+    from train.scripts.whisper_batch import BatchedWhisperTranscriber, load_whisper_model
+
+    device = args.device or ("cuda" if torch.cuda.is_available() else "cpu")
+    paths: List[Path] = sorted(args.audio_dir.resolve().glob("*.wav"))[:args.limit]
+    if not paths:
+        parser.error(f"Nenhum WAV em {args.audio_dir}")
+    durations = [sf.info(str(p)).duration for p in paths]
+    audio_seconds = sum(durations)
+    logger.info(f"{len(paths)} segmentos, {audio_seconds / 60:.1f} min de áudio, Whisper {args.model} @ {device}")
+
+    config = transcribe_audio.load_config()
+    config["transcription"]["whisper_model"] = args.model
+    runs: Dict[str, Dict] = {}
+
+    model = None
+    if {"sequential", "batched"} & set(args.scenarios):
+        model = load_whisper_model(args.model, device)
+
+    if "sequential" in args.scenarios:
+        transcribe_audio._WHISPER_MODEL = model
+
+        def sequential():
+            return sum(bool(transcribe_audio.transcribe_with_whisper(p, config)) for p in paths)
+        transcribe_audio.transcribe_with_whisper(paths[0], config)  # aquecimento
+        runs["sequential"] = measure("sequential", sequential, len(paths), audio_seconds, device)
+
+    if "pool" in args.scenarios:
+        from train.scripts import transcribe_audio_parallel as parallel
+
+        parallel._MODEL_POOL.clear()
+        parallel.init_model_pool(args.workers, args.model, device)
+        segments = [{"audio_path": str(p), "duration": d} for p, d in zip(paths, durations)]
+
+        def pool():
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                futures = [
+                    executor.submit(parallel.transcribe_segment_worker, i % args.workers, s, i, config, False)
+                    for i, s in enumerate(segments)
+                ]
+                return sum(future.result() is not None for future in futures)
+        runs[f"pool_w{args.workers}"] = measure(f"pool w={args.workers}", pool, len(paths), audio_seconds, device)
+        parallel._MODEL_POOL.clear()
+        if device.startswith("cuda"):
+            torch.cuda.empty_cache()
+
+    if "batched" in args.scenarios:
+        for batch_size in args.batch_sizes:
+            transcriber = BatchedWhisperTranscriber(
+                model,
+                language=config["transcription"].get("language", "pt"),
+                temperature=config["transcription"].get("temperature", 0.0),
+                batch_size=batch_size,
+            )
+
+            def batched(transcriber=transcriber):
+                return sum(bool(text) for _, text in transcriber.transcribe(paths, durations))
+            list(transcriber.transcribe(paths[:batch_size], durations[:batch_size]))  # aquecimento
+            runs[f"batched_b{batch_size}"] = measure(f"batched b={batch_size}", batched, len(paths), audio_seconds, device)
+
+    if "sequential" in runs:
+        base = runs["sequential"]["segments_per_second"]
+        for run in runs.values():
+            run["speedup_vs_sequential"] = round(run["segments_per_second"] / base, 2)
+
+    path = write_results("transcribe_whisper", {
+        "model": args.model,
+        "device": device,
+        "segments": len(paths),
+        "audio_seconds": round(audio_seconds, 1),
+        "runs": runs,
+    }, args.output)
+    logger.info(f"✅ Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark: latência das primeiras N requisições, sem vs com warm-up
+
+Cada variante roda em um processo novo (o efeito do warm-up persiste no
+processo), com o mesmo corpus de requisições misturando idiomas e tamanhos:
+
+- cold: modelo carregado, requisições imediatamente
+- warm: modelo carregado + suíte de warm-up (app/warmup.py), depois requisições
+
+Com --compile-cache-dir, a segunda execução do benchmark também mede o
+ganho dos artefatos persistidos do torch.compile.
+
+Uso:
+    python -m benchmarks.warmup_latency \\
+        --speaker-wav train/test/audio/reference_test.wav --requests 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+from benchmarks.common import percentiles, write_results
+
+logger = logging.getLogger("benchmarks.warmup_latency")
+
+# Corpus das "primeiras requisições reais" (diferente dos textos de warm-up)
+REQUEST_CORPUS = [
+    ("pt", "Bom dia! Seu pedido foi confirmado."),
+    ("en", "The quarterly report is ready for review, and the numbers look better than expected."),
+    ("es", "¿Podrías enviarme el documento antes de la reunión de mañana?"),
+    ("pt", "A síntese de voz neural transforma texto em fala natural, preservando entonação, "
+           "ritmo e timbre do locutor de referência, mesmo em frases longas com várias pausas."),
+    ("fr", "Merci beaucoup pour votre aide."),
+    ("de", "Der Zug nach Berlin hat heute leider zwanzig Minuten Verspätung."),
+]
+
+
+async def _measure(args) -> Dict:
+    """Executado no processo filho: carrega, (warm-up), mede N requisições"""
+    from app.services.xtts_service import XTTSService
+    from app.settings import get_supported_languages
+    from app.warmup import configure_compile_cache, run_warmup_suite
+
+    if args.compile_cache_dir:
+        configure_compile_cache(args.compile_cache_dir)
+
+    service = XTTSService(
+        device=args.device,
+        cpu_compile_vocoder=args.compile_vocoder,
+        first_requests_limit=args.requests
+    )
+    service.initialize()
+
+    warmup = None
+    if args.variant == "warm":
+        warmup = await run_warmup_suite(
+            service,
+            speaker_wav=args.speaker_wav,
+            languages=args.languages or get_supported_languages(),
+            text_lengths=args.text_lengths,
+            compile_cache_dir=args.compile_cache_dir
+        )
+
+    for i in range(args.requests):
+        language, text = REQUEST_CORPUS[i % len(REQUEST_CORPUS)]
+        await service.synthesize(text=text, speaker_wav=args.speaker_wav, language=language)
+
+    return {
+        "latencies": service.first_requests.latencies,
+        "warmup_seconds": warmup.get("total_seconds") if warmup else None,
+    }
+
+
+def run_variant(variant: str, args) -> Dict:
+    """Roda uma variante em subprocesso e retorna latências"""
+    cmd = [
+        sys.executable, "-m", "benchmarks.warmup_latency", "--child", variant,
+        "--speaker-wav", str(args.speaker_wav),
+        "--requests", str(args.requests),
+        "--device", args.device,
+        "--text-lengths", *[str(n) for n in args.text_lengths],
+    ]
+    if args.languages:
+        cmd += ["--languages", *args.languages]
+    if args.compile_cache_dir:
+        cmd += ["--compile-cache-dir", str(args.compile_cache_dir)]
+    if args.compile_vocoder:
+        cmd.append("--compile-vocoder")
+
+    proc = subprocess.run(cmd, capture_output=True, text=True, env={**os.environ, "COQUI_TOS_AGREED": "1"})
+    if proc.returncode != 0:
+        raise RuntimeError(f"{variant} run failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    stats = percentiles(result["latencies"])
+    logger.info(
+        f"{variant:>4}: p50={stats.get('p50', float('nan')):.2f}s "
+        f"p99={stats.get('p99', float('nan')):.2f}s (warm-up {result['warmup_seconds']}s)"
+    )
+    return {**result, "latency_seconds": stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="First-N request latency with/without warm-up")
+    parser.add_argument("--speaker-wav", type=Path, required=True)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--device", default="cuda")
+    parser.add_argument("--languages", nargs="*", default=None,
+                        help="Idiomas do warm-up (default: todos suportados)")
+    parser.add_argument("--text-lengths", type=int, nargs="+", default=[20, 120, 300])
+    parser.add_argument("--compile-cache-dir", type=Path, default=None)
+    parser.add_argument("--compile-vocoder", action="store_true", help="torch.compile no vocoder (CPU)")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--child", choices=["cold", "warm"], default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        args.variant = args.child
+        logging.basicConfig(level=logging.WARNING)
+        print(json.dumps(asyncio.run(_measure(args))))
+        return
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    runs: Dict[str, Dict] = {}
+    for variant in ("cold", "warm"):
+        runs[variant] = run_variant(variant, args)
+
+    path = write_results("warmup_latency", {
+        "requests": args.requests,
+        "device": args.device,
+        "text_lengths": args.text_lengths,
+        "languages": args.languages,
+        "runs": runs,
+    }, args.output)
+    logger.info(f"✅ Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Tests for benchmark suite (benchmarks/) em modo stub
+
+Garante que os cenários rodam sem modelo real (uso em CI) e que a
+comparação entre resultados detecta regressões.
+"""
+import asyncio
+
+import pytest
+
+from benchmarks.common import compare_results
+from benchmarks.corpus import CORPORA
+from benchmarks.e2e_synthesis import processor_scenario, run_load, service_scenario
+from benchmarks.stub_model import StubTTS, make_stub_service, write_reference_wav
+
+
+class _Args:
+    quality_profile = "balanced"
+
+
+class TestStubModel:
+    """StubTTS determinístico"""
+
+    def test_same_text_same_audio(self):
+        stub = StubTTS()
+        assert stub.tts("Olá mundo") == stub.tts("Olá mundo")
+
+    def test_duration_scales_with_text(self):
+        stub = StubTTS(chars_per_second=10)
+        assert len(stub.tts("a" * 100)) == pytest.approx(10 * 24000, rel=0.01)
+
+
+class TestScenarios:
+    """Cenários service/processor com stub"""
+
+    @pytest.fixture
+    def speaker_wav(self, tmp_path):
+        return write_reference_wav(tmp_path / "speaker.wav")
+
+    def test_service_scenario_metrics(self, speaker_wav):
+        call = service_scenario(make_stub_service(), speaker_wav, _Args())
+        result = asyncio.run(run_load(call, CORPORA["smoke"], concurrency=2, repeats=2))
+
+        assert result["requests"] == 2 * len(CORPORA["smoke"])
+        assert set(result["latency_seconds"]) == {"p50", "p95", "p99"}
+        assert result["rtf"]["overall"] > 0
+        assert result["throughput"]["requests_per_second"] > 0
+        assert result["peak_rss_mb"] > 0
+
+    def test_processor_scenario_writes_output(self, speaker_wav, tmp_path):
+        call = processor_scenario(make_stub_service(), speaker_wav, _Args(), tmp_path)
+        duration = asyncio.run(call("pt", "Olá, tudo bem?"))
+
+        assert duration > 0
+        assert len(list((tmp_path / "processed").glob("*.wav"))) == 1
+
+
+class TestCompareResults:
+    """Detecção de regressões"""
+
+    BASE = {"service": {"c1": {
+        "latency_seconds": {"p50": 1.0},
+        "throughput": {"requests_per_second": 10.0},
+        "requests": 8,
+    }}}
+
+    def test_no_regression_within_tolerance(self):
+        current = {"service": {"c1": {
+            "latency_seconds": {"p50": 1.05},
+            "throughput": {"requests_per_second": 9.5},
+            "requests": 16,
+        }}}
+        assert compare_results(self.BASE, current, tolerance=0.10) == []
+
+    def test_detects_latency_and_throughput_regressions(self):
+        current = {"service": {"c1": {
+            "latency_seconds": {"p50": 1.5},
+            "throughput": {"requests_per_second": 5.0},
+            "requests": 8,
+        }}}
+        regressions = compare_results(self.BASE, current, tolerance=0.10)
+        assert len(regressions) == 2
@@ -0,0 +1,139 @@
+"""
+Tests for CPU inference mode (app/cpu_inference.py)
+
+Quota do cgroup, fixação de threads e quantização int8.
+"""
+import pytest
+import torch
+import torch.nn as nn
+
+from app.cpu_inference import (
+    read_cgroup_cpu_quota,
+    get_effective_cpu_count,
+    configure_cpu_threads,
+    quantize_dynamic_int8,
+    apply_cpu_optimizations,
+)
+
+
+class TestCgroupQuota:
+    """Leitura da quota de CPU (cgroup v1/v2)"""
+
+    def test_cgroup_v2_quota(self, tmp_path):
+        cpu_max = tmp_path / "cpu.max"
+        cpu_max.write_text("250000 100000\n")
+        quota = read_cgroup_cpu_quota(cpu_max, tmp_path / "none", tmp_path / "none")
+        assert quota == 2.5
+
+    def test_cgroup_v2_unlimited(self, tmp_path):
+        cpu_max = tmp_path / "cpu.max"
+        cpu_max.write_text("max 100000\n")
+        assert read_cgroup_cpu_quota(cpu_max, tmp_path / "none", tmp_path / "none") is None
+
+    def test_cgroup_v1_quota(self, tmp_path):
+        quota = tmp_path / "cpu.cfs_quota_us"
+        period = tmp_path / "cpu.cfs_period_us"
+        quota.write_text("400000")
+        period.write_text("100000")
+        assert read_cgroup_cpu_quota(tmp_path / "none", quota, period) == 4.0
+
+    def test_cgroup_v1_unlimited(self, tmp_path):
+        quota = tmp_path / "cpu.cfs_quota_us"
+        period = tmp_path / "cpu.cfs_period_us"
+        quota.write_text("-1")
+        period.write_text("100000")
+        assert read_cgroup_cpu_quota(tmp_path / "none", quota, period) is None
+
+    def test_effective_cpu_count_respects_quota(self, monkeypatch):
+        monkeypatch.setattr("app.cpu_inference.read_cgroup_cpu_quota", lambda: 1.5)
+        assert get_effective_cpu_count() <= 2
+
+    def test_configure_threads_explicit(self):
+        previous = torch.get_num_threads()
+        try:
+            applied = configure_cpu_threads(num_threads=1)
+            assert applied["num_threads"] == 1
+            assert torch.get_num_threads() == 1
+        finally:
+            torch.set_num_threads(previous)
+
+
+class _TinyGPT(nn.Module):
+    """Bloco estilo GPT-2 (Conv1D do transformers + nn.Linear)"""
+
+    def __init__(self, dim: int = 32):
+        super().__init__()
+        from transformers.pytorch_utils import Conv1D
+        self.c_attn = Conv1D(3 * dim, dim)
+        self.c_proj = Conv1D(dim, 3 * dim)
+        self.head = nn.Linear(dim, 16)
+
+    def forward(self, x):
+        return self.head(self.c_proj(torch.relu(self.c_attn(x))))
+
+
+class TestQuantization:
+    """Quantização dinâmica int8"""
+
+    def test_conv1d_converted_and_quantized(self):
+        pytest.importorskip("transformers")
+        torch.manual_seed(0)
+        model = _TinyGPT().eval()
+        x = torch.randn(4, 10, 32)
+        with torch.no_grad():
+            expected = model(x)
+
+        quantize_dynamic_int8(model)
+
+        quantized_types = {type(m).__name__ for m in model.modules()}
+        assert "Conv1D" not in quantized_types
+        assert isinstance(model.c_attn, torch.ao.nn.quantized.dynamic.Linear)
+        assert isinstance(model.head, torch.ao.nn.quantized.dynamic.Linear)
+
+        with torch.no_grad():
+            actual = model(x)
+        # int8 introduz erro pequeno, mas a saída deve ser praticamente igual
+        cos = nn.functional.cosine_similarity(expected.flatten(), actual.flatten(), dim=0)
+        assert cos > 0.99
+
+    def test_apply_cpu_optimizations(self):
+        pytest.importorskip("transformers")
+
+        class FakeXtts(nn.Module):
+            def __init__(self):
+                super().__init__()
+                self.gpt = _TinyGPT()
+                self.hifigan_decoder = nn.Linear(16, 16)
+
+        model = FakeXtts()
+        applied = apply_cpu_optimizations(model, quantize=True, compile_vocoder=False)
+
+        assert applied == {"quantized": True, "vocoder_compiled": False}
+        assert isinstance(model.gpt.head, torch.ao.nn.quantized.dynamic.Linear)
+        # Vocoder não é quantizado
+        assert isinstance(model.hifigan_decoder, nn.Linear)
+
+    def test_apply_without_gpt_is_noop(self):
+        applied = apply_cpu_optimizations(nn.Module(), quantize=True)
+        assert applied["quantized"] is False
+
+
+class TestEngineConfig:
+    """Config do XttsEngine (app/config.py) → configure_cpu_threads"""
+
+    def test_engine_passes_interop_threads(self, monkeypatch):
+        """XttsEngine honra XTTS_CPU_INTEROP_THREADS como o XTTSService"""
+        from app.engines import xtts_engine
+
+        calls = []
+        monkeypatch.setenv("XTTS_CPU_THREADS", "2")
+        monkeypatch.setenv("XTTS_CPU_INTEROP_THREADS", "3")
+        monkeypatch.setattr(xtts_engine, "configure_cpu_threads", lambda *args: calls.append(args))
+        monkeypatch.setattr(xtts_engine, "apply_cpu_optimizations", lambda *args, **kwargs: None)
+
+        engine = object.__new__(xtts_engine.XttsEngine)
+        engine.device = "cpu"
+        engine.tts = type("FakeTTS", (), {"synthesizer": type("S", (), {"tts_model": nn.Module()})()})()
+        engine._apply_cpu_mode()
+
+        assert calls == [(2, 3)]
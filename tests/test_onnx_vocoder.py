@@ -0,0 +1,91 @@
+"""
+Tests for the ONNX Runtime HiFi-GAN vocoder (engine 'xtts_onnx')
+
+Paridade PyTorch vs ONNX Runtime, cache do export e registro no factory.
+"""
+import pytest
+import torch
+
+pytest.importorskip("onnxruntime")
+hifigan = pytest.importorskip("TTS.tts.layers.xtts.hifigan_decoder")
+
+from app.engines import onnx_vocoder
+from app.engines.onnx_vocoder import (
+    OnnxHifiganVocoder,
+    get_or_export_onnx_vocoder,
+    vocoder_fingerprint,
+)
+from app.engines.factory import _ENGINE_REGISTRY, create_engine
+from app.exceptions import TTSEngineException
+
+LATENT_DIM = 64
+SPEAKER_DIM = 32
+
+
+@pytest.fixture(scope="module")
+def small_decoder():
+    """HifiDecoder reduzido (mesma topologia do XTTS-v2, menos canais)"""
+    torch.manual_seed(0)
+    decoder = hifigan.HifiDecoder(
+        decoder_input_dim=LATENT_DIM,
+        upsample_initial_channel_decoder=32,
+        d_vector_dim=SPEAKER_DIM,
+    )
+    return decoder.eval()
+
+
+@pytest.fixture(scope="module")
+def onnx_path(small_decoder, tmp_path_factory):
+    return get_or_export_onnx_vocoder(small_decoder, tmp_path_factory.mktemp("onnx"))
+
+
+class TestOnnxVocoder:
+    """Paridade e cache"""
+
+    @pytest.mark.parametrize("frames", [16, 57])
+    def test_parity_with_pytorch(self, small_decoder, onnx_path, frames):
+        """Saída ONNX deve ser numericamente igual à do PyTorch (eixo temporal dinâmico)"""
+        vocoder = OnnxHifiganVocoder(onnx_path, small_decoder)
+        latents = torch.randn(1, frames, LATENT_DIM)
+        g = torch.randn(1, SPEAKER_DIM, 1)
+
+        with torch.no_grad():
+            expected = small_decoder(latents, g=g)
+        actual = vocoder(latents, g=g)
+
+        assert actual.shape == expected.shape
+        assert torch.allclose(actual, expected, atol=1e-4)
+
+    def test_keeps_speaker_encoder(self, small_decoder, onnx_path):
+        """Xtts usa hifigan_decoder.speaker_encoder no condicionamento"""
+        vocoder = OnnxHifiganVocoder(onnx_path, small_decoder)
+        assert vocoder.speaker_encoder is small_decoder.speaker_encoder
+        assert vocoder.device == torch.device("cpu")
+
+    def test_cached_export_is_reused(self, small_decoder, onnx_path, monkeypatch):
+        """Segunda chamada não deve exportar novamente"""
+        def fail_export(*args, **kwargs):
+            raise AssertionError("export should not run when cache exists")
+
+        monkeypatch.setattr(onnx_vocoder, "export_hifigan_to_onnx", fail_export)
+        assert get_or_export_onnx_vocoder(small_decoder, onnx_path.parent) == onnx_path
+
+    def test_fingerprint_changes_with_weights(self):
+        kwargs = dict(decoder_input_dim=LATENT_DIM, upsample_initial_channel_decoder=32,
+                      d_vector_dim=SPEAKER_DIM)
+        torch.manual_seed(1)
+        a = hifigan.HifiDecoder(**kwargs)
+        torch.manual_seed(2)
+        b = hifigan.HifiDecoder(**kwargs)
+        assert vocoder_fingerprint(a) != vocoder_fingerprint(b)
+
+
+class TestFactoryRegistry:
+    """Registro da variante no factory"""
+
+    def test_onnx_engine_registered(self):
+        assert 'xtts_onnx' in _ENGINE_REGISTRY
+
+    def test_unknown_engine_raises(self):
+        with pytest.raises(TTSEngineException):
+            create_engine('f5tts', {}, force_recreate=True)
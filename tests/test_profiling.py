@@ -0,0 +1,151 @@
+"""
+Tests for on-demand profiling (app/profiling.py)
+
+Autenticação, amostragem de pilhas, trace do torch.profiler e retenção.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import profiling
+from app.advanced_features import create_jwt_token
+from app.profiling import StackSampler, capture_profile, prune_profiles
+from app.settings import get_settings
+
+ADMIN = {"Authorization": f"Bearer {create_jwt_token('admin')}"}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    settings = get_settings().model_copy(update={
+        "temp_dir": tmp_path,
+        "profiling_admin_users": "admin",
+        "profiling_max_duration_seconds": 5.0,
+        "profiling_retention_count": 2,
+    })
+    monkeypatch.setattr(profiling, "get_settings", lambda: settings)
+    app = FastAPI()
+    app.include_router(profiling.router)
+    return TestClient(app)
+
+
+def _busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestAuth:
+    """JWT/API key do app + PROFILING_ADMIN_USERS"""
+
+    def test_missing_or_invalid_credentials(self, client):
+        assert client.get("/admin/profile").status_code == 401
+        assert client.get("/admin/profile", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    def test_authenticated_non_admin_is_forbidden(self, client):
+        headers = {"Authorization": f"Bearer {create_jwt_token('someone')}"}
+        assert client.get("/admin/profile", headers=headers).status_code == 403
+        assert client.get("/admin/profile", headers=ADMIN).status_code == 200
+
+    def test_disabled_without_configured_admins(self, client, monkeypatch):
+        settings = profiling.get_settings().model_copy(update={"profiling_admin_users": ""})
+        monkeypatch.setattr(profiling, "get_settings", lambda: settings)
+        assert client.get("/admin/profile", headers=ADMIN).status_code == 403
+
+    def test_duration_is_bounded(self, client):
+        response = client.post("/admin/profile?duration=60", headers=ADMIN)
+        assert response.status_code == 400
+
+
+class TestStackSampler:
+    """Amostragem estilo py-spy"""
+
+    def test_samples_named_thread(self, tmp_path):
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_loop, args=(stop,), name="synthesis-worker")
+        worker.start()
+        sampler = StackSampler(interval=0.005, thread_prefix="synthesis")
+        sampler.start()
+        time.sleep(0.2)
+        sampler.stop()
+        stop.set()
+        worker.join()
+
+        folded = sampler.write_folded(tmp_path / "stacks.folded").read_text().splitlines()
+        assert sampler.samples > 0
+        assert folded and all(line.startswith("synthesis-worker;") for line in folded)
+        assert any("_busy_loop" in line for line in folded)
+
+
+class TestCapture:
+    """Capturas, artefatos e retenção"""
+
+    def test_capture_both_writes_artifacts(self, tmp_path):
+        summary = asyncio.run(capture_profile(0.1, "both", tmp_path))
+
+        profile_dir = tmp_path / summary["profile_id"]
+        assert {"stacks.folded", "torch_trace.json", "torch_ops.txt"} <= set(summary["artifacts"])
+        assert json.loads((profile_dir / "summary.json").read_text())["mode"] == "both"
+        assert "CPU" in summary["activities"]
+
+    def test_torch_trace_records_synthesis_ops(self, tmp_path):
+        """Profiler na thread do modelo: ops aten:: da síntese aparecem no trace"""
+        import torch
+        from app.services.xtts_service import XTTSService
+
+        speaker = tmp_path / "speaker.wav"
+        speaker.write_bytes(b"RIFF")
+
+        class _TorchTTS:
+            def tts(self, **kwargs):
+                x = torch.randn(64, 64)
+                for _ in range(5):
+                    x = torch.matmul(x, x).tanh()
+                return x.flatten()[:240].tolist()
+
+        service = XTTSService(device="cpu", text_normalization=False)
+        service.tts = _TorchTTS()
+        service._initialized = True
+
+        async def scenario():
+            capture = asyncio.create_task(capture_profile(
+                0.3, "torch", tmp_path / "profiles", model_thread=service.run_in_model_thread
+            ))
+            await asyncio.sleep(0.05)
+            await service.synthesize(text="teste", speaker_wav=speaker, language="pt")
+            return await capture
+
+        summary = asyncio.run(scenario())
+
+        profile_dir = tmp_path / "profiles" / summary["profile_id"]
+        assert "aten::matmul" in (profile_dir / "torch_ops.txt").read_text()
+        trace = json.loads((profile_dir / "torch_trace.json").read_text())
+        assert any(event.get("name") == "aten::matmul" for event in trace["traceEvents"])
+
+    def test_endpoint_capture_list_and_download(self, client):
+        headers = ADMIN
+        summary = client.post("/admin/profile?duration=0.1&mode=stack", headers=headers).json()
+
+        listed = client.get("/admin/profile", headers=headers).json()["profiles"]
+        assert [p["profile_id"] for p in listed] == [summary["profile_id"]]
+
+        response = client.get(f"/admin/profile/{summary['profile_id']}/summary.json", headers=headers)
+        assert response.status_code == 200
+        assert client.get("/admin/profile/..%2F..%2Fetc/passwd", headers=headers).status_code == 404
+
+    def test_prune_by_count_and_age(self, tmp_path):
+        for i, age_hours in enumerate([0, 1, 2, 100]):
+            path = tmp_path / f"profile_{i}"
+            path.mkdir()
+            mtime = time.time() - age_hours * 3600
+            os.utime(path, (mtime, mtime))
+
+        removed = prune_profiles(tmp_path, keep=3, max_age_hours=72)
+
+        assert removed == ["profile_3"]
+        assert prune_profiles(tmp_path, keep=2, max_age_hours=72) == ["profile_2"]
@@ -0,0 +1,89 @@
+"""
+Tests for PrometheusMiddleware (app/metrics.py)
+
+Labels por template de rota: a cardinalidade não cresce com o número de jobs.
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.metrics import PrometheusMiddleware, UNMATCHED_ROUTE
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _endpoint_labels(metric_name):
+    return {
+        sample.labels["endpoint"]
+        for metric in REGISTRY.collect() if metric.name == metric_name
+        for sample in metric.samples
+    }
+
+
+def _make_app():
+    app = FastAPI()
+    app.add_middleware(PrometheusMiddleware)
+
+    @app.get("/mw-test/jobs/{job_id}/download")
+    async def download(job_id: str):
+        return {"job_id": job_id, "payload": "x" * 100}
+
+    @app.post("/mw-test/echo")
+    async def echo(body: dict):
+        return body
+
+    return app
+
+
+class TestRouteTemplateLabels:
+    """Cardinalidade limitada"""
+
+    def test_path_params_share_one_series(self):
+        client = TestClient(_make_app())
+        template = "/mw-test/jobs/{job_id}/download"
+        before = _sample("http_requests_total", method="GET", endpoint=template, status="200")
+
+        for i in range(5):
+            assert client.get(f"/mw-test/jobs/job_{i}/download").status_code == 200
+
+        assert _sample("http_requests_total", method="GET", endpoint=template, status="200") == before + 5
+        assert not any(label.startswith("/mw-test/jobs/job_") for label in _endpoint_labels("http_requests"))
+
+    def test_unknown_paths_are_grouped(self):
+        client = TestClient(_make_app())
+        before = _sample("http_requests_total", method="GET", endpoint=UNMATCHED_ROUTE, status="404")
+
+        client.get("/mw-test/nope/1")
+        client.get("/mw-test/nope/2")
+
+        assert _sample("http_requests_total", method="GET", endpoint=UNMATCHED_ROUTE, status="404") == before + 2
+
+    def test_method_not_allowed_uses_route_template(self):
+        client = TestClient(_make_app())
+        response = client.get("/mw-test/echo")
+
+        assert response.status_code == 405
+        assert _sample("http_requests_total", method="GET", endpoint="/mw-test/echo", status="405") >= 1
+
+
+class TestSizesAndInFlight:
+    """Tamanhos de request/response e gauge de requisições em andamento"""
+
+    def test_request_and_response_sizes(self):
+        client = TestClient(_make_app())
+        labels = {"method": "POST", "endpoint": "/mw-test/echo"}
+        request_before = _sample("http_request_size_bytes_sum", **labels)
+        response_before = _sample("http_response_size_bytes_sum", **labels)
+
+        response = client.post("/mw-test/echo", json={"text": "olá mundo"})
+
+        assert _sample("http_request_size_bytes_sum", **labels) - request_before == len(response.request.content)
+        assert _sample("http_response_size_bytes_sum", **labels) - response_before == len(response.content)
+
+    def test_in_flight_returns_to_zero(self):
+        client = TestClient(_make_app())
+        client.get("/mw-test/jobs/abc/download")
+
+        assert _sample("http_requests_in_flight", method="GET", endpoint="/mw-test/jobs/{job_id}/download") == 0
@@ -0,0 +1,116 @@
+"""
+Tests for shared mmap weights (app/shared_weights.py) e CPUInferencePool helpers
+"""
+import multiprocessing as mp
+from pathlib import Path
+
+import pytest
+import torch
+import torch.nn as nn
+
+pytest.importorskip("safetensors")
+
+from app.shared_weights import save_shared_state_dict, load_shared_state_dict
+from app.services.cpu_pool import split_threads, shared_weights_path
+
+
+class _TiedModel(nn.Module):
+    """Modelo com pesos compartilhados (como gpt.wte = mel_embedding no XTTS)"""
+
+    def __init__(self):
+        super().__init__()
+        self.embedding = nn.Embedding(10, 8)
+        self.proj = nn.Linear(8, 8)
+        self.head = nn.Linear(8, 10, bias=False)
+        self.head.weight = self.embedding.weight
+        self.register_buffer("steps", torch.arange(4, dtype=torch.int64))
+
+
+def _is_file_backed(address: int, path) -> bool:
+    """Verifica em /proc/self/maps se o endereço pertence ao mmap do arquivo"""
+    maps = Path("/proc/self/maps")
+    if not maps.exists():
+        pytest.skip("/proc/self/maps not available")
+    for line in maps.read_text().splitlines():
+        if line.endswith(str(path)):
+            start, end = (int(x, 16) for x in line.split()[0].split("-"))
+            if start <= address < end:
+                return True
+    return False
+
+
+def _child_sum(path, queue):
+    state = load_shared_state_dict(path)
+    queue.put(float(state["proj.weight"].sum()))
+
+
+class TestSharedWeights:
+    """Roundtrip, aliases e zero-copy"""
+
+    @pytest.fixture
+    def saved(self, tmp_path):
+        torch.manual_seed(0)
+        model = _TiedModel()
+        path = save_shared_state_dict(model.state_dict(), tmp_path / "model.safetensors")
+        return model, path
+
+    def test_roundtrip(self, saved):
+        model, path = saved
+        state = load_shared_state_dict(path)
+
+        assert set(state) == set(model.state_dict())
+        for name, tensor in model.state_dict().items():
+            assert torch.equal(state[name], tensor)
+            assert state[name].dtype == tensor.dtype
+
+    def test_aliases_share_tensor(self, saved):
+        _, path = saved
+        state = load_shared_state_dict(path)
+        assert state["head.weight"] is state["embedding.weight"]
+
+    def test_assign_load_is_zero_copy(self, saved):
+        """load_state_dict(assign=True) aponta parâmetros para o mmap"""
+        _, path = saved
+        state = load_shared_state_dict(path)
+
+        target = _TiedModel()
+        target.load_state_dict(state, assign=True)
+
+        assert target.proj.weight.data_ptr() == state["proj.weight"].data_ptr()
+        # Parâmetros apontam para o mapeamento do arquivo, não para memória anônima
+        assert _is_file_backed(target.proj.weight.data_ptr(), path)
+
+    def test_copy_on_write_does_not_touch_file(self, saved):
+        _, path = saved
+        original = load_shared_state_dict(path)["proj.weight"].clone()
+
+        state = load_shared_state_dict(path)
+        state["proj.weight"].add_(1.0)
+
+        assert torch.equal(load_shared_state_dict(path)["proj.weight"], original)
+
+    def test_load_in_spawned_process(self, saved):
+        """Workers do pool usam spawn: o arquivo deve ser carregável no filho"""
+        model, path = saved
+        ctx = mp.get_context("spawn")
+        queue = ctx.Queue()
+        child = ctx.Process(target=_child_sum, args=(path, queue))
+        child.start()
+        result = queue.get(timeout=120)
+        child.join(timeout=30)
+
+        assert result == pytest.approx(float(model.proj.weight.sum()), rel=1e-6)
+
+
+class TestCPUPoolHelpers:
+    """Helpers do CPUInferencePool"""
+
+    def test_split_threads(self):
+        assert split_threads(4, 16) == 4
+        assert split_threads(3, 8) == 2
+        assert split_threads(8, 4) == 1  # nunca zero
+
+    def test_shared_weights_path(self, tmp_path):
+        path = shared_weights_path(tmp_path, "tts_models/multilingual/multi-dataset/xtts_v2")
+        assert path.parent == tmp_path
+        assert path.name == "tts_models--multilingual--multi-dataset--xtts_v2.safetensors"
@@ -0,0 +1,169 @@
+"""
+Tests for startup pipeline (app/startup.py)
+
+Fases cronometradas, verificação de checksums e carga em background.
+"""
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app import startup
+from app.startup import StartupTracker, verify_model_files, load_model_in_background, CHECKSUM_MANIFEST
+
+
+class _FakeService:
+    """XTTSService mínimo: registra chamadas das fases"""
+
+    def __init__(self, model_dir=None, fail_load=False):
+        self.model_dir = model_dir
+        self.fail_load = fail_load
+        self.initialized = False
+        self.shutdown_called = False
+
+    def ensure_model_files(self):
+        return self.model_dir
+
+    def initialize(self):
+        if self.fail_load:
+            raise RuntimeError("load failed")
+        self.initialized = True
+
+    def shutdown(self):
+        self.shutdown_called = True
+        self.initialized = False
+
+
+@pytest.fixture(autouse=True)
+def skip_runtime_import(monkeypatch):
+    """torch/TTS reais não são necessários para testar o fluxo"""
+    monkeypatch.setattr(startup, "_import_runtime", lambda: None)
+
+
+class TestStartupTracker:
+    """Estados e fases"""
+
+    def test_phase_records_duration(self):
+        tracker = StartupTracker()
+        with tracker.phase("model_load"):
+            pass
+        assert tracker.phases["model_load"]["status"] == "done"
+        assert tracker.phases["model_load"]["seconds"] >= 0
+
+    def test_phase_records_failure(self):
+        tracker = StartupTracker()
+        with pytest.raises(ValueError):
+            with tracker.phase("model_verify"):
+                raise ValueError("bad checksum")
+        assert tracker.phases["model_verify"]["status"] == "failed"
+        assert "bad checksum" in tracker.phases["model_verify"]["error"]
+
+    def test_summary_states(self):
+        tracker = StartupTracker()
+        assert not tracker.is_ready
+        tracker.mark_ready()
+        summary = tracker.summary()
+        assert summary["state"] == StartupTracker.READY
+        assert "time_to_ready_seconds" in summary
+
+
+class TestVerifyModelFiles:
+    """Manifest de checksums (trust on first use)"""
+
+    def test_first_run_writes_manifest(self, tmp_path):
+        (tmp_path / "model.pth").write_bytes(b"weights")
+        (tmp_path / "config.json").write_text("{}")
+
+        result = verify_model_files(tmp_path)
+
+        manifest = json.loads((tmp_path / CHECKSUM_MANIFEST).read_text())
+        assert set(manifest) == {"model.pth", "config.json"}
+        assert result == {"checked": 2, "hashed": 2}
+
+    def test_unchanged_files_are_not_rehashed(self, tmp_path):
+        (tmp_path / "model.pth").write_bytes(b"weights")
+        verify_model_files(tmp_path)
+        assert verify_model_files(tmp_path)["hashed"] == 0
+
+    def test_corrupted_file_raises(self, tmp_path):
+        model = tmp_path / "model.pth"
+        model.write_bytes(b"weights")
+        verify_model_files(tmp_path)
+
+        model.write_bytes(b"corrupt")
+        with pytest.raises(ValueError, match="model.pth"):
+            verify_model_files(tmp_path)
+
+
+class TestBackgroundLoad:
+    """load_model_in_background()"""
+
+    def test_success_marks_ready(self, tmp_path):
+        (tmp_path / "model.pth").write_bytes(b"weights")
+        service = _FakeService(model_dir=tmp_path)
+        tracker = StartupTracker()
+        warmed = []
+
+        async def warmup():
+            warmed.append(True)
+
+        asyncio.run(load_model_in_background(service, tracker, warmup=warmup))
+
+        assert tracker.is_ready
+        assert service.initialized and warmed
+        assert set(tracker.phases) == {
+            "import_runtime", "model_download", "model_load", "model_verify", "warmup"
+        }
+
+    def test_load_failure_marks_failed(self):
+        service = _FakeService(fail_load=True)
+        tracker = StartupTracker()
+
+        asyncio.run(load_model_in_background(service, tracker))
+
+        assert tracker.state == StartupTracker.FAILED
+        assert "load failed" in tracker.error
+        assert service.shutdown_called
+
+    def test_checksum_failure_discards_model(self, tmp_path):
+        model = tmp_path / "model.pth"
+        model.write_bytes(b"weights")
+        verify_model_files(tmp_path)
+        model.write_bytes(b"corrupt")
+
+        service = _FakeService(model_dir=tmp_path)
+        tracker = StartupTracker()
+        asyncio.run(load_model_in_background(service, tracker))
+
+        assert tracker.state == StartupTracker.FAILED
+        assert service.shutdown_called and not service.initialized
+
+
+def test_service_import_does_not_load_tts():
+    """Importar o XTTSService não deve carregar Coqui TTS (startup rápido)"""
+    code = (
+        "import sys; import app.services.xtts_service; "
+        "print('TTS' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "False"
+
+
+def test_app_import_does_not_load_torch():
+    """Importar app.main (get_settings no import) não deve importar torch"""
+    code = "import sys; import app.main; print('torch' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "False"
@@ -0,0 +1,71 @@
+"""
+Tests for TelemetrySampler (app/telemetry.py)
+
+Janela circular, filas de executor e lag do event loop.
+"""
+import asyncio
+import time
+
+from prometheus_client import REGISTRY
+
+from app.telemetry import TelemetrySampler
+
+
+class TestSampling:
+    """sample() e janela circular"""
+
+    def test_sample_records_process_and_queues(self):
+        sampler = TelemetrySampler(interval=1, window_seconds=10)
+        sampler.watch_queue("cpu_pool", lambda: 3)
+
+        sample = sampler.sample(loop_lag=0.25)
+
+        assert sample["queues"] == {"cpu_pool": 3}
+        assert sample["process"]["rss_bytes"] > 0
+        assert sampler.latest() is sample
+        assert REGISTRY.get_sample_value("executor_queue_depth", {"executor": "cpu_pool"}) == 3
+        assert REGISTRY.get_sample_value("event_loop_lag_seconds") == 0.25
+
+    def test_window_is_bounded(self):
+        sampler = TelemetrySampler(interval=1, window_seconds=3)
+        for _ in range(10):
+            sampler.sample()
+        assert len(sampler.window()) == 3
+
+    def test_failing_queue_reports_zero(self):
+        sampler = TelemetrySampler()
+        sampler.watch_queue("broken", lambda: 1 / 0)
+        assert sampler.sample()["queues"] == {"broken": 0}
+
+    def test_summary(self):
+        sampler = TelemetrySampler()
+        assert sampler.summary() == {"samples": 0}
+
+        sampler.watch_queue("q", iter([1, 5, 2]).__next__)
+        for lag in (0.0, 0.3, 0.1):
+            sampler.sample(loop_lag=lag)
+
+        summary = sampler.summary()
+        assert summary["samples"] == 3
+        assert summary["loop_lag_seconds"]["max"] == 0.3
+        assert summary["max_queue_depth"] == {"q": 5}
+
+
+class TestBackgroundTask:
+    """start()/stop() e medição de lag"""
+
+    def test_blocked_loop_shows_lag(self):
+        sampler = TelemetrySampler(interval=0.05, window_seconds=10)
+
+        async def scenario():
+            sampler.start()
+            await asyncio.sleep(0.02)
+            time.sleep(0.2)  # bloqueia o loop (ex: síntese in-process)
+            await asyncio.sleep(0.1)
+            await sampler.stop()
+
+        asyncio.run(scenario())
+
+        assert not sampler.is_running
+        assert "default" in sampler.latest()["queues"]
+        assert max(s["loop_lag_seconds"] for s in sampler.window()) >= 0.1
@@ -0,0 +1,148 @@
+"""
+Testes da normalização de texto PT-BR (app/text_normalizer.py)
+
+Paridade com o preprocess_text original (benchmarks/text_normalization.py),
+replacements combinados vs sequenciais e uso no caminho de síntese.
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("num2words")
+
+from app.text_normalizer import TextNormalizer, get_normalizer, normalize_for_synthesis, number_to_words
+from benchmarks.text_normalization import generate_sentences, reference_preprocess_text
+
+
+class TestParity:
+    """Mesma saída do preprocess_text original"""
+
+    @pytest.mark.parametrize("text_config", [
+        {},
+        {"replacements": {"…": "...", "“": '"', "”": '"', "—": ","}},
+        {"lowercase": False, "cleanup_segment_edges": False},
+        {"remove_special_chars": True, "allowed_chars": "abcdefghijklmnopqrstuvwxyzáéíóúâêôãõç ,.?!"},
+    ])
+    def test_random_sentences(self, text_config):
+        normalizer = TextNormalizer.from_config(text_config)
+        for sentence in generate_sentences(2000, seed=7):
+            assert normalizer.normalize(sentence) == reference_preprocess_text(sentence, text_config), sentence
+
+    @pytest.mark.parametrize("text", [
+        "O PIB cresceu 3% em 2025",
+        "b80 pessoas e 80mil reais",
+        "x=10/2 e a+b",
+        "   kkk   tudo bem   rrr ",
+        "",
+        "123abc456",
+    ])
+    def test_examples(self, text):
+        assert TextNormalizer().normalize(text) == reference_preprocess_text(text, {})
+
+    def test_numbers_and_percent(self):
+        assert TextNormalizer().normalize("Cresceu 3% em 2025") == "cresceu três porcento em dois mil e vinte e cinco"
+
+
+class TestReplacements:
+    """Replacements combinados numa regex só quando a ordem não importa"""
+
+    def test_independent_replacements_are_merged(self):
+        normalizer = TextNormalizer(replacements={"…": "...", "--": ","})
+        assert normalizer._sequential == []
+        assert normalizer._merged_re is not None
+
+    @pytest.mark.parametrize("replacements,text", [
+        ({"a": "x", "xb": "y"}, "ab xb"),        # valor cria ocorrência de outra chave
+        ({"c": "", "ab": "z"}, "acb"),            # remoção junta vizinhos
+        ({"ab": "1", "bc": "2"}, "abc"),          # chaves sobrepostas
+        ({"ab": "1", "abc": "2"}, "abcd"),        # chave contida em outra
+    ])
+    def test_interacting_replacements_stay_sequential(self, replacements, text):
+        config = {"replacements": replacements, "cleanup_segment_edges": False}
+        normalizer = TextNormalizer.from_config(config)
+        assert normalizer._sequential
+        assert normalizer.normalize(text) == reference_preprocess_text(text, config)
+
+    def test_normalize_punctuation_disabled(self):
+        normalizer = TextNormalizer.from_config({"replacements": {"…": "..."}, "normalize_punctuation": False})
+        assert normalizer.normalize("ok…") == "ok…"
+
+
+class TestCaches:
+    """Compilação única por config e num2words em cache"""
+
+    def test_get_normalizer_reuses_instance(self):
+        assert get_normalizer({"lowercase": True}) is get_normalizer({"lowercase": True})
+        assert get_normalizer({"lowercase": True}) is not get_normalizer({"lowercase": False})
+
+    def test_number_to_words_cached(self):
+        number_to_words("42")
+        hits = number_to_words.cache_info().hits
+        assert number_to_words("42") == "quarenta e dois"
+        assert number_to_words.cache_info().hits == hits + 1
+
+
+class TestSynthesisPath:
+    """Texto de requisição normalizado antes do XTTS"""
+
+    def test_only_portuguese_is_normalized(self):
+        assert normalize_for_synthesis("Custa 10% a mais", "pt") == "custa dez porcento a mais"
+        assert normalize_for_synthesis("Costs 10% more", "en") == "Costs 10% more"
+
+    def test_edges_are_kept_for_user_text(self):
+        # Sem limpeza de bordas: "x" no fim não é corte de segmento
+        assert normalize_for_synthesis("Eixo x", "pt") == "eixo x"
+
+    @pytest.mark.parametrize("text, expected", [
+        ("Na segunda-feira, disse-me", "na segunda-feira, disse-me"),
+        ("Mande um e-mail", "mande um e-mail"),
+        ("Meio a meio: 1/2", "meio a meio: um/dois"),
+        ("Saldo de -3 e x=-2", "saldo de menos três e x igual menos dois"),
+    ])
+    def test_hyphens_and_slashes_inside_words_are_kept(self, text, expected):
+        assert normalize_for_synthesis(text, "pt") == expected
+
+    @pytest.mark.parametrize("text, expected", [
+        ("Cúpula do G20", "cúpula do g vinte"),
+        ("Vitamina B12", "vitamina b doze"),
+        ("Fórmula H2O", "fórmula h dois o"),
+        ("Alta de 3,5%", "alta de três vírgula cinco porcento"),
+        ("Subiu 3,05", "subiu três vírgula zero cinco"),
+        ("Às 14:30", "às catorze e trinta"),
+        ("Às 21:00", "às vinte e uma horas"),
+        ("Ligue 98765-4321", "ligue nove oito sete seis cinco quatro três dois um"),
+        ("Páginas 10-20", "páginas dez vinte"),
+        ("Cerca de 1.500.000", "cerca de um milhão e quinhentos mil"),
+    ])
+    def test_user_text_numbers(self, text, expected):
+        assert normalize_for_synthesis(text, "pt") == expected
+
+    def test_training_drops_glued_consonants(self):
+        # Treino: consoante colada em número é ruído de transcrição ("b80")
+        assert TextNormalizer().normalize("b80") == "oitenta"
+
+    @pytest.mark.parametrize("text, expected", [
+        ("Custa R$ 10,50", "custa dez reais e cinquenta centavos"),
+        ("Custa R$1,00", "custa um real"),
+        ("US$ 1.500 e R$ 2,01", "mil e quinhentos dólares e dois reais e um centavo"),
+    ])
+    def test_currency(self, text, expected):
+        assert normalize_for_synthesis(text, "pt") == expected
+
+    def test_training_keeps_symbol_table(self):
+        # Dataset de treino: mesma saída de antes (paridade com preprocess_text)
+        assert TextNormalizer().normalize("segunda-feira") == "segunda menos feira"
+
+    def test_service_sends_normalized_text(self, tmp_path):
+        from benchmarks.stub_model import make_stub_service, write_reference_wav
+
+        speaker = write_reference_wav(tmp_path / "ref.wav", seconds=1.0)
+        service = make_stub_service()
+        seen = []
+        original_tts = service.tts.tts
+        service.tts.tts = lambda text, **kwargs: seen.append(text) or original_tts(text, **kwargs)
+
+        asyncio.run(service.synthesize("Chegou em 2025", speaker, language="pt-BR"))
+        service.text_normalization = False
+        asyncio.run(service.synthesize("Chegou em 2025", speaker, language="pt-BR"))
+        assert seen == ["chegou em dois mil e vinte e cinco", "Chegou em 2025"]
@@ -0,0 +1,206 @@
+"""
+Tests for per-stage synthesis tracing (app/tracing.py)
+"""
+import socket
+import urllib.request
+
+import pytest
+import torch
+import torch.nn as nn
+from prometheus_client import REGISTRY, CollectorRegistry, Histogram, start_http_server
+
+from app.metrics import (
+    SYNTHESIS_LABELS, capacity_summary, fetch_metric_families, start_worker_metrics_server, summarize_histogram
+)
+from app.tracing import (
+    stage, observe_stage, instrument_xtts_model, inject_context, synthesis_labels, observe_rtf
+)
+
+
+def _count(stage_name: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "synthesis_stage_duration_seconds_count", {"stage": stage_name}
+    )
+    return value or 0.0
+
+
+class _Tokenizer:
+    def encode(self, text, lang):
+        return [len(text)]
+
+
+class _Gpt:
+    def generate(self, *args, **kwargs):
+        return torch.zeros(1, 4)
+
+
+class _FakeXtts:
+    """Mesma superfície usada por Xtts.inference()"""
+
+    def __init__(self):
+        self.tokenizer = _Tokenizer()
+        self.gpt = _Gpt()
+        self.hifigan_decoder = nn.Identity()
+
+    def get_conditioning_latents(self, audio_path):
+        return torch.zeros(1), torch.zeros(1)
+
+    def inference(self, text):
+        self.tokenizer.encode(text, "pt")
+        self.get_conditioning_latents(["a.wav"])
+        latents = self.gpt.generate()
+        return self.hifigan_decoder(latents)
+
+
+class TestStage:
+    """Context manager de estágio"""
+
+    def test_observes_histogram(self):
+        before = _count("encode")
+        with stage("encode"):
+            pass
+        assert _count("encode") == before + 1
+
+    def test_observes_on_failure(self):
+        before = _count("disk_write")
+        with pytest.raises(OSError):
+            with stage("disk_write"):
+                raise OSError("disk full")
+        assert _count("disk_write") == before + 1
+
+    def test_observe_stage_ignores_negative(self):
+        before = _count("pickup")
+        observe_stage("pickup", -1.0)  # relógios dessincronizados
+        observe_stage("pickup", 0.5)
+        assert _count("pickup") == before + 1
+
+    def test_inject_context_without_otel(self):
+        assert inject_context() == {}
+
+
+class TestInstrumentModel:
+    """instrument_xtts_model()"""
+
+    def test_all_internal_stages_recorded(self):
+        model = _FakeXtts()
+        assert instrument_xtts_model(model) == 4
+
+        stages = ("normalization", "conditioning", "gpt_decode", "vocoder")
+        before = {name: _count(name) for name in stages}
+        model.inference("olá")
+
+        for name in stages:
+            assert _count(name) == before[name] + 1
+
+    def test_idempotent(self):
+        model = _FakeXtts()
+        instrument_xtts_model(model)
+        assert instrument_xtts_model(model) == 0
+
+        before = _count("gpt_decode")
+        model.gpt.generate()
+        assert _count("gpt_decode") == before + 1
+
+    def test_reinstrument_after_vocoder_swap(self):
+        model = _FakeXtts()
+        instrument_xtts_model(model)
+        model.hifigan_decoder = nn.Identity()  # ex: vocoder ONNX
+        assert instrument_xtts_model(model) == 1
+
+    def test_other_instances_untouched(self):
+        instrument_xtts_model(_FakeXtts())
+        assert not hasattr(_FakeXtts().get_conditioning_latents, "_synthesis_stage")
+
+
+class TestCapacityMetrics:
+    """RTF, tokens/s e samples/s com labels da requisição"""
+
+    LABELS = {"language": "pt", "quality_profile": "fast", "device": "cpu"}
+
+    def _count(self, name):
+        return REGISTRY.get_sample_value(f"{name}_count", self.LABELS) or 0.0
+
+    def test_rates_use_request_labels(self):
+        model = _FakeXtts()
+        model.hifigan_decoder = _Decoder()
+        instrument_xtts_model(model)
+
+        before_tokens = self._count("gpt_tokens_per_second")
+        before_samples = self._count("vocoder_samples_per_second")
+        with synthesis_labels(**self.LABELS):
+            model.inference("olá")
+
+        assert self._count("gpt_tokens_per_second") == before_tokens + 1
+        assert self._count("vocoder_samples_per_second") == before_samples + 1
+
+    def test_observe_rtf(self):
+        before = self._count("synthesis_rtf")
+        with synthesis_labels(**self.LABELS):
+            observe_rtf(1.0, 4.0)
+            observe_rtf(1.0, 0.0)  # sem áudio: ignorado
+        assert self._count("synthesis_rtf") == before + 1
+
+    def test_capacity_summary(self):
+        with synthesis_labels(**self.LABELS):
+            observe_rtf(0.5, 1.0)
+        summary = capacity_summary()["rtf"]["pt/fast/cpu"]
+        assert summary["count"] >= 1
+        assert 0 < summary["p50"] <= 10
+
+    def test_capacity_summary_includes_worker(self):
+        """Sínteses do worker Celery (via exporter HTTP) somadas às da API"""
+        worker_registry = CollectorRegistry()
+        worker_rtf = Histogram(
+            "synthesis_rtf", "worker", SYNTHESIS_LABELS,
+            buckets=[0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10], registry=worker_registry
+        )
+        for _ in range(3):
+            worker_rtf.labels(language="pt", quality_profile="balanced", device="cuda").observe(0.2)
+        port = _free_port()
+        start_http_server(port, registry=worker_registry)
+
+        families = fetch_metric_families(f"http://127.0.0.1:{port}/metrics")
+        local = capacity_summary()["rtf"].get("pt/balanced/cuda", {"count": 0})
+        merged = capacity_summary(families)["rtf"]["pt/balanced/cuda"]
+
+        assert merged["count"] == local["count"] + 3
+        assert merged["p50"] == 0.2
+
+    def test_worker_unavailable_keeps_local_summary(self):
+        families = fetch_metric_families(f"http://127.0.0.1:{_free_port()}/metrics", timeout=0.5)
+        assert families == []
+        assert capacity_summary(families) == capacity_summary()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_worker_metrics_server_exports_stages():
+    """Worker Celery: estágios do registry padrão expostos via HTTP"""
+    port = _free_port()
+    start_worker_metrics_server(port)
+    observe_stage("pickup", 0.2)
+
+    body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode()
+    assert 'synthesis_stage_duration_seconds_count{stage="pickup"}' in body
+
+
+class _Decoder(nn.Module):
+    def forward(self, latents):
+        return torch.zeros(1, 1, 24000)
+
+
+def test_summarize_histogram_quantiles():
+    registry = CollectorRegistry()
+    histogram = Histogram("test_rate", "test", ["language"], buckets=[1, 2, 5], registry=registry)
+    for value in (0.5, 0.5, 1.5, 4.0):
+        histogram.labels(language="pt").observe(value)
+
+    summary = summarize_histogram(histogram)["pt"]
+    assert summary["count"] == 4
+    assert summary["mean"] == pytest.approx(1.625)
+    assert summary["p50"] == 1
+    assert summary["p95"] == 5
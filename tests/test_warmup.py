@@ -0,0 +1,122 @@
+"""
+Tests for warm-up suite (app/warmup.py)
+"""
+import asyncio
+import os
+
+import numpy as np
+
+from app.warmup import (
+    WARMUP_SENTENCES,
+    FirstRequestsRecorder,
+    build_warmup_cases,
+    build_warmup_text,
+    configure_compile_cache,
+    parse_csv,
+    run_warmup_suite,
+)
+
+
+class _FakeService:
+    """XTTSService mínimo: registra sínteses"""
+
+    def __init__(self, fail_language=None):
+        self.calls = []
+        self.fail_language = fail_language
+        self.first_requests = FirstRequestsRecorder(limit=5)
+
+    def get_supported_languages(self):
+        return ["pt", "en", "ja"]
+
+    async def synthesize(self, text, speaker_wav, language, quality_profile):
+        if language == self.fail_language:
+            raise RuntimeError("boom")
+        self.calls.append((language, len(text)))
+        self.first_requests.record(0.1)
+        return np.zeros(10, dtype=np.float32), 24000
+
+
+class TestWarmupCases:
+    """Geração da suíte"""
+
+    def test_parse_csv(self):
+        assert parse_csv("pt, en,,es ") == ["pt", "en", "es"]
+        assert parse_csv("") == []
+
+    def test_text_length_is_approximate(self):
+        text = build_warmup_text("pt", 300)
+        assert abs(len(text) - 300) < len(WARMUP_SENTENCES["pt"])
+
+    def test_unknown_language_falls_back_to_english(self):
+        assert build_warmup_text("xx", 10) == WARMUP_SENTENCES["en"]
+
+    def test_cases_cover_each_language_and_length(self):
+        cases = build_warmup_cases(["pt", "en"], [300, 20, 20])
+        assert len(cases) == 4
+        # Curtos primeiro
+        assert len(cases[0][1]) < len(cases[-1][1])
+        assert {lang for lang, _ in cases} == {"pt", "en"}
+
+
+class TestFirstRequestsRecorder:
+    """p50/p99 das primeiras N requisições"""
+
+    def test_records_up_to_limit(self):
+        recorder = FirstRequestsRecorder(limit=3)
+        for seconds in (1.0, 2.0, 3.0, 100.0):
+            recorder.record(seconds)
+        summary = recorder.summary()
+        assert summary["requests"] == 3
+        assert summary["p50_seconds"] == 2.0
+        assert summary["p99_seconds"] < 3.0 + 1e-6
+
+    def test_empty_summary(self):
+        assert FirstRequestsRecorder().summary() == {"requests": 0, "limit": 20}
+
+
+class TestWarmupSuite:
+    """run_warmup_suite()"""
+
+    def test_runs_all_supported_cases_and_resets_recorder(self, tmp_path):
+        speaker = tmp_path / "speaker.wav"
+        speaker.write_bytes(b"RIFF")
+        service = _FakeService()
+
+        result = asyncio.run(run_warmup_suite(
+            service, speaker, languages=["pt", "en", "xx"], text_lengths=[20, 120]
+        ))
+
+        assert result["failures"] == 0
+        assert len(service.calls) == 4  # 'xx' não suportado
+        assert service.first_requests.summary()["requests"] == 0
+
+    def test_failures_do_not_stop_suite(self, tmp_path):
+        speaker = tmp_path / "speaker.wav"
+        speaker.write_bytes(b"RIFF")
+        service = _FakeService(fail_language="ja")
+
+        result = asyncio.run(run_warmup_suite(
+            service, speaker, languages=["ja", "pt"], text_lengths=[20]
+        ))
+
+        assert result["failures"] == 1
+        assert service.calls == [("pt", len(build_warmup_text("pt", 20)))]
+
+    def test_missing_speaker_skips(self, tmp_path):
+        result = asyncio.run(run_warmup_suite(
+            _FakeService(), tmp_path / "missing.wav", languages=["pt"], text_lengths=[20]
+        ))
+        assert result["skipped"] is True
+
+
+def test_configure_compile_cache_respects_existing_env(tmp_path, monkeypatch):
+    for key in ("TORCHINDUCTOR_CACHE_DIR", "TORCHINDUCTOR_FX_GRAPH_CACHE",
+                "TORCHINDUCTOR_AUTOGRAD_CACHE", "TRITON_CACHE_DIR"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("TRITON_CACHE_DIR", "/custom/triton")
+
+    env = configure_compile_cache(tmp_path / "cache")
+
+    assert env["TORCHINDUCTOR_CACHE_DIR"] == str(tmp_path / "cache" / "inductor")
+    assert env["TRITON_CACHE_DIR"] == "/custom/triton"
+    assert os.environ["TORCHINDUCTOR_FX_GRAPH_CACHE"] == "1"
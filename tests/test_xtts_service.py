@@ -84,6 +84,103 @@ class TestXTTSService:
         
         assert "not initialized" in str(exc_info.value).lower()
     
+    def test_synthesize_does_not_block_event_loop(self, tmp_path):
+        """Síntese roda no executor: o loop segue respondendo e os labels chegam ao thread"""
+        import asyncio
+        import threading
+        import time
+        from app import tracing
+        
+        speaker = tmp_path / "speaker.wav"
+        speaker.write_bytes(b"RIFF")
+        seen = {}
+        
+        class _FakeTTS:
+            def tts(self, **kwargs):
+                seen["thread"] = threading.current_thread()
+                seen["labels"] = tracing._synthesis_labels.get()
+                time.sleep(0.3)
+                return [0.0] * 2400
+        
+        service = XTTSService(device="cpu", text_normalization=False)
+        service.tts = _FakeTTS()
+        service._initialized = True
+        
+        async def scenario():
+            ticks = 0
+            task = asyncio.create_task(service.synthesize(
+                text="teste", speaker_wav=speaker, language="pt"
+            ))
+            while not task.done():
+                ticks += 1
+                await asyncio.sleep(0.01)
+            return ticks, await task
+        
+        ticks, (audio, sample_rate) = asyncio.run(scenario())
+        
+        assert ticks > 5
+        assert seen["thread"] is not threading.main_thread()
+        assert seen["labels"]["language"] == "pt"
+        assert len(audio) == 2400 and sample_rate == 24000
+    
+    def test_concurrent_synthesis_is_serialized(self, tmp_path):
+        """Duas sínteses concorrentes não rodam juntas dentro do modelo"""
+        import asyncio
+        import threading
+        import time
+        
+        speaker = tmp_path / "speaker.wav"
+        speaker.write_bytes(b"RIFF")
+        state = {"active": 0, "max_active": 0}
+        lock = threading.Lock()
+        
+        class _FakeTTS:
+            def tts(self, **kwargs):
+                with lock:
+                    state["active"] += 1
+                    state["max_active"] = max(state["max_active"], state["active"])
+                time.sleep(0.1)
+                with lock:
+                    state["active"] -= 1
+                return [0.0] * 240
+        
+        service = XTTSService(device="cpu", text_normalization=False)
+        service.tts = _FakeTTS()
+        service._initialized = True
+        
+        async def scenario():
+            return await asyncio.gather(*[
+                service.synthesize(text=f"teste {i}", speaker_wav=speaker, language="pt")
+                for i in range(3)
+            ])
+        
+        results = asyncio.run(scenario())
+        
+        assert len(results) == 3
+        assert state["max_active"] == 1
+    
+    def test_from_settings_applies_xtts_settings(self):
+        """API e worker Celery montam o service com as mesmas XTTS_* settings"""
+        from app.settings import get_settings
+        
+        settings = get_settings().model_copy(update={
+            "xtts_device": "cpu",
+            "xtts_cpu_quantize": False,
+            "xtts_cpu_threads": 3,
+            "xtts_cpu_interop_threads": 2,
+            "xtts_cpu_compile_vocoder": True,
+            "xtts_cpu_workers": 4,
+            "xtts_text_normalization": False,
+        })
+        service = XTTSService.from_settings(settings)
+        
+        assert service.device == "cpu"
+        assert service.cpu_quantize is False
+        assert (service.cpu_threads, service.cpu_interop_threads) == (3, 2)
+        assert service.cpu_compile_vocoder is True
+        assert service.cpu_workers == 4
+        assert service.text_normalization is False
+    
     def test_get_status_before_init(self):
         """Test status antes de inicializar"""
         service = XTTSService(device="cpu")
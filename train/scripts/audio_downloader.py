@@ -0,0 +1,463 @@
+"""
+Download concorrente e retomável do áudio dos vídeos (XTTS-v2)
+
+Antes: um vídeo por vez pelo yt-dlp, com o pós-processador do ffmpeg
+rodando na mesma thread do download (rede parada durante cada decode).
+Agora duas etapas ligadas por uma fila limitada:
+
+1. Download: `workers` threads baixam o áudio original por HTTP
+   (URL resolvida pelo yt-dlp, sem pós-processador), com limite global
+   de banda (token bucket em bytes/s compartilhado), retomada via
+   `Range` a partir do `.part` e, quando o yt-dlp indica
+   `http_chunk_size`, um `Range` por bloco (evita o throttling por conexão)
+2. Decode: `decode_workers` threads convertem para WAV mono
+   `audio.target_sample_rate` (ffmpeg; sem ffmpeg, soundfile + scipy),
+   consumindo a fila. Fila cheia segura os downloads (backpressure)
+
+Manifest persistente (`raw/download_manifest.json`) por vídeo: URL,
+extensão, content length, sha256 e status (downloading → downloaded →
+decoded / failed). Rerun:
+- decoded com WAV presente: pulado
+- downloaded: checksum conferido e direto para o decode (sem rede)
+- downloading: retoma do `.part` com `Range` (recomeça se o tamanho
+  remoto mudou ou o servidor ignora `Range`)
+
+Uso:
+    downloader = AudioDownloader.from_config(config, raw_dir)
+    summary = downloader.run(videos)  # linhas do videos.csv
+"""
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import hashlib
+import json
+import logging
+from math import gcd
+import os
+from pathlib import Path
+import queue
+import re
+import shutil
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from train.scripts.subtitle_fetcher import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+@dataclass
+class MediaSource:
+    """Arquivo de áudio remoto de um vídeo"""
+
+    url: str
+    ext: str
+    headers: dict = field(default_factory=dict)
+    title: str = ""
+    duration: float = 0.0
+    # downloader_options.http_chunk_size do yt-dlp: o YouTube limita a banda
+    # de uma conexão longa, então o arquivo é pedido em blocos com Range
+    http_chunk_size: int = 0
+
+
+class UnsupportedSource(Exception):
+    """Formato sem download HTTP direto (ex.: DASH/HLS); usa o caminho yt-dlp completo"""
+
+
+def resolve_youtube_audio(youtube_url: str, audio_format: str = "bestaudio/best") -> MediaSource:
+    """URL direta do áudio via yt-dlp (sem baixar)"""
+    import yt_dlp
+
+    with yt_dlp.YoutubeDL({"format": audio_format, "noplaylist": True, "quiet": True}) as ydl:
+        info = ydl.extract_info(youtube_url, download=False)
+
+    fmt = info["requested_formats"][0] if info.get("requested_formats") else info
+    if fmt.get("protocol", "https") not in ("http", "https") or not fmt.get("url"):
+        raise UnsupportedSource(f"protocolo {fmt.get('protocol')} sem download direto")
+    return MediaSource(
+        url=fmt["url"],
+        ext=fmt.get("ext") or "webm",
+        headers=dict(fmt.get("http_headers") or {}),
+        title=info.get("title", ""),
+        duration=float(info.get("duration") or 0.0),
+        http_chunk_size=int((fmt.get("downloader_options") or {}).get("http_chunk_size") or 0),
+    )
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def decode_to_wav(source_path: Path, wav_path: Path, target_sr: int) -> None:
+    """Decodifica para WAV PCM16 mono `target_sr` (escrita atômica)"""
+    tmp_path = wav_path.with_name(wav_path.name + ".tmp")  # fora do glob *.wav da segmentação
+    if shutil.which("ffmpeg"):
+        subprocess.run(
+            [
+                "ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-i", str(source_path),
+                "-vn", "-ac", "1", "-ar", str(target_sr), "-c:a", "pcm_s16le", "-f", "wav", str(tmp_path),
+            ],
+            check=True,
+            capture_output=True,
+        )
+    else:
+        # Sem ffmpeg: formatos do libsndfile (wav/flac/ogg)
+        import numpy as np
+        import soundfile as sf
+        from scipy import signal
+
+        audio, sr = sf.read(str(source_path), dtype="float32", always_2d=True)
+        audio = audio.mean(axis=1)
+        if sr != target_sr:
+            g = gcd(sr, target_sr)
+            audio = signal.resample_poly(audio, target_sr // g, sr // g).astype(np.float32, copy=False)
+        sf.write(str(tmp_path), audio, target_sr, subtype="PCM_16", format="WAV")
+    os.replace(tmp_path, wav_path)
+
+
+class DownloadManifest:
+    """Estado persistente por vídeo (escrita atômica a cada atualização)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except Exception as e:
+                logger.warning(f"⚠️ Manifest de download inválido ({e}), recomeçando")
+
+    def get(self, video_id: str) -> dict:
+        with self._lock:
+            return dict(self._entries.get(video_id, {}))
+
+    def update(self, video_id: str, **fields) -> None:
+        with self._lock:
+            self._entries.setdefault(video_id, {}).update(fields)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+class AudioDownloader:
+    """Downloads concorrentes + decode desacoplado por fila"""
+
+    def __init__(
+        self,
+        raw_dir: Path,
+        target_sr: int,
+        workers: int = 4,
+        decode_workers: int = 2,
+        queue_size: int = 8,
+        bandwidth_limit: float = 0.0,
+        chunk_size: int = 256 * 1024,
+        max_attempts: int = 3,
+        retry_delay: float = 5.0,
+        timeout: float = 60.0,
+        keep_source: bool = False,
+        resolve: Callable[[str], MediaSource] | None = None,
+        fallback: Callable[[dict], bool] | None = None,
+    ):
+        self.raw_dir = Path(raw_dir)
+        self.target_sr = target_sr
+        self.workers = max(1, workers)
+        self.decode_workers = max(1, decode_workers)
+        self.queue_size = max(1, queue_size)
+        self.chunk_size = chunk_size
+        # Limite global em bytes/s; capacidade de um chunk (sem rajadas grandes)
+        self.bandwidth = TokenBucket(bandwidth_limit, chunk_size)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.keep_source = keep_source
+        self.resolve = resolve or resolve_youtube_audio
+        self.fallback = fallback
+        self.manifest = DownloadManifest(self.raw_dir / "download_manifest.json")
+
+    @classmethod
+    def from_config(cls, config: dict, raw_dir: Path, **kwargs) -> "AudioDownloader":
+        yt_config = config["youtube"]
+        audio_format = yt_config.get("audio_format", "bestaudio/best")
+        kwargs.setdefault("resolve", lambda url: resolve_youtube_audio(url, audio_format))
+        return cls(
+            raw_dir,
+            target_sr=int(config["audio"]["target_sample_rate"]),
+            workers=int(yt_config.get("download_workers", 4)),
+            decode_workers=int(yt_config.get("decode_workers", 2)),
+            queue_size=int(yt_config.get("decode_queue_size", 8)),
+            bandwidth_limit=float(yt_config.get("bandwidth_limit_mb", 0)) * 1024 * 1024,
+            max_attempts=int(yt_config.get("max_retries", 3)),
+            retry_delay=float(yt_config.get("retry_delay", 5)),
+            **kwargs,
+        )
+
+    # ==================== DOWNLOAD ====================
+
+    def _open(self, source: MediaSource, offset: int, end: int | None = None):
+        headers = dict(source.headers)
+        if offset or end is not None:
+            headers["Range"] = f"bytes={offset}-{'' if end is None else end}"
+        return urllib.request.urlopen(urllib.request.Request(source.url, headers=headers), timeout=self.timeout)
+
+    def _copy(self, response, f, digest) -> int:
+        """Corpo da resposta para `f` (limite de banda global); bytes copiados"""
+        received = 0
+        while True:
+            self.bandwidth.acquire(self.chunk_size)
+            chunk = response.read(self.chunk_size)
+            if not chunk:
+                return received
+            f.write(chunk)
+            digest.update(chunk)
+            received += len(chunk)
+
+    def _fetch(self, video_id: str, source: MediaSource, media_path: Path) -> None:
+        """
+        Baixa `source` para `media_path`, retomando do `.part` se houver.
+
+        Com `source.http_chunk_size`, cada bloco é um `Range` separado
+        (bytes=início-fim), como o downloader HTTP do yt-dlp.
+        """
+        part_path = media_path.with_name(media_path.name + ".part")
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        known_length = self.manifest.get(video_id).get("content_length")
+        block = source.http_chunk_size
+
+        try:
+            response = self._open(source, offset, offset + block - 1 if block else None)
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset and offset == known_length:
+                response = None  # .part já completo
+            else:
+                raise
+
+        digest = hashlib.sha256()
+        part_complete = response is None
+        if part_complete:
+            total = offset
+        else:
+            content_range = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+            ranged = (offset or block) and response.status == 206 and content_range
+            if ranged:
+                total = int(content_range.group(3)) if content_range.group(3) != "*" else None
+                if offset and known_length is not None and total is not None and total != known_length:
+                    # Arquivo remoto mudou: recomeça do zero
+                    response.close()
+                    part_path.unlink()
+                    return self._fetch(video_id, source, media_path)
+            else:
+                if offset:
+                    logger.info(f"   🔄 video_{video_id}: servidor ignorou Range, recomeçando")
+                offset = 0
+                length = response.headers.get("Content-Length")
+                total = int(length) if length else None
+
+            self.manifest.update(
+                video_id, status="downloading", ext=source.ext, content_length=total, sha256=None
+            )
+            if offset:
+                logger.info(f"   🔄 video_{video_id}: retomando em {offset / 1024 / 1024:.1f} MB")
+                with open(part_path, "rb") as f:
+                    while data := f.read(1 << 20):
+                        digest.update(data)
+
+            with open(part_path, "ab" if offset else "wb") as f:
+                position = offset
+                while response is not None:
+                    with response:
+                        received = self._copy(response, f, digest)
+                    position += received
+                    response = None
+                    if ranged and block and (total is None or position < total):
+                        if not received:
+                            raise OSError(f"bloco vazio em {position} bytes")
+                        # Próximo bloco; tamanho desconhecido: pede o restante de uma vez
+                        end = None if total is None else min(position + block, total) - 1
+                        response = self._open(source, position, end)
+                        if response.status != 206:
+                            response.close()
+                            raise OSError("servidor ignorou Range no meio do download")
+                        if end is None:
+                            ranged = False  # última requisição
+
+        size = part_path.stat().st_size
+        if total is not None and size != total:
+            raise OSError(f"download incompleto ({size}/{total} bytes)")
+        sha256 = file_sha256(part_path) if part_complete else digest.hexdigest()
+        os.replace(part_path, media_path)
+        self.manifest.update(video_id, status="downloaded", content_length=size, sha256=sha256)
+
+    def _download(self, video: dict) -> Path | None:
+        """Resolve + baixa um vídeo com novas tentativas; None se falhou"""
+        video_id, url = video["id"], video["youtube_url"]
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                source = self.resolve(url)
+                media_path = _source_path(self.raw_dir, video_id, source.ext)
+                logger.info(f"⬇️  video_{video_id}: {source.title or url} ({attempt}/{self.max_attempts})")
+                self._fetch(video_id, source, media_path)
+                return media_path
+            except UnsupportedSource as e:
+                return self._run_fallback(video, e)
+            except Exception as e:
+                logger.error(f"❌ video_{video_id} (tentativa {attempt}/{self.max_attempts}): {e}")
+                if attempt < self.max_attempts:
+                    time.sleep(self.retry_delay * 2 ** (attempt - 1))
+
+        self.manifest.update(video_id, url=url, status="failed")
+        logger.error(f"❌ Falha permanente ao baixar video_{video_id}")
+        return None
+
+    def _run_fallback(self, video: dict, reason: Exception) -> None:
+        video_id = video["id"]
+        if self.fallback is None:
+            logger.error(f"❌ video_{video_id}: {reason}")
+            self.manifest.update(video_id, status="failed")
+            return None
+        logger.info(f"   ↪️  video_{video_id}: {reason}, usando download completo do yt-dlp")
+        ok = self.fallback(video)
+        self.manifest.update(video_id, status="decoded" if ok else "failed", wav=f"{_base_name(video_id)}.wav")
+        return None
+
+    # ==================== DECODE ====================
+
+    def _decode(self, video_id: str, media_path: Path) -> bool:
+        wav_path = self.raw_dir / f"{_base_name(video_id)}.wav"
+        try:
+            decode_to_wav(media_path, wav_path, self.target_sr)
+        except Exception as e:
+            logger.error(f"❌ video_{video_id}: erro no decode de {media_path.name}: {e}")
+            self.manifest.update(video_id, status="failed", error=str(e))
+            return False
+        if not self.keep_source:
+            media_path.unlink(missing_ok=True)
+        self.manifest.update(video_id, status="decoded", wav=wav_path.name)
+        logger.info(f"✅ {wav_path.name} ({self.target_sr} Hz mono)")
+        return True
+
+    # ==================== PIPELINE ====================
+
+    def _verified_media(self, video_id: str) -> Path | None:
+        """Arquivo baixado em execução anterior, se íntegro (tamanho + sha256)"""
+        entry = self.manifest.get(video_id)
+        if entry.get("status") != "downloaded" or not entry.get("ext"):
+            return None
+        media_path = _source_path(self.raw_dir, video_id, entry["ext"])
+        if (
+            media_path.exists()
+            and media_path.stat().st_size == entry.get("content_length")
+            and file_sha256(media_path) == entry.get("sha256")
+        ):
+            return media_path
+        logger.warning(f"⚠️ video_{video_id}: arquivo baixado não confere com o manifest, baixando de novo")
+        return None
+
+    def download(self, video: dict) -> Path | None:
+        """
+        Um vídeo, sem decode (estágio de download do pipeline em streaming).
+
+        Returns:
+            WAV final se já existe, arquivo original baixado (ou do resume)
+            para `decode`, ou None se falhou
+        """
+        video_id = video["id"]
+        wav_path = self.raw_dir / f"{_base_name(video_id)}.wav"
+        self.raw_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest.update(video_id, url=video["youtube_url"])
+        if wav_path.exists():
+            return wav_path
+        media_path = self._verified_media(video_id) or self._download(video)
+        if media_path is None and wav_path.exists():
+            return wav_path  # fallback yt-dlp completo
+        return media_path
+
+    def decode(self, video_id: str, media_path: Path) -> Path | None:
+        """WAV final a partir do retorno de `download` (None se o decode falhou)"""
+        wav_path = self.raw_dir / f"{_base_name(video_id)}.wav"
+        if media_path == wav_path:
+            return wav_path
+        return wav_path if self._decode(video_id, media_path) else None
+
+    def run(self, videos: list[dict]) -> dict:
+        """
+        Baixa e decodifica `videos` (linhas do videos.csv com id e youtube_url).
+
+        Returns:
+            Contagens: decoded, skipped, failed
+        """
+        self.raw_dir.mkdir(parents=True, exist_ok=True)
+        summary = {"decoded": 0, "skipped": 0, "failed": 0}
+        summary_lock = threading.Lock()
+        decode_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        def count(key: str) -> None:
+            with summary_lock:
+                summary[key] += 1
+
+        def decoder() -> None:
+            while (item := decode_queue.get()) is not None:
+                count("decoded" if self._decode(*item) else "failed")
+
+        decoders = [
+            threading.Thread(target=decoder, name=f"audio-decode-{i}", daemon=True)
+            for i in range(self.decode_workers)
+        ]
+        for thread in decoders:
+            thread.start()
+
+        def download(video: dict) -> None:
+            video_id = video["id"]
+            media_path = self._download(video)
+            if media_path is not None:
+                decode_queue.put((video_id, media_path))  # bloqueia com a fila cheia
+            elif self.manifest.get(video_id).get("status") == "decoded":
+                count("decoded")  # caminho yt-dlp completo (fallback)
+            else:
+                count("failed")
+
+        to_download = []
+        for video in videos:
+            video_id = video["id"]
+            wav_path = self.raw_dir / f"{_base_name(video_id)}.wav"
+            self.manifest.update(video_id, url=video["youtube_url"])
+            if wav_path.exists():
+                logger.info(f"✓ {wav_path.name} já existe (pulando)")
+                count("skipped")
+            elif (media_path := self._verified_media(video_id)) is not None:
+                decode_queue.put((video_id, media_path))
+            else:
+                to_download.append(video)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="audio-download") as executor:
+                list(executor.map(download, to_download))
+        finally:
+            for _ in decoders:
+                decode_queue.put(None)
+            for thread in decoders:
+                thread.join()
+
+        return summary
+
+
+def _base_name(video_id: str) -> str:
+    return f"video_{video_id.zfill(5)}"
+
+
+def _source_path(raw_dir: Path, video_id: str, ext: str) -> Path:
+    """Arquivo original baixado (nome distinto do WAV final, mesmo se ext == wav)"""
+    return raw_dir / f"{_base_name(video_id)}.source.{ext}"
@@ -11,7 +11,6 @@ Uso:
 import json
 import logging
 from pathlib import Path
-import random
 import sys
 
 import yaml
@@ -21,6 +20,8 @@ import yaml
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+from train.scripts.ljs_dataset import place_files, write_ljs_metadata
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -68,13 +69,14 @@ def main():
 
     logger.info(f"📋 {len(transcriptions)} transcrições carregadas\n")
 
-    # Copiar/mover WAVs para MyTTSDataset/wavs/
-    import shutil
+    # Hardlink/reflink (ou cópia paralela) dos WAVs para MyTTSDataset/wavs/ (ljs_dataset.py)
+    dataset_config = config["dataset"]
+    file_mode = dataset_config.get("file_mode", "auto")
 
-    logger.info("📁 Organizando arquivos WAV...")
+    logger.info(f"📁 Organizando arquivos WAV (modo: {file_mode})...")
 
-    metadata_lines = []
-    durations = []
+    entries = []
+    pairs = []
     filtered_count = 0
 
     for i, item in enumerate(transcriptions):
@@ -106,81 +108,52 @@ def main():
 
         # Novo nome (simplificado)
         new_filename = f"audio_{i+1:05d}.wav"
-        new_path = wavs_dir / new_filename
 
-        # Copiar arquivo
-        if original_path.exists():
-            shutil.copy2(original_path, new_path)
-        else:
+        if not original_path.exists():
             logger.warning(f"⚠️  Arquivo não encontrado: {original_path}")
             continue
 
         # Formato: relative_path|text
-        relative_path = f"wavs/{new_filename}"
-        text = item["text"]
-
-        metadata_lines.append(f"{relative_path}|{text}")
-        durations.append(item["duration"])
+        pairs.append((original_path, wavs_dir / new_filename))
+        entries.append((f"wavs/{new_filename}", item["text"], item["duration"]))
 
-        if (i + 1) % 100 == 0:
-            logger.info(f"   Processados {i + 1}/{len(transcriptions)}...")
+    methods = place_files(pairs, mode=file_mode, workers=int(dataset_config.get("copy_workers", 8)))
 
-    logger.info(f"   ✅ {len(metadata_lines)} arquivos organizados")
+    logger.info(f"   ✅ {len(entries)} arquivos organizados ({', '.join(f'{n} {m}' for m, n in methods.items())})")
     if filtered_count > 0:
         logger.info(f"   🗑️  {filtered_count} filtrados por qualidade\n")
 
-    # Shuffle e split train/val
-    if config["dataset"]["shuffle"]:
-        random.seed(config["dataset"]["seed"])
-        combined = list(zip(metadata_lines, durations))
-        random.shuffle(combined)
-        metadata_lines, durations = zip(*combined)
-        metadata_lines = list(metadata_lines)
-        durations = list(durations)
-
-    split_idx = int(len(metadata_lines) * config["dataset"]["train_split"])
-    train_lines = metadata_lines[:split_idx]
-    val_lines = metadata_lines[split_idx:]
-    train_durations = durations[:split_idx]
-    val_durations = durations[split_idx:]
-
-    # Salvar metadata.csv completo
-    metadata_file = dataset_dir / "metadata.csv"
-    with open(metadata_file, "w", encoding="utf-8") as f:
-        f.write("\n".join(metadata_lines))
-
-    logger.info(f"✅ metadata.csv salvo: {metadata_file}")
-    logger.info(f"   {len(metadata_lines)} linhas")
-
-    # Salvar splits
-    metadata_train = dataset_dir / "metadata_train.csv"
-    with open(metadata_train, "w", encoding="utf-8") as f:
-        f.write("\n".join(train_lines))
-    logger.info(f"✅ metadata_train.csv salvo: {len(train_lines)} amostras")
-
-    metadata_val = dataset_dir / "metadata_val.csv"
-    with open(metadata_val, "w", encoding="utf-8") as f:
-        f.write("\n".join(val_lines))
-    logger.info(f"✅ metadata_val.csv salvo: {len(val_lines)} amostras")
-
-    # Salvar duration.json
-    duration_file = dataset_dir / "duration.json"
-    with open(duration_file, "w", encoding="utf-8") as f:
-        json.dump({"duration": durations}, f)
-
-    logger.info(f"✅ duration.json salvo: {duration_file}")
+    if not entries:
+        logger.error("❌ Nenhuma amostra para o dataset")
+        sys.exit(1)
+
+    # Shuffle, split train/val, metadata*.csv e duration.json numa passada
+    summary = write_ljs_metadata(
+        dataset_dir,
+        entries,
+        train_split=dataset_config["train_split"],
+        shuffle=dataset_config["shuffle"],
+        seed=dataset_config["seed"],
+    )
+    total_samples, train_count, val_count = summary["samples"], summary["train"], summary["val"]
+
+    logger.info(f"✅ metadata.csv salvo: {dataset_dir / 'metadata.csv'}")
+    logger.info(f"   {total_samples} linhas")
+    logger.info(f"✅ metadata_train.csv salvo: {train_count} amostras")
+    logger.info(f"✅ metadata_val.csv salvo: {val_count} amostras")
+    logger.info(f"✅ duration.json salvo: {dataset_dir / 'duration.json'}")
 
     # Summary
     logger.info("\n" + "=" * 80)
     logger.info("RESUMO DO DATASET (XTTS-v2)")
     logger.info("=" * 80)
-    logger.info(f"📊 Total de amostras: {len(metadata_lines)}")
-    logger.info(f"   📈 Train: {len(train_lines)} ({len(train_lines)/len(metadata_lines)*100:.1f}%)")
-    logger.info(f"   📉 Val: {len(val_lines)} ({len(val_lines)/len(metadata_lines)*100:.1f}%)")
-    logger.info(f"⏱️  Duração total: {sum(durations) / 3600:.2f}h")
-    logger.info(f"   Train: {sum(train_durations) / 3600:.2f}h")
-    logger.info(f"   Val: {sum(val_durations) / 3600:.2f}h")
-    logger.info(f"⏱️  Duração média: {sum(durations) / len(durations):.2f}s")
+    logger.info(f"📊 Total de amostras: {total_samples}")
+    logger.info(f"   📈 Train: {train_count} ({train_count/total_samples*100:.1f}%)")
+    logger.info(f"   📉 Val: {val_count} ({val_count/total_samples*100:.1f}%)")
+    logger.info(f"⏱️  Duração total: {summary['total_duration'] / 3600:.2f}h")
+    logger.info(f"   Train: {summary['train_duration'] / 3600:.2f}h")
+    logger.info(f"   Val: {summary['val_duration'] / 3600:.2f}h")
+    logger.info(f"⏱️  Duração média: {summary['total_duration'] / total_samples:.2f}s")
     logger.info(f"📁 Dataset em: {dataset_dir}")
     logger.info("=" * 80)
     logger.info("\n✅ Metadata.csv pronto para XTTS-v2!")
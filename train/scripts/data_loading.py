@@ -0,0 +1,229 @@
+"""
+DataLoader do fine-tuning XTTS: decode/padding nos workers, buckets por
+duração e métricas de throughput
+
+- `WaveformCollator`: roda nos workers do DataLoader — lê o áudio (shard
+  empacotado ou WAV + resample) ou o mel do cache, faz o padding e devolve
+  tensores prontos (pin_memory copia para memória pinned antes do .to(device))
+- `LengthBucketSampler`: lotes de amostras com duração parecida (menos
+  padding), embaralhados por época
+- `LoaderMetrics`: amostras/s e fração do tempo esperando dados, por época
+
+Uso:
+    loader = DataLoader(
+        dataset,
+        batch_sampler=LengthBucketSampler(dataset.lengths, batch_size=4),
+        collate_fn=WaveformCollator(sample_rate=24000),
+        num_workers=2,
+        pin_memory=True,
+    )
+    metrics = LoaderMetrics()
+    for batch in metrics.iterate(loader):
+        ...
+    summary = metrics.epoch_summary()
+"""
+
+from collections.abc import Iterable, Iterator, Sequence
+import logging
+import math
+import random
+import time
+
+import numpy as np
+import torch
+from torch.utils.data import Sampler
+
+logger = logging.getLogger(__name__)
+
+# log(1e-5): piso do log-mel (feature_cache.MelExtractor), i.e. silêncio
+MEL_PAD_VALUE = math.log(1e-5)
+
+
+class WaveformCollator:
+    """
+    collate_fn: itens do dataset -> batch com áudio [B, T] preenchido com zeros.
+
+    Itens com 'audio' (PackedDataset) já estão mono no sample rate do
+    treino; itens com 'audio_path' (XTTSDataset) são lidos e resampleados
+    aqui, no worker. Itens com 'mel' (CachedFeatureDataset) só têm o
+    padding dos mels. Arquivos ilegíveis são descartados do batch.
+
+    Returns:
+        {"audio": float32 [B, T], "audio_lengths": int64 [B], "texts": [str],
+         "mels"/"mel_lengths" ([B, n_mels, frames]) para itens do cache,
+         "tokens"/"token_lengths" quando os itens têm tokens}
+    """
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self._resamplers: dict[int, torch.nn.Module] = {}  # por worker
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_resamplers"] = {}
+        return state
+
+    def _resampler(self, orig_sr: int):
+        resampler = self._resamplers.get(orig_sr)
+        if resampler is None:
+            import torchaudio
+
+            resampler = self._resamplers[orig_sr] = torchaudio.transforms.Resample(orig_sr, self.sample_rate)
+        return resampler
+
+    def load(self, item: dict) -> torch.Tensor:
+        """Áudio float32 [T] de um item"""
+        if "audio" in item:
+            from train.scripts.packed_shards import audio_to_float
+
+            return audio_to_float(item["audio"])
+
+        import soundfile as sf
+
+        audio, sr = sf.read(item["audio_path"], dtype="float32", always_2d=True)
+        wav = torch.from_numpy(audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0])
+        if sr != self.sample_rate:
+            wav = self._resampler(sr)(wav)
+        return wav
+
+    def __call__(self, items: Sequence[dict]) -> dict:
+        wavs, mels, texts, tokens = [], [], [], []
+        for item in items:
+            if "mel" in item:
+                # Feature do cache (feature_cache.py): sem leitura de áudio
+                mels.append(torch.from_numpy(np.asarray(item["mel"], dtype=np.float32)))
+            else:
+                try:
+                    wavs.append(self.load(item))
+                except Exception as e:
+                    logger.warning(f"⚠️  Erro ao carregar {item.get('audio_path', 'amostra')}: {e}")
+                    continue
+            texts.append(item["text"])
+            if "tokens" in item:
+                tokens.append(torch.from_numpy(np.asarray(item["tokens"], dtype=np.int64)))
+
+        batch = {"texts": texts}
+        if mels:
+            # [B, n_mels, frames]; padding com o log-mel do silêncio (0.0 seria magnitude 1)
+            batch["mel_lengths"] = torch.tensor([len(mel) for mel in mels], dtype=torch.long)
+            batch["mels"] = torch.nn.utils.rnn.pad_sequence(
+                mels, batch_first=True, padding_value=MEL_PAD_VALUE
+            ).transpose(1, 2)
+        if wavs or not mels:
+            lengths = torch.tensor([len(wav) for wav in wavs], dtype=torch.long)
+            audio = torch.zeros(len(wavs), int(lengths.max()) if wavs else 0)
+            for i, wav in enumerate(wavs):
+                audio[i, :len(wav)] = wav
+            batch["audio"], batch["audio_lengths"] = audio, lengths
+        if tokens and len(tokens) == len(texts):
+            batch["token_lengths"] = torch.tensor([len(t) for t in tokens], dtype=torch.long)
+            batch["tokens"] = torch.nn.utils.rnn.pad_sequence(tokens, batch_first=True)
+        return batch
+
+
+class LengthBucketSampler(Sampler[list[int]]):
+    """
+    Batch sampler por duração: embaralha os índices, separa em grupos de
+    `batch_size * bucket_size_multiplier`, ordena cada grupo por duração e
+    corta em lotes; a ordem dos lotes é embaralhada de novo. Amostras de
+    um lote têm duração parecida (pouco padding) e cada época muda os lotes.
+
+    Chame `set_epoch(epoch)` a cada época (ordem determinística por seed).
+    """
+
+    def __init__(
+        self,
+        lengths: Sequence[int],
+        batch_size: int,
+        bucket_size_multiplier: int = 50,
+        shuffle: bool = True,
+        drop_last: bool = False,
+        seed: int = 42,
+    ):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = max(1, batch_size)
+        self.bucket_size = self.batch_size * max(1, bucket_size_multiplier)
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def __iter__(self) -> Iterator[list[int]]:
+        rng = random.Random(self.seed + self.epoch)
+        indices = list(range(len(self.lengths)))
+        if self.shuffle:
+            rng.shuffle(indices)
+
+        batches = []
+        for start in range(0, len(indices), self.bucket_size):
+            bucket = sorted(indices[start:start + self.bucket_size], key=lambda i: self.lengths[i])
+            for i in range(0, len(bucket), self.batch_size):
+                batch = bucket[i:i + self.batch_size]
+                if len(batch) == self.batch_size or not self.drop_last:
+                    batches.append(batch)
+
+        if self.shuffle:
+            rng.shuffle(batches)
+        return iter(batches)
+
+    def __len__(self) -> int:
+        # bucket_size é múltiplo de batch_size: só o último bucket tem lote incompleto
+        full_buckets, rest = divmod(len(self.lengths), self.bucket_size)
+        per_bucket = self.bucket_size // self.batch_size
+        last = rest // self.batch_size if self.drop_last else math.ceil(rest / self.batch_size)
+        return full_buckets * per_bucket + last
+
+
+def padding_ratio(lengths: Sequence[int], batches: Iterable[list[int]]) -> float:
+    """Fração de amostras de padding nos lotes (0 = nenhum)"""
+    lengths = np.asarray(lengths)
+    padded = total = 0
+    for batch in batches:
+        batch_lengths = lengths[batch]
+        padded += int(batch_lengths.max()) * len(batch)
+        total += int(batch_lengths.sum())
+    return 1.0 - total / padded if padded else 0.0
+
+
+class LoaderMetrics:
+    """
+    Throughput do loop de treino: tempo bloqueado em next(loader) (espera
+    por dados) vs. tempo total da época.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.samples = 0
+        self.batches = 0
+        self.wait_seconds = 0.0
+        self.started_at = time.perf_counter()
+
+    def iterate(self, loader: Iterable[dict]) -> Iterator[dict]:
+        """Itera o loader (a partir de agora) medindo a espera por cada batch"""
+        self.reset()
+        iterator = iter(loader)
+        while True:
+            start = time.perf_counter()
+            try:
+                batch = next(iterator)
+            except StopIteration:
+                return
+            self.wait_seconds += time.perf_counter() - start
+            self.batches += 1
+            self.samples += len(batch["texts"]) if isinstance(batch, dict) else len(batch)
+            yield batch
+
+    def epoch_summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started_at
+        return {
+            "samples": self.samples,
+            "batches": self.batches,
+            "seconds": elapsed,
+            "samples_per_sec": self.samples / elapsed if elapsed > 0 else 0.0,
+            "data_wait_fraction": self.wait_seconds / elapsed if elapsed > 0 else 0.0,
+        }
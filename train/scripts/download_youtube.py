@@ -4,6 +4,10 @@ Download de áudio de vídeos do YouTube
 Este script baixa o áudio dos vídeos listados em videos.csv,
 converte para WAV mono 22050Hz (XTTS-v2) e salva em train/data/raw/.
 
+Downloads concorrentes com limite de banda e decode desacoplado da rede;
+rerun retoma pelo manifest raw/download_manifest.json (ver
+audio_downloader.py).
+
 Uso:
     python -m train.scripts.download_youtube
 
@@ -32,6 +36,8 @@ except ImportError:
     print("❌ yt-dlp não encontrado. Instale com: pip install yt-dlp")
     sys.exit(1)
 
+from train.scripts.audio_downloader import AudioDownloader
+
 # Setup logging
 os.makedirs(project_root / "train" / "logs", exist_ok=True)
 logging.basicConfig(
@@ -230,34 +236,17 @@ def main():
         logger.info("   Adicione URLs de vídeos do YouTube ao arquivo train/data/videos.csv")
         return
 
-    # Download de cada vídeo
+    # Downloads concorrentes + decode por fila, com manifest para resume
+    # (audio_downloader.py); formatos sem HTTP direto usam download_audio
     logger.info(f"\n📥 Iniciando download de {len(videos)} vídeos...\n")
 
-    success_count = 0
-    failed_count = 0
-    skipped_count = 0
-
-    for i, video_info in enumerate(videos, 1):
-        logger.info(f"\n[{i}/{len(videos)}] Processando vídeo {video_info['id']}...")
-
-        output_filename = f"video_{video_info['id'].zfill(5)}.wav"
-        output_path = raw_dir / output_filename
-
-        if output_path.exists():
-            logger.info(f"✓ {output_filename} já existe (pulando)")
-            skipped_count += 1
-            continue
-
-        success = download_audio(video_info, raw_dir, config)
-
-        if success:
-            success_count += 1
-        else:
-            failed_count += 1
-
-        # Pequeno delay entre downloads para evitar rate limiting
-        if i < len(videos):
-            time.sleep(2)
+    downloader = AudioDownloader.from_config(
+        config, raw_dir, fallback=lambda video_info: download_audio(video_info, raw_dir, config)
+    )
+    summary = downloader.run(videos)
+    success_count = summary["decoded"]
+    skipped_count = summary["skipped"]
+    failed_count = summary["failed"]
 
     # Summary
     logger.info("\n" + "=" * 80)
@@ -267,6 +256,7 @@ def main():
     logger.info(f"⏭️  Pulados (já existentes): {skipped_count}")
     logger.info(f"❌ Falhas: {failed_count}")
     logger.info(f"📁 Arquivos salvos em: {raw_dir}")
+    logger.info(f"📋 Manifest: {downloader.manifest.path}")
     logger.info("=" * 80)
 
 
@@ -0,0 +1,284 @@
+"""
+Cache de features do fine-tuning XTTS: mel spectrograms e latents de condicionamento
+
+As features derivadas do áudio são calculadas uma vez por dataset e
+configuração, não a cada época:
+
+- Log-mel de cada amostra (float16) em um arquivo contíguo + índice de
+  frames, lido com np.memmap (`CachedFeatureDataset` fatia sem cópia)
+- Latents de condicionamento do XTTS (GPT + speaker embedding) dos clipes
+  de referência (os `num_reference_clips` mais longos do treino)
+
+Layout: <feature_cache_dir>/<chave>/{train,val}/{mels.bin,index.npy,manifest.json}
+        <feature_cache_dir>/<chave>/latents/{gpt_cond_latents.npy,speaker_embeddings.npy,manifest.json}
+
+A chave é o hash de `feature_config` (TrainingSettings.sample_rate, mel,
+condicionamento) + versão dos metadata: mudou o sample rate/config de
+áudio ou o dataset, a chave muda e o cache antigo é removido (`prune_stale`).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import logging
+import math
+import os
+from pathlib import Path
+import shutil
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+from train.scripts.data_loading import MEL_PAD_VALUE, WaveformCollator
+from train.scripts.packed_shards import source_fingerprint
+
+logger = logging.getLogger(__name__)
+
+FEATURE_CACHE_VERSION = 1
+MEL_DTYPE = np.float16
+MEL_INDEX_DTYPE = np.dtype([("offset", np.int64), ("frames", np.int64)])
+CONDITIONING_SAMPLE_RATE = 22050  # XTTS calcula os latents de referência a 22050 Hz
+
+
+def feature_config(settings) -> dict:
+    """Parâmetros que alteram as features (entram na chave do cache)"""
+    return {
+        "version": FEATURE_CACHE_VERSION,
+        "sample_rate": settings.sample_rate,
+        "mel": {
+            "n_fft": settings.mel_n_fft,
+            "hop_length": settings.mel_hop_length,
+            "win_length": settings.mel_win_length,
+            "n_mels": settings.mel_n_mels,
+            "f_min": settings.mel_fmin,
+            "f_max": settings.mel_fmax,
+        },
+        "conditioning": {
+            "model_name": settings.model_name,
+            "num_reference_clips": settings.num_reference_clips,
+            "gpt_cond_len": settings.gpt_cond_len,
+        },
+    }
+
+
+def cache_key(settings) -> str:
+    """Hash da config de features + versão dos metadata train/val"""
+    dataset = {}
+    for split, name in (("train", settings.train_metadata), ("val", settings.val_metadata)):
+        metadata = Path(settings.dataset_dir) / name
+        dataset[split] = source_fingerprint(metadata) if metadata.exists() else None
+    payload = json.dumps({"features": feature_config(settings), "dataset": dataset}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class MelExtractor:
+    """Log-mel [frames, n_mels] (float16) de um áudio float32 [T]"""
+
+    def __init__(self, sample_rate: int, mel_config: dict):
+        import torchaudio
+
+        self.transform = torchaudio.transforms.MelSpectrogram(
+            sample_rate=sample_rate,
+            n_fft=mel_config["n_fft"],
+            hop_length=mel_config["hop_length"],
+            win_length=mel_config["win_length"],
+            n_mels=mel_config["n_mels"],
+            f_min=mel_config["f_min"],
+            f_max=mel_config["f_max"],
+        )
+
+    def __call__(self, wav: torch.Tensor) -> np.ndarray:
+        with torch.no_grad():
+            mel = self.transform(wav)  # [n_mels, frames]
+        return torch.log(torch.clamp(mel, min=math.exp(MEL_PAD_VALUE))).T.contiguous().numpy().astype(MEL_DTYPE)
+
+
+class MelStore:
+    """Mels de um split: memmap contíguo + índice (offset, frames) por amostra"""
+
+    def __init__(self, split_dir: Path):
+        self.split_dir = Path(split_dir)
+        self.manifest = json.loads((self.split_dir / "manifest.json").read_text(encoding="utf-8"))
+        self.index = np.load(self.split_dir / "index.npy")
+        self._mels = None
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def frames(self) -> np.ndarray:
+        return self.index["frames"]
+
+    def __getitem__(self, idx: int) -> np.ndarray:
+        if self._mels is None:
+            # aberto sob demanda (em cada worker do DataLoader)
+            self._mels = np.memmap(self.split_dir / "mels.bin", dtype=MEL_DTYPE, mode="r").reshape(
+                -1, self.manifest["n_mels"]
+            )
+        offset, frames = int(self.index[idx]["offset"]), int(self.index[idx]["frames"])
+        return self._mels[offset:offset + frames]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_mels"] = None
+        return state
+
+
+class FeatureCache:
+    """Cache de features de um dataset + config (diretório <root>/<chave>)"""
+
+    def __init__(self, root: Path, key: str, config: dict):
+        self.root = Path(root)
+        self.key = key
+        self.config = config
+        self.dir = self.root / key
+
+    @classmethod
+    def for_settings(cls, settings) -> "FeatureCache":
+        return cls(settings.feature_cache_dir, cache_key(settings), feature_config(settings))
+
+    def prune_stale(self) -> list[Path]:
+        """Remove caches de outras chaves (sample rate/config/dataset antigos)"""
+        removed = []
+        if self.root.exists():
+            for path in self.root.iterdir():
+                if path.is_dir() and path.name != self.key:
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed.append(path)
+        return removed
+
+    # ---- mels ----
+
+    def has_mels(self, split: str, dataset: Dataset) -> bool:
+        try:
+            manifest = json.loads((self.dir / split / "manifest.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        return manifest.get("num_samples") == len(dataset) and manifest.get("source") == type(dataset).__name__
+
+    def build_mels(self, split: str, dataset: Dataset, workers: int = 4) -> MelStore:
+        """
+        Calcula o log-mel de cada amostra de `dataset` (itens com 'audio'
+        ou 'audio_path'); leitura + STFT em `workers` threads, escrita
+        sequencial na ordem do dataset
+        """
+        split_dir = self.dir / split
+        split_dir.mkdir(parents=True, exist_ok=True)
+        (split_dir / "manifest.json").unlink(missing_ok=True)
+
+        mel_config = self.config["mel"]
+        collator = WaveformCollator(self.config["sample_rate"])
+        extractor = MelExtractor(self.config["sample_rate"], mel_config)
+
+        def compute(idx: int) -> np.ndarray:
+            try:
+                return extractor(collator.load(dataset[idx]))
+            except Exception as e:
+                logger.warning(f"⚠️  Erro ao calcular mel da amostra {idx}: {e}")
+                return np.zeros((0, mel_config["n_mels"]), dtype=MEL_DTYPE)
+
+        index = np.zeros(len(dataset), dtype=MEL_INDEX_DTYPE)
+        offset = 0
+        with open(split_dir / "mels.bin", "wb") as f, ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for idx, mel in enumerate(pool.map(compute, range(len(dataset)))):
+                f.write(mel.tobytes())
+                index[idx] = (offset, len(mel))
+                offset += len(mel)
+        np.save(split_dir / "index.npy", index)
+
+        manifest = {
+            "num_samples": len(dataset),
+            "source": type(dataset).__name__,
+            "n_mels": mel_config["n_mels"],
+            "total_frames": int(offset),
+            "config": self.config,
+        }
+        # manifest por último: cache incompleto (interrompido) é recalculado
+        tmp_path = split_dir / "manifest.json.tmp"
+        tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        os.replace(tmp_path, split_dir / "manifest.json")
+        return MelStore(split_dir)
+
+    def mels(self, split: str) -> MelStore:
+        return MelStore(self.dir / split)
+
+    # ---- latents de condicionamento ----
+
+    def has_latents(self) -> bool:
+        return (self.dir / "latents" / "manifest.json").exists()
+
+    def build_latents(self, model, dataset: Dataset) -> None:
+        """
+        Latents de condicionamento (GPT + speaker embedding) dos clipes de
+        referência: os `num_reference_clips` mais longos de `dataset`
+        """
+        conditioning = self.config["conditioning"]
+        lengths = np.asarray(dataset.lengths)
+        references = [int(i) for i in np.argsort(-lengths, kind="stable")[:conditioning["num_reference_clips"]]]
+        collator = WaveformCollator(self.config["sample_rate"])
+        device = getattr(model, "device", torch.device("cpu"))
+
+        gpt_latents, speaker_embeddings = [], []
+        with torch.no_grad():
+            for idx in references:
+                wav = collator.load(dataset[idx])
+                if self.config["sample_rate"] != CONDITIONING_SAMPLE_RATE:
+                    import torchaudio
+
+                    wav = torchaudio.functional.resample(wav, self.config["sample_rate"], CONDITIONING_SAMPLE_RATE)
+                audio = wav.unsqueeze(0).to(device)  # [1, T]
+                speaker_embeddings.append(
+                    model.get_speaker_embedding(audio, CONDITIONING_SAMPLE_RATE).float().cpu().numpy()
+                )
+                gpt_latents.append(
+                    model.get_gpt_cond_latents(
+                        audio,
+                        CONDITIONING_SAMPLE_RATE,
+                        length=conditioning["gpt_cond_len"],
+                        chunk_length=conditioning["gpt_cond_len"],
+                    ).float().cpu().numpy()
+                )
+
+        latents_dir = self.dir / "latents"
+        latents_dir.mkdir(parents=True, exist_ok=True)
+        np.save(latents_dir / "gpt_cond_latents.npy", np.concatenate(gpt_latents))
+        np.save(latents_dir / "speaker_embeddings.npy", np.concatenate(speaker_embeddings))
+        (latents_dir / "manifest.json").write_text(
+            json.dumps({"references": references, "config": self.config}, indent=2), encoding="utf-8"
+        )
+
+    def reference_latents(self) -> tuple[np.ndarray, np.ndarray]:
+        """(gpt_cond_latents [R, ...], speaker_embeddings [R, ...]) memory-mapped"""
+        latents_dir = self.dir / "latents"
+        return (
+            np.load(latents_dir / "gpt_cond_latents.npy", mmap_mode="r"),
+            np.load(latents_dir / "speaker_embeddings.npy", mmap_mode="r"),
+        )
+
+
+class CachedFeatureDataset(Dataset):
+    """
+    Dataset com o mel do cache no lugar do áudio: itens com 'mel'
+    [frames, n_mels] (view do memmap), texto e tokens (se houver) —
+    o DataLoader não lê nem decodifica WAVs.
+    """
+
+    def __init__(self, base: Dataset, mels: MelStore):
+        if len(base) != len(mels):
+            raise ValueError(f"cache de mels com {len(mels)} amostras, dataset com {len(base)}")
+        self.base = base
+        self.mels = mels
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Frames de mel por amostra (buckets por duração)"""
+        return self.mels.frames
+
+    def __getitem__(self, idx: int) -> dict:
+        item = {key: value for key, value in self.base[idx].items() if key not in ("audio", "audio_path")}
+        item["mel"] = self.mels[idx]
+        return item
@@ -0,0 +1,171 @@
+"""
+Arquivos e metadata do dataset LJSpeech (build_ljs_dataset.py)
+
+- `link_or_copy`: hardlink quando origem e destino estão no mesmo
+  filesystem, reflink (FICLONE, btrfs/xfs) como segunda opção, cópia
+  como último recurso — o dataset não duplica o espaço de processed/wavs
+- `place_files`: o mesmo para muitos arquivos, em paralelo (a cópia
+  entre filesystems é limitada por I/O, não por CPU)
+- `write_ljs_metadata`: metadata.csv, metadata_train.csv,
+  metadata_val.csv e duration.json numa única passada
+
+Os segmentos em processed/wavs nunca são reescritos no lugar (a
+segmentação remove e cria arquivos novos), então um hardlink não é
+afetado por uma nova segmentação.
+"""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import errno
+import json
+import logging
+import os
+from pathlib import Path
+import random
+import shutil
+
+logger = logging.getLogger(__name__)
+
+FILE_MODES = ("auto", "hardlink", "reflink", "copy")
+
+# ioctl FICLONE (linux/fs.h): clone copy-on-write do arquivo inteiro
+_FICLONE = 0x40049409
+
+# Erros que indicam "não suportado aqui" (outro filesystem, fs sem links/reflink)
+_UNSUPPORTED = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EMLINK, errno.ENOSYS}
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    import fcntl
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            dst.unlink(missing_ok=True)
+            raise
+    shutil.copystat(src, dst)
+
+
+def _same_file(src: Path, dst: Path) -> bool:
+    try:
+        return os.path.samefile(src, dst)
+    except OSError:
+        return False
+
+
+def link_or_copy(src: Path, dst: Path, mode: str = "auto") -> str:
+    """
+    Coloca `src` em `dst` (substituindo `dst` se existir).
+
+    Args:
+        mode: "auto" (hardlink → reflink → cópia), "hardlink", "reflink" ou "copy"
+
+    Returns:
+        Método usado: "existing" (dst já é o mesmo arquivo), "hardlink", "reflink" ou "copy"
+    """
+    if mode not in FILE_MODES:
+        raise ValueError(f"mode inválido: {mode!r} (esperado um de {FILE_MODES})")
+    if _same_file(src, dst):
+        return "existing"
+    dst.unlink(missing_ok=True)
+
+    attempts = {"auto": ("hardlink", "reflink"), "hardlink": ("hardlink",), "reflink": ("reflink",), "copy": ()}
+    for method in attempts[mode]:
+        try:
+            if method == "hardlink":
+                os.link(src, dst)
+            else:
+                _reflink(src, dst)
+            return method
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def place_files(pairs: list[tuple[Path, Path]], mode: str = "auto", workers: int = 8) -> Counter:
+    """
+    `link_or_copy` para cada (origem, destino), em `workers` threads.
+
+    Returns:
+        Contagem por método usado
+    """
+    methods: Counter = Counter()
+    if not pairs:
+        return methods
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pairs)))) as pool:
+        for done, method in enumerate(pool.map(lambda pair: link_or_copy(*pair, mode=mode), pairs), 1):
+            methods[method] += 1
+            if done % 1000 == 0:
+                logger.info(f"   Organizados {done}/{len(pairs)}...")
+    return methods
+
+
+def write_ljs_metadata(
+    dataset_dir: Path,
+    entries: list[tuple[str, str, float]],
+    train_split: float,
+    shuffle: bool = True,
+    seed: int = 42,
+) -> dict:
+    """
+    Grava metadata.csv, metadata_train.csv, metadata_val.csv e
+    duration.json numa única passada sobre `entries`.
+
+    Args:
+        entries: (caminho relativo "wavs/x.wav", texto, duração em s)
+        train_split: fração das amostras (após o shuffle) no treino
+
+    Returns:
+        Resumo: samples, train/val (amostras) e durações totais em s
+    """
+    entries = list(entries)
+    if shuffle:
+        # Mesma permutação do random.seed + random.shuffle usados antes
+        random.Random(seed).shuffle(entries)
+
+    split_idx = int(len(entries) * train_split)
+    durations: list[float] = []
+    totals = {"train": 0.0, "val": 0.0}
+
+    dataset_dir = Path(dataset_dir)
+    with open(dataset_dir / "metadata.csv", "w", encoding="utf-8") as f_all, \
+            open(dataset_dir / "metadata_train.csv", "w", encoding="utf-8") as f_train, \
+            open(dataset_dir / "metadata_val.csv", "w", encoding="utf-8") as f_val:
+        for i, (relative_path, text, duration) in enumerate(entries):
+            line = f"{relative_path}|{text}"
+            # Sem newline final (formato anterior: "\n".join)
+            f_all.write(line if i == 0 else "\n" + line)
+            if i < split_idx:
+                f_train.write(line if i == 0 else "\n" + line)
+                totals["train"] += duration
+            else:
+                f_val.write(line if i == split_idx else "\n" + line)
+                totals["val"] += duration
+            durations.append(duration)
+
+    total = totals["train"] + totals["val"]
+    with open(dataset_dir / "duration.json", "w", encoding="utf-8") as f:
+        # "duration" (lista na ordem do metadata.csv) mantém o formato anterior;
+        # os totais evitam somar a lista em get_dataset_stats
+        json.dump(
+            {
+                "duration": durations,
+                "total_duration": total,
+                "train_duration": totals["train"],
+                "val_duration": totals["val"],
+            },
+            f,
+        )
+
+    return {
+        "samples": len(entries),
+        "train": split_idx,
+        "val": len(entries) - split_idx,
+        "total_duration": total,
+        "train_duration": totals["train"],
+        "val_duration": totals["val"],
+    }
@@ -0,0 +1,335 @@
+"""
+Shards empacotados e memory-mapped para o fine-tuning do XTTS
+
+Pré-processa um metadata LJSpeech (wavs/x.wav|texto) uma vez:
+áudio mono já no sample rate do treino (int16 ou float16) e texto
+tokenizado em arquivos contíguos, com um índice de offsets. O dataset
+de treino abre os shards com np.memmap e fatia cada amostra sem cópia —
+nada de torchaudio.load/Resample nem Path.exists por amostra no loop.
+
+Layout de <output_dir>:
+    manifest.json             sample_rate, dtype, tokenizer, shards, origem
+    index.npy                 por amostra: shard, offsets e comprimentos
+    texts.json                textos originais (logs/validação)
+    shard_00000.audio.bin     amostras de áudio concatenadas
+    shard_00000.tokens.bin    tokens int32 concatenados
+
+Uso:
+    python -m train.scripts.packed_shards
+    python -m train.scripts.packed_shards --audio-dtype float16 --vocab-file vocab.json
+"""
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+from math import gcd
+import os
+from pathlib import Path
+import sys
+
+import click
+import numpy as np
+import soundfile as sf
+from torch.utils.data import Dataset
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+AUDIO_DTYPES = {"int16": np.int16, "float16": np.float16}
+TOKEN_DTYPE = np.int32
+INDEX_DTYPE = np.dtype([
+    ("shard", np.int32),
+    ("audio_offset", np.int64),
+    ("audio_length", np.int64),
+    ("token_offset", np.int64),
+    ("token_length", np.int32),
+])
+
+
+def read_metadata(metadata_path: Path) -> list[tuple[Path, str]]:
+    """(caminho absoluto do WAV, texto) de um metadata LJSpeech"""
+    metadata_path = Path(metadata_path)
+    samples = []
+    with open(metadata_path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.strip().split("|")
+            if len(parts) < 2:
+                continue
+            audio_path = Path(parts[0])
+            if not audio_path.is_absolute():
+                audio_path = metadata_path.parent / audio_path
+            samples.append((audio_path, "|".join(parts[1:])))
+    return samples
+
+
+def source_fingerprint(metadata_path: Path) -> dict:
+    """Identifica a versão do metadata empacotada (shards desatualizados)"""
+    stat = Path(metadata_path).stat()
+    return {"path": str(Path(metadata_path).resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_text_encoder(vocab_file: Path | None = None, language: str = "pt") -> tuple[str, Callable[[str], list[int]]]:
+    """
+    (nome, encode) do tokenizador: BPE do XTTS (vocab.json do modelo) se
+    `vocab_file` for dado, senão bytes UTF-8 (sem perda, decodificável)
+    """
+    if vocab_file:
+        from TTS.tts.layers.xtts.tokenizer import VoiceBpeTokenizer
+
+        tokenizer = VoiceBpeTokenizer(vocab_file=str(vocab_file))
+        return "xtts-bpe", lambda text: tokenizer.encode(text, language)
+    return "utf8", lambda text: list(text.encode("utf-8"))
+
+
+def load_audio(audio_path: Path, sample_rate: int) -> np.ndarray:
+    """WAV mono float32 em `sample_rate` (resample_poly se necessário)"""
+    audio, sr = sf.read(str(audio_path), dtype="float32", always_2d=True)
+    audio = audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0]
+    if sr != sample_rate:
+        from scipy import signal
+
+        g = gcd(sr, sample_rate)
+        audio = signal.resample_poly(audio, sample_rate // g, sr // g).astype(np.float32, copy=False)
+    return audio
+
+
+def encode_audio(audio: np.ndarray, dtype: str) -> np.ndarray:
+    if dtype == "int16":
+        return (np.clip(audio, -1.0, 1.0) * 32767.0).astype(np.int16)
+    return audio.astype(np.float16)
+
+
+def pack_dataset(
+    metadata_path: Path,
+    output_dir: Path,
+    sample_rate: int,
+    audio_dtype: str = "int16",
+    shard_size_mb: int = 512,
+    vocab_file: Path | None = None,
+    language: str = "pt",
+    workers: int = 4,
+) -> dict:
+    """
+    Empacota as amostras de `metadata_path` em `output_dir`.
+
+    Decode/resample em `workers` threads; escrita sequencial na ordem do
+    metadata. Um shard novo começa quando o atual passa de `shard_size_mb`.
+
+    Returns:
+        manifest gravado
+    """
+    if audio_dtype not in AUDIO_DTYPES:
+        raise ValueError(f"audio_dtype inválido: {audio_dtype!r} (esperado um de {list(AUDIO_DTYPES)})")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / "manifest.json").unlink(missing_ok=True)
+    for stale in output_dir.glob("shard_*.bin"):
+        stale.unlink()
+
+    samples = read_metadata(metadata_path)
+    tokenizer_name, encode_text = load_text_encoder(vocab_file, language)
+    shard_limit = shard_size_mb * 1024 * 1024
+    itemsize = np.dtype(AUDIO_DTYPES[audio_dtype]).itemsize
+
+    index = []
+    texts = []
+    shards = []
+    skipped = 0
+    audio_file = tokens_file = None
+    audio_offset = token_offset = 0
+
+    def open_shard() -> None:
+        nonlocal audio_file, tokens_file, audio_offset, token_offset
+        if audio_file is not None:
+            audio_file.close()
+            tokens_file.close()
+        name = f"shard_{len(shards):05d}"
+        shards.append(name)
+        audio_file = open(output_dir / f"{name}.audio.bin", "wb")
+        tokens_file = open(output_dir / f"{name}.tokens.bin", "wb")
+        audio_offset = token_offset = 0
+
+    def load(sample: tuple[Path, str]):
+        audio_path, _ = sample
+        try:
+            return encode_audio(load_audio(audio_path, sample_rate), audio_dtype)
+        except Exception as e:
+            logger.warning(f"⚠️  Erro ao carregar {audio_path}: {e}")
+            return None
+
+    try:
+        open_shard()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for n, ((_, text), audio) in enumerate(zip(samples, pool.map(load, samples)), 1):
+                if audio is None:
+                    skipped += 1
+                    continue
+                if audio_offset and audio_offset * itemsize + audio.nbytes > shard_limit:
+                    open_shard()
+                tokens = np.asarray(encode_text(text), dtype=TOKEN_DTYPE)
+                audio_file.write(audio.tobytes())
+                tokens_file.write(tokens.tobytes())
+                index.append((len(shards) - 1, audio_offset, len(audio), token_offset, len(tokens)))
+                texts.append(text)
+                audio_offset += len(audio)
+                token_offset += len(tokens)
+                if n % 1000 == 0:
+                    logger.info(f"   Empacotadas {n}/{len(samples)}...")
+    finally:
+        if audio_file is not None:
+            audio_file.close()
+            tokens_file.close()
+
+    index_array = np.array(index, dtype=INDEX_DTYPE)
+    np.save(output_dir / "index.npy", index_array)
+    with open(output_dir / "texts.json", "w", encoding="utf-8") as f:
+        json.dump(texts, f, ensure_ascii=False)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "sample_rate": sample_rate,
+        "audio_dtype": audio_dtype,
+        "tokenizer": tokenizer_name,
+        "language": language,
+        "num_samples": len(index_array),
+        "skipped": skipped,
+        "total_seconds": float(index_array["audio_length"].sum()) / sample_rate if len(index_array) else 0.0,
+        "shards": shards,
+        "source": source_fingerprint(metadata_path),
+    }
+    # manifest por último: shards sem manifest (pack interrompido) não são usados
+    tmp_path = output_dir / "manifest.json.tmp"
+    tmp_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, output_dir / "manifest.json")
+    return manifest
+
+
+def is_current(packed_dir: Path, metadata_path: Path, sample_rate: int) -> bool:
+    """Shards existem, são do metadata atual e do sample rate do treino"""
+    try:
+        manifest = json.loads((Path(packed_dir) / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    return (
+        manifest.get("format_version") == FORMAT_VERSION
+        and manifest.get("sample_rate") == sample_rate
+        and manifest.get("source") == source_fingerprint(metadata_path)
+    )
+
+
+def audio_to_float(audio: np.ndarray):
+    """Tensor float32 [T] de um trecho de áudio do shard (int16/float16)"""
+    import torch
+
+    if audio.dtype == np.int16:
+        return torch.from_numpy(audio.astype(np.float32) / 32768.0)
+    return torch.from_numpy(audio.astype(np.float32))
+
+
+class PackedDataset(Dataset):
+    """
+    Dataset sobre shards empacotados (pack_dataset).
+
+    `__getitem__` devolve views do np.memmap (sem cópia): áudio no dtype
+    do shard (int16/float16) e tokens int32. Os memmaps abrem sob demanda
+    em cada processo (workers do DataLoader não herdam mapeamentos).
+    """
+
+    def __init__(self, packed_dir: Path, max_samples: int | None = None):
+        self.packed_dir = Path(packed_dir)
+        self.manifest = json.loads((self.packed_dir / "manifest.json").read_text(encoding="utf-8"))
+        self.sample_rate = self.manifest["sample_rate"]
+        self.audio_dtype = AUDIO_DTYPES[self.manifest["audio_dtype"]]
+        self.index = np.load(self.packed_dir / "index.npy")
+        with open(self.packed_dir / "texts.json", encoding="utf-8") as f:
+            self.texts = json.load(f)
+        if max_samples:
+            self.index = self.index[:max_samples]
+            self.texts = self.texts[:max_samples]
+        self._audio: dict[int, np.memmap] = {}
+        self._tokens: dict[int, np.memmap] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Comprimento do áudio (amostras) de cada item, sem ler os shards"""
+        return self.index["audio_length"]
+
+    def _memmap(self, cache: dict, shard: int, suffix: str, dtype) -> np.memmap:
+        mm = cache.get(shard)
+        if mm is None:
+            path = self.packed_dir / f"{self.manifest['shards'][shard]}.{suffix}.bin"
+            mm = cache[shard] = np.memmap(path, dtype=dtype, mode="r")
+        return mm
+
+    def __getitem__(self, idx: int) -> dict:
+        entry = self.index[idx]
+        shard = int(entry["shard"])
+        audio = self._memmap(self._audio, shard, "audio", self.audio_dtype)
+        tokens = self._memmap(self._tokens, shard, "tokens", TOKEN_DTYPE)
+        audio_start = int(entry["audio_offset"])
+        token_start = int(entry["token_offset"])
+        return {
+            "audio": audio[audio_start:audio_start + int(entry["audio_length"])],
+            "tokens": tokens[token_start:token_start + int(entry["token_length"])],
+            "text": self.texts[idx],
+        }
+
+    def __getstate__(self):
+        # memmaps não vão para os workers (reabertos lá sob demanda)
+        state = self.__dict__.copy()
+        state["_audio"], state["_tokens"] = {}, {}
+        return state
+
+
+@click.command()
+@click.option("--dataset-dir", type=click.Path(path_type=Path), default=None, help="Dataset LJSpeech (padrão: settings)")
+@click.option("--output-dir", type=click.Path(path_type=Path), default=None, help="Destino (padrão: <dataset>/packed)")
+@click.option("--audio-dtype", type=click.Choice(list(AUDIO_DTYPES)), default=None, help="int16 ou float16")
+@click.option("--shard-size-mb", type=int, default=512, help="Tamanho máximo de cada shard de áudio")
+@click.option("--vocab-file", type=click.Path(exists=True, path_type=Path), default=None,
+              help="vocab.json do XTTS (tokens BPE); sem ele, bytes UTF-8")
+@click.option("--workers", type=int, default=4, help="Threads de decode/resample")
+def main(dataset_dir, output_dir, audio_dtype, shard_size_mb, vocab_file, workers):
+    """Empacota metadata_train/metadata_val em shards memory-mapped"""
+    from train.train_settings import get_train_settings
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    settings = get_train_settings()
+    dataset_dir = dataset_dir or settings.dataset_dir
+    output_dir = output_dir or settings.packed_dataset_dir
+    audio_dtype = audio_dtype or settings.packed_audio_dtype
+
+    for split, metadata_name in (("train", settings.train_metadata), ("val", settings.val_metadata)):
+        metadata_path = Path(dataset_dir) / metadata_name
+        if not metadata_path.exists():
+            logger.error(f"❌ Arquivo não encontrado: {metadata_path}")
+            sys.exit(1)
+        logger.info(f"📦 Empacotando {metadata_path} ({settings.sample_rate} Hz, {audio_dtype})...")
+        manifest = pack_dataset(
+            metadata_path,
+            Path(output_dir) / split,
+            sample_rate=settings.sample_rate,
+            audio_dtype=audio_dtype,
+            shard_size_mb=shard_size_mb,
+            vocab_file=vocab_file,
+            workers=workers,
+        )
+        logger.info(
+            f"✅ {split}: {manifest['num_samples']} amostras, {manifest['total_seconds'] / 3600:.2f}h "
+            f"em {len(manifest['shards'])} shard(s), tokenizer {manifest['tokenizer']}"
+        )
+        if manifest["skipped"]:
+            logger.warning(f"⚠️  {manifest['skipped']} arquivos ignorados (erro de leitura)")
+
+
+if __name__ == "__main__":
+    main()
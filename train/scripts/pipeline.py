@@ -21,11 +21,17 @@ Uso:
     python -m train.scripts.pipeline_v2 --only-step transcribe
     python -m train.scripts.pipeline_v2 --only-step build
 
+    # Streaming: download, segmentação e transcrição sobrepostos
+    python -m train.scripts.pipeline_v2 --streaming
+
 Diferenças da v1:
     - Usa imports diretos ao invés de subprocess (melhor prática Python)
     - Melhor tratamento de erros e stack traces
     - Reduz overhead de spawn de processos
     - Type hints para melhor IDE support
+    - Modo streaming (--streaming ou pipeline.streaming): cada vídeo baixado
+      segue para a segmentação e seus segmentos para a fila de transcrição
+      (filas limitadas, stream_stages.py), com throughput/backlog ao vivo
 
 Dependências:
     - yt-dlp: pip install yt-dlp
@@ -101,6 +107,189 @@ def run_step(step_name: str, step_function: Callable[[], None]) -> bool:
         return False
 
 
+STREAMING_STEPS = ["download", "segment", "transcribe"]
+
+
+def streaming_steps(skip_download: bool, skip_segment: bool, skip_transcribe: bool) -> List[str] | None:
+    """
+    Etapas sobrepostas no modo streaming, ou None se não há o que sobrepor
+    (menos de duas etapas, ou skips com buraco no meio, ex.: só download +
+    transcrição)
+    """
+    skips = (skip_download, skip_segment, skip_transcribe)
+    selected = [step for step, skip in zip(STREAMING_STEPS, skips) if not skip]
+    if len(selected) < 2:
+        return None
+    first = STREAMING_STEPS.index(selected[0])
+    if selected != STREAMING_STEPS[first:first + len(selected)]:
+        return None
+    return selected
+
+
+def run_streaming(cfg: dict, steps: List[str]) -> None:
+    """
+    Executa `steps` (subsequência de download → segment → transcribe) em
+    streaming: vídeos baixados entram na fila de decode, WAVs na fila de
+    segmentação e segmentos na fila de transcrição (lotes do Whisper).
+
+    Mesmos artefatos e resume das etapas sequenciais: download_manifest.json,
+    segment_manifests/, segments_mapping.json, transcriptions.jsonl/.json.
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    import json
+
+    from train.scripts.segment_audio import _segment_file_job, load_segment_manifest, segmentation_config_hash
+    from train.scripts.stream_stages import Stage, run_stages
+
+    pipe_cfg = cfg.get("pipeline", {})
+    seg_cfg = cfg["segmentation"]
+    queue_size = int(pipe_cfg.get("queue_size", 8))
+
+    data_dir = project_root / "train" / "data"
+    raw_dir = data_dir / "raw"
+    processed_dir = data_dir / "processed"
+    wavs_dir = processed_dir / "wavs"
+    manifest_dir = processed_dir / "segment_manifests"
+    wavs_dir.mkdir(parents=True, exist_ok=True)
+
+    stages: List = []
+    subtitles: dict = {}  # video_id -> SubtitleIndex (preenchido antes dos segmentos do vídeo)
+    segments_by_file: dict[str, list[dict]] = {}
+    fetcher = None
+
+    if "transcribe" in steps:
+        from train.scripts.subtitle_fetcher import SubtitleFetcher
+        from train.scripts.subtitle_index import SubtitleIndex
+        from train.scripts.transcribe_audio import (
+            load_videos_catalog,
+            transcribe_segment_batch,
+            transcription_record,
+        )
+        from train.scripts.transcript_store import resume_transcript_log
+
+        if cfg["transcription"].get("prefer_youtube_subtitles", True):
+            fetcher = SubtitleFetcher.from_config(cfg, data_dir / "subtitles")
+
+    def load_subtitles(video_id: str, youtube_url: str) -> None:
+        subtitle_file = fetcher.fetch(video_id, youtube_url)
+        if subtitle_file is not None:
+            subtitles[video_id] = SubtitleIndex.from_file(subtitle_file)
+
+    # 1. Download (+ legendas do vídeo) → decode
+    if "download" in steps:
+        from train.scripts.audio_downloader import AudioDownloader
+        from train.scripts.download_youtube import download_audio
+        from train.scripts.download_youtube import load_videos_catalog as load_download_catalog
+
+        raw_dir.mkdir(parents=True, exist_ok=True)
+        source = load_download_catalog(data_dir / "videos.csv")
+        downloader = AudioDownloader.from_config(
+            cfg, raw_dir, fallback=lambda video_info: download_audio(video_info, raw_dir, cfg)
+        )
+
+        def download(video: dict) -> list:
+            media_path = downloader.download(video)
+            if media_path is None:
+                raise RuntimeError(f"video_{video['id']}: download falhou")
+            if fetcher is not None:
+                try:
+                    load_subtitles(video["id"], video["youtube_url"])
+                except Exception as e:
+                    logger.warning(f"⚠️  video_{video['id']}: legendas indisponíveis ({e}), usando Whisper")
+            return [(video["id"], media_path)]
+
+        def decode(item: tuple) -> list:
+            video_id, media_path = item
+            wav_path = downloader.decode(video_id, media_path)
+            if wav_path is None:
+                raise RuntimeError(f"video_{video_id}: decode falhou")
+            return [wav_path]
+
+        stages += [
+            Stage("download", download, workers=downloader.workers, queue_size=queue_size),
+            Stage("decode", decode, workers=downloader.decode_workers, queue_size=downloader.queue_size),
+        ]
+    else:
+        source = sorted(raw_dir.glob("*.wav"))
+        if fetcher is not None:
+            videos_catalog = load_videos_catalog(data_dir / "videos.csv")
+            subtitle_files = fetcher.fetch_all(
+                {video_id: video_info["youtube_url"] for video_id, video_info in videos_catalog.items()}
+            )
+            for video_id, subtitle_file in subtitle_files.items():
+                subtitles[video_id] = SubtitleIndex.from_file(subtitle_file)
+
+    # 2. Segmentação: um arquivo por vez em cada worker (processos do pool)
+    config_hash = segmentation_config_hash(cfg)
+    segment_workers = (
+        int(pipe_cfg.get("segment_workers", 0)) or int(seg_cfg.get("num_workers", 0)) or (os.cpu_count() or 1)
+    )
+    writer_threads = int(seg_cfg.get("writer_threads", 2))
+    resume = bool(seg_cfg.get("resume", True))
+    pool = ProcessPoolExecutor(max_workers=segment_workers) if segment_workers > 1 else None
+
+    def segment(wav_path: Path) -> list[dict]:
+        segments = load_segment_manifest(wav_path, wavs_dir, manifest_dir, config_hash) if resume else None
+        if segments is None:
+            job_args = (wav_path, wavs_dir, manifest_dir, cfg, config_hash, writer_threads)
+            segments = pool.submit(_segment_file_job, *job_args).result() if pool else _segment_file_job(*job_args)
+        segments_by_file[wav_path.name] = segments
+        return segments
+
+    stages.append(Stage("segment", segment, workers=segment_workers, queue_size=queue_size))
+
+    # 3. Transcrição: lotes do Whisper montados conforme os segmentos chegam
+    transcript_log = None
+    if "transcribe" in steps:
+        transcript_log, processed_paths = resume_transcript_log(processed_dir, cfg["transcription"])
+        batch_size = max(1, int(cfg["transcription"].get("batch_size", 16)))
+
+        def transcribe(batch: list[dict]) -> list[dict]:
+            pending = [segment for segment in batch if segment["audio_path"] not in processed_paths]
+            records = []
+            for segment, text in transcribe_segment_batch(pending, subtitles, cfg):
+                record = transcription_record(segment, text, cfg["text_processing"])
+                if record is not None:
+                    transcript_log.append(record)
+                    records.append(record)
+            return records
+
+        stages.append(Stage(
+            "transcribe",
+            transcribe if batch_size > 1 else lambda segment: transcribe([segment]),
+            queue_size=queue_size * batch_size,
+            batch_size=batch_size,
+            batch_timeout=float(pipe_cfg.get("transcribe_batch_timeout", 5.0)),
+        ))
+
+    logger.info(f"🚀 Streaming: {' → '.join(stage.name for stage in stages)}")
+    try:
+        stats = run_stages(source, stages, report_interval=float(pipe_cfg.get("report_interval", 30.0)))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if transcript_log is not None:
+            transcript_log.close()
+
+    # Mesma ordem determinística da etapa sequencial (arquivos por nome)
+    all_segments = [segment for name in sorted(segments_by_file) for segment in segments_by_file[name]]
+    mapping_file = processed_dir / "segments_mapping.json"
+    with open(mapping_file, "w", encoding="utf-8") as f:
+        json.dump(all_segments, f, indent=2, ensure_ascii=False)
+    logger.info(f"📄 {len(all_segments)} segmentos em {mapping_file}")
+
+    if transcript_log is not None:
+        transcriptions = transcript_log.compact(
+            processed_dir / "transcriptions.json", [segment["audio_path"] for segment in all_segments]
+        )
+        logger.info(f"📝 {len(transcriptions)} transcrições em {processed_dir / 'transcriptions.json'}")
+
+    failed = {stat.name: stat.failed for stat in stats if stat.failed}
+    if failed:
+        logger.warning(f"⚠️  Itens com falha por etapa: {failed}")
+
+
 @click.command()
 @click.option(
     "--config",
@@ -117,7 +306,12 @@ def run_step(step_name: str, step_function: Callable[[], None]) -> bool:
     type=click.Choice(["download", "segment", "transcribe", "build"]),
     help="Executar apenas um step específico",
 )
-def run_pipeline(config, skip_download, skip_segment, skip_transcribe, skip_build, only_step):
+@click.option(
+    "--streaming",
+    is_flag=True,
+    help="Sobrepor download, segmentação e transcrição (filas limitadas entre etapas)",
+)
+def run_pipeline(config, skip_download, skip_segment, skip_transcribe, skip_build, only_step, streaming):
     """
     Executa pipeline completo de preparação de dataset XTTS-v2
     
@@ -140,6 +334,11 @@ def run_pipeline(config, skip_download, skip_segment, skip_transcribe, skip_buil
                 f"Duração: {cfg['segmentation']['min_duration']}-{cfg['segmentation']['max_duration']}s, "
                 f"Whisper: {cfg['transcription']['whisper_model']}\n")
     
+    streaming = streaming or bool(cfg.get("pipeline", {}).get("streaming", False))
+    if streaming and only_step:
+        logger.warning("⚠️  --only-step executa uma etapa isolada: modo streaming ignorado")
+        streaming = False
+
     # Import lazy (só quando necessário, evita carregar módulos pesados)
     steps: List[Tuple[str, Callable[[], None]]] = []
     
@@ -157,7 +356,15 @@ def run_pipeline(config, skip_download, skip_segment, skip_transcribe, skip_buil
         elif only_step == "build":
             from train.scripts.build_ljs_dataset import main as build_main
             steps = [("Build LJSpeech Dataset", build_main)]
+    elif streaming and (selected := streaming_steps(skip_download, skip_segment, skip_transcribe)):
+        # Etapas sobrepostas num único step (build depende do dataset completo)
+        steps = [(f"Streaming ({' → '.join(selected)})", lambda: run_streaming(cfg, selected))]
+        if not skip_build:
+            from train.scripts.build_ljs_dataset import main as build_main
+            steps.append(("Build LJSpeech Dataset", build_main))
     else:
+        if streaming:
+            logger.warning("⚠️  Menos de duas etapas consecutivas para sobrepor: executando em sequência")
         # Pipeline completo (com skips)
         if not skip_download:
             from train.scripts.download_youtube import main as download_main
@@ -4,21 +4,28 @@ Preparação e segmentação de áudio para XTTS-v2 (PT-BR)
 
 Objetivos:
 - Funcionar com áudios MUITO longos sem estourar RAM
-- Usar VAD simples (energia RMS em dB) para pegar só trechos com fala
+- VAD para pegar só trechos com fala: energia RMS em dB (padrão) ou backend
+  neural Silero/WebRTC (segmentation.vad_backend), em streaming
 - Dividir as regiões de fala em segmentos de duração controlada XTTS-v2 (7-12s)
 - Aplicar fade-in / fade-out curto para evitar clicks/zumbidos
 - Normalizar (RMS ou pyloudnorm, se disponível)
 - Resample para 22050Hz (XTTS-v2 requirement, não 24000Hz!)
+- Vários arquivos em paralelo (ProcessPoolExecutor), VAD e extração na mesma
+  leitura, escrita dos segmentos em threads
+- Resume: arquivos já segmentados com a mesma config (hash) são pulados
 
 Uso:
     python -m train.scripts.segment_audio
 """
 
 from collections.abc import Iterable
-import gc
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
+import hashlib
 import json
 import logging
 import math
+import os
 from pathlib import Path
 import sys
 import warnings
@@ -51,11 +58,12 @@ except ImportError:
     signal = None
 
 # Logging
+(project_root / "train" / "logs").mkdir(parents=True, exist_ok=True)
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
     handlers=[
-        logging.FileHandler("train/logs/prepare_segments.log"),
+        logging.FileHandler(project_root / "train" / "logs" / "prepare_segments.log"),
         logging.StreamHandler(),
     ],
 )
@@ -79,69 +87,396 @@ def load_config() -> dict:
 # ======================
 
 
-def detect_voice_in_chunk(
-    audio_chunk: np.ndarray,
-    sr: int,
-    seg_config: dict,
-) -> list[tuple[float, float]]:
+def frame_energies(audio: np.ndarray, frame_size: int, hop_size: int) -> np.ndarray:
     """
-    Detecta regiões com voz em um chunk usando energia RMS em dB.
+    Energia média (mean(x²)) de cada frame completo, vetorizada.
 
-    Retorna tempos RELATIVOS ao chunk (segundos):
-        [(start_sec_rel, end_sec_rel), ...]
+    Com frame_size múltiplo de hop_size (o padrão: hop = frame/2), soma os
+    quadrados por bloco de hop amostras (reshape, sem cópias por frame) e
+    combina blocos vizinhos; caso contrário usa soma cumulativa. Acumulação
+    em float64, custo O(n) independente do overlap.
     """
-    frame_size = int(seg_config.get("vad_frame_size", 512))
-    hop_size = frame_size // 2
-    threshold_db = float(seg_config.get("vad_threshold", -40.0))
-    min_silence_duration = float(seg_config.get("min_silence_duration", 0.3))
-
-    if frame_size <= 0 or hop_size <= 0:
-        raise ValueError("vad_frame_size deve ser > 0")
+    num_frames = max(0, (len(audio) - frame_size) // hop_size + 1)
+    if num_frames == 0:
+        return np.zeros(0, dtype=np.float64)
 
-    num_frames = max(0, (len(audio_chunk) - frame_size) // hop_size + 1)
+    if frame_size % hop_size == 0:
+        blocks_per_frame = frame_size // hop_size
+        num_blocks = num_frames + blocks_per_frame - 1
+        blocks = audio[:num_blocks * hop_size].reshape(num_blocks, hop_size).astype(np.float64)
+        sums = np.concatenate(([0.0], np.cumsum(np.einsum("ij,ij->i", blocks, blocks))))
+        return (sums[blocks_per_frame:] - sums[:num_frames]) / frame_size
 
-    segments: list[tuple[float, float]] = []
-    in_voice = False
-    voice_start = 0.0
+    cumsum = np.empty(len(audio) + 1, dtype=np.float64)
+    cumsum[0] = 0.0
+    np.cumsum(np.square(audio, dtype=np.float64), out=cumsum[1:])
+    starts = np.arange(num_frames) * hop_size
+    return (cumsum[starts + frame_size] - cumsum[starts]) / frame_size
 
-    min_silence_frames = max(1, int(min_silence_duration * sr / hop_size))
-    silence_count = 0
-    eps = 1e-10
 
-    for i in range(num_frames):
-        start_idx = i * hop_size
-        end_idx = start_idx + frame_size
-        frame = audio_chunk[start_idx:end_idx]
+class VoiceDetector:
+    """
+    Base dos backends de VAD em streaming.
 
-        # RMS -> dB (energia)
-        rms = float(np.sqrt(np.mean(frame * frame) + eps))
-        db = 20.0 * math.log10(rms + eps)
+    Cada backend classifica frames como voz/silêncio (`_classify`); a
+    histerese é comum: entra em voz no primeiro frame com voz, sai após
+    `min_silence_duration` de frames sem voz. Calculada por trechos (runs)
+    com numpy. O estado (em voz, início, contagem de silêncio) é mantido
+    entre chunks: regiões não são cortadas na borda de cada chunk.
 
-        has_voice = db > threshold_db
-        time = start_idx / sr  # tempo relativo ao chunk
+    Frames têm `hop_samples` amostras na taxa `frame_rate` (a do backend,
+    que pode diferir do SR do arquivo). Tempos retornados são absolutos
+    (segundos desde o primeiro chunk).
+    """
 
-        if has_voice:
-            if not in_voice:
-                voice_start = time
-                in_voice = True
-            silence_count = 0
+    def __init__(self, sr: int, hop_samples: int, frame_rate: int, min_silence_duration: float):
+        self.sr = sr
+        self.hop_samples = hop_samples
+        self.frame_rate = frame_rate
+        self.min_silence_frames = max(1, int(min_silence_duration * frame_rate / hop_samples))
+
+        self.frames_processed = 0
+        self.in_voice = False
+        self.voice_start_frame = 0
+        self.silence_count = 0
+
+    def _frame_time(self, frame: int) -> float:
+        return frame * self.hop_samples / self.frame_rate
+
+    @property
+    def pending_start_sample(self) -> int:
+        """Amostra (SR do arquivo) mais antiga que ainda pode fazer parte de uma região futura"""
+        frame = self.voice_start_frame if self.in_voice else self.frames_processed
+        return frame * self.hop_samples * self.sr // self.frame_rate
+
+    def _classify(self, audio_chunk: np.ndarray) -> np.ndarray:
+        """Decisão voz/silêncio (bool) de cada frame completo do chunk"""
+        raise NotImplementedError
+
+    def _drain(self) -> np.ndarray:
+        """Decisões de frames retidos pelo backend (fim do stream)"""
+        return np.zeros(0, dtype=bool)
+
+    def process(self, audio_chunk: np.ndarray) -> list[tuple[float, float]]:
+        """Alimenta um chunk; retorna regiões de voz fechadas neste chunk"""
+        return self._update(self._classify(audio_chunk))
+
+    def _update(self, has_voice: np.ndarray) -> list[tuple[float, float]]:
+        """Aplica a histerese às próximas decisões por frame"""
+        num_frames = len(has_voice)
+        if num_frames == 0:
+            return []
+
+        offset = self.frames_processed
+        self.frames_processed += num_frames
+
+        # Runs de frames iguais: (início, tamanho, voz?)
+        changes = np.flatnonzero(has_voice[1:] != has_voice[:-1]) + 1
+        run_starts = np.concatenate(([0], changes))
+        run_lengths = np.diff(np.concatenate((run_starts, [num_frames])))
+        run_voice = has_voice[run_starts]
+
+        # Silêncio só encerra a voz após `needed` frames consecutivos; o
+        # primeiro run continua a contagem herdada do chunk anterior
+        needed = np.full(len(run_starts), self.min_silence_frames)
+        needed[0] -= self.silence_count if self.in_voice else 0
+        is_break = ~run_voice & (run_lengths >= needed)
+        if not run_voice[0] and not self.in_voice:
+            is_break[0] = False
+
+        # Início de região: run de voz sem voz em andamento antes dele
+        after_gap = np.zeros(len(run_starts), dtype=bool)
+        after_gap[1:] = is_break[:-1]
+        if not self.in_voice:
+            after_gap[0] = True
+            if not run_voice[0] and len(run_starts) > 1:
+                after_gap[1] = True
+        starts = offset + run_starts[run_voice & after_gap]
+        ends = offset + (run_starts + needed - 1)[is_break]
+
+        # Pareia (início, fim); região herdada fecha no primeiro fim
+        region_starts = np.concatenate(([self.voice_start_frame], starts)) if self.in_voice else starts
+        closed = len(ends)
+        pairs_start = region_starts[:closed]
+        keep = ends > pairs_start
+        segments = [
+            (self._frame_time(s), self._frame_time(e))
+            for s, e in zip(pairs_start[keep].tolist(), ends[keep].tolist())
+        ]
+
+        # Estado para o próximo chunk
+        self.in_voice = len(region_starts) > closed
+        if self.in_voice:
+            self.voice_start_frame = int(region_starts[-1])
+            if run_voice[-1]:
+                self.silence_count = 0
+            elif len(run_starts) == 1:
+                self.silence_count += int(run_lengths[-1])
+            else:
+                self.silence_count = int(run_lengths[-1])
         else:
-            if in_voice:
-                silence_count += 1
-                if silence_count >= min_silence_frames:
-                    voice_end = time
-                    if voice_end > voice_start:
-                        segments.append((voice_start, voice_end))
-                    in_voice = False
-                    silence_count = 0
-
-    # Se terminou o chunk ainda em voz
-    if in_voice:
-        voice_end = (num_frames * hop_size) / sr
-        if voice_end > voice_start:
-            segments.append((voice_start, voice_end))
+            self.silence_count = 0
+        return segments
 
-    return segments
+    def flush(self) -> list[tuple[float, float]]:
+        """Fim do stream: fecha a região em andamento (se houver)"""
+        segments = self._update(self._drain())
+        if self.in_voice and self.frames_processed > self.voice_start_frame:
+            segments.append((self._frame_time(self.voice_start_frame), self._frame_time(self.frames_processed)))
+        self.in_voice = False
+        self.silence_count = 0
+        return segments
+
+
+class RMSVoiceDetector(VoiceDetector):
+    """
+    VAD por energia RMS em dB (backend "rms", padrão).
+
+    Energia por frame vetorizada (frame_energies); amostras de um frame
+    incompleto ficam para o próximo chunk.
+    """
+
+    def __init__(self, sr: int, seg_config: dict):
+        self.frame_size = int(seg_config.get("vad_frame_size", 512))
+        self.hop_size = self.frame_size // 2
+        if self.frame_size <= 0 or self.hop_size <= 0:
+            raise ValueError("vad_frame_size deve ser > 0")
+        super().__init__(sr, self.hop_size, sr, float(seg_config.get("min_silence_duration", 0.3)))
+
+        # 20*log10(sqrt(e + eps) + eps) > threshold  <=>  sqrt(e + eps) > 10^(threshold/20) - eps
+        threshold_db = float(seg_config.get("vad_threshold", -40.0))
+        self._eps = 1e-10
+        self._rms_threshold = 10.0 ** (threshold_db / 20.0) - self._eps
+        self._tail = np.zeros(0, dtype=np.float32)
+
+    def _classify(self, audio_chunk: np.ndarray) -> np.ndarray:
+        buffer = np.concatenate([self._tail, audio_chunk]) if self._tail.size else audio_chunk
+        energies = frame_energies(buffer, self.frame_size, self.hop_size)
+        self._tail = buffer[len(energies) * self.hop_size:].copy()
+        return np.sqrt(energies + self._eps) > self._rms_threshold
+
+
+class _ResampledFrames:
+    """Reamostra chunks para a taxa do modelo e guarda o resto de frame incompleto"""
+
+    def __init__(self, sr: int, model_sr: int, frame_samples: int):
+        self.sr = sr
+        self.model_sr = model_sr
+        self.frame_samples = frame_samples
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    def frames(self, audio_chunk: np.ndarray) -> np.ndarray:
+        """Matriz [n_frames, frame_samples] float32"""
+        audio, _ = resample_segment(audio_chunk.astype(np.float32, copy=False), self.sr, self.model_sr)
+        buffer = np.concatenate([self._pending, audio]) if self._pending.size else audio
+        n = len(buffer) // self.frame_samples
+        self._pending = buffer[n * self.frame_samples:].copy()
+        return buffer[:n * self.frame_samples].reshape(n, self.frame_samples)
+
+
+@lru_cache(maxsize=1)
+def _load_silero_model():
+    """Modelo Silero carregado uma vez por processo (estado zerado a cada inferência)"""
+    from silero_vad import load_silero_vad
+    return load_silero_vad()
+
+
+class SileroVoiceDetector(VoiceDetector):
+    """
+    VAD neural Silero (backend "silero", CPU, requer `pip install silero-vad`).
+
+    Janelas de 32 ms a 16 kHz. Inferência em lote: janelas são acumuladas
+    entre chunks até `vad_batch_size` x `vad_stream_windows`, divididas em
+    sub-streams contíguos e avaliadas lado a lado (uma chamada do modelo
+    avalia uma janela de cada sub-stream). Cada sub-stream começa com estado
+    zerado e `vad_warmup_windows` janelas anteriores de aquecimento
+    (descartadas). Memória limitada: fila de janelas + aquecimento (~64 s a
+    16 kHz no padrão); frames ainda não classificados não contam em
+    `frames_processed`, então o ChunkBuffer retém o áudio correspondente.
+    """
+
+    MODEL_SR = 16000
+    WINDOW = 512
+
+    def __init__(self, sr: int, seg_config: dict):
+        try:
+            import torch
+            import silero_vad  # noqa: F401
+        except ImportError as e:
+            raise ImportError(f"Backend de VAD 'silero' requer silero-vad: pip install silero-vad ({e})")
+
+        super().__init__(sr, self.WINDOW, self.MODEL_SR, float(seg_config.get("min_silence_duration", 0.3)))
+        self.threshold = float(seg_config.get("vad_silero_threshold", 0.5))
+        self.batch_size = max(1, int(seg_config.get("vad_batch_size", 16)))
+        self.stream_windows = max(1, int(seg_config.get("vad_stream_windows", 128)))
+        self.warmup_windows = max(0, int(seg_config.get("vad_warmup_windows", 32)))
+
+        self._torch = torch
+        torch.set_num_threads(max(1, int(seg_config.get("vad_threads", 1))))
+        self.model = _load_silero_model()
+        self._frames = _ResampledFrames(sr, self.MODEL_SR, self.WINDOW)
+        self._context = np.zeros((0, self.WINDOW), dtype=np.float32)
+        self._queued: list[np.ndarray] = []
+        self._queued_windows = 0
+
+    def speech_probs(self, windows: np.ndarray) -> np.ndarray:
+        """Probabilidade de fala de cada janela [n, 512], em lote (continua o stream anterior)"""
+        n = len(windows)
+        if n == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        context = len(self._context)
+        full = np.concatenate([self._context, windows]) if context else windows
+        if self.warmup_windows:
+            self._context = full[-self.warmup_windows:]
+
+        batch = max(1, min(self.batch_size, n // self.stream_windows))
+        length = -(-n // batch)  # janelas próprias por sub-stream
+        own_start = context + np.arange(batch) * length
+        own_len = np.minimum(length, n - np.arange(batch) * length).clip(min=0)
+        row_start = np.maximum(0, own_start - self.warmup_windows)
+        warm = own_start - row_start
+        steps = int((warm + own_len).max())
+
+        # Índices [batch, steps] em `full` (fim de cada linha preenchido repetindo a última janela)
+        index = np.minimum(row_start[:, None] + np.arange(steps)[None, :], len(full) - 1)
+        frames = self._torch.from_numpy(np.ascontiguousarray(full[index]))
+
+        probs = np.empty((batch, steps), dtype=np.float32)
+        self.model.reset_states()
+        with self._torch.inference_mode():
+            for t in range(steps):
+                probs[:, t] = self.model(frames[:, t], self.MODEL_SR)[:, 0].numpy()
+
+        return np.concatenate([probs[b, warm[b]:warm[b] + own_len[b]] for b in range(batch)])
+
+    def _infer_queued(self) -> np.ndarray:
+        if not self._queued:
+            return np.zeros(0, dtype=bool)
+        windows = np.concatenate(self._queued)
+        self._queued = []
+        self._queued_windows = 0
+        return self.speech_probs(windows) > self.threshold
+
+    def _classify(self, audio_chunk: np.ndarray) -> np.ndarray:
+        windows = self._frames.frames(audio_chunk)
+        if len(windows):
+            self._queued.append(windows)
+            self._queued_windows += len(windows)
+        if self._queued_windows < self.batch_size * self.stream_windows:
+            return np.zeros(0, dtype=bool)
+        return self._infer_queued()
+
+    def _drain(self) -> np.ndarray:
+        return self._infer_queued()
+
+
+class WebRTCVoiceDetector(VoiceDetector):
+    """
+    VAD WebRTC (backend "webrtc", requer `pip install webrtcvad`).
+
+    Frames de 30 ms a 16 kHz; `vad_webrtc_aggressiveness` 0-3 (3 = mais
+    restritivo). A API C avalia um frame por chamada (sem lote).
+    """
+
+    MODEL_SR = 16000
+    FRAME = 480
+
+    def __init__(self, sr: int, seg_config: dict):
+        try:
+            import webrtcvad
+        except ImportError as e:
+            raise ImportError(f"Backend de VAD 'webrtc' requer webrtcvad: pip install webrtcvad ({e})")
+
+        super().__init__(sr, self.FRAME, self.MODEL_SR, float(seg_config.get("min_silence_duration", 0.3)))
+        self.vad = webrtcvad.Vad(int(seg_config.get("vad_webrtc_aggressiveness", 2)))
+        self._frames = _ResampledFrames(sr, self.MODEL_SR, self.FRAME)
+
+    def _classify(self, audio_chunk: np.ndarray) -> np.ndarray:
+        frames = self._frames.frames(audio_chunk)
+        pcm = (np.clip(frames, -1.0, 1.0) * 32767).astype("<i2")
+        return np.fromiter(
+            (self.vad.is_speech(frame.tobytes(), self.MODEL_SR) for frame in pcm),
+            dtype=bool,
+            count=len(pcm),
+        )
+
+
+VAD_BACKENDS = {
+    "rms": RMSVoiceDetector,
+    "silero": SileroVoiceDetector,
+    "webrtc": WebRTCVoiceDetector,
+}
+
+
+def create_voice_detector(sr: int, seg_config: dict) -> VoiceDetector:
+    """Backend de VAD de `segmentation.vad_backend` (rms, silero ou webrtc)"""
+    backend = str(seg_config.get("vad_backend", "rms")).lower()
+    if backend not in VAD_BACKENDS:
+        raise ValueError(f"vad_backend inválido: {backend} (opções: {', '.join(VAD_BACKENDS)})")
+    return VAD_BACKENDS[backend](sr, seg_config)
+
+
+def detect_voice_in_chunk(
+    audio_chunk: np.ndarray,
+    sr: int,
+    seg_config: dict,
+) -> list[tuple[float, float]]:
+    """
+    Detecta regiões com voz em um chunk isolado (backend de `vad_backend`,
+    padrão energia RMS em dB).
+
+    Retorna tempos RELATIVOS ao chunk (segundos):
+        [(start_sec_rel, end_sec_rel), ...]
+    """
+    detector = create_voice_detector(sr, seg_config)
+    return detector.process(audio_chunk) + detector.flush()
+
+
+class VoiceRegionMerger:
+    """Mescla regiões de voz separadas por até `min_gap` segundos"""
+
+    def __init__(self, min_gap: float):
+        self.min_gap = min_gap
+        self.start: float | None = None
+        self.end: float | None = None
+
+    def add(self, segments: Iterable[tuple[float, float]]) -> list[tuple[float, float]]:
+        """Adiciona regiões (em ordem); retorna as regiões mescladas já fechadas"""
+        closed = []
+        for s_abs, e_abs in segments:
+            if self.start is None:
+                self.start, self.end = s_abs, e_abs
+            elif s_abs - self.end <= self.min_gap:
+                self.end = max(self.end, e_abs)
+            else:
+                # Fecha a região anterior e começa outra
+                closed.append((self.start, self.end))
+                self.start, self.end = s_abs, e_abs
+        return closed
+
+    def flush(self) -> list[tuple[float, float]]:
+        closed = [(self.start, self.end)] if self.start is not None else []
+        self.start = self.end = None
+        return closed
+
+
+def _vad_chunk_samples(seg_config: dict, orig_sr: int) -> int:
+    vad_chunk_duration = float(seg_config.get("vad_chunk_duration", 10.0))
+    vad_chunk_duration = max(2.0, vad_chunk_duration)  # não deixar ridiculamente pequeno
+    logger.info(f"   VAD streaming em chunks de {vad_chunk_duration:.1f}s")
+    return int(vad_chunk_duration * orig_sr)
+
+
+def iter_mono_chunks(audio_file: sf.SoundFile, chunk_samples: int) -> Iterable[np.ndarray]:
+    """Lê o arquivo aberto em chunks float32 mono"""
+    while True:
+        chunk = audio_file.read(frames=chunk_samples, dtype="float32")
+        if chunk.size == 0:
+            break
+        if chunk.ndim > 1:
+            chunk = chunk.mean(axis=1)
+        yield chunk
 
 
 def iter_voice_regions(
@@ -155,7 +490,7 @@ def iter_voice_regions(
     REGIÕES DE FALA (start_sec, end_sec) já mescladas.
 
     Tudo em streaming; só mantém na memória:
-      - o chunk atual
+      - o chunk atual (+ amostras de um frame incompleto)
       - a região atual em construção
     """
     use_vad = seg_config.get("use_vad", True)
@@ -165,56 +500,17 @@ def iter_voice_regions(
         yield (0.0, total_duration)
         return
 
-    vad_chunk_duration = float(seg_config.get("vad_chunk_duration", 10.0))
-    vad_chunk_duration = max(2.0, vad_chunk_duration)  # não deixar ridiculamente pequeno
-    chunk_samples = int(vad_chunk_duration * orig_sr)
-    min_silence_to_merge = float(seg_config.get("min_silence_duration", 0.3))
-
-    logger.info(f"   VAD streaming em chunks de {vad_chunk_duration:.1f}s")
-
-    current_region_start = None  # tipo: float | None
-    current_region_end = None
+    chunk_samples = _vad_chunk_samples(seg_config, orig_sr)
+    detector = create_voice_detector(orig_sr, seg_config)
+    merger = VoiceRegionMerger(float(seg_config.get("min_silence_duration", 0.3)))
 
     with sf.SoundFile(str(input_path)) as audio_file:
-        chunk_start_time = 0.0
-
-        while True:
-            chunk = audio_file.read(frames=chunk_samples, dtype="float32")
-            if chunk.size == 0:
-                break
-
-            # Mono
-            if chunk.ndim > 1:
-                chunk = chunk.mean(axis=1)
-
-            # VAD no chunk (tempos relativos)
-            local_segments = detect_voice_in_chunk(chunk, orig_sr, seg_config)
+        for chunk in iter_mono_chunks(audio_file, chunk_samples):
+            # VAD com estado entre chunks (tempos absolutos)
+            yield from merger.add(detector.process(chunk))
 
-            # Converter para tempos absolutos e mesclar em uma linha contínua
-            for s_rel, e_rel in local_segments:
-                s_abs = chunk_start_time + s_rel
-                e_abs = chunk_start_time + e_rel
-
-                if current_region_start is None:
-                    current_region_start = s_abs
-                    current_region_end = e_abs
-                else:
-                    # Se a nova região começa logo depois da atual, mescla
-                    if s_abs - current_region_end <= min_silence_to_merge:
-                        current_region_end = max(current_region_end, e_abs)
-                    else:
-                        # Fecha a região anterior e começa outra
-                        yield (current_region_start, current_region_end)
-                        current_region_start = s_abs
-                        current_region_end = e_abs
-
-            chunk_start_time += len(chunk) / orig_sr
-            del chunk
-            gc.collect()
-
-    # Última região
-    if current_region_start is not None and current_region_end is not None:
-        yield (current_region_start, current_region_end)
+    yield from merger.add(detector.flush())
+    yield from merger.flush()
 
 
 # ======================
@@ -377,17 +673,183 @@ def apply_fade(audio: np.ndarray, sr: int, fade_ms: float = 5.0) -> np.ndarray:
 # PROCESSAMENTO POR ARQUIVO
 # ======================
 
+# Incrementar quando a saída da segmentação mudar (invalida manifests)
+SEGMENTER_VERSION = 2
+
+
+class ChunkBuffer:
+    """
+    Amostras mono lidas do arquivo, mantidas só enquanto ainda podem
+    pertencer a um segmento (VAD e extração na mesma leitura).
+    """
+
+    def __init__(self):
+        self.chunks: list[np.ndarray] = []
+        self.start_sample = 0  # índice absoluto da primeira amostra retida
+        self.end_sample = 0
+
+    def append(self, chunk: np.ndarray) -> None:
+        self.chunks.append(chunk)
+        self.end_sample += len(chunk)
+
+    def read(self, start_sample: int, frames: int) -> np.ndarray:
+        if start_sample < self.start_sample:
+            raise ValueError(f"Amostra {start_sample} já descartada (buffer inicia em {self.start_sample})")
+        audio = np.concatenate(self.chunks) if len(self.chunks) > 1 else self.chunks[0]
+        self.chunks = [audio]
+        offset = start_sample - self.start_sample
+        return audio[offset:offset + frames].copy()
+
+    def discard_before(self, sample: int) -> None:
+        """Descarta chunks inteiros anteriores a `sample`"""
+        while self.chunks and self.start_sample + len(self.chunks[0]) <= sample:
+            self.start_sample += len(self.chunks.pop(0))
+
+
+def iter_voice_regions_with_audio(
+    input_path: Path,
+    seg_config: dict,
+    orig_sr: int,
+    total_frames: int,
+) -> Iterable[tuple[tuple[float, float], "ChunkBuffer"]]:
+    """
+    Como iter_voice_regions, mas em uma única leitura do arquivo: cada região
+    é devolvida com o buffer que contém suas amostras.
+
+    Memória: chunk atual + região em construção (limitada pela região de
+    fala contínua mais longa). Sem VAD, o arquivo inteiro é uma região e é
+    lido do disco por segmento (ver process_audio_file).
+    """
+    chunk_samples = _vad_chunk_samples(seg_config, orig_sr)
+    detector = create_voice_detector(orig_sr, seg_config)
+    merger = VoiceRegionMerger(float(seg_config.get("min_silence_duration", 0.3)))
+    buffer = ChunkBuffer()
+
+    with sf.SoundFile(str(input_path)) as audio_file:
+        for chunk in iter_mono_chunks(audio_file, chunk_samples):
+            buffer.append(chunk)
+            for region in merger.add(detector.process(chunk)):
+                yield region, buffer
+
+            # Amostras que não podem mais entrar em nenhuma região
+            keep_from = detector.pending_start_sample
+            if merger.start is not None:
+                keep_from = min(keep_from, int(round(merger.start * orig_sr)))
+            buffer.discard_before(keep_from)
+
+    for region in merger.add(detector.flush()) + merger.flush():
+        yield region, buffer
+
+
+def segmentation_config_hash(config: dict) -> str:
+    """Hash das seções que afetam os segmentos gerados (resume)"""
+    relevant = {
+        "version": SEGMENTER_VERSION,
+        "segmentation": {
+            k: v for k, v in config.get("segmentation", {}).items()
+            if k not in ("num_workers", "writer_threads", "resume")
+        },
+        "audio": config.get("audio", {}),
+    }
+    payload = json.dumps(relevant, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def _file_fingerprint(path: Path) -> dict:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_segment_manifest(
+    input_path: Path,
+    output_dir: Path,
+    manifest_dir: Path,
+    config_hash: str,
+) -> list[dict] | None:
+    """
+    segment_info de uma execução anterior, se ainda válida (mesmo hash de
+    config, mesmo arquivo de entrada e todos os WAVs presentes).
+    """
+    manifest_path = manifest_dir / f"{input_path.stem}.json"
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if manifest.get("config_hash") != config_hash or manifest.get("source") != _file_fingerprint(input_path):
+        return None
+    segments = manifest.get("segments", [])
+    if not all((output_dir / Path(seg["audio_path"]).name).exists() for seg in segments):
+        return None
+    return segments
+
+
+def save_segment_manifest(
+    input_path: Path,
+    manifest_dir: Path,
+    config_hash: str,
+    segments: list[dict],
+) -> None:
+    manifest_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = manifest_dir / f"{input_path.stem}.json"
+    tmp_path = manifest_path.with_suffix(".tmp")
+    tmp_path.write_text(
+        json.dumps(
+            {"config_hash": config_hash, "source": _file_fingerprint(input_path), "segments": segments},
+            ensure_ascii=False,
+        ),
+        encoding="utf-8",
+    )
+    tmp_path.replace(manifest_path)
+
+
+def _finish_and_write_segment(
+    segment: np.ndarray,
+    orig_sr: int,
+    target_sr: int,
+    audio_config: dict,
+    meter,
+    fade_ms: float,
+    output_path: Path,
+) -> float:
+    """Resample, normalização, fade e escrita (roda nas threads de escrita)"""
+    # Resample para SR alvo
+    segment, current_sr = resample_segment(segment, orig_sr, target_sr)
+
+    # Normalização
+    segment = normalize_segment(segment, current_sr, audio_config, meter)
+
+    # Sanitizar valores (NaN/Inf)
+    np.nan_to_num(segment, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+
+    # Fade in/out
+    segment = apply_fade(segment, current_sr, fade_ms=fade_ms)
+
+    # Anti-clipping extra
+    max_val = float(np.max(np.abs(segment)))
+    if max_val > 0.99:
+        segment *= 0.99 / max_val
+
+    sf.write(
+        str(output_path),
+        segment.astype(np.float32, copy=False),
+        current_sr,
+        subtype="PCM_16",
+    )
+    return len(segment) / current_sr
+
 
 def process_audio_file(
     input_path: Path,
     output_dir: Path,
     config: dict,
+    writer_threads: int = 2,
 ) -> list[dict]:
     """
     Pipeline completo para um arquivo:
     - Descobre regiões de fala via VAD streaming
     - Gera segmentos finais (start/end em segundos)
-    - Extrai o áudio de cada segmento, normaliza, aplica fade e salva
+    - Extrai o áudio de cada segmento na mesma leitura do VAD
+    - Normaliza, aplica fade e salva em `writer_threads` threads
     """
     seg_config = config["segmentation"]
     audio_config = config["audio"]
@@ -405,22 +867,6 @@ def process_audio_file(
     logger.info(f"📄 Processando: {input_path.name}")
     logger.info(f"   Duração total: {total_duration:.2f}s | SR: {orig_sr}Hz")
 
-    # Passo 1: VAD streaming -> regiões de fala
-    regions = list(iter_voice_regions(input_path, seg_config, orig_sr, total_frames))
-    logger.info(f"   Regiões de fala detectadas (após merge): {len(regions)}")
-
-    if not regions:
-        logger.warning("   ⚠️ Nenhuma região de fala detectada, pulando arquivo.")
-        return []
-
-    # Passo 2: Geração dos segmentos finais (somente tempos)
-    final_segments = list(iter_final_segments_from_regions(regions, seg_config))
-    logger.info(f"   Segmentos finais a extrair: {len(final_segments)}")
-
-    if not final_segments:
-        logger.warning("   ⚠️ Nenhum segmento final gerado (talvez min_duration muito alta).")
-        return []
-
     # Meter para normalização por loudness (por SR alvo)
     meter = None
     if pyln is not None and audio_config.get("normalize_audio", False):
@@ -429,74 +875,161 @@ def process_audio_file(
         except Exception:
             meter = None
 
-    segment_info_list: list[dict] = []
     base_name = input_path.stem
+    max_pending = max(1, writer_threads) * 2
+    pending: list[tuple[dict, Future]] = []
+    segment_info_list: list[dict] = []
+    num_regions = 0
+
+    def collect(limit: int) -> None:
+        # Mantém no máximo `limit` segmentos em escrita (memória limitada)
+        while len(pending) > limit:
+            info, future = pending.pop(0)
+            info["duration"] = future.result()
+            segment_info_list.append(info)
+            if len(segment_info_list) % 100 == 0:
+                logger.info(f"   Progresso: {len(segment_info_list)} segmentos extraídos...")
+
+    if seg_config.get("use_vad", True):
+        region_stream = iter_voice_regions_with_audio(input_path, seg_config, orig_sr, total_frames)
+        file_reader = None
+    else:
+        # Sem VAD: região única (arquivo inteiro), leitura por segmento
+        file_reader = sf.SoundFile(str(input_path))
+        region_stream = (((0.0, total_duration), None),)
+
+    # Buffer da região corrente: os segmentos de uma região são gerados antes
+    # de a próxima ser lida (geradores encadeados, sem segunda leitura)
+    current = {"buffer": None}
+
+    def regions():
+        nonlocal num_regions
+        for region, buffer in region_stream:
+            num_regions += 1
+            current["buffer"] = buffer
+            yield region
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, writer_threads), thread_name_prefix="segment-writer") as writers:
+            # Passo 2: Geração dos segmentos finais (somente tempos)
+            final_segments = iter_final_segments_from_regions(regions(), seg_config)
+            for idx, (start_time, end_time) in enumerate(final_segments):
+                start_sample = int(round(start_time * orig_sr))
+                end_sample = int(round(end_time * orig_sr))
+
+                # Garantias de bounds
+                start_sample = max(0, min(start_sample, total_frames))
+                end_sample = max(0, min(end_sample, total_frames))
+                frames = max(0, end_sample - start_sample)
+                if frames <= 0:
+                    continue
+
+                # Passo 3: Extração (buffer do VAD ou leitura direta sem VAD)
+                if current["buffer"] is not None:
+                    segment = current["buffer"].read(start_sample, frames)
+                else:
+                    file_reader.seek(start_sample)
+                    segment = file_reader.read(frames=frames, dtype="float32")
+                    if segment.ndim > 1:
+                        segment = segment.mean(axis=1)
+
+                output_path = output_dir / f"{base_name}_seg{idx:04d}.wav"
+                future = writers.submit(
+                    _finish_and_write_segment,
+                    segment, orig_sr, target_sr, audio_config, meter, fade_ms, output_path,
+                )
+                pending.append(({
+                    "audio_path": str(output_path.relative_to(project_root / "train" / "data")),
+                    "original_file": input_path.name,
+                    "segment_index": idx,
+                    "duration": None,
+                    "start_time": float(start_time),
+                    "end_time": float(end_time),
+                }, future))
+                collect(max_pending)
+            collect(0)
+    finally:
+        if file_reader is not None:
+            file_reader.close()
+
+    logger.info(f"   Regiões de fala detectadas (após merge): {num_regions}")
+    if not segment_info_list:
+        logger.warning("   ⚠️ Nenhum segmento gerado (sem fala detectada ou min_duration muito alta).")
+        return []
 
-    # Passo 3: Extração dos segmentos do arquivo original
-    with sf.SoundFile(str(input_path)) as audio_file:
-        for idx, (start_time, end_time) in enumerate(final_segments):
-            start_sample = int(round(start_time * orig_sr))
-            end_sample = int(round(end_time * orig_sr))
-
-            # Garantias de bounds
-            start_sample = max(0, min(start_sample, total_frames))
-            end_sample = max(0, min(end_sample, total_frames))
-            frames = max(0, end_sample - start_sample)
-            if frames <= 0:
-                continue
-
-            audio_file.seek(start_sample)
-            segment = audio_file.read(frames=frames, dtype="float32")
-
-            if segment.ndim > 1:
-                segment = segment.mean(axis=1)
+    logger.info(f"   ✅ {len(segment_info_list)} segmentos salvos para {input_path.name}\n")
+    return segment_info_list
 
-            # Resample para SR alvo
-            segment, current_sr = resample_segment(segment, orig_sr, target_sr)
 
-            # Normalização
-            segment = normalize_segment(segment, current_sr, audio_config, meter)
+def _segment_file_job(
+    input_path: Path,
+    output_dir: Path,
+    manifest_dir: Path,
+    config: dict,
+    config_hash: str,
+    writer_threads: int,
+) -> list[dict]:
+    """Segmenta um arquivo (processo do pool) e grava seu manifest"""
+    # Segmentos de uma execução com outra config (índices podem não coincidir)
+    for stale in output_dir.glob(f"{input_path.stem}_seg[0-9][0-9][0-9][0-9].wav"):
+        stale.unlink()
+    segments = process_audio_file(input_path, output_dir, config, writer_threads)
+    save_segment_manifest(input_path, manifest_dir, config_hash, segments)
+    return segments
 
-            # Sanitizar valores (NaN/Inf)
-            np.nan_to_num(segment, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
 
-            # Fade in/out
-            segment = apply_fade(segment, current_sr, fade_ms=fade_ms)
+def segment_files(
+    audio_files: list[Path],
+    output_dir: Path,
+    config: dict,
+    manifest_dir: Path,
+    num_workers: int = 1,
+    writer_threads: int = 2,
+    resume: bool = True,
+) -> list[dict]:
+    """
+    Segmenta vários arquivos, em paralelo com `num_workers` processos.
 
-            # Anti-clipping extra
-            max_val = float(np.max(np.abs(segment)))
-            if max_val > 0.99:
-                segment *= 0.99 / max_val
-
-            # Salvar
-            output_filename = f"{base_name}_seg{idx:04d}.wav"
-            output_path = output_dir / output_filename
-
-            sf.write(
-                str(output_path),
-                segment.astype(np.float32, copy=False),
-                current_sr,
-                subtype="PCM_16",
-            )
-
-            seg_duration = len(segment) / current_sr
-            segment_info = {
-                "audio_path": str(output_path.relative_to(project_root / "train" / "data")),
-                "original_file": input_path.name,
-                "segment_index": idx,
-                "duration": seg_duration,
-                "start_time": float(start_time),
-                "end_time": float(end_time),
-            }
-            segment_info_list.append(segment_info)
-
-            # GC ocasional (para longos loops)
-            if (idx + 1) % 100 == 0:
-                gc.collect()
-                logger.info(f"   Progresso: {idx + 1}/{len(final_segments)} segmentos extraídos...")
+    A saída é determinística: segmentos na ordem dos arquivos de entrada,
+    independente da ordem de conclusão. Com `resume`, arquivos cujo manifest
+    tem o mesmo hash de config (e WAVs presentes) não são reprocessados.
+    """
+    config_hash = segmentation_config_hash(config)
+    results: dict[int, list[dict]] = {}
+    todo: list[int] = []
+
+    for i, audio_file in enumerate(audio_files):
+        cached = load_segment_manifest(audio_file, output_dir, manifest_dir, config_hash) if resume else None
+        if cached is not None:
+            results[i] = cached
+            logger.info(f"⏭️  {audio_file.name}: {len(cached)} segmentos já existentes (config {config_hash})")
+        else:
+            todo.append(i)
+
+    def job_args(i: int) -> tuple:
+        return (audio_files[i], output_dir, manifest_dir, config, config_hash, writer_threads)
+
+    if num_workers <= 1 or len(todo) <= 1:
+        for n, i in enumerate(todo, 1):
+            logger.info(f"[{n}/{len(todo)}] Processando {audio_files[i].name}")
+            try:
+                results[i] = _segment_file_job(*job_args(i))
+            except Exception as e:
+                logger.error(f"❌ Erro ao processar {audio_files[i].name}: {e}", exc_info=True)
+    else:
+        workers = min(num_workers, len(todo))
+        logger.info(f"🚀 Segmentando {len(todo)} arquivos em {workers} processos")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_segment_file_job, *job_args(i)): i for i in todo}
+            for n, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                    logger.info(f"[{n}/{len(todo)}] ✅ {audio_files[i].name}: {len(results[i])} segmentos")
+                except Exception as e:
+                    logger.error(f"[{n}/{len(todo)}] ❌ Erro ao processar {audio_files[i].name}: {e}")
 
-    logger.info(f"   ✅ {len(segment_info_list)} segmentos salvos para {input_path.name}\n")
-    return segment_info_list
+    return [segment for i in range(len(audio_files)) for segment in results.get(i, [])]
 
 
 # ======================
@@ -510,6 +1043,7 @@ def main():
     logger.info("=" * 80)
 
     config = load_config()
+    seg_config = config["segmentation"]
 
     data_dir = project_root / "train" / "data"
     raw_dir = data_dir / "raw"
@@ -525,19 +1059,16 @@ def main():
 
     logger.info(f"📁 {len(audio_files)} arquivos encontrados em {raw_dir}\n")
 
-    all_segments: list[dict] = []
-
-    for i, audio_file in enumerate(audio_files, 1):
-        logger.info(f"[{i}/{len(audio_files)}] Processando {audio_file.name}")
-        try:
-            segs = process_audio_file(audio_file, wavs_dir, config)
-            all_segments.extend(segs)
-        except Exception as e:
-            logger.error(f"❌ Erro ao processar {audio_file.name}: {e}")
-            import traceback
-
-            traceback.print_exc()
-        gc.collect()
+    num_workers = int(seg_config.get("num_workers", 0)) or (os.cpu_count() or 1)
+    all_segments = segment_files(
+        audio_files,
+        wavs_dir,
+        config,
+        manifest_dir=processed_dir / "segment_manifests",
+        num_workers=num_workers,
+        writer_threads=int(seg_config.get("writer_threads", 2)),
+        resume=bool(seg_config.get("resume", True)),
+    )
 
     processed_dir.mkdir(parents=True, exist_ok=True)
     mapping_file = processed_dir / "segments_mapping.json"
@@ -0,0 +1,214 @@
+"""
+Estágios em streaming com filas limitadas (pipeline de dataset)
+
+Cada `Stage` tem N threads consumindo a fila de entrada e produzindo
+zero ou mais itens para o próximo estágio. As filas entre estágios são
+limitadas (`queue_size`): um estágio lento segura os anteriores
+(backpressure) em vez de acumular o corpus inteiro em memória/disco.
+
+- `batch_size > 1`: o worker junta até `batch_size` itens (esperando no
+  máximo `batch_timeout` segundos pelos seguintes) e chama `fn` com a
+  lista (ex.: lotes do Whisper)
+- Erro em um item é logado e contado (`failed`); o pipeline continua
+- Relatório ao vivo a cada `report_interval` segundos: itens por
+  estágio, throughput, backlog da fila e ocupação dos workers
+
+Uso:
+    stats = run_stages(videos, [
+        Stage("download", download, workers=4),
+        Stage("segment", segment, workers=2),
+        Stage("transcribe", transcribe, batch_size=16, batch_timeout=5.0),
+    ])
+"""
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()  # sentinela de fim de fluxo (um por worker)
+
+
+@dataclass
+class Stage:
+    """Estágio: `fn(item)` (ou `fn(lista)` com batch_size > 1) -> itens de saída"""
+
+    name: str
+    fn: Callable[[object], Iterable | None]
+    workers: int = 1
+    queue_size: int = 8
+    batch_size: int = 1
+    batch_timeout: float = 1.0
+
+
+@dataclass
+class StageStats:
+    """Contadores de um estágio (atualizados pelos workers)"""
+
+    name: str
+    workers: int
+    received: int = 0
+    emitted: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float | None = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Itens de entrada processados por segundo"""
+        return self.received / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Fração do tempo em que os workers estavam processando (não esperando)"""
+        return self.busy_seconds / (self.elapsed * self.workers) if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "received": self.received,
+            "emitted": self.emitted,
+            "failed": self.failed,
+            "seconds": round(self.elapsed, 2),
+            "items_per_second": round(self.throughput, 3),
+            "utilization": round(self.utilization, 3),
+        }
+
+
+def _next_batch(inbox: queue.Queue, stage: Stage) -> tuple[list, bool]:
+    """(itens, fim do fluxo?) — bloqueia pelo primeiro, espera batch_timeout pelos demais"""
+    item = inbox.get()
+    if item is _DONE:
+        return [], True
+    batch = [item]
+    deadline = time.monotonic() + stage.batch_timeout
+    while len(batch) < stage.batch_size:
+        try:
+            item = inbox.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            break
+        if item is _DONE:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+
+def format_report(stages: list[Stage], stats: list[StageStats], queues: list[queue.Queue]) -> str:
+    parts = []
+    for stage, stat, inbox in zip(stages, stats, queues):
+        parts.append(
+            f"{stage.name}: {stat.received} in/{stat.emitted} out ({stat.throughput:.2f}/s), "
+            f"fila {inbox.qsize()}/{stage.queue_size}, ocupação {stat.utilization:.0%}"
+            + (f", {stat.failed} falhas" if stat.failed else "")
+        )
+    return "📊 " + " | ".join(parts)
+
+
+def run_stages(
+    source: Iterable,
+    stages: list[Stage],
+    report_interval: float = 10.0,
+    sink: Callable[[object], None] | None = None,
+) -> list[StageStats]:
+    """
+    Executa os estágios em streaming sobre os itens de `source`.
+
+    Args:
+        source: itens de entrada do primeiro estágio (consumido numa thread)
+        stages: estágios em ordem
+        report_interval: segundos entre relatórios ao vivo (0 = desligado)
+        sink: recebe cada item de saída do último estágio
+
+    Returns:
+        Estatísticas por estágio
+    """
+    queues = [queue.Queue(maxsize=max(1, stage.queue_size)) for stage in stages]
+    stats = [StageStats(stage.name, max(1, stage.workers)) for stage in stages]
+    remaining = [max(1, stage.workers) for stage in stages]
+    remaining_lock = threading.Lock()
+    finished = threading.Event()
+
+    def emit(index: int, item) -> None:
+        if index + 1 < len(stages):
+            queues[index + 1].put(item)
+        elif sink is not None:
+            sink(item)
+
+    def worker(index: int) -> None:
+        stage, stat, inbox = stages[index], stats[index], queues[index]
+        done = False
+        while not done:
+            if stage.batch_size > 1:
+                items, done = _next_batch(inbox, stage)
+                if not items:
+                    break
+                payload = items
+            else:
+                item = inbox.get()
+                if item is _DONE:
+                    break
+                items, payload = [item], item
+
+            start = time.monotonic()
+            outputs = []
+            try:
+                outputs = list(stage.fn(payload) or ())
+            except Exception as e:
+                with stat.lock:
+                    stat.failed += len(items)
+                logger.error(f"❌ [{stage.name}] {e}", exc_info=True)
+            with stat.lock:
+                stat.received += len(items)
+                stat.emitted += len(outputs)
+                stat.busy_seconds += time.monotonic() - start
+            for output in outputs:
+                emit(index, output)
+
+        # Último worker do estágio: fecha o fluxo do próximo
+        with remaining_lock:
+            remaining[index] -= 1
+            last = remaining[index] == 0
+        if last:
+            stat.finished_at = time.monotonic()
+            if index + 1 < len(stages):
+                for _ in range(remaining[index + 1]):
+                    queues[index + 1].put(_DONE)
+
+    def feeder() -> None:
+        try:
+            for item in source:
+                queues[0].put(item)
+        finally:
+            for _ in range(remaining[0]):
+                queues[0].put(_DONE)
+
+    def reporter() -> None:
+        while not finished.wait(report_interval):
+            logger.info(format_report(stages, stats, queues))
+
+    threads = [threading.Thread(target=feeder, name="stream-source", daemon=True)]
+    for index, stage in enumerate(stages):
+        threads += [
+            threading.Thread(target=worker, args=(index,), name=f"stream-{stage.name}-{n}", daemon=True)
+            for n in range(max(1, stage.workers))
+        ]
+    if report_interval > 0:
+        threading.Thread(target=reporter, name="stream-report", daemon=True).start()
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    finished.set()
+
+    logger.info(format_report(stages, stats, queues))
+    return stats
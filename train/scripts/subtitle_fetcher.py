@@ -0,0 +1,330 @@
+"""
+Download concorrente de legendas do YouTube com rate limit compartilhado
+
+Antes: `download_youtube_subtitles` sequencial por vídeo, e o primeiro
+HTTP 429 interrompia a etapa de legendas inteira. Agora:
+
+- Pool limitado de workers (`youtube.subtitles.workers`)
+- `TokenBucket` único para todos os workers: no máximo
+  `requests_per_second` requisições/s (rajadas até `burst`)
+- `HostBackoff`: backoff exponencial por host após 429/5xx (respeita
+  `Retry-After`); um host em backoff não bloqueia os outros
+- `SubtitleCache`: manifest em disco (`subtitles_manifest.json`) com o
+  arquivo baixado ou "sem legenda" por vídeo; reruns pulam esses vídeos.
+  Vídeos que falharam (rate limit esgotado, erro de rede) são tentados de
+  novo na próxima execução
+
+Duas etapas por vídeo, ambas pelo rate limiter:
+1. `resolve`: lista de faixas (lang, ext, url); padrão via yt-dlp
+   (`extract_info` sem download), injetável para testes
+2. download HTTP da faixa escolhida (urllib), escrita atômica
+
+Uso:
+    fetcher = SubtitleFetcher.from_config(config, subtitles_dir)
+    subtitle_files = fetcher.fetch_all({video_id: youtube_url, ...})
+"""
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import os
+from pathlib import Path
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+# (lang, ext, url) em ordem de preferência
+Track = tuple[str, str, str]
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class RateLimited(Exception):
+    """Host respondeu 429/5xx (ou yt-dlp reportou HTTP 429)"""
+
+    def __init__(self, host: str, retry_after: float | None = None):
+        super().__init__(f"rate limited by {host}")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket thread-safe: `rate` tokens/s, até `capacity` acumulados"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Bloqueia até haver `tokens` (limitado à capacidade; rate <= 0 = sem limite)"""
+        if self.rate <= 0:
+            return
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostBackoff:
+    """Backoff exponencial com jitter, independente por host"""
+
+    def __init__(self, base: float = 2.0, max_delay: float = 120.0):
+        self.base = base
+        self.max_delay = max_delay
+        self._failures: dict[str, int] = {}
+        self._not_before: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host: str) -> None:
+        """Dorme até o fim do backoff atual do host"""
+        with self._lock:
+            delay = self._not_before.get(host, 0.0) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def failure(self, host: str, retry_after: float | None = None) -> float:
+        """Registra falha; retorna o atraso aplicado ao host"""
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            delay = min(self.max_delay, self.base * 2 ** (failures - 1))
+            delay *= random.uniform(0.5, 1.0)  # jitter: workers não voltam juntos
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, self.max_delay))
+            self._not_before[host] = max(self._not_before.get(host, 0.0), time.monotonic() + delay)
+            return delay
+
+    def success(self, host: str) -> None:
+        with self._lock:
+            self._failures.pop(host, None)
+
+    def failures(self, host: str) -> int:
+        with self._lock:
+            return self._failures.get(host, 0)
+
+
+class SubtitleCache:
+    """Manifest em disco dos vídeos já resolvidos (arquivo ou sem legenda)"""
+
+    def __init__(self, subtitles_dir: Path):
+        self.subtitles_dir = Path(subtitles_dir)
+        self.path = self.subtitles_dir / "subtitles_manifest.json"
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except Exception as e:
+                logger.warning(f"⚠️ Manifest de legendas inválido ({e}), recomeçando")
+
+    def lookup(self, video_id: str) -> tuple[bool, Path | None]:
+        """(em cache?, arquivo de legenda ou None se o vídeo não tem legenda)"""
+        with self._lock:
+            entry = self._entries.get(video_id)
+        if entry is None:
+            return False, None
+        if entry["status"] == "missing":
+            return True, None
+        subtitle_file = self.subtitles_dir / entry["file"]
+        return (True, subtitle_file) if subtitle_file.exists() else (False, None)
+
+    def record(self, video_id: str, subtitle_file: Path | None) -> None:
+        entry = {"status": "missing"} if subtitle_file is None else {"status": "ok", "file": subtitle_file.name}
+        with self._lock:
+            self._entries[video_id] = entry
+            self._save()
+
+    def _save(self) -> None:
+        self.subtitles_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def resolve_youtube_tracks(youtube_url: str, langs: list[str], formats: list[str], auto_subs: bool) -> list[Track]:
+    """Faixas de legenda de um vídeo via yt-dlp (sem baixar nada)"""
+    import yt_dlp
+
+    ydl_opts = {
+        "skip_download": True,
+        "quiet": True,
+        "extractor_args": {"youtube": ["player_client=default"]},
+    }
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(youtube_url, download=False)
+    except yt_dlp.utils.DownloadError as e:
+        if "HTTP Error 429" in str(e):
+            raise RateLimited(urllib.parse.urlsplit(youtube_url).netloc) from e
+        raise
+
+    sources = [info.get("subtitles") or {}]
+    if auto_subs:
+        sources.append(info.get("automatic_captions") or {})
+
+    tracks: list[Track] = []
+    for source in sources:  # legendas manuais antes das automáticas
+        for lang in langs:
+            available = {t.get("ext"): t.get("url") for t in source.get(lang, []) if t.get("url")}
+            tracks += [(lang, ext, available[ext]) for ext in formats if ext in available]
+    return tracks
+
+
+class SubtitleFetcher:
+    """Baixa legendas de vários vídeos em paralelo com rate limit compartilhado"""
+
+    def __init__(
+        self,
+        subtitles_dir: Path,
+        langs: list[str],
+        formats: list[str],
+        auto_subs: bool = True,
+        workers: int = 4,
+        requests_per_second: float = 1.0,
+        burst: int = 2,
+        max_attempts: int = 5,
+        backoff_base: float = 2.0,
+        backoff_max: float = 120.0,
+        timeout: float = 30.0,
+        resolve: Callable[[str], list[Track]] | None = None,
+    ):
+        self.subtitles_dir = Path(subtitles_dir)
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.timeout = timeout
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.backoff = HostBackoff(backoff_base, backoff_max)
+        self.cache = SubtitleCache(self.subtitles_dir)
+        self.resolve = resolve or (lambda url: resolve_youtube_tracks(url, langs, formats, auto_subs))
+
+    @classmethod
+    def from_config(cls, config: dict, subtitles_dir: Path, **kwargs) -> "SubtitleFetcher":
+        sub_config = config["youtube"]["subtitles"]
+        formats = sub_config.get("subtitle_formats") or sub_config.get("format", ["vtt", "srt"])
+        return cls(
+            subtitles_dir,
+            langs=list(sub_config.get("subtitle_langs") or sub_config.get("languages", ["pt"])),
+            formats=[formats] if isinstance(formats, str) else list(formats),
+            auto_subs=sub_config.get("download_auto_subs", sub_config.get("auto_generated", True)),
+            workers=int(sub_config.get("workers", 4)),
+            requests_per_second=float(sub_config.get("requests_per_second", 1.0)),
+            burst=int(sub_config.get("burst", 2)),
+            max_attempts=int(sub_config.get("max_attempts", config["youtube"].get("max_retries", 3))),
+            backoff_base=float(sub_config.get("backoff_base", config["youtube"].get("retry_delay", 2.0))),
+            backoff_max=float(sub_config.get("backoff_max", 120.0)),
+            **kwargs,
+        )
+
+    # ==================== HTTP ====================
+
+    def _call(self, host: str, request: Callable[[], object]):
+        """Executa `request` respeitando token bucket e backoff do host"""
+        for attempt in range(1, self.max_attempts + 1):
+            self.backoff.wait(host)
+            self.bucket.acquire()
+            try:
+                result = request()
+            except RateLimited as e:
+                if attempt == self.max_attempts:
+                    raise
+                delay = self.backoff.failure(e.host, e.retry_after)
+                logger.warning(f"   ⚠️  {e.host}: rate limit, nova tentativa em {delay:.1f}s ({attempt}/{self.max_attempts})")
+                continue
+            self.backoff.success(host)
+            return result
+
+    def _get(self, url: str) -> bytes:
+        host = urllib.parse.urlsplit(url).netloc
+
+        def request() -> bytes:
+            try:
+                with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                    return response.read()
+            except urllib.error.HTTPError as e:
+                if e.code in RETRYABLE_STATUS:
+                    retry_after = e.headers.get("Retry-After") if e.headers else None
+                    raise RateLimited(host, float(retry_after) if retry_after and retry_after.isdigit() else None)
+                raise
+
+        return self._call(host, request)
+
+    # ==================== DOWNLOAD ====================
+
+    def fetch(self, video_id: str, youtube_url: str) -> Path | None:
+        """Legenda de um vídeo (cache em disco primeiro); None se não houver"""
+        cached, subtitle_file = self.cache.lookup(video_id)
+        if cached:
+            return subtitle_file
+
+        host = urllib.parse.urlsplit(youtube_url).netloc
+        tracks = self._call(host, lambda: self.resolve(youtube_url))
+        if not tracks:
+            logger.warning(f"   ⚠️  Legendas não encontradas para video_{video_id}")
+            self.cache.record(video_id, None)
+            return None
+
+        lang, ext, url = tracks[0]
+        content = self._get(url)
+
+        self.subtitles_dir.mkdir(parents=True, exist_ok=True)
+        subtitle_file = self.subtitles_dir / f"video_{video_id.zfill(5)}.{lang}.{ext}"
+        tmp_path = subtitle_file.with_name(subtitle_file.name + ".tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, subtitle_file)
+
+        self.cache.record(video_id, subtitle_file)
+        logger.info(f"   ✅ Legendas encontradas: {subtitle_file.name}")
+        return subtitle_file
+
+    def fetch_all(self, videos: dict[str, str]) -> dict[str, Path]:
+        """
+        Baixa as legendas de `videos` (video_id -> youtube_url).
+
+        Falhas de um vídeo (rate limit esgotado, erro HTTP/rede) não
+        interrompem os demais; esses vídeos ficam fora do cache e são
+        tentados de novo no próximo rerun.
+
+        Returns:
+            video_id -> arquivo de legenda (só vídeos com legenda)
+        """
+        results: dict[str, Path] = {}
+        failed = 0
+
+        def task(item: tuple[str, str]) -> tuple[str, Path | None, Exception | None]:
+            video_id, youtube_url = item
+            try:
+                return video_id, self.fetch(video_id, youtube_url), None
+            except Exception as e:
+                return video_id, None, e
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="subtitles") as executor:
+            for video_id, subtitle_file, error in executor.map(task, videos.items()):
+                if error is not None:
+                    failed += 1
+                    logger.warning(f"   ⚠️  video_{video_id}: erro ao baixar legendas ({error})")
+                elif subtitle_file is not None:
+                    results[video_id] = subtitle_file
+
+        logger.info(
+            f"📄 Legendas: {len(results)}/{len(videos)} vídeos"
+            + (f", {failed} falhas (tentadas de novo no próximo rerun)" if failed else "")
+        )
+        return results
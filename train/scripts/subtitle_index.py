@@ -0,0 +1,115 @@
+"""
+Índice de legendas por tempo (VTT/SRT) para alinhar texto a segmentos
+
+`parse_subtitle_cues` mantém os timestamps de cada cue (o parse_subtitle_file
+antigo achatava tudo num único texto por vídeo). `SubtitleIndex` guarda os
+cues ordenados por início e responde "quais cues caem em [start, end)?" com
+busca binária, em O(log n + k):
+
+- `bisect` em `starts` limita os cues que começam antes do fim do segmento
+- `bisect` no máximo acumulado de `ends` acha o primeiro cue que ainda
+  termina depois do início do segmento (cues podem se sobrepor)
+
+Um cue pertence ao segmento se o seu ponto médio está em [start, end): cada
+cue vai para um único segmento, mesmo cortado na borda.
+
+Legendas automáticas do YouTube repetem a linha anterior em cada cue
+(texto "rolante") e trazem tags de tempo inline (<00:00:01.234><c>...</c>);
+linhas repetidas são descartadas no parse.
+"""
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from pathlib import Path
+import re
+
+_TIMING_RE = re.compile(
+    r"(?P<start>(?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})\s*-->\s*(?P<end>(?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})"
+)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACES_RE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class SubtitleCue:
+    start: float
+    end: float
+    text: str
+
+
+def parse_timestamp(value: str) -> float:
+    """'01:02:03.456', '02:03,456' -> segundos"""
+    parts = value.replace(",", ".").split(":")
+    seconds = float(parts[-1])
+    minutes = int(parts[-2]) if len(parts) >= 2 else 0
+    hours = int(parts[-3]) if len(parts) >= 3 else 0
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def parse_subtitle_cues(subtitle_path: Path) -> list[SubtitleCue]:
+    """Cues de um arquivo VTT ou SRT, ordenados por início"""
+    with open(subtitle_path, encoding="utf-8-sig") as f:
+        content = f.read()
+
+    cues: list[SubtitleCue] = []
+    previous_line = None
+    # Blocos separados por linha em branco; o bloco do cue contém a linha "-->"
+    for block in re.split(r"\n\s*\n", content.replace("\r\n", "\n")):
+        lines = block.strip().split("\n")
+        for position, line in enumerate(lines):
+            timing = _TIMING_RE.search(line)
+            if timing:
+                break
+        else:
+            continue  # cabeçalho WEBVTT, NOTE, STYLE ...
+
+        new_lines = []
+        for line in lines[position + 1:]:
+            line = _SPACES_RE.sub(" ", _TAG_RE.sub("", line)).strip()
+            if not line or line == previous_line:
+                continue
+            new_lines.append(line)
+            previous_line = line
+        if not new_lines:
+            continue
+
+        start = parse_timestamp(timing.group("start"))
+        end = parse_timestamp(timing.group("end"))
+        cues.append(SubtitleCue(start, max(start, end), " ".join(new_lines)))
+
+    cues.sort(key=lambda cue: (cue.start, cue.end))
+    return cues
+
+
+class SubtitleIndex:
+    """Cues ordenados com consulta por intervalo em O(log n + k)"""
+
+    def __init__(self, cues: list[SubtitleCue]):
+        self.cues = sorted(cues, key=lambda cue: (cue.start, cue.end))
+        self.starts = [cue.start for cue in self.cues]
+        # Máximo acumulado dos fins: não decrescente, permite bisect mesmo com sobreposição
+        self.max_ends = list(accumulate((cue.end for cue in self.cues), max))
+
+    @classmethod
+    def from_file(cls, subtitle_path: Path) -> "SubtitleIndex":
+        return cls(parse_subtitle_cues(subtitle_path))
+
+    def __len__(self) -> int:
+        return len(self.cues)
+
+    def overlapping(self, start: float, end: float) -> list[SubtitleCue]:
+        """Cues que se sobrepõem a [start, end)"""
+        lo = bisect_right(self.max_ends, start)
+        hi = bisect_left(self.starts, end)
+        return [cue for cue in self.cues[lo:hi] if cue.end > start]
+
+    def cues_for_segment(self, start: float, end: float) -> list[SubtitleCue]:
+        """Cues atribuídos ao segmento (ponto médio do cue em [start, end))"""
+        return [cue for cue in self.overlapping(start, end) if start <= (cue.start + cue.end) / 2 < end]
+
+    def text_for_segment(self, start: float, end: float) -> str:
+        return " ".join(cue.text for cue in self.cues_for_segment(start, end))
+
+    def full_text(self) -> str:
+        return "\n".join(cue.text for cue in self.cues)
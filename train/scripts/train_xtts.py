@@ -42,6 +42,7 @@ sys.path.insert(0, str(project_root))
 
 # Import Pydantic Settings
 from train.train_settings import get_train_settings, TrainingSettings
+from train.scripts.data_loading import LengthBucketSampler, LoaderMetrics, WaveformCollator
 
 # Setup logging (apenas StreamHandler para Docker)
 logging.basicConfig(
@@ -222,6 +223,40 @@ def setup_lora(model: nn.Module, settings: TrainingSettings) -> nn.Module:
     return model
 
 
+def create_packed_dataset(settings: TrainingSettings):
+    """
+    (train, val) sobre shards memory-mapped (packed_shards.py), ou None se
+    desabilitado, ausentes ou desatualizados (metadata/sample rate mudou)
+    """
+    if not settings.use_packed_dataset:
+        return None
+    
+    from train.scripts.packed_shards import PackedDataset, is_current
+    
+    packed_dir = settings.packed_dataset_dir
+    splits = {
+        "train": settings.dataset_dir / settings.train_metadata,
+        "val": settings.dataset_dir / settings.val_metadata,
+    }
+    if not all(
+        metadata.exists() and is_current(packed_dir / split, metadata, settings.sample_rate)
+        for split, metadata in splits.items()
+    ):
+        logger.info("💡 Shards empacotados ausentes ou desatualizados, lendo WAVs")
+        logger.info("   Para empacotar: python -m train.scripts.packed_shards")
+        return None
+    
+    max_samples = settings.max_train_samples
+    train_dataset = PackedDataset(packed_dir / "train", max_samples=max_samples)
+    val_dataset = PackedDataset(packed_dir / "val", max_samples=max_samples // 10 if max_samples else None)
+    
+    logger.info(f"📦 Shards empacotados: {packed_dir} ({train_dataset.manifest['audio_dtype']}, "
+                f"{train_dataset.sample_rate} Hz)")
+    logger.info(f"✅ Dataset carregado: {len(train_dataset)} train, {len(val_dataset)} val samples")
+    
+    return train_dataset, val_dataset
+
+
 def create_dataset(settings: TrainingSettings):
     """
     Cria dataset para treinamento
@@ -236,6 +271,7 @@ def create_dataset(settings: TrainingSettings):
         def __init__(self, metadata_path, sample_rate=22050, max_samples=None):
             self.sample_rate = sample_rate
             self.samples = []
+            self.lengths = []
             
             with open(metadata_path, 'r', encoding='utf-8') as f:
                 for line in f:
@@ -249,8 +285,13 @@ def create_dataset(settings: TrainingSettings):
                             dataset_dir = Path(metadata_path).parent
                             audio_path = dataset_dir / audio_path
                         
-                        if Path(audio_path).exists():
-                            self.samples.append({'audio_path': str(audio_path), 'text': text})
+                        # stat: existência + tamanho (proxy da duração para os buckets)
+                        try:
+                            size = os.stat(audio_path).st_size
+                        except OSError:
+                            continue
+                        self.samples.append({'audio_path': str(audio_path), 'text': text})
+                        self.lengths.append(size)
                     
                     # Limitar amostras se especificado (para teste rápido)
                     if max_samples and len(self.samples) >= max_samples:
@@ -271,6 +312,10 @@ def create_dataset(settings: TrainingSettings):
     logger.info("📊 Carregando dataset...")
     
     dataset_dir = settings.dataset_dir
+    packed = create_packed_dataset(settings)
+    if packed is not None:
+        return packed
+    
     train_metadata = dataset_dir / settings.train_metadata
     val_metadata = dataset_dir / settings.val_metadata
     max_samples = settings.max_train_samples
@@ -313,6 +358,93 @@ def create_dataset(settings: TrainingSettings):
     return train_dataset, val_dataset
 
 
+def prepare_feature_cache(model, train_dataset, val_dataset, settings: TrainingSettings):
+    """
+    Troca o áudio pelos mels do cache (feature_cache.py), calculando o que
+    faltar: mels de train/val e latents de condicionamento das referências.
+    
+    A chave do cache inclui sample_rate e config de áudio/mel: mudou,
+    recalcula (e o cache antigo é removido).
+    
+    Returns:
+        (train, val, latents) — latents = (gpt_cond_latents, speaker_embeddings) ou None
+    """
+    if not settings.use_feature_cache:
+        return train_dataset, val_dataset, None
+    
+    from train.scripts.feature_cache import CachedFeatureDataset, FeatureCache
+    
+    cache = FeatureCache.for_settings(settings)
+    for stale in cache.prune_stale():
+        logger.info(f"🧹 Cache de features desatualizado removido: {stale.name}")
+    
+    datasets = {}
+    for split, dataset in (("train", train_dataset), ("val", val_dataset)):
+        if cache.has_mels(split, dataset):
+            logger.info(f"📂 Mels em cache ({split}): {cache.dir / split}")
+            mels = cache.mels(split)
+        else:
+            logger.info(f"🔄 Calculando mels de {len(dataset)} amostras ({split}, cache {cache.key})...")
+            start = time.time()
+            mels = cache.build_mels(split, dataset, workers=max(1, settings.num_workers))
+            logger.info(f"   ✅ {mels.manifest['total_frames']} frames em {time.time() - start:.1f}s")
+        datasets[split] = CachedFeatureDataset(dataset, mels)
+    
+    latents = None
+    try:
+        if not cache.has_latents():
+            logger.info(f"🔄 Calculando latents de condicionamento ({settings.num_reference_clips} referências)...")
+            cache.build_latents(model, train_dataset)
+        latents = cache.reference_latents()
+        logger.info(f"📂 Latents de condicionamento em cache: {latents[0].shape[0]} referências")
+    except Exception as e:
+        logger.warning(f"⚠️  Latents de condicionamento não calculados: {e}")
+    
+    return datasets["train"], datasets["val"], latents
+
+
+def create_dataloaders(train_dataset, val_dataset, settings: TrainingSettings, device: torch.device):
+    """
+    DataLoaders de treino/validação (data_loading.py)
+    
+    - WaveformCollator: leitura/resample/padding nos workers
+    - pin_memory em CUDA: cópia host→GPU assíncrona (non_blocking)
+    - LengthBucketSampler no treino (bucket_by_length): lotes de duração parecida
+    """
+    collate_fn = WaveformCollator(settings.sample_rate)
+    workers = settings.num_workers
+    loader_kwargs = dict(
+        num_workers=workers,
+        collate_fn=collate_fn,
+        pin_memory=settings.pin_memory and device.type == 'cuda',
+    )
+    if workers > 0:
+        loader_kwargs.update(persistent_workers=True, prefetch_factor=settings.prefetch_factor)
+    
+    if settings.bucket_by_length:
+        train_loader = DataLoader(
+            train_dataset,
+            batch_sampler=LengthBucketSampler(
+                train_dataset.lengths,
+                settings.batch_size,
+                bucket_size_multiplier=settings.bucket_size_multiplier,
+            ),
+            **loader_kwargs,
+        )
+    else:
+        train_loader = DataLoader(train_dataset, batch_size=settings.batch_size, shuffle=True, **loader_kwargs)
+    
+    # Validação: ordem fixa, ordenada por duração (menos padding)
+    val_order = sorted(range(len(val_dataset)), key=lambda i: val_dataset.lengths[i])
+    val_batches = [val_order[i:i + settings.batch_size] for i in range(0, len(val_order), settings.batch_size)]
+    val_loader = DataLoader(val_dataset, batch_sampler=val_batches, **loader_kwargs)
+    
+    logger.info(f"🔄 DataLoader: {workers} workers, pin_memory={loader_kwargs['pin_memory']}, "
+                f"buckets por duração={'sim' if settings.bucket_by_length else 'não'}")
+    
+    return train_loader, val_loader
+
+
 def create_optimizer(model: nn.Module, settings: TrainingSettings):
     """Cria otimizador AdamW usando Pydantic Settings"""
     optimizer = torch.optim.AdamW(
@@ -360,46 +492,20 @@ def train_step(model, batch, optimizer, scaler, settings: TrainingSettings, devi
     
     XTTS não expõe forward() tradicional para treinamento.
     Usamos loss baseado em parâmetros + componente variável real.
-    """
-    import torchaudio
     
+    Com use_feature_cache o componente variável é calculado sobre o log-mel
+    (não sobre a waveform): a escala do loss muda ~100x e não é comparável
+    com runs/checkpoints sem o cache.
+    """
     model.train()
     
-    # Carregar áudio e processar
-    audio_paths = [item['audio_path'] for item in batch]
-    texts = [item['text'] for item in batch]
-    
-    # Carregar áudios
-    wavs = []
-    for audio_path in audio_paths:
-        try:
-            wav, sr = torchaudio.load(audio_path)
-            # Resample se necessário
-            if sr != settings.sample_rate:
-                resampler = torchaudio.transforms.Resample(sr, settings.sample_rate)
-                wav = resampler(wav)
-            # Mono
-            if wav.shape[0] > 1:
-                wav = wav.mean(dim=0, keepdim=True)
-            wavs.append(wav)
-        except Exception as e:
-            logger.warning(f"⚠️  Erro ao carregar {audio_path}: {e}")
-            continue
-    
-    if len(wavs) == 0:
+    # Áudio (ou mels do cache) já com padding nos workers (WaveformCollator)
+    features = batch["mels"] if "mels" in batch else batch["audio"]
+    if features.shape[0] == 0:
         logger.error("❌ Nenhum áudio válido no batch!")
         return 0.0
     
-    # Pad/collate batch
-    max_len = max(wav.shape[1] for wav in wavs)
-    wavs_padded = []
-    for wav in wavs:
-        if wav.shape[1] < max_len:
-            pad_len = max_len - wav.shape[1]
-            wav = torch.nn.functional.pad(wav, (0, pad_len))
-        wavs_padded.append(wav)
-    
-    wavs_tensor = torch.stack(wavs_padded).squeeze(1).to(device)  # [B, T]
+    wavs_tensor = features.to(device, non_blocking=True)  # [B, T] ou [B, n_mels, frames] (memória pinned)
     
     # LOSS REAL baseado em ativações dos parâmetros treináveis
     # Soma L2 dos parâmetros (weight decay)
@@ -444,8 +550,6 @@ def validate(model, val_loader, device: torch.device, settings: TrainingSettings
     
     Retorna loss médio no conjunto de validação
     """
-    import torchaudio
-    
     model.eval()
     total_loss = 0.0
     count = 0
@@ -453,33 +557,11 @@ def validate(model, val_loader, device: torch.device, settings: TrainingSettings
     with torch.no_grad():
         for batch in val_loader:
             try:
-                # Carregar áudios
-                audio_paths = [item['audio_path'] for item in batch]
-                
-                wavs = []
-                for audio_path in audio_paths:
-                    wav, sr = torchaudio.load(audio_path)
-                    if sr != settings.sample_rate:
-                        resampler = torchaudio.transforms.Resample(sr, settings.sample_rate)
-                        wav = resampler(wav)
-                    # Mono
-                    if wav.shape[0] > 1:
-                        wav = wav.mean(dim=0, keepdim=True)
-                    wavs.append(wav)
-                
-                if len(wavs) == 0:
+                features = batch["mels"] if "mels" in batch else batch["audio"]
+                if features.shape[0] == 0:
                     continue
                 
-                # Pad batch
-                max_len = max(wav.shape[1] for wav in wavs)
-                wavs_padded = []
-                for wav in wavs:
-                    if wav.shape[1] < max_len:
-                        pad_len = max_len - wav.shape[1]
-                        wav = torch.nn.functional.pad(wav, (0, pad_len))
-                    wavs_padded.append(wav)
-                
-                wavs_tensor = torch.stack(wavs_padded).squeeze(1).to(device)
+                wavs_tensor = features.to(device, non_blocking=True)
                 
                 # Loss de validação (similar ao treino mas sem backward)
                 param_norm = sum((p ** 2).sum().item() for p in model.parameters() if p.requires_grad) * 1e-8
@@ -1030,27 +1112,12 @@ def main(resume):
     # Create datasets
     train_dataset, val_dataset = create_dataset(settings)
     
-    # Create dataloaders com collate_fn para batches de dicts
-    from torch.utils.data import DataLoader
+    # Features (mels + latents) calculadas uma vez por dataset/config
+    train_dataset, val_dataset, reference_latents = prepare_feature_cache(model, train_dataset, val_dataset, settings)
     
-    def collate_fn(batch):
-        """Collate function para batches de dicts"""
-        return batch  # Retorna lista de dicts, processamento no train_step
-    
-    train_loader = DataLoader(
-        train_dataset,
-        batch_size=settings.batch_size,
-        shuffle=True,
-        num_workers=settings.num_workers,
-        collate_fn=collate_fn,
-    )
-    val_loader = DataLoader(
-        val_dataset,
-        batch_size=settings.batch_size,
-        shuffle=False,
-        num_workers=settings.num_workers,
-        collate_fn=collate_fn,
-    )
+    # Dataloaders: decode + padding nos workers, buckets por duração
+    train_loader, val_loader = create_dataloaders(train_dataset, val_dataset, settings, device)
+    loader_metrics = LoaderMetrics()
     
     logger.info(f"\n📊 Datasets carregados:")
     logger.info(f"   Train: {len(train_dataset)} samples")
@@ -1065,8 +1132,10 @@ def main(resume):
         
         epoch_loss = 0.0
         num_batches = 0
+        if isinstance(train_loader.batch_sampler, LengthBucketSampler):
+            train_loader.batch_sampler.set_epoch(epoch)
         
-        for batch_idx, batch in enumerate(train_loader):
+        for batch_idx, batch in enumerate(loader_metrics.iterate(train_loader)):
             # Train step
             loss = train_step(model, batch, optimizer, scaler, settings, device)
             epoch_loss += loss
@@ -1096,15 +1165,20 @@ def main(resume):
         
         # Validation após cada época
         avg_epoch_loss = epoch_loss / num_batches if num_batches > 0 else 0.0
+        throughput = loader_metrics.epoch_summary()
         val_loss = validate(model, val_loader, device, settings)
         
         logger.info(f"\n📊 EPOCH {epoch} COMPLETO")
         logger.info(f"   Train Loss: {avg_epoch_loss:.4f}")
-        logger.info(f"   Val Loss: {val_loss:.4f}\n")
+        logger.info(f"   Val Loss: {val_loss:.4f}")
+        logger.info(f"   ⏱️  Throughput: {throughput['samples_per_sec']:.1f} samples/s | "
+                    f"Espera por dados: {throughput['data_wait_fraction']:.1%}\n")
         
         if writer is not None:
             writer.add_scalar('epoch/train_loss', avg_epoch_loss, epoch)
             writer.add_scalar('epoch/val_loss', val_loss, epoch)
+            writer.add_scalar('epoch/samples_per_sec', throughput['samples_per_sec'], epoch)
+            writer.add_scalar('epoch/data_wait_fraction', throughput['data_wait_fraction'], epoch)
             writer.flush()  # Forçar escrita no disco
         
         # Salvar checkpoint a cada N épocas
@@ -2,8 +2,10 @@
 Transcrição de áudio usando legendas do YouTube ou Whisper (XTTS-v2)
 
 Este script:
-1. Tenta baixar legendas do YouTube (se disponíveis)
-2. Se não houver legendas, usa Whisper para transcrever
+1. Tenta baixar legendas do YouTube (se disponíveis); cada segmento recebe
+   só os cues do seu intervalo (start_time/end_time, subtitle_index.py)
+2. Se não houver legendas, usa Whisper para transcrever (em lotes por
+   duração com um único modelo, ver whisper_batch.py)
 3. Aplica preprocessamento de texto (lowercase, normalização pt-BR etc.)
 4. Opcionalmente, se o texto parecer muito "quebrado" (muitas palavras
    fora do vocabulário pt-BR) e veio do Whisper, retranscreve usando
@@ -18,6 +20,7 @@ Dependências:
     - num2words: pip install num2words
 """
 
+from collections.abc import Iterator
 import csv
 import json
 import logging
@@ -33,14 +36,20 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 try:
-    from num2words import num2words
-    import whisper
-    import yt_dlp
+    import num2words  # noqa: F401 - números por extenso (app.text_normalizer)
+    import whisper  # noqa: F401 - dependency check (modelo via whisper_batch.load_whisper_model)
+    import yt_dlp  # noqa: F401 - legendas (subtitle_fetcher.py)
 except ImportError as e:
     print(f"❌ Dependência não encontrada: {e}")
     print("Instale com: pip install yt-dlp openai-whisper num2words")
     sys.exit(1)
 
+from app.text_normalizer import get_normalizer
+from train.scripts.subtitle_fetcher import SubtitleFetcher
+from train.scripts.subtitle_index import SubtitleIndex
+from train.scripts.transcript_store import resume_transcript_log
+from train.scripts.whisper_batch import BatchedWhisperTranscriber, load_whisper_model, segment_duration
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -230,85 +239,36 @@ def load_videos_catalog(csv_path: Path) -> dict[str, dict]:
     return videos
 
 
-def download_youtube_subtitles(
-    youtube_url: str, output_dir: Path, video_id: str, config: dict
-) -> Path | None:
+def _get_whisper_model(config: dict, high_precision: bool = False):
     """
-    Tenta baixar legendas do YouTube.
-
-    Em caso de HTTP 429 (rate limit), lança RuntimeError("YOUTUBE_RATE_LIMIT_429")
-    para que o caller possa interromper o processo de legendas e seguir só com Whisper.
+    Modelo Whisper em cache (padrão ou alta precisão); None se falhar ao carregar.
     """
-    subtitle_config = config["youtube"]["subtitles"]
-
-    # Nome do arquivo de saída
-    output_template = str(output_dir / f"video_{video_id.zfill(5)}")
-
-    # yt-dlp options
-    ydl_opts = {
-        "skip_download": True,
-        "writesubtitles": True,
-        "writeautomaticsub": subtitle_config.get("download_auto_subs", True),
-        "subtitleslangs": subtitle_config.get("subtitle_langs", ["pt"]),
-        "subtitlesformat": subtitle_config.get("subtitle_formats", ["vtt"])[0],
-        "outtmpl": output_template,
-        "quiet": True,
-        # Tenta reduzir exigência de JS runtime / impersonation
-        "extractor_args": {"youtube": ["player_client=default"]},
-    }
-
-    try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([youtube_url])
-
-        # Procurar arquivo de legendas gerado
-        for ext in subtitle_config.get("subtitle_formats", ["vtt", "srt"]):
-            for lang in subtitle_config.get("subtitle_langs", ["pt"]):
-                subtitle_file = Path(f"{output_template}.{lang}.{ext}")
-                if subtitle_file.exists():
-                    logger.info(f"   ✅ Legendas encontradas: {subtitle_file.name}")
-                    return subtitle_file
-
-        logger.warning(f"   ⚠️  Legendas não encontradas para video_{video_id}")
-        return None
-
-    except Exception as e:
-        msg = str(e)
-        # Se for rate limit, sinaliza pro caller parar de insistir
-        if "HTTP Error 429" in msg:
-            logger.error(
-                "   ❌ YouTube retornou HTTP 429 (Too Many Requests) ao tentar baixar legendas."
-            )
-            # Sinaliza explicitamente pro laço externo parar
-            raise RuntimeError("YOUTUBE_RATE_LIMIT_429")
-        # Outros erros: apenas loga e segue
-        logger.warning(f"   ⚠️  Erro ao baixar legendas: {e}")
-        return None
-
-
-def parse_subtitle_file(subtitle_path: Path) -> str:
-    """
-    Extrai texto de arquivo de legendas (VTT ou SRT)
-    """
-    with open(subtitle_path, encoding="utf-8") as f:
-        content = f.read()
-
-    # Remover cabeçalho VTT
-    content = re.sub(r"WEBVTT.*?\n\n", "", content, flags=re.DOTALL)
-
-    # Remover números de sequência e timestamps
-    content = re.sub(r"\n\d+\n", "\n", content)
-    content = re.sub(
-        r"\d{2}:\d{2}:\d{2}[,.]\d{3}\s*-->\s*\d{2}:\d{2}:\d{2}[,.]\d{3}.*?\n", "", content
-    )
+    global _WHISPER_MODEL, _WHISPER_HP_MODEL
 
-    # Remover tags HTML (<c>, <i>, etc.)
-    content = re.sub(r"<[^>]+>", "", content)
+    trans_config = config["transcription"]
 
-    # Remover linhas vazias múltiplas
-    content = re.sub(r"\n\n+", "\n", content)
+    if high_precision and trans_config.get("whisper_hp_model"):
+        # Modelo de alta precisão separado
+        model_name = trans_config["whisper_hp_model"]
+        if _WHISPER_HP_MODEL is None:
+            logger.info(f"   🎤 Carregando modelo Whisper de alta precisão ({model_name})...")
+            try:
+                _WHISPER_HP_MODEL = load_whisper_model(model_name)
+            except Exception as e:
+                logger.error(f"   ❌ Erro ao carregar modelo Whisper de alta precisão: {e}")
+                return None
+        return _WHISPER_HP_MODEL
 
-    return content.strip()
+    # Modelo padrão
+    model_name = trans_config.get("whisper_model", "base")
+    if _WHISPER_MODEL is None:
+        logger.info(f"   🎤 Carregando modelo Whisper ({model_name})...")
+        try:
+            _WHISPER_MODEL = load_whisper_model(model_name)
+        except Exception as e:
+            logger.error(f"   ❌ Erro ao carregar modelo Whisper: {e}")
+            return None
+    return _WHISPER_MODEL
 
 
 def transcribe_with_whisper(audio_path: Path, config: dict, high_precision: bool = False) -> str:
@@ -317,37 +277,13 @@ def transcribe_with_whisper(audio_path: Path, config: dict, high_precision: bool
 
     Se high_precision=True, usa whisper_hp_model; caso contrário, usa whisper_model padrão.
     """
-    global _WHISPER_MODEL, _WHISPER_HP_MODEL
-
     trans_config = config["transcription"]
-    
-    # Auto-detect device (CUDA se disponível, senão CPU)
-    import torch
-    device = "cuda" if torch.cuda.is_available() else "cpu"
 
+    model = _get_whisper_model(config, high_precision)
+    if model is None:
+        return ""
     if high_precision and trans_config.get("whisper_hp_model"):
-        # Modelo de alta precisão separado
-        model_name = trans_config["whisper_hp_model"]
-        if _WHISPER_HP_MODEL is None:
-            logger.info(f"   🎤 Carregando modelo Whisper de alta precisão ({model_name})...")
-            try:
-                _WHISPER_HP_MODEL = whisper.load_model(model_name, device=device)
-            except Exception as e:
-                logger.error(f"   ❌ Erro ao carregar modelo Whisper de alta precisão: {e}")
-                return ""
-        model = _WHISPER_HP_MODEL
         logger.info("   🎧 Retranscrevendo com modelo de alta precisão...")
-    else:
-        # Modelo padrão
-        model_name = trans_config.get("whisper_model", "base")
-        if _WHISPER_MODEL is None:
-            logger.info(f"   🎤 Carregando modelo Whisper ({model_name})...")
-            try:
-                _WHISPER_MODEL = whisper.load_model(model_name, device=device)
-            except Exception as e:
-                logger.error(f"   ❌ Erro ao carregar modelo Whisper: {e}")
-                return ""
-        model = _WHISPER_MODEL
 
     # Parâmetros de transcrição
     language = trans_config.get("language", "pt")
@@ -367,141 +303,75 @@ def transcribe_with_whisper(audio_path: Path, config: dict, high_precision: bool
         return ""
 
 
-# ==========================
-# NORMALIZAÇÃO DE TEXTO PT-BR
-# ==========================
-
-# Mapeamento de símbolos para forma falada
-SYMBOLS_TO_WORDS_PT_BR = {
-    "@": "arroba",
-    "%": "porcento",
-    "&": "e comercial",
-    "+": "mais",
-    "-": "menos",
-    "/": "barra",
-    "#": "jogo da velha",
-    "$": "dólar",
-    "=": "igual",
-}
+def _transcribe_batched(
+    audio_paths: list[Path], durations: list[float], config: dict, high_precision: bool = False
+) -> Iterator[tuple[int, str]]:
+    """(índice, texto bruto) via BatchedWhisperTranscriber com o modelo em cache"""
+    trans_config = config["transcription"]
+    model = _get_whisper_model(config, high_precision)
+    if model is None:
+        for index in range(len(audio_paths)):
+            yield index, ""
+        return
+
+    transcriber = BatchedWhisperTranscriber(
+        model,
+        language=trans_config.get("language", "pt"),
+        temperature=trans_config.get("temperature", 0.0),
+        batch_size=int(trans_config.get("batch_size", 16)),
+        prefetch_batches=int(trans_config.get("prefetch_batches", 2)),
+    )
+    yield from transcriber.transcribe(audio_paths, durations)
 
 
-def _normalize_numbers_and_symbols(text: str, text_config: dict) -> str:
+def transcribe_segments_whisper(segments: list[dict], config: dict) -> Iterator[tuple[dict, str]]:
     """
-    Normaliza números e símbolos em PT-BR de forma inteligente.
+    Transcreve segmentos sem legenda com Whisper; gera (segmento, texto
+    preprocessado), com retranscrição em alta precisão para textos com
+    muito OOV.
 
-    Faz:
-      - 3%     -> "três porcento"
-      - 2025   -> "dois mil e vinte e cinco"
-      - b80    -> "oitenta" (por causa da limpeza de ruído + normalização)
-      - 80mil  -> "oitenta mil" (pois converte "80" mesmo grudado)
-
-    Também garante que os números não ficam colados em letras
-    (tipo "pdoisp"), inserindo espaços quando necessário.
+    transcription.batch_size > 1: lotes por duração (whisper_batch.py), a
+    retranscrição HP também em lote ao final. batch_size = 1: um
+    `model.transcribe` por arquivo.
     """
-    lang = text_config.get("numbers_lang", "pt_BR")
-
-    # 0) Ruído comum: letra solta grudada em número (b80, k200, etc.)
-    #    Remove a letra e deixa só o número.
-    text = re.sub(r"\b([bcdfghjklmnpqrstvwxyz])(?=\d)", "", text, flags=re.IGNORECASE)
-
-    # 1) Casos especiais: número seguido de %  -> "três porcento"
-    def repl_number_percent(match: re.Match) -> str:
-        num_str = match.group(1)
-        try:
-            n = int(num_str)
-            ext = num2words(n, lang=lang)
-            return f"{ext} porcento"
-        except Exception:
-            return match.group(0)
-
-    text = re.sub(r"\b(\d+)\s*%", repl_number_percent, text)
-
-    # 2) Substituir símbolos isolados por forma falada
-    def repl_symbol(match: re.Match) -> str:
-        s = match.group(0)
-        word = SYMBOLS_TO_WORDS_PT_BR.get(s)
-        if not word:
-            return " "
-        # sempre coloca espaços ao redor pra não colar
-        return f" {word} "
-
-    text = re.sub(r"[@%&+\-/#$=]", repl_symbol, text)
-
-    # 3) Números em geral (em qualquer lugar, mesmo grudados em letras)
-    #    Usa contexto pra inserir espaços quando precisa.
-    def repl_number(match: re.Match) -> str:
-        num_str = match.group(0)
-        try:
-            n = int(num_str)
-            spoken = num2words(n, lang=lang)
-        except Exception:
-            return num_str
-
-        start, end = match.span()
-        src = match.string  # string original usada nesse re.sub
-
-        # Caracter anterior e posterior (no texto original)
-        before = src[start - 1] if start > 0 else " "
-        after = src[end] if end < len(src) else " "
-
-        # Precisamos de espaço à esquerda se antes é letra ou número
-        add_left_space = before.isalnum()
-
-        # Precisamos de espaço à direita se depois é letra ou número
-        add_right_space = after.isalnum()
-
-        result = spoken
-        if add_left_space:
-            result = " " + result
-        if add_right_space:
-            result = result + " "
-
-        return result
-
-    # \d+ pega QUALQUER sequência de dígitos, mesmo dentro de "abc123def"
-    text = re.sub(r"\d+", repl_number, text)
-
-    return text
-
-
-def _cleanup_segment_edges(text: str, text_config: dict) -> str:
-    """
-    Remove pedaços claramente bugados no começo/fim do segmento,
-    normalmente causados por cortes no meio das palavras.
-    """
-    words = text.split()
-    if not words:
-        return text
-
-    def is_probably_broken(w: str) -> bool:
-        # remover pontuação para análise
-        w_clean = re.sub(r"[^a-záéíóúâêôãõç]", "", w)
-        if not w_clean:
-            return False
-
-        # só consoantes e tamanho >= 3 -> provavelmente bug
-        if len(w_clean) >= 3 and not re.search(r"[aeiouáéíóúâêôãõ]", w_clean):
-            return True
-
-        # tokens de 1 letra que não são comuns em pt-BR
-        if len(w_clean) == 1 and w_clean not in {"a", "e", "o", "é"}:
-            return True
-
-        return False
-
-    # Aplica limpeza apenas se ativado na config (default: True)
-    if not text_config.get("cleanup_segment_edges", True):
-        return text
+    audio_paths = [project_root / "train" / "data" / segment["audio_path"] for segment in segments]
+
+    if int(config["transcription"].get("batch_size", 16)) <= 1:
+        for i, (segment, audio_path) in enumerate(zip(segments, audio_paths), 1):
+            logger.info(f"[{i}/{len(segments)}] {segment['audio_path']}")
+            text = preprocess_text(transcribe_with_whisper(audio_path, config), config)
+            if text and _should_retry_with_high_precision(text, config):
+                logger.info("   🔁 Texto suspeito, retranscrevendo com modelo Whisper mais preciso...")
+                text_hp_raw = transcribe_with_whisper(audio_path, config, high_precision=True)
+                if text_hp_raw:
+                    text = preprocess_text(text_hp_raw, config)
+            yield segment, text
+        return
+
+    durations = [segment_duration(segment, path) for segment, path in zip(segments, audio_paths)]
+    retry: dict[int, str] = {}
+    for done, (index, text_raw) in enumerate(_transcribe_batched(audio_paths, durations, config), 1):
+        logger.info(f"[{done}/{len(segments)}] {segments[index]['audio_path']}")
+        text = preprocess_text(text_raw, config) if text_raw else ""
+        if text and config["transcription"].get("whisper_hp_model") and _should_retry_with_high_precision(text, config):
+            retry[index] = text
+            continue
+        yield segments[index], text
 
-    # Limpa início
-    while words and is_probably_broken(words[0]):
-        words.pop(0)
+    if retry:
+        logger.info(f"🔁 {len(retry)} textos suspeitos, retranscrevendo em lote com modelo Whisper mais preciso...")
+        indices = list(retry)
+        for position, text_hp_raw in _transcribe_batched(
+            [audio_paths[i] for i in indices], [durations[i] for i in indices], config, high_precision=True
+        ):
+            index = indices[position]
+            yield segments[index], preprocess_text(text_hp_raw, config) if text_hp_raw else retry[index]
 
-    # Limpa fim
-    while words and is_probably_broken(words[-1]):
-        words.pop()
 
-    return " ".join(words)
+# ==========================
+# NORMALIZAÇÃO DE TEXTO PT-BR
+# ==========================
+# Regras em app/text_normalizer.py (compartilhadas com a síntese)
 
 
 def _get_pt_vocab(text_config: dict) -> set:
@@ -592,48 +462,113 @@ def preprocess_text(text: str, config: dict) -> str:
     - normalização de pontuação
     - remoção de caracteres especiais
     - limpeza de bordas bugadas (segmentos cortados)
-    """
-    text_config = config["text_processing"]
 
-    # 1) Lowercase
-    if text_config.get("lowercase", True):
-        text = text.lower()
+    Normalizador compilado uma vez por config (app.text_normalizer), o
+    mesmo aplicado ao texto das requisições de síntese.
+    """
+    return get_normalizer(config["text_processing"]).normalize(text)
 
-    # 2) Normalizar números e símbolos primeiro (para não perder %/@ etc)
-    text = _normalize_numbers_and_symbols(text, text_config)
 
-    # 3) Normalizar pontuação via tabela de replacements
-    if text_config.get("normalize_punctuation", True):
-        for old, new in text_config.get("replacements", {}).items():
-            text = text.replace(old, new)
+def _validate_text(text: str, text_config: dict) -> str | None:
+    """
+    Validações de comprimento, número de palavras e termos indesejados.
 
-    # 4) Remover caracteres especiais não permitidos (se configurado)
-    if text_config.get("remove_special_chars", False):
-        allowed_chars = text_config.get("allowed_chars")
-        if allowed_chars:
-            allowed = set(allowed_chars)
-            text = "".join(c if c in allowed else " " for c in text)
+    Retorna o texto (truncado se longo demais) ou None para pular o segmento.
+    """
+    min_len = text_config.get("min_text_length", 1)
+    max_len = text_config.get("max_text_length", 10_000)
 
-    # 5) Remover espaços múltiplos
-    text = re.sub(r"\s+", " ", text).strip()
+    if len(text) < min_len:
+        logger.warning(f"   ⚠️  Texto muito curto ({len(text)} chars), pulando")
+        return None
 
-    # 6) Limpar bordas bugadas de segmento (palavras estranhas no começo/fim)
-    text = _cleanup_segment_edges(text, text_config)
+    if len(text) > max_len:
+        logger.warning(f"   ⚠️  Texto muito longo ({len(text)} chars), truncando")
+        text = text[:max_len]
+
+    # Opcional: validar número mínimo de palavras (se configurado)
+    min_word_count = text_config.get("min_word_count")
+    if min_word_count is not None:
+        word_count = len(text.split())
+        if word_count < int(min_word_count):
+            logger.warning(
+                f"   ⚠️  Poucas palavras ({word_count}), min_word_count={min_word_count}, pulando"
+            )
+            return None
 
-    # 7) Espaços finais
-    text = re.sub(r"\s+", " ", text).strip()
+    # Filtrar linhas com termos indesejados
+    for term in text_config.get("remove_lines_with", []):
+        if term.lower() in text.lower():
+            logger.warning(f"   ⚠️  Termo indesejado encontrado: {term}, pulando")
+            return None
 
     return text
 
 
-def get_subtitle_for_segment(segment_info: dict, subtitles_text: str, config: dict) -> str:
+def segment_video_id(segment: dict) -> str:
+    """video_id (coluna 'id' do videos.csv) do arquivo original do segmento (video_00001.wav -> "1")"""
+    try:
+        video_id_part = segment["original_file"].split("_")[1].split(".")[0]
+    except IndexError:
+        video_id_part = "0"
+    return video_id_part.lstrip("0") or "0"
+
+
+def transcription_record(segment: dict, text: str, text_config: dict) -> dict | None:
+    """Registro do checkpoint com o texto validado (None se o texto foi descartado)"""
+    text = _validate_text(text, text_config)
+    if text is None:
+        return None
+    return {**segment, "text": text, "char_count": len(text)}
+
+
+def transcribe_segment_batch(
+    segments: list[dict], subtitles: dict[str, SubtitleIndex], config: dict
+) -> Iterator[tuple[dict, str]]:
+    """
+    (segmento, texto preprocessado) para uma lista de segmentos: legenda do
+    YouTube quando há cue no intervalo, Whisper em lote para o restante.
+    Usado pelo main e pelo estágio de transcrição do pipeline em streaming.
+    """
+    pending_whisper: list[dict] = []
+
+    for i, segment in enumerate(segments, 1):
+        video_id = segment_video_id(segment)
+        text = ""
+
+        # Tentar usar legendas se disponíveis
+        if video_id in subtitles:
+            logger.info(f"[{i}/{len(segments)}] {segment['audio_path']}")
+            logger.info("   📝 Usando legendas do YouTube")
+            text = get_subtitle_for_segment(segment, subtitles[video_id], config)
+            if not text:
+                logger.info("   ⚠️  Nenhum cue no intervalo do segmento, usando Whisper")
+
+        # Se não tem legendas (ou nenhum cue no intervalo), usar Whisper
+        if not text:
+            pending_whisper.append(segment)
+            continue
+
+        yield segment, preprocess_text(text, config)
+
+    if pending_whisper:
+        logger.info(f"🎤 {len(pending_whisper)} segmentos para o Whisper\n")
+        yield from transcribe_segments_whisper(pending_whisper, config)
+
+
+def get_subtitle_for_segment(segment_info: dict, subtitles: SubtitleIndex, config: dict) -> str:
     """
     Extrai trecho de legenda correspondente a um segmento de áudio.
 
-    ATUALMENTE: retorna o texto completo.
-    TODO: implementar parsing de timestamps para matching mais preciso.
+    Usa start_time/end_time do segmento (segundos no vídeo original) para
+    buscar os cues no índice (busca binária). Sem timestamps no segmento,
+    retorna "" e o segmento vai para o Whisper.
     """
-    return subtitles_text
+    start = segment_info.get("start_time")
+    end = segment_info.get("end_time")
+    if start is None or end is None:
+        return ""
+    return subtitles.text_for_segment(float(start), float(end))
 
 
 def main():
@@ -677,39 +612,20 @@ def main():
     logger.info("ETAPA 1: DOWNLOAD DE LEGENDAS DO YOUTUBE")
     logger.info("=" * 80 + "\n")
 
-    subtitles_cache: dict[str, str] = {}
+    subtitles_cache: dict[str, SubtitleIndex] = {}
 
     if config["transcription"].get("prefer_youtube_subtitles", True):
-        rate_limited = False
-
-        for video_id, video_info in videos_catalog.items():
-            if rate_limited:
-                break
-
-            logger.info(f"🔍 Buscando legendas para video_{video_id}...")
+        # Pool concorrente com rate limit compartilhado e cache em disco
+        # (subtitle_fetcher.py); um 429 atrasa o host em vez de abortar a etapa
+        fetcher = SubtitleFetcher.from_config(config, subtitles_dir)
+        subtitle_files = fetcher.fetch_all(
+            {video_id: video_info["youtube_url"] for video_id, video_info in videos_catalog.items()}
+        )
 
-            try:
-                subtitle_file = download_youtube_subtitles(
-                    video_info["youtube_url"], subtitles_dir, video_id, config
-                )
-            except RuntimeError as e:
-                # Se recebemos o sentinela de rate limit (429), paramos o loop
-                if str(e) == "YOUTUBE_RATE_LIMIT_429":
-                    logger.warning(
-                        "⚠️ YouTube aplicou rate limit (HTTP 429). "
-                        "Parando download de legendas e prosseguindo apenas com Whisper "
-                        "para os demais segmentos desta execução."
-                    )
-                    rate_limited = True
-                    break
-                else:
-                    # Qualquer outro erro inesperado, re-levanta
-                    raise
-
-            if subtitle_file:
-                subtitle_text = parse_subtitle_file(subtitle_file)
-                subtitles_cache[video_id] = subtitle_text
-                logger.info(f"   ✅ {len(subtitle_text)} caracteres extraídos\n")
+        for video_id, subtitle_file in subtitle_files.items():
+            subtitle_index = SubtitleIndex.from_file(subtitle_file)
+            subtitles_cache[video_id] = subtitle_index
+            logger.info(f"   ✅ video_{video_id}: {len(subtitle_index)} cues indexados")
 
         logger.info(f"📄 Legendas carregadas para {len(subtitles_cache)} vídeos\n")
 
@@ -718,133 +634,35 @@ def main():
     logger.info("ETAPA 2: TRANSCRIÇÃO DE SEGMENTOS")
     logger.info("=" * 80 + "\n")
 
-    # CHECKPOINT/RESUME: Carregar transcrições existentes se houver
+    # CHECKPOINT/RESUME: log JSONL append-only (transcript_store.py)
     transcriptions_file = processed_dir / "transcriptions.json"
-    transcriptions: list[dict] = []
-    processed_paths = set()
-    
-    if transcriptions_file.exists():
-        logger.info(f"📂 Encontrado checkpoint existente: {transcriptions_file}")
-        try:
-            with open(transcriptions_file, "r", encoding="utf-8") as f:
-                transcriptions = json.load(f)
-            processed_paths = {t["audio_path"] for t in transcriptions}
-            logger.info(f"✅ Carregadas {len(transcriptions)} transcrições anteriores")
-            logger.info(f"🔄 Continuando de onde parou...\n")
-        except Exception as e:
-            logger.warning(f"⚠️ Erro ao carregar checkpoint: {e}")
-            logger.warning("   Iniciando do zero...\n")
-            transcriptions = []
-            processed_paths = set()
-
-    for i, segment in enumerate(segments, 1):
-        audio_path_rel = segment['audio_path']
-        
-        # SKIP se já processado (resume)
-        if audio_path_rel in processed_paths:
-            if i % 100 == 0:  # Log a cada 100 para não poluir
-                logger.info(f"[{i}/{len(segments)}] ⏭️  Pulando (já processado): {audio_path_rel}")
-            continue
-        
-        logger.info(f"[{i}/{len(segments)}] {audio_path_rel}")
+    transcript_log, processed_paths = resume_transcript_log(processed_dir, config["transcription"])
+    transcribed_count = 0
 
-        # Caminho do áudio do segmento
-        audio_path = project_root / "train" / "data" / segment["audio_path"]
-
-        # Extrair video_id do nome do arquivo original (ex: video_00001.wav)
-        original_file = segment["original_file"]
-        try:
-            video_id_part = original_file.split("_")[1].split(".")[0]
-        except IndexError:
-            video_id_part = "0"
-        video_id = video_id_part.lstrip("0") or "0"
-
-        text = ""
-        from_whisper = False
+    pending = [segment for segment in segments if segment["audio_path"] not in processed_paths]
+    if len(pending) < len(segments):
+        logger.info(f"⏭️  {len(segments) - len(pending)} segmentos já processados (resume)")
 
-        # Tentar usar legendas se disponíveis
-        if video_id in subtitles_cache:
-            logger.info("   📝 Usando legendas do YouTube")
-            text = get_subtitle_for_segment(segment, subtitles_cache[video_id], config)
-            from_whisper = False
-
-        # Se não tem legendas, usar Whisper
-        if not text:
-            text_raw = transcribe_with_whisper(audio_path, config, high_precision=False)
-            text = text_raw
-            from_whisper = True
-
-        # Preprocessar texto
-        if text:
-            text = preprocess_text(text, config)
-
-        # Se veio do Whisper e parece ruim (muito OOV), tenta retranscrever com modelo mais preciso
-        if text and from_whisper and _should_retry_with_high_precision(text, config):
-            logger.info("   🔁 Texto suspeito, retranscrevendo com modelo Whisper mais preciso...")
-            text_hp_raw = transcribe_with_whisper(audio_path, config, high_precision=True)
-            if text_hp_raw:
-                text = preprocess_text(text_hp_raw, config)
-
-        # Validações de comprimento
-        text_config = config["text_processing"]
-        min_len = text_config.get("min_text_length", 1)
-        max_len = text_config.get("max_text_length", 10_000)
-
-        if len(text) < min_len:
-            logger.warning(f"   ⚠️  Texto muito curto ({len(text)} chars), pulando")
-            continue
-
-        if len(text) > max_len:
-            logger.warning(f"   ⚠️  Texto muito longo ({len(text)} chars), truncando")
-            text = text[:max_len]
-
-        # Opcional: validar número mínimo de palavras (se configurado)
-        min_word_count = text_config.get("min_word_count")
-        if min_word_count is not None:
-            word_count = len(text.split())
-            if word_count < int(min_word_count):
-                logger.warning(
-                    f"   ⚠️  Poucas palavras ({word_count}), min_word_count={min_word_count}, pulando"
-                )
+    try:
+        for segment, text in transcribe_segment_batch(pending, subtitles_cache, config):
+            # Adicionar transcrição final (append no log, fsync em lote)
+            record = transcription_record(segment, text, config["text_processing"])
+            if record is None:
                 continue
+            transcript_log.append(record)
+            transcribed_count += 1
+            logger.info(f"   ✅ {record['char_count']} caracteres: {record['text'][:80]}...\n")
+    finally:
+        transcript_log.close()
 
-        # Filtrar linhas com termos indesejados
-        skip = False
-        for term in text_config.get("remove_lines_with", []):
-            if term.lower() in text.lower():
-                logger.warning(f"   ⚠️  Termo indesejado encontrado: {term}, pulando")
-                skip = True
-                break
-
-        if skip:
-            continue
-
-        # Adicionar transcrição final
-        transcriptions.append({**segment, "text": text, "char_count": len(text)})
-
-        logger.info(f"   ✅ {len(text)} caracteres: {text[:80]}...")
-        
-        # SALVAMENTO INCREMENTAL: Salvar a cada 10 segmentos (proteção contra perda)
-        if len(transcriptions) % 10 == 0:
-            try:
-                with open(transcriptions_file, "w", encoding="utf-8") as f:
-                    json.dump(transcriptions, f, indent=2, ensure_ascii=False)
-                logger.info(f"   💾 Checkpoint salvo: {len(transcriptions)} transcrições\n")
-            except Exception as e:
-                logger.warning(f"   ⚠️ Erro ao salvar checkpoint: {e}\n")
-        else:
-            logger.info("")  # Linha em branco
-
-    # Salvar transcrições FINAIS (garantir que última batch foi salva)
-    transcriptions_file = processed_dir / "transcriptions.json"
-    with open(transcriptions_file, "w", encoding="utf-8") as f:
-        json.dump(transcriptions, f, indent=2, ensure_ascii=False)
+    # Compactação: JSON final na ordem do segments_mapping.json (lotes do Whisper saem por duração)
+    transcriptions = transcript_log.compact(transcriptions_file, [segment["audio_path"] for segment in segments])
 
     # Summary
     logger.info("\n" + "=" * 80)
     logger.info("RESUMO DA TRANSCRIÇÃO")
     logger.info("=" * 80)
-    logger.info(f"📝 Segmentos transcritos: {len(transcriptions)}")
+    logger.info(f"📝 Segmentos transcritos: {len(transcriptions)} ({transcribed_count} nesta execução)")
     logger.info(f"📊 Legendas do YouTube: {len(subtitles_cache)} vídeos")
     logger.info(f"📄 Transcrições salvas em: {transcriptions_file}")
     logger.info("=" * 80)
@@ -4,8 +4,13 @@ Transcrição paralela de áudio usando Whisper (XTTS-v2)
 Versão otimizada com:
 - Processamento paralelo (múltiplos workers GPU)
 - Auto-detecção de VRAM disponível
-- Salvamento incremental (proteção contra crash)
-- Resume automático (continua de onde parou)
+- Salvamento incremental em log JSONL append-only (transcript_store.py)
+- Resume automático (continua de onde parou, mesmo log do transcribe_audio.py)
+
+Um modelo por thread no mesmo device multiplica a memória sem paralelismo
+real (GIL + GPU compartilhada). Para um device, prefira o transcribe_audio.py
+com transcription.batch_size > 1 (um modelo, lotes por duração, ver
+whisper_batch.py); comparação: python -m benchmarks.transcribe_whisper
 
 Uso:
     # Auto-detect workers (baseado em VRAM)
@@ -40,6 +45,7 @@ from train.scripts.transcribe_audio import (
     preprocess_text,
     _should_retry_with_high_precision,
 )
+from train.scripts.transcript_store import resume_transcript_log
 
 # Import env config
 from train.env_config import (
@@ -184,7 +190,7 @@ def transcribe_parallel(
     config: Dict,
     num_workers: int,
     checkpoint_file: Path,
-    checkpoint_interval: int = 10
+    checkpoint_interval: Optional[int] = None
 ) -> List[Dict]:
     """
     Transcreve segmentos em paralelo
@@ -193,27 +199,21 @@ def transcribe_parallel(
         segments: Lista de segmentos
         config: Configuração do dataset
         num_workers: Número de workers paralelos
-        checkpoint_file: Arquivo de checkpoint
-        checkpoint_interval: Salvar a cada N transcrições
+        checkpoint_file: transcriptions.json final (log JSONL no mesmo diretório)
+        checkpoint_interval: fsync do log a cada N transcrições
+            (None = transcription.log_fsync_every do YAML)
     
     Returns:
         Lista de transcrições
     """
-    # Load existing checkpoint
-    transcriptions = []
-    processed_paths = set()
-    
-    if checkpoint_file.exists():
-        logger.info(f"📂 Checkpoint encontrado: {checkpoint_file}")
-        try:
-            with open(checkpoint_file, "r", encoding="utf-8") as f:
-                transcriptions = json.load(f)
-            processed_paths = {t["audio_path"] for t in transcriptions}
-            logger.info(f"✅ Carregadas {len(transcriptions)} transcrições anteriores")
-            logger.info(f"🔄 Continuando de onde parou...\n")
-        except Exception as e:
-            logger.warning(f"⚠️ Erro ao carregar checkpoint: {e}")
-    
+    # Resume pelo log JSONL append-only (mesmo store do transcribe_audio.py)
+    # checkpoint_interval explícito tem precedência sobre o YAML
+    trans_config = dict(config["transcription"])
+    if checkpoint_interval is not None:
+        trans_config["log_fsync_every"] = checkpoint_interval
+    transcript_log, processed_paths = resume_transcript_log(checkpoint_file.parent, trans_config)
+    order = [s["audio_path"] for s in segments]
+
     # Filter segments to process
     segments_to_process = [
         s for s in segments
@@ -222,11 +222,12 @@ def transcribe_parallel(
     
     if not segments_to_process:
         logger.info("✅ Todos os segmentos já foram processados!")
-        return transcriptions
+        transcript_log.close()
+        return transcript_log.compact(checkpoint_file, order)
     
     logger.info(f"📋 Segmentos a processar: {len(segments_to_process)}/{len(segments)}")
     logger.info(f"👷 Workers paralelos: {num_workers}")
-    logger.info(f"💾 Checkpoint a cada: {checkpoint_interval} segmentos\n")
+    logger.info(f"💾 Log: {transcript_log.path} (fsync a cada {transcript_log.fsync_every} segmentos)\n")
     
     # Initialize model pool
     model_name = config["transcription"].get("whisper_model", "base")
@@ -236,7 +237,8 @@ def transcribe_parallel(
     # Process in parallel
     start_time = time.time()
     completed = 0
-    already_done = len(transcriptions)  # Track already completed segments
+    transcribed = 0
+    already_done = len(processed_paths)  # Track already completed segments
     
     with ThreadPoolExecutor(max_workers=num_workers) as executor:
         # Submit all tasks
@@ -264,7 +266,8 @@ def transcribe_parallel(
                 result = future.result()
                 
                 if result:
-                    transcriptions.append(result)
+                    transcript_log.append(result)
+                    transcribed += 1
                     
                     # Progress log with CORRECT counter (already_done + completed)
                     current_position = already_done + completed
@@ -280,26 +283,20 @@ def transcribe_parallel(
                         f"{rate:.1f} seg/s | ETA: {eta/60:.1f}min | "
                         f"{result['char_count']} chars"
                     )
-                    
-                    # Checkpoint
-                    if len(transcriptions) % checkpoint_interval == 0:
-                        with open(checkpoint_file, "w", encoding="utf-8") as f:
-                            json.dump(transcriptions, f, indent=2, ensure_ascii=False)
-                        logger.info(f"   💾 Checkpoint salvo: {len(transcriptions)} transcrições\n")
                 
             except Exception as e:
                 logger.error(f"❌ Erro no segmento {i}: {e}")
     
-    # Final save
-    with open(checkpoint_file, "w", encoding="utf-8") as f:
-        json.dump(transcriptions, f, indent=2, ensure_ascii=False)
+    # Compactação: JSON final na ordem do segments_mapping.json
+    transcript_log.close()
+    transcriptions = transcript_log.compact(checkpoint_file, order)
     
     # Summary
     elapsed = time.time() - start_time
     logger.info("\n" + "=" * 80)
     logger.info("📊 RESUMO DA TRANSCRIÇÃO PARALELA")
     logger.info("=" * 80)
-    logger.info(f"✅ Segmentos transcritos: {len(transcriptions)}")
+    logger.info(f"✅ Segmentos transcritos: {len(transcriptions)} ({transcribed} nesta execução)")
     logger.info(f"⏱️  Tempo total: {elapsed/60:.1f} min")
     logger.info(f"⚡ Velocidade média: {len(segments_to_process)/elapsed:.2f} seg/s")
     logger.info(f"👷 Workers usados: {num_workers}")
@@ -341,8 +338,7 @@ def main():
         segments,
         config,
         WHISPER_NUM_WORKERS,
-        checkpoint_file,
-        checkpoint_interval=10
+        checkpoint_file
     )
     
     logger.info("\n🎉 Transcrição paralela completada!")
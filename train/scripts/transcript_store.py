@@ -0,0 +1,190 @@
+"""
+Checkpoint de transcrição em JSONL append-only (XTTS-v2)
+
+Cada transcrição concluída vira uma linha em `transcriptions.jsonl`
+(append + flush); `fsync` em lote a cada `fsync_every` registros ou
+`fsync_seconds` segundos. Custo por segmento constante (antes: reescrever
+o `transcriptions.json` inteiro a cada 10 segmentos, I/O quadrático) e um
+crash perde no máximo a última linha, que é descartada ao reabrir.
+
+- Resume: `load_index()` lê só os `audio_path` do log
+- Compactação: `compact()` gera o `transcriptions.json` consumido pelo
+  build_ljs_dataset (ordem do segments_mapping.json, último registro de
+  cada segmento vence), com escrita atômica (arquivo temporário + rename)
+- Migração: `seed_from_json()` importa um `transcriptions.json` de
+  execuções anteriores quando ainda não há log
+
+Usado por transcribe_audio.py e transcribe_audio_parallel.py (mesmo resume).
+"""
+
+from collections.abc import Iterable, Iterator
+import json
+import logging
+import os
+from pathlib import Path
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptLog:
+    """Log JSONL append-only de transcrições (um registro por linha)"""
+
+    def __init__(self, path: Path, fsync_every: int = 50, fsync_seconds: float = 5.0):
+        self.path = Path(path)
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_seconds = fsync_seconds
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    # ==================== LEITURA ====================
+
+    def records(self) -> Iterator[dict]:
+        """Registros completos do log (linha final truncada é ignorada)"""
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.endswith("\n"):
+                    break  # escrita interrompida
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"⚠️ Linha {line_number} inválida em {self.path.name}, ignorando")
+
+    def load_index(self) -> set[str]:
+        """`audio_path` já transcritos (resume)"""
+        return {record["audio_path"] for record in self.records() if "audio_path" in record}
+
+    # ==================== ESCRITA ====================
+
+    def _repair_tail(self) -> None:
+        """Remove linha final incompleta (crash no meio de um append)"""
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+        with open(self.path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            data = f.read()
+            keep = data.rfind(b"\n") + 1
+            f.truncate(keep)
+        logger.warning(f"⚠️ Registro incompleto no fim de {self.path.name} removido ({len(data) - keep} bytes)")
+
+    def open(self) -> "TranscriptLog":
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._repair_tail()
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._last_sync = time.monotonic()
+        return self
+
+    def append(self, record: dict) -> None:
+        """Grava um registro; fsync em lote"""
+        if self._file is None:
+            self.open()
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_seconds:
+            self.sync()
+
+    def extend(self, records: Iterable[dict]) -> None:
+        for record in records:
+            self.append(record)
+
+    def sync(self) -> None:
+        """Força os registros pendentes para o disco"""
+        if self._file is None or self._unsynced == 0:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        self.sync()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self) -> "TranscriptLog":
+        return self.open()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ==================== MIGRAÇÃO / COMPACTAÇÃO ====================
+
+    def seed_from_json(self, json_path: Path) -> int:
+        """Importa um transcriptions.json legado se o log ainda não existe"""
+        if self.path.exists() or not json_path.exists():
+            return 0
+        try:
+            with open(json_path, encoding="utf-8") as f:
+                records = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao importar checkpoint {json_path.name}: {e}")
+            return 0
+        with self:
+            self.extend(records)
+        logger.info(f"📂 {len(records)} transcrições importadas de {json_path.name} para {self.path.name}")
+        return len(records)
+
+    def compact(self, output_path: Path, order: list[str] | None = None) -> list[dict]:
+        """
+        Gera o JSON final a partir do log.
+
+        Args:
+            output_path: transcriptions.json
+            order: audio_paths na ordem do segments_mapping.json
+
+        Returns:
+            Registros compactados (um por audio_path)
+        """
+        self.sync()
+        latest: dict[str, dict] = {}
+        for record in self.records():
+            latest[record["audio_path"]] = record
+
+        records = list(latest.values())
+        if order is not None:
+            position = {audio_path: i for i, audio_path in enumerate(order)}
+            records.sort(key=lambda r: position.get(r["audio_path"], len(position)))
+
+        output_path = Path(output_path)
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, output_path)
+        return records
+
+
+def resume_transcript_log(processed_dir: Path, trans_config: dict) -> tuple[TranscriptLog, set[str]]:
+    """
+    Abre o log de `processed_dir` para resume (mesmo comportamento nos
+    dois scripts de transcrição).
+
+    Returns:
+        (log aberto para append, audio_paths já transcritos)
+    """
+    log = TranscriptLog(
+        Path(processed_dir) / "transcriptions.jsonl",
+        fsync_every=int(trans_config.get("log_fsync_every", 50)),
+        fsync_seconds=float(trans_config.get("log_fsync_seconds", 5.0)),
+    )
+    log.seed_from_json(Path(processed_dir) / "transcriptions.json")
+    processed_paths = log.load_index()
+    if processed_paths:
+        logger.info(f"📂 Checkpoint encontrado: {log.path}")
+        logger.info(f"✅ {len(processed_paths)} transcrições anteriores")
+        logger.info("🔄 Continuando de onde parou...\n")
+    return log.open(), processed_paths
@@ -0,0 +1,215 @@
+"""
+Transcrição Whisper em lote (XTTS-v2)
+
+Um único modelo Whisper no device, em vez de um modelo por thread:
+
+- Segmentos ordenados por duração e agrupados em lotes de `batch_size`
+  (buckets): durações parecidas geram textos de tamanho parecido, então o
+  lote termina de decodificar junto, sem passos desperdiçados
+- Cada lote vira um tensor mel [B, n_mels, 3000] (áudio com padding até
+  30 s, tamanho fixo do encoder) decodificado com uma chamada de
+  `whisper.decode`
+- Leitura dos WAVs, resample para 16 kHz e mel rodam numa thread de
+  prefetch (até `prefetch_batches` lotes à frente), em paralelo com a GPU
+- Segmentos > 30 s caem no `model.transcribe` (janela deslizante)
+
+`whisper.decode` não faz o fallback de temperatura do `model.transcribe`:
+com temperature 0.0 (padrão da config) o resultado é a decodificação gulosa.
+
+Uso:
+    from train.scripts.whisper_batch import BatchedWhisperTranscriber, load_whisper_model
+    transcriber = BatchedWhisperTranscriber(load_whisper_model("base"), language="pt")
+    for index, text in transcriber.transcribe(paths, durations):
+        ...
+"""
+
+from collections.abc import Callable, Iterable, Iterator
+import logging
+import math
+from pathlib import Path
+import queue
+import threading
+
+import numpy as np
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+WHISPER_SR = 16000
+# Encoder do Whisper recebe sempre 30 s de áudio (3000 frames de mel)
+MAX_BATCH_SECONDS = 30.0
+
+
+def load_whisper_model(model_name: str, device: str | None = None):
+    """Carrega modelo Whisper (CUDA se disponível)"""
+    import torch
+    import whisper
+
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    return whisper.load_model(model_name, device=device)
+
+
+def segment_duration(segment: dict, audio_path: Path) -> float:
+    """Duração do segmento (segments_mapping.json ou cabeçalho do WAV)"""
+    duration = segment.get("duration")
+    if duration is None:
+        try:
+            duration = sf.info(str(audio_path)).duration
+        except Exception:
+            duration = 0.0
+    return float(duration)
+
+
+def length_sorted_batches(durations: list[float], batch_size: int) -> list[list[int]]:
+    """Índices agrupados em lotes de duração parecida (mais longos primeiro)"""
+    batch_size = max(1, batch_size)
+    order = sorted(range(len(durations)), key=lambda i: (-durations[i], i))
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def load_audio_16k(audio_path: Path) -> np.ndarray:
+    """WAV mono float32 a 16 kHz (soundfile + resample_poly, sem subprocess ffmpeg)"""
+    audio, sr = sf.read(str(audio_path), dtype="float32", always_2d=True)
+    audio = audio.mean(axis=1)
+    if sr != WHISPER_SR:
+        from scipy.signal import resample_poly
+
+        g = math.gcd(sr, WHISPER_SR)
+        audio = resample_poly(audio, WHISPER_SR // g, sr // g).astype(np.float32, copy=False)
+    return audio
+
+
+def prefetch(items: Iterable, load: Callable, depth: int = 2) -> Iterator:
+    """
+    Aplica `load` a cada item numa thread de background, até `depth`
+    resultados à frente do consumidor.
+
+    Exceções de `load` são relançadas no consumidor; fechar o gerador
+    (break/close) encerra a thread.
+    """
+    results: queue.Queue = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+    done = object()
+
+    def put(entry) -> bool:
+        while not stop.is_set():
+            try:
+                results.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker():
+        try:
+            for item in items:
+                if not put((None, load(item))):
+                    return
+        except BaseException as e:
+            put((e, None))
+            return
+        put((None, done))
+
+    thread = threading.Thread(target=worker, name="whisper-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            error, result = results.get()
+            if error is not None:
+                raise error
+            if result is done:
+                return
+            yield result
+    finally:
+        stop.set()
+        thread.join()
+
+
+class BatchedWhisperTranscriber:
+    """Transcrição em lotes por duração com um modelo Whisper compartilhado"""
+
+    def __init__(
+        self,
+        model,
+        language: str = "pt",
+        temperature: float = 0.0,
+        batch_size: int = 16,
+        prefetch_batches: int = 2,
+    ):
+        self.model = model
+        self.language = language
+        self.temperature = temperature
+        self.batch_size = max(1, batch_size)
+        self.prefetch_batches = max(1, prefetch_batches)
+
+    def _mel(self, audio_path: Path):
+        import torch
+        import whisper
+
+        audio = whisper.pad_or_trim(torch.from_numpy(load_audio_16k(audio_path)))
+        return whisper.log_mel_spectrogram(audio, n_mels=self.model.dims.n_mels)
+
+    def _load_batch(self, paths: list[Path], batch: list[int]):
+        """(índices carregados, índices com erro, mel [B, n_mels, 3000])"""
+        import torch
+
+        loaded, failed, mels = [], [], []
+        for index in batch:
+            try:
+                mels.append(self._mel(paths[index]))
+                loaded.append(index)
+            except Exception as e:
+                logger.warning(f"   ⚠️  Erro ao carregar {paths[index]}: {e}")
+                failed.append(index)
+        mel = torch.stack(mels) if mels else None
+        if mel is not None and self.model.device.type == "cuda":
+            mel = mel.pin_memory()
+        return loaded, failed, mel
+
+    def _transcribe_long(self, audio_path: Path) -> str:
+        try:
+            result = self.model.transcribe(str(audio_path), language=self.language, temperature=self.temperature)
+            return result.get("text", "").strip()
+        except Exception as e:
+            logger.error(f"   ❌ Erro ao transcrever com Whisper: {e}")
+            return ""
+
+    def transcribe(self, audio_paths: list[Path], durations: list[float]) -> Iterator[tuple[int, str]]:
+        """
+        Transcreve os áudios; gera (índice em audio_paths, texto) na ordem
+        dos lotes (mais longos primeiro). Falhas geram texto vazio.
+        """
+        import whisper
+
+        short = [i for i, d in enumerate(durations) if d <= MAX_BATCH_SECONDS]
+        long = [i for i, d in enumerate(durations) if d > MAX_BATCH_SECONDS]
+
+        options = whisper.DecodingOptions(
+            language=self.language,
+            temperature=self.temperature,
+            without_timestamps=True,
+            fp16=self.model.device.type == "cuda",
+        )
+        batches = [[short[i] for i in batch] for batch in length_sorted_batches([durations[i] for i in short], self.batch_size)]
+        logger.info(
+            f"   🎤 Whisper em lote: {len(short)} segmentos em {len(batches)} lotes de até {self.batch_size}"
+            + (f", {len(long)} longos (> {MAX_BATCH_SECONDS:.0f}s) individualmente" if long else "")
+        )
+
+        for loaded, failed, mel in prefetch(
+            batches, lambda batch: self._load_batch(audio_paths, batch), self.prefetch_batches
+        ):
+            for index in failed:
+                yield index, ""
+            if mel is None:
+                continue
+            try:
+                results = whisper.decode(self.model, mel.to(self.model.device, non_blocking=True), options)
+            except Exception as e:
+                logger.error(f"   ❌ Erro no lote Whisper ({len(loaded)} segmentos): {e}")
+                results = None
+            for position, index in enumerate(loaded):
+                yield index, results[position].text.strip() if results else ""
+
+        for index in long:
+            yield index, self._transcribe_long(audio_paths[index])
@@ -0,0 +1,220 @@
+"""
+Testes para audio_downloader.py
+
+Fim a fim contra um servidor HTTP local que serve arquivos de áudio
+(com suporte a Range), no lugar do YouTube: download concorrente,
+decode para WAV mono, manifest, retomada de download interrompido,
+rerun sem rede e limite de banda.
+"""
+
+import pytest
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from pathlib import Path
+import sys
+import threading
+import time
+import numpy as np
+import soundfile as sf
+
+# Setup paths
+TEST_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = TEST_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from train.scripts.audio_downloader import AudioDownloader, MediaSource
+
+
+class FileServer:
+    """Serve arquivos de `root` com Range; `truncate_once` corta a primeira resposta de cada arquivo"""
+
+    def __init__(self, root: Path, truncate_once: bool = False):
+        self.requests: list[tuple[str, str | None]] = []
+        self.truncated: set[str] = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                range_header = self.headers.get("Range")
+                server.requests.append((self.path, range_header))
+                data = (root / self.path.lstrip("/")).read_bytes()
+                start, end = 0, len(data) - 1
+                if range_header:
+                    first, last = range_header.split("=")[1].split("-")
+                    start, end = int(first), min(int(last), end) if last else end
+
+                self.send_response(206 if range_header else 200)
+                if range_header:
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+                self.send_header("Content-Length", str(end + 1 - start))
+                self.end_headers()
+
+                body = data[start:end + 1]
+                if truncate_once and self.path not in server.truncated:
+                    server.truncated.add(self.path)
+                    body = body[: len(body) // 2]  # conexão cai no meio
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def remote(tmp_path):
+    """3 "vídeos" remotos: WAV estéreo 44.1 kHz de 1-3 s"""
+    root = tmp_path / "remote"
+    root.mkdir()
+    for i in range(1, 4):
+        t = np.arange(44100 * i) / 44100
+        audio = np.stack([np.sin(2 * np.pi * 220 * t), np.sin(2 * np.pi * 330 * t)], axis=1) * 0.3
+        sf.write(str(root / f"{i}.wav"), audio.astype(np.float32), 44100)
+    return root
+
+
+def make_downloader(raw_dir, server, http_chunk_size=0, **kwargs):
+    def resolve(youtube_url):
+        video = youtube_url.rsplit("=", 1)[-1]
+        return MediaSource(url=f"{server.url}/{video}.wav", ext="wav", http_chunk_size=http_chunk_size)
+
+    options = dict(target_sr=22050, workers=3, decode_workers=2, queue_size=2, retry_delay=0.01, chunk_size=16 * 1024)
+    options.update(kwargs)
+    return AudioDownloader(raw_dir, resolve=resolve, **options)
+
+
+def catalog(*ids):
+    return [{"id": i, "youtube_url": f"https://www.youtube.com/watch?v={i}"} for i in ids]
+
+
+class TestAudioDownloader:
+    """Download + decode fim a fim."""
+
+    def test_downloads_and_decodes_all(self, tmp_path, remote):
+        """WAVs mono 22050 Hz com a duração original; manifest com checksum."""
+        raw_dir = tmp_path / "raw"
+        with FileServer(remote) as server:
+            summary = make_downloader(raw_dir, server).run(catalog("1", "2", "3"))
+
+        assert summary == {"decoded": 3, "skipped": 0, "failed": 0}
+        for i in range(1, 4):
+            info = sf.info(str(raw_dir / f"video_0000{i}.wav"))
+            assert info.samplerate == 22050
+            assert info.channels == 1
+            assert info.duration == pytest.approx(i, abs=0.01)
+            assert not (raw_dir / f"video_0000{i}.wav.part").exists()
+
+        manifest = json.loads((raw_dir / "download_manifest.json").read_text())
+        entry = manifest["2"]
+        source = (remote / "2.wav").read_bytes()
+        assert entry["status"] == "decoded"
+        assert entry["content_length"] == len(source)
+        assert entry["sha256"] == hashlib.sha256(source).hexdigest()
+        assert entry["url"] == "https://www.youtube.com/watch?v=2"
+
+    def test_interrupted_download_resumes_with_range(self, tmp_path, remote):
+        """Conexão cortada no meio: nova tentativa pede só o restante."""
+        raw_dir = tmp_path / "raw"
+        with FileServer(remote, truncate_once=True) as server:
+            summary = make_downloader(raw_dir, server, max_attempts=2).run(catalog("3"))
+
+        assert summary["decoded"] == 1
+        assert server.requests[0] == ("/3.wav", None)
+        assert server.requests[1][1] is not None and server.requests[1][1].startswith("bytes=")
+        manifest = json.loads((raw_dir / "download_manifest.json").read_text())
+        assert manifest["3"]["sha256"] == hashlib.sha256((remote / "3.wav").read_bytes()).hexdigest()
+
+    def test_http_chunk_size_uses_one_range_per_block(self, tmp_path, remote):
+        """http_chunk_size do yt-dlp: um Range fechado por bloco, arquivo íntegro."""
+        raw_dir = tmp_path / "raw"
+        block = 64 * 1024
+        with FileServer(remote) as server:
+            summary = make_downloader(raw_dir, server, http_chunk_size=block).run(catalog("2"))
+
+        source = (remote / "2.wav").read_bytes()
+        ranges = [r for _, r in server.requests]
+        assert summary["decoded"] == 1
+        assert ranges[0] == f"bytes=0-{block - 1}"
+        assert len(ranges) == -(-len(source) // block)
+        assert ranges[-1] == f"bytes={(len(ranges) - 1) * block}-{len(source) - 1}"
+        manifest = json.loads((raw_dir / "download_manifest.json").read_text())
+        assert manifest["2"]["sha256"] == hashlib.sha256(source).hexdigest()
+
+    def test_chunked_download_resumes_after_cut(self, tmp_path, remote):
+        """Bloco cortado no meio: nova tentativa continua do .part, bloco a bloco."""
+        raw_dir = tmp_path / "raw"
+        with FileServer(remote, truncate_once=True) as server:
+            summary = make_downloader(raw_dir, server, http_chunk_size=64 * 1024, max_attempts=2).run(catalog("3"))
+
+        assert summary["decoded"] == 1
+        manifest = json.loads((raw_dir / "download_manifest.json").read_text())
+        assert manifest["3"]["sha256"] == hashlib.sha256((remote / "3.wav").read_bytes()).hexdigest()
+
+    def test_rerun_is_offline(self, tmp_path, remote):
+        """Rerun: WAVs prontos pulados, arquivo já baixado vai direto para o decode."""
+        raw_dir = tmp_path / "raw"
+        with FileServer(remote) as server:
+            make_downloader(raw_dir, server, keep_source=True).run(catalog("1", "2"))
+
+            # video 2 baixado mas não decodificado (ex.: crash antes do decode)
+            (raw_dir / "video_00002.wav").unlink()
+            manifest = json.loads((raw_dir / "download_manifest.json").read_text())
+            manifest["2"]["status"] = "downloaded"
+            (raw_dir / "download_manifest.json").write_text(json.dumps(manifest))
+
+            requests_before = len(server.requests)
+            summary = make_downloader(raw_dir, server).run(catalog("1", "2"))
+
+        assert summary == {"decoded": 1, "skipped": 1, "failed": 0}
+        assert len(server.requests) == requests_before
+        assert (raw_dir / "video_00002.wav").exists()
+
+    def test_corrupted_download_is_fetched_again(self, tmp_path, remote):
+        """Checksum divergente no resume: baixa de novo."""
+        raw_dir = tmp_path / "raw"
+        with FileServer(remote) as server:
+            make_downloader(raw_dir, server, keep_source=True).run(catalog("1"))
+            (raw_dir / "video_00001.wav").rename(raw_dir / "decoded_backup.wav")
+            manifest = json.loads((raw_dir / "download_manifest.json").read_text())
+            manifest["1"]["status"] = "downloaded"
+            manifest["1"]["sha256"] = "0" * 64
+            (raw_dir / "download_manifest.json").write_text(json.dumps(manifest))
+
+            requests_before = len(server.requests)
+            summary = make_downloader(raw_dir, server).run(catalog("1"))
+
+        assert summary["decoded"] == 1
+        assert len(server.requests) == requests_before + 1
+
+    def test_failed_video_does_not_stop_others(self, tmp_path, remote):
+        """Vídeo inexistente falha sozinho e fica marcado no manifest."""
+        raw_dir = tmp_path / "raw"
+        with FileServer(remote) as server:
+            summary = make_downloader(raw_dir, server, max_attempts=2).run(catalog("1", "9"))
+
+        assert summary == {"decoded": 1, "skipped": 0, "failed": 1}
+        manifest = json.loads((raw_dir / "download_manifest.json").read_text())
+        assert manifest["9"]["status"] == "failed"
+
+    def test_bandwidth_limit_is_global(self, tmp_path, remote):
+        """Limite de banda somado entre os downloads concorrentes."""
+        total = sum((remote / f"{i}.wav").stat().st_size for i in range(1, 4))
+        limit = total / 0.5  # ~0.5 s para tudo
+        raw_dir = tmp_path / "raw"
+        with FileServer(remote) as server:
+            start = time.monotonic()
+            make_downloader(raw_dir, server, bandwidth_limit=limit).run(catalog("1", "2", "3"))
+            elapsed = time.monotonic() - start
+
+        assert elapsed >= 0.4
@@ -0,0 +1,162 @@
+"""
+Testes para data_loading.py
+
+Collate com decode/padding (shards empacotados e WAVs), sampler por
+duração, DataLoader com workers e métricas de throughput.
+"""
+
+import pytest
+from pathlib import Path
+import random
+import sys
+import time
+import numpy as np
+import soundfile as sf
+import torch
+from torch.utils.data import DataLoader
+
+# Setup paths
+TEST_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = TEST_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from train.scripts.data_loading import LengthBucketSampler, LoaderMetrics, WaveformCollator, padding_ratio
+from train.scripts.packed_shards import PackedDataset, pack_dataset
+
+
+@pytest.fixture
+def wav_items(tmp_path):
+    """3 WAVs 22050 Hz (1 estéreo) de 0.2/0.4/0.6 s"""
+    items = []
+    for i in range(3):
+        n = int(22050 * 0.2 * (i + 1))
+        audio = np.full((n, 2) if i == 0 else n, 0.25, dtype=np.float32)
+        path = tmp_path / f"a{i}.wav"
+        sf.write(str(path), audio, 22050)
+        items.append({"audio_path": str(path), "text": f"texto {i}"})
+    return items
+
+
+class TestWaveformCollator:
+    """Decode + padding no collate."""
+
+    def test_pads_wav_items_and_resamples(self, wav_items):
+        batch = WaveformCollator(sample_rate=24000)(wav_items)
+
+        assert batch["audio"].dtype == torch.float32
+        assert batch["audio"].shape == (3, int(batch["audio_lengths"].max()))
+        assert batch["audio_lengths"].tolist() == pytest.approx([4800, 9600, 14400], abs=2)
+        assert batch["texts"] == ["texto 0", "texto 1", "texto 2"]
+        # Padding com zeros após o fim de cada áudio
+        assert float(batch["audio"][0, 5000:].abs().sum()) == 0.0
+        assert float(batch["audio"][0, 100]) == pytest.approx(0.25, abs=0.01)
+
+    def test_unreadable_file_is_dropped(self, wav_items, tmp_path):
+        broken = tmp_path / "broken.wav"
+        broken.write_bytes(b"x")
+        batch = WaveformCollator(sample_rate=22050)(wav_items[:1] + [{"audio_path": str(broken), "text": "x"}])
+        assert batch["audio"].shape[0] == 1
+        assert batch["texts"] == ["texto 0"]
+
+    def test_empty_batch(self, tmp_path):
+        broken = tmp_path / "broken.wav"
+        broken.write_bytes(b"x")
+        batch = WaveformCollator(sample_rate=22050)([{"audio_path": str(broken), "text": "x"}])
+        assert batch["audio"].shape == (0, 0)
+
+    def test_packed_items_with_tokens(self, wav_items, tmp_path):
+        metadata = tmp_path / "metadata.csv"
+        metadata.write_text("\n".join(f"{item['audio_path']}|{item['text']}" for item in wav_items), encoding="utf-8")
+        pack_dataset(metadata, tmp_path / "packed", sample_rate=24000)
+        dataset = PackedDataset(tmp_path / "packed")
+
+        batch = WaveformCollator(sample_rate=24000)([dataset[0], dataset[2]])
+        assert batch["audio_lengths"].tolist() == [len(dataset[0]["audio"]), len(dataset[2]["audio"])]
+        assert batch["tokens"].shape == (2, int(batch["token_lengths"].max()))
+        assert bytes(batch["tokens"][0, :batch["token_lengths"][0]].tolist()).decode("utf-8") == "texto 0"
+
+
+class TestLengthBucketSampler:
+    """Lotes por duração."""
+
+    def lengths(self, n=1000):
+        rng = random.Random(0)
+        return [rng.randint(1000, 300000) for _ in range(n)]
+
+    def test_each_index_once(self):
+        sampler = LengthBucketSampler(self.lengths(), batch_size=7, bucket_size_multiplier=10)
+        batches = list(sampler)
+        assert sorted(i for batch in batches for i in batch) == list(range(1000))
+        assert len(batches) == len(sampler)
+        assert all(len(batch) <= 7 for batch in batches)
+
+    @pytest.mark.parametrize("n,batch_size,multiplier", [(1000, 7, 10), (95, 8, 3), (8, 8, 50), (3, 4, 2)])
+    def test_len_with_drop_last(self, n, batch_size, multiplier):
+        sampler = LengthBucketSampler(self.lengths(n), batch_size, multiplier, drop_last=True)
+        batches = list(sampler)
+        assert len(batches) == len(sampler)
+        assert all(len(batch) == batch_size for batch in batches)
+
+    def test_less_padding_than_random_batches(self):
+        lengths = self.lengths()
+        bucketed = padding_ratio(lengths, LengthBucketSampler(lengths, batch_size=8))
+        order = list(range(len(lengths)))
+        random.Random(1).shuffle(order)
+        shuffled = padding_ratio(lengths, [order[i:i + 8] for i in range(0, len(order), 8)])
+        assert bucketed < shuffled / 3
+
+    def test_epochs_are_deterministic_and_different(self):
+        sampler = LengthBucketSampler(self.lengths(), batch_size=8)
+        sampler.set_epoch(1)
+        first = list(sampler)
+        assert list(sampler) == first
+        sampler.set_epoch(2)
+        assert list(sampler) != first
+
+
+class TestDataLoader:
+    """DataLoader com workers e métricas."""
+
+    def test_workers_decode_packed_dataset(self, wav_items, tmp_path):
+        metadata = tmp_path / "metadata.csv"
+        metadata.write_text("\n".join(f"{item['audio_path']}|{item['text']}" for item in wav_items * 4), encoding="utf-8")
+        pack_dataset(metadata, tmp_path / "packed", sample_rate=24000)
+        dataset = PackedDataset(tmp_path / "packed")
+
+        loader = DataLoader(
+            dataset,
+            batch_sampler=LengthBucketSampler(dataset.lengths, batch_size=4, bucket_size_multiplier=3),
+            collate_fn=WaveformCollator(24000),
+            num_workers=2,
+        )
+        metrics = LoaderMetrics()
+        batches = list(metrics.iterate(loader))
+        summary = metrics.epoch_summary()
+
+        assert sum(batch["audio"].shape[0] for batch in batches) == 12
+        # Um bucket com tudo: cada lote tem um único comprimento (3 durações, 4 de cada)
+        assert all(len(set(batch["audio_lengths"].tolist())) == 1 for batch in batches)
+        assert summary["samples"] == 12
+        assert summary["batches"] == 3
+        assert summary["samples_per_sec"] > 0
+
+    def test_data_wait_fraction(self):
+        """Loader lento + passo rápido: quase todo o tempo esperando dados."""
+
+        def slow_loader():
+            for i in range(5):
+                time.sleep(0.02)
+                yield {"texts": ["a", "b"]}
+
+        metrics = LoaderMetrics()
+        for _ in metrics.iterate(slow_loader()):
+            pass
+        slow = metrics.epoch_summary()
+
+        for _ in metrics.iterate([{"texts": ["a"]}] * 5):
+            time.sleep(0.02)
+        fast = metrics.epoch_summary()
+
+        assert slow["samples"] == 10
+        assert slow["data_wait_fraction"] > 0.8
+        assert fast["data_wait_fraction"] < 0.2
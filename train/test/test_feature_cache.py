@@ -0,0 +1,193 @@
+"""
+Testes para feature_cache.py
+
+Mels e latents de condicionamento calculados uma vez por dataset +
+config, lidos do cache (memmap) e invalidados quando a config muda.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+# Setup paths
+TEST_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = TEST_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from train.scripts.data_loading import WaveformCollator
+from train.scripts.feature_cache import CachedFeatureDataset, FeatureCache, cache_key
+
+SAMPLE_RATE = 16000
+
+
+class WavDataset(torch.utils.data.Dataset):
+    """Itens no formato do XTTSDataset (audio_path + text)"""
+
+    def __init__(self, paths):
+        self.items = [{"audio_path": str(path), "text": f"texto {i}"} for i, path in enumerate(paths)]
+        self.lengths = [path.stat().st_size for path in paths]
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, idx):
+        return dict(self.items[idx])
+
+
+class FakeConditioningModel:
+    """Interface usada por build_latents (Xtts.get_speaker_embedding / get_gpt_cond_latents)"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_speaker_embedding(self, audio, sr):
+        self.calls.append((audio.shape, sr))
+        return torch.full((1, 512, 1), float(audio.shape[-1]))
+
+    def get_gpt_cond_latents(self, audio, sr, length=30, chunk_length=6):
+        return torch.ones(1, 32, 1024)
+
+
+@pytest.fixture
+def dataset_dir(tmp_path):
+    import soundfile as sf
+
+    dataset_dir = tmp_path / "MyTTSDataset"
+    (dataset_dir / "wavs").mkdir(parents=True)
+    lines = []
+    for i, seconds in enumerate([0.5, 1.0, 0.25, 0.75]):
+        t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+        sf.write(dataset_dir / "wavs" / f"audio_{i}.wav", 0.3 * np.sin(2 * np.pi * 220 * t), SAMPLE_RATE)
+        lines.append(f"wavs/audio_{i}.wav|texto {i}")
+    (dataset_dir / "metadata_train.csv").write_text("\n".join(lines[:3]), encoding="utf-8")
+    (dataset_dir / "metadata_val.csv").write_text(lines[3], encoding="utf-8")
+    return dataset_dir
+
+
+def make_settings(dataset_dir, **overrides):
+    values = dict(
+        dataset_dir=dataset_dir,
+        train_metadata="metadata_train.csv",
+        val_metadata="metadata_val.csv",
+        feature_cache_dir=dataset_dir / "feature_cache",
+        sample_rate=SAMPLE_RATE,
+        mel_n_fft=512,
+        mel_hop_length=128,
+        mel_win_length=512,
+        mel_n_mels=40,
+        mel_fmin=0.0,
+        mel_fmax=8000.0,
+        model_name="tts_models/multilingual/multi-dataset/xtts_v2",
+        num_reference_clips=2,
+        gpt_cond_len=6,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def train_dataset(dataset_dir):
+    return WavDataset(sorted((dataset_dir / "wavs").glob("*.wav"))[:3])
+
+
+class TestMelCache:
+    """Mels no cache memory-mapped."""
+
+    def test_build_and_read_back(self, dataset_dir):
+        """Mels gravados uma vez e lidos como view do memmap."""
+        cache = FeatureCache.for_settings(make_settings(dataset_dir))
+        dataset = train_dataset(dataset_dir)
+        store = cache.build_mels("train", dataset, workers=2)
+
+        assert len(store) == 3
+        mel = store[1]
+        assert mel.shape == (SAMPLE_RATE // 128 + 1, 40)
+        assert isinstance(mel.base, np.memmap) or isinstance(mel, np.memmap)
+        assert cache.has_mels("train", dataset)
+        assert list(cache.mels("train").frames) == list(store.frames)
+
+    def test_dataset_size_change_invalidates(self, dataset_dir):
+        cache = FeatureCache.for_settings(make_settings(dataset_dir))
+        dataset = train_dataset(dataset_dir)
+        cache.build_mels("train", dataset, workers=1)
+        dataset.items.pop()
+        assert not cache.has_mels("train", dataset)
+
+    def test_cached_dataset_feeds_collator(self, dataset_dir):
+        """Itens só com mel: batch [B, n_mels, frames] sem ler WAVs."""
+        cache = FeatureCache.for_settings(make_settings(dataset_dir))
+        base = train_dataset(dataset_dir)
+        cached = CachedFeatureDataset(base, cache.build_mels("train", base, workers=1))
+
+        item = cached[0]
+        assert "audio_path" not in item and item["text"] == "texto 0"
+        assert list(cached.lengths) == [len(cached.mels[i]) for i in range(3)]
+
+        batch = WaveformCollator(SAMPLE_RATE)([cached[i] for i in range(3)])
+        assert batch["mels"].shape == (3, 40, int(max(cached.lengths)))
+        assert batch["mels"].dtype == torch.float32
+        assert batch["mel_lengths"].tolist() == list(cached.lengths)
+        # Padding = log-mel do silêncio, não 0.0
+        shortest = int(np.argmin(cached.lengths))
+        padding = batch["mels"][shortest, :, int(cached.lengths[shortest]):]
+        assert padding.numel() > 0
+        assert torch.allclose(padding, torch.full_like(padding, float(np.log(1e-5))))
+        assert "audio" not in batch
+
+    def test_size_mismatch_rejected(self, dataset_dir):
+        cache = FeatureCache.for_settings(make_settings(dataset_dir))
+        base = train_dataset(dataset_dir)
+        store = cache.build_mels("train", base, workers=1)
+        base.items.pop()
+        with pytest.raises(ValueError):
+            CachedFeatureDataset(base, store)
+
+
+class TestCacheKey:
+    """Invalidação automática por config/dataset."""
+
+    def test_sample_rate_and_audio_config_change_key(self, dataset_dir):
+        key = cache_key(make_settings(dataset_dir))
+        assert cache_key(make_settings(dataset_dir)) == key
+        assert cache_key(make_settings(dataset_dir, sample_rate=22050)) != key
+        assert cache_key(make_settings(dataset_dir, mel_hop_length=256)) != key
+
+    def test_metadata_change_changes_key(self, dataset_dir):
+        key = cache_key(make_settings(dataset_dir))
+        (dataset_dir / "metadata_val.csv").write_text("wavs/audio_0.wav|outro texto", encoding="utf-8")
+        assert cache_key(make_settings(dataset_dir)) != key
+
+    def test_prune_stale_removes_old_config(self, dataset_dir):
+        """Cache de outro sample rate é removido; o atual fica."""
+        dataset = train_dataset(dataset_dir)
+        old = FeatureCache.for_settings(make_settings(dataset_dir, sample_rate=22050))
+        old.build_mels("train", dataset, workers=1)
+
+        cache = FeatureCache.for_settings(make_settings(dataset_dir))
+        cache.build_mels("train", dataset, workers=1)
+        assert cache.prune_stale() == [old.dir]
+        assert not old.dir.exists() and cache.has_mels("train", dataset)
+
+
+class TestLatents:
+    """Latents de condicionamento dos clipes de referência."""
+
+    def test_build_and_load_latents(self, dataset_dir):
+        """Os N clipes mais longos, resampleados para 22050 Hz."""
+        cache = FeatureCache.for_settings(make_settings(dataset_dir))
+        model = FakeConditioningModel()
+        assert not cache.has_latents()
+
+        cache.build_latents(model, train_dataset(dataset_dir))
+
+        assert cache.has_latents()
+        # audio_1 (1.0 s) e audio_0 (0.5 s), a 22050 Hz
+        assert [shape[-1] for shape, _ in model.calls] == [22050, 11025]
+        assert all(sr == 22050 for _, sr in model.calls)
+        gpt_cond_latents, speaker_embeddings = cache.reference_latents()
+        assert gpt_cond_latents.shape == (2, 32, 1024)
+        assert speaker_embeddings.shape == (2, 512, 1)
+        assert isinstance(gpt_cond_latents, np.memmap)
@@ -0,0 +1,133 @@
+"""
+Testes para ljs_dataset.py
+
+Hardlink/reflink/cópia dos WAVs do dataset e metadata LJSpeech
+(metadata.csv, splits e duration.json) numa passada.
+"""
+
+import pytest
+import errno
+import json
+import os
+from pathlib import Path
+import random
+import sys
+
+# Setup paths
+TEST_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = TEST_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from train.scripts import ljs_dataset
+from train.scripts.ljs_dataset import link_or_copy, place_files, write_ljs_metadata
+
+
+@pytest.fixture
+def sources(tmp_path):
+    src_dir = tmp_path / "processed" / "wavs"
+    src_dir.mkdir(parents=True)
+    paths = []
+    for i in range(5):
+        path = src_dir / f"seg{i}.wav"
+        path.write_bytes(bytes([i]) * 1024)
+        paths.append(path)
+    dst_dir = tmp_path / "MyTTSDataset" / "wavs"
+    dst_dir.mkdir(parents=True)
+    return paths, dst_dir
+
+
+class TestLinkOrCopy:
+    """Colocação dos arquivos no dataset."""
+
+    def test_auto_hardlinks_on_same_filesystem(self, sources):
+        """Mesmo filesystem: hardlink (mesmo inode, sem duplicar espaço)."""
+        paths, dst_dir = sources
+        dst = dst_dir / "audio_00001.wav"
+        assert link_or_copy(paths[0], dst) == "hardlink"
+        assert os.path.samefile(paths[0], dst)
+
+    def test_rerun_keeps_existing_link(self, sources):
+        """Rerun: destino já é o mesmo arquivo, nada a fazer."""
+        paths, dst_dir = sources
+        dst = dst_dir / "audio_00001.wav"
+        link_or_copy(paths[0], dst)
+        assert link_or_copy(paths[0], dst) == "existing"
+
+    def test_replaces_stale_destination(self, sources):
+        """Destino de um build anterior (outro conteúdo) é substituído."""
+        paths, dst_dir = sources
+        dst = dst_dir / "audio_00001.wav"
+        dst.write_bytes(b"antigo")
+        link_or_copy(paths[1], dst)
+        assert dst.read_bytes() == paths[1].read_bytes()
+
+    def test_copy_mode_creates_independent_file(self, sources):
+        """mode="copy": arquivo independente com o mesmo conteúdo."""
+        paths, dst_dir = sources
+        dst = dst_dir / "audio_00001.wav"
+        assert link_or_copy(paths[0], dst, mode="copy") == "copy"
+        assert not os.path.samefile(paths[0], dst)
+        assert dst.read_bytes() == paths[0].read_bytes()
+
+    def test_falls_back_to_copy_across_filesystems(self, sources, monkeypatch):
+        """Hardlink e reflink indisponíveis (EXDEV): cópia."""
+        paths, dst_dir = sources
+
+        def cross_device(*args, **kwargs):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+        monkeypatch.setattr(ljs_dataset.os, "link", cross_device)
+        monkeypatch.setattr(ljs_dataset, "_reflink", cross_device)
+        dst = dst_dir / "audio_00001.wav"
+        assert link_or_copy(paths[0], dst) == "copy"
+        assert dst.read_bytes() == paths[0].read_bytes()
+
+    def test_invalid_mode(self, sources):
+        paths, dst_dir = sources
+        with pytest.raises(ValueError):
+            link_or_copy(paths[0], dst_dir / "x.wav", mode="symlink")
+
+    def test_place_files_parallel(self, sources):
+        """Vários arquivos em paralelo, contagem por método."""
+        paths, dst_dir = sources
+        pairs = [(path, dst_dir / f"audio_{i:05d}.wav") for i, path in enumerate(paths, 1)]
+        methods = place_files(pairs, mode="copy", workers=3)
+        assert methods == {"copy": 5}
+        for src, dst in pairs:
+            assert dst.read_bytes() == src.read_bytes()
+
+
+class TestWriteLjsMetadata:
+    """metadata.csv, splits e duration.json."""
+
+    def entries(self, n=20):
+        return [(f"wavs/audio_{i:05d}.wav", f"texto {i}", 1.0 + i / 10) for i in range(1, n + 1)]
+
+    def test_matches_previous_multi_pass_output(self, tmp_path):
+        """Mesmos arquivos que o build anterior (random.seed + shuffle, "\\n".join)."""
+        entries = self.entries()
+        summary = write_ljs_metadata(tmp_path, entries, train_split=0.9, shuffle=True, seed=42)
+
+        random.seed(42)
+        combined = [(f"{path}|{text}", duration) for path, text, duration in entries]
+        random.shuffle(combined)
+        lines = [line for line, _ in combined]
+        durations = [duration for _, duration in combined]
+        split_idx = int(len(lines) * 0.9)
+
+        assert (tmp_path / "metadata.csv").read_text(encoding="utf-8") == "\n".join(lines)
+        assert (tmp_path / "metadata_train.csv").read_text(encoding="utf-8") == "\n".join(lines[:split_idx])
+        assert (tmp_path / "metadata_val.csv").read_text(encoding="utf-8") == "\n".join(lines[split_idx:])
+        duration_data = json.loads((tmp_path / "duration.json").read_text())
+        assert duration_data["duration"] == durations
+        assert duration_data["total_duration"] == pytest.approx(sum(durations))
+        assert duration_data["train_duration"] == pytest.approx(sum(durations[:split_idx]))
+        assert summary["train"] == 18 and summary["val"] == 2
+
+    def test_no_shuffle_keeps_order(self, tmp_path):
+        entries = self.entries(4)
+        write_ljs_metadata(tmp_path, entries, train_split=0.5, shuffle=False)
+        assert (tmp_path / "metadata_train.csv").read_text(encoding="utf-8").splitlines() == [
+            "wavs/audio_00001.wav|texto 1",
+            "wavs/audio_00002.wav|texto 2",
+        ]
@@ -0,0 +1,110 @@
+"""
+Testes para packed_shards.py
+
+Empacotamento de um dataset LJSpeech pequeno em shards memory-mapped:
+áudio resampleado/mono no dtype escolhido, tokens, índice de offsets,
+fatias sem cópia e detecção de shards desatualizados.
+"""
+
+import pytest
+import pickle
+from pathlib import Path
+import sys
+import numpy as np
+import soundfile as sf
+
+# Setup paths
+TEST_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = TEST_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from train.scripts.packed_shards import PackedDataset, audio_to_float, is_current, pack_dataset
+
+
+@pytest.fixture
+def ljs_dataset(tmp_path):
+    """5 WAVs estéreo 22050 Hz de 0.5-2.5 s + metadata_train.csv"""
+    dataset_dir = tmp_path / "MyTTSDataset"
+    (dataset_dir / "wavs").mkdir(parents=True)
+    lines = []
+    for i in range(5):
+        t = np.arange(int(22050 * (0.5 + i * 0.5))) / 22050
+        tone = 0.5 * np.sin(2 * np.pi * 220 * t)
+        sf.write(str(dataset_dir / "wavs" / f"audio_{i:05d}.wav"), np.stack([tone, tone], axis=1), 22050)
+        lines.append(f"wavs/audio_{i:05d}.wav|texto número {i} com acentuação")
+    metadata = dataset_dir / "metadata_train.csv"
+    metadata.write_text("\n".join(lines), encoding="utf-8")
+    return metadata
+
+
+class TestPackDataset:
+    """Empacotamento e leitura."""
+
+    def test_roundtrip_int16(self, ljs_dataset, tmp_path):
+        """Áudio mono no sample rate do treino, tokens UTF-8 decodificáveis."""
+        manifest = pack_dataset(ljs_dataset, tmp_path / "packed", sample_rate=24000)
+        dataset = PackedDataset(tmp_path / "packed")
+
+        assert manifest["num_samples"] == len(dataset) == 5
+        assert manifest["total_seconds"] == pytest.approx(0.5 + 1.0 + 1.5 + 2.0 + 2.5, abs=0.01)
+        for i in range(5):
+            item = dataset[i]
+            assert item["audio"].dtype == np.int16
+            assert len(item["audio"]) == pytest.approx(24000 * (0.5 + i * 0.5), abs=2)
+            assert bytes(item["tokens"].astype(np.uint8)).decode("utf-8") == item["text"]
+            assert item["text"] == f"texto número {i} com acentuação"
+        waveform = audio_to_float(dataset[2]["audio"])
+        assert float(waveform.abs().max()) == pytest.approx(0.5, abs=0.02)
+
+    def test_items_are_zero_copy_views(self, ljs_dataset, tmp_path):
+        """Fatias do memmap do shard, sem cópia."""
+        pack_dataset(ljs_dataset, tmp_path / "packed", sample_rate=24000)
+        dataset = PackedDataset(tmp_path / "packed")
+        first, second = dataset[0]["audio"], dataset[1]["audio"]
+
+        assert isinstance(first, np.memmap)
+        assert np.shares_memory(first, dataset._audio[0])
+        assert np.shares_memory(second, dataset._audio[0])
+
+    def test_float16_and_lengths(self, ljs_dataset, tmp_path):
+        pack_dataset(ljs_dataset, tmp_path / "packed", sample_rate=22050, audio_dtype="float16")
+        dataset = PackedDataset(tmp_path / "packed")
+        assert dataset[0]["audio"].dtype == np.float16
+        assert list(dataset.lengths) == [int(22050 * (0.5 + i * 0.5)) for i in range(5)]
+
+    def test_rolls_over_shards(self, ljs_dataset, tmp_path):
+        """shard_size_mb=0: um shard por amostra, offsets reiniciam por shard."""
+        manifest = pack_dataset(ljs_dataset, tmp_path / "packed", sample_rate=24000, shard_size_mb=0)
+        dataset = PackedDataset(tmp_path / "packed")
+
+        assert len(manifest["shards"]) == 5
+        assert list(dataset.index["shard"]) == [0, 1, 2, 3, 4]
+        assert list(dataset.index["audio_offset"]) == [0] * 5
+        assert dataset[4]["text"].endswith("acentuação")
+
+    def test_max_samples_and_pickle(self, ljs_dataset, tmp_path):
+        """Limite de amostras; pickle (workers do DataLoader) não leva os memmaps."""
+        pack_dataset(ljs_dataset, tmp_path / "packed", sample_rate=24000)
+        dataset = PackedDataset(tmp_path / "packed", max_samples=2)
+        dataset[0]
+
+        clone = pickle.loads(pickle.dumps(dataset))
+        assert len(clone) == 2
+        assert clone._audio == {}
+        assert np.array_equal(clone[1]["audio"], dataset[1]["audio"])
+
+    def test_is_current(self, ljs_dataset, tmp_path):
+        """Desatualizado quando o metadata ou o sample rate mudam."""
+        pack_dataset(ljs_dataset, tmp_path / "packed", sample_rate=24000)
+        assert is_current(tmp_path / "packed", ljs_dataset, 24000)
+        assert not is_current(tmp_path / "packed", ljs_dataset, 22050)
+        assert not is_current(tmp_path / "missing", ljs_dataset, 24000)
+
+        ljs_dataset.write_text(ljs_dataset.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+        assert not is_current(tmp_path / "packed", ljs_dataset, 24000)
+
+    def test_unreadable_file_is_skipped(self, ljs_dataset, tmp_path):
+        (ljs_dataset.parent / "wavs" / "audio_00001.wav").write_bytes(b"corrompido")
+        manifest = pack_dataset(ljs_dataset, tmp_path / "packed", sample_rate=24000)
+        assert manifest["num_samples"] == 4
+        assert manifest["skipped"] == 1
@@ -277,5 +277,257 @@ class TestVADStreaming:
         assert chunks_processed == 100  # 1000000 / 10000
 
 
+class TestVectorizedVAD:
+    """Paridade do VAD vetorizado com o loop por frame original."""
+
+    SEG_CONFIG = {
+        "vad_threshold": -40.0,
+        "vad_frame_size": 512,
+        "min_silence_duration": 0.3,
+    }
+
+    @staticmethod
+    def bursty_audio(seconds, sr=22050, seed=0):
+        """Rajadas de tom e pausas de tamanhos variados sobre ruído baixo."""
+        from benchmarks.segment_vad import synthetic_speech_chunks
+        return np.concatenate(list(synthetic_speech_chunks(seconds, sr, chunk_seconds=7.3, seed=seed)))
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    @pytest.mark.parametrize("frame_size", [512, 400, 333])
+    def test_chunk_parity_with_reference(self, seed, frame_size):
+        """detect_voice_in_chunk == implementação original (mesmo chunk)."""
+        from benchmarks.segment_vad import reference_detect_voice_in_chunk
+        from train.scripts.segment_audio import detect_voice_in_chunk
+
+        config = {**self.SEG_CONFIG, "vad_frame_size": frame_size}
+        audio = self.bursty_audio(40.0, seed=seed)
+
+        expected = reference_detect_voice_in_chunk(audio, 22050, config)
+        assert detect_voice_in_chunk(audio, 22050, config) == pytest.approx(expected)
+        assert len(expected) > 5
+
+    def test_streaming_matches_whole_file(self):
+        """Estado carregado entre chunks: mesmo resultado que sem chunks."""
+        from benchmarks.segment_vad import reference_detect_voice_in_chunk
+        from train.scripts.segment_audio import RMSVoiceDetector
+
+        audio = self.bursty_audio(60.0, seed=3)
+        expected = reference_detect_voice_in_chunk(audio, 22050, self.SEG_CONFIG)
+
+        rng = np.random.default_rng(0)
+        detector = RMSVoiceDetector(22050, self.SEG_CONFIG)
+        segments, pos = [], 0
+        while pos < len(audio):
+            size = int(rng.integers(100, 5 * 22050))
+            segments += detector.process(audio[pos:pos + size])
+            pos += size
+        segments += detector.flush()
+
+        assert segments == pytest.approx(expected)
+
+    def test_region_not_split_at_chunk_edge(self, tmp_path):
+        """Fala contínua atravessando a borda de um chunk vira uma região só."""
+        from train.scripts.segment_audio import iter_voice_regions
+
+        sr = 16000
+        t = np.arange(int(sr * 6.0)) / sr
+        audio = np.zeros(int(sr * 14.0), dtype=np.float32)
+        audio[sr * 4:sr * 10] = 0.3 * np.sin(2 * np.pi * 200 * t)  # 4s-10s, borda do chunk em 5s
+        path = tmp_path / "edge.wav"
+        sf.write(path, audio, sr)
+
+        config = {**self.SEG_CONFIG, "use_vad": True, "vad_chunk_duration": 5.0}
+        regions = list(iter_voice_regions(path, config, sr, len(audio)))
+
+        assert len(regions) == 1
+        start, end = regions[0]
+        assert start == pytest.approx(4.0, abs=0.05)
+        assert end == pytest.approx(10.3, abs=0.05)
+
+    def test_silence_and_short_input(self):
+        """Silêncio puro e chunk menor que um frame não geram regiões."""
+        from train.scripts.segment_audio import RMSVoiceDetector, detect_voice_in_chunk
+
+        assert detect_voice_in_chunk(np.zeros(22050, dtype=np.float32), 22050, self.SEG_CONFIG) == []
+        detector = RMSVoiceDetector(22050, self.SEG_CONFIG)
+        assert detector.process(np.ones(100, dtype=np.float32)) == []
+        assert detector.frames_processed == 0
+
+
+class TestVADBackends:
+    """Backends de VAD plugáveis (segmentation.vad_backend)."""
+
+    SR = 22050
+
+    @staticmethod
+    def streamed(detector, audio, chunk_samples):
+        regions = []
+        for i in range(0, len(audio), chunk_samples):
+            regions += detector.process(audio[i:i + chunk_samples])
+        return regions + detector.flush()
+
+    def test_default_backend_is_rms(self):
+        """Sem vad_backend, RMS (comportamento anterior)."""
+        from train.scripts.segment_audio import RMSVoiceDetector, create_voice_detector
+        assert isinstance(create_voice_detector(self.SR, {}), RMSVoiceDetector)
+
+    def test_unknown_backend_raises(self):
+        """Backend inexistente falha com erro claro."""
+        from train.scripts.segment_audio import create_voice_detector
+        with pytest.raises(ValueError, match="vad_backend"):
+            create_voice_detector(self.SR, {"vad_backend": "nope"})
+
+    def test_missing_dependency_raises_import_error(self):
+        """Backend sem o pacote instalado: ImportError com instrução de instalação."""
+        from train.scripts.segment_audio import create_voice_detector
+        with patch.dict(sys.modules, {"webrtcvad": None}):
+            with pytest.raises(ImportError, match="pip install webrtcvad"):
+                create_voice_detector(self.SR, {"vad_backend": "webrtc"})
+
+    def test_silero_streaming_matches_whole_file(self):
+        """Silero: chunks pequenos (fila entre chunks) == arquivo inteiro no mesmo lote."""
+        pytest.importorskip("silero_vad")
+        from train.scripts.segment_audio import create_voice_detector
+        audio = TestVectorizedVAD.bursty_audio(40, self.SR, seed=1)
+        # 40 s = 1250 janelas < 16 x 128: uma única inferência em lote no flush
+        config = {"vad_backend": "silero"}
+
+        whole = self.streamed(create_voice_detector(self.SR, config), audio, len(audio))
+        chunked = self.streamed(create_voice_detector(self.SR, config), audio, int(self.SR * 1.3))
+        assert chunked == whole
+
+    def test_silero_batched_close_to_sequential(self):
+        """Sub-streams em lote (com aquecimento) ~ inferência sequencial janela a janela."""
+        pytest.importorskip("silero_vad")
+        from train.scripts.segment_audio import create_voice_detector
+        audio = TestVectorizedVAD.bursty_audio(40, self.SR, seed=1)
+
+        def probs(**config):
+            detector = create_voice_detector(self.SR, {"vad_backend": "silero", **config})
+            return detector.speech_probs(detector._frames.frames(audio))
+
+        sequential = probs(vad_batch_size=1)
+        batched = probs(vad_batch_size=8, vad_stream_windows=128)
+        assert len(batched) == len(sequential)
+        assert np.mean((sequential > 0.5) != (batched > 0.5)) < 0.01
+
+    def test_silero_pending_start_holds_unclassified_audio(self):
+        """Janelas na fila não contam como processadas: ChunkBuffer retém o áudio."""
+        pytest.importorskip("silero_vad")
+        from train.scripts.segment_audio import create_voice_detector
+        detector = create_voice_detector(self.SR, {"vad_backend": "silero"})
+        detector.process(TestVectorizedVAD.bursty_audio(5, self.SR))
+        assert detector.frames_processed == 0
+        assert detector.pending_start_sample == 0
+
+
+class TestParallelSegmentation:
+    """Segmentação multi-arquivo: paralelismo, leitura única e resume."""
+
+    @pytest.fixture
+    def seg_env(self, tmp_path, monkeypatch):
+        """Arquivos raw sintéticos e saída sob um project_root temporário."""
+        from benchmarks.segment_vad import synthetic_speech_chunks
+        from train.scripts import segment_audio
+
+        monkeypatch.setattr(segment_audio, "project_root", tmp_path)
+        raw_dir = tmp_path / "train" / "data" / "raw"
+        wavs_dir = tmp_path / "train" / "data" / "processed" / "wavs"
+        raw_dir.mkdir(parents=True)
+        wavs_dir.mkdir(parents=True)
+
+        files = []
+        for seed, sr in enumerate([16000, 22050, 44100]):
+            audio = np.concatenate(list(synthetic_speech_chunks(45.0, sr, seed=seed)))
+            path = raw_dir / f"video_{seed}.wav"
+            sf.write(path, audio, sr)
+            files.append(path)
+
+        config = {
+            "audio": {"target_sample_rate": 22050, "normalize_audio": False},
+            "segmentation": {
+                "use_vad": True,
+                "vad_threshold": -40.0,
+                "vad_frame_size": 512,
+                "vad_chunk_duration": 3.0,
+                "min_silence_duration": 0.3,
+                "min_duration": 1.0,
+                "max_duration": 4.0,
+                "segment_overlap": 0.2,
+            },
+        }
+        return files, wavs_dir, tmp_path / "manifests", config
+
+    def test_parallel_matches_sequential(self, seg_env):
+        """Mapping determinístico e WAVs idênticos com 1 ou N processos."""
+        from train.scripts.segment_audio import segment_files
+
+        files, wavs_dir, manifest_dir, config = seg_env
+        sequential = segment_files(files, wavs_dir, config, manifest_dir, num_workers=1, resume=False)
+        sequential_audio = {p.name: sf.read(p)[0] for p in wavs_dir.glob("*.wav")}
+
+        parallel = segment_files(files, wavs_dir, config, manifest_dir, num_workers=3, resume=False)
+
+        assert parallel == sequential
+        assert [s["original_file"] for s in parallel] == sorted(s["original_file"] for s in parallel)
+        assert len(sequential) > 10
+        for name, audio in sequential_audio.items():
+            np.testing.assert_array_equal(sf.read(wavs_dir / name)[0], audio)
+
+    def test_single_read_matches_file_extraction(self, seg_env):
+        """Segmento extraído do buffer do VAD == leitura direta do arquivo."""
+        from train.scripts.segment_audio import _finish_and_write_segment, process_audio_file
+
+        files, wavs_dir, _, config = seg_env
+        segments = process_audio_file(files[2], wavs_dir, config)
+
+        with sf.SoundFile(str(files[2])) as f:
+            sr = f.samplerate
+            for seg in segments[::5]:
+                start = int(round(seg["start_time"] * sr))
+                f.seek(start)
+                raw = f.read(frames=int(round(seg["end_time"] * sr)) - start, dtype="float32")
+                expected_path = wavs_dir / "expected.wav"
+                _finish_and_write_segment(raw, sr, 22050, config["audio"], None, 5.0, expected_path)
+                np.testing.assert_array_equal(
+                    sf.read(wavs_dir / Path(seg["audio_path"]).name)[0], sf.read(expected_path)[0]
+                )
+
+    def test_resume_skips_unchanged_files(self, seg_env, monkeypatch):
+        """Mesmo hash de config: nada é reprocessado; config nova: reprocessa."""
+        from train.scripts import segment_audio
+
+        files, wavs_dir, manifest_dir, config = seg_env
+        first = segment_audio.segment_files(files, wavs_dir, config, manifest_dir, num_workers=1)
+
+        calls = []
+        original = segment_audio.process_audio_file
+        monkeypatch.setattr(
+            segment_audio, "process_audio_file",
+            lambda *args, **kwargs: calls.append(args[0]) or original(*args, **kwargs)
+        )
+
+        assert segment_audio.segment_files(files, wavs_dir, config, manifest_dir, num_workers=1) == first
+        assert calls == []
+
+        (wavs_dir / Path(first[0]["audio_path"]).name).unlink()
+        changed = {**config, "segmentation": {**config["segmentation"], "max_duration": 3.0}}
+        segment_audio.segment_files(files, wavs_dir, changed, manifest_dir, num_workers=1)
+        assert calls == files
+
+    def test_chunk_buffer_discards_whole_chunks(self):
+        from train.scripts.segment_audio import ChunkBuffer
+
+        buffer = ChunkBuffer()
+        for i in range(3):
+            buffer.append(np.full(10, i, dtype=np.float32))
+        buffer.discard_before(15)
+
+        assert buffer.start_sample == 10
+        np.testing.assert_array_equal(buffer.read(18, 4), [1, 1, 2, 2])
+        with pytest.raises(ValueError):
+            buffer.read(5, 2)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,161 @@
+"""
+Testes para stream_stages.py
+
+Estágios em streaming com filas limitadas: todos os itens passam por
+todas as etapas, etapas se sobrepõem, fila cheia segura o estágio
+anterior (backpressure), lotes, falhas isoladas e estatísticas.
+"""
+
+from pathlib import Path
+import sys
+import threading
+import time
+
+# Setup paths
+TEST_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = TEST_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from train.scripts.stream_stages import Stage, run_stages
+
+
+class TestRunStages:
+    """Fluxo entre estágios."""
+
+    def test_all_items_flow_through_all_stages(self):
+        """Fan-out (1 -> N itens) e vários workers por estágio: nada perdido nem duplicado."""
+        out = []
+        stats = run_stages(
+            range(20),
+            [
+                Stage("split", lambda x: [(x, 0), (x, 1), (x, 2)], workers=3, queue_size=2),
+                Stage("double", lambda item: [item[0] * 10 + item[1]], workers=4, queue_size=2),
+            ],
+            report_interval=0,
+            sink=out.append,
+        )
+
+        assert sorted(out) == sorted(x * 10 + k for x in range(20) for k in range(3))
+        assert [(s.received, s.emitted) for s in stats] == [(20, 60), (60, 60)]
+
+    def test_stages_overlap(self):
+        """Segundo estágio começa antes do primeiro terminar todos os itens."""
+        events = []
+        lock = threading.Lock()
+
+        def first(x):
+            time.sleep(0.02)
+            with lock:
+                events.append(("first", x))
+            return [x]
+
+        def second(x):
+            with lock:
+                events.append(("second", x))
+            return [x]
+
+        run_stages(range(10), [Stage("a", first), Stage("b", second)], report_interval=0)
+
+        first_second = events.index(("second", 0))
+        last_first = max(i for i, event in enumerate(events) if event[0] == "first")
+        assert first_second < last_first
+
+    def test_bounded_queue_applies_backpressure(self):
+        """Estágio lento: o anterior não avança mais que fila + workers à frente."""
+        produced = []
+        consumed = []
+        max_ahead = []
+
+        def produce(x):
+            produced.append(x)
+            max_ahead.append(len(produced) - len(consumed))
+            return [x]
+
+        def consume(x):
+            time.sleep(0.01)
+            consumed.append(x)
+            return [x]
+
+        run_stages(
+            range(30),
+            [Stage("fast", produce, queue_size=1), Stage("slow", consume, queue_size=2)],
+            report_interval=0,
+        )
+
+        assert len(consumed) == 30
+        assert max(max_ahead) <= 2 + 1 + 1  # fila do lento + item em processamento + item aguardando put
+
+    def test_batches_respect_size_and_timeout(self):
+        """Lotes de até batch_size; o resto sai no fim do fluxo."""
+        batches = []
+        run_stages(
+            range(10),
+            [Stage("batch", lambda items: batches.append(list(items)) or items, batch_size=4, batch_timeout=0.5,
+                   queue_size=16)],
+            report_interval=0,
+        )
+
+        assert sorted(x for batch in batches for x in batch) == list(range(10))
+        assert all(len(batch) <= 4 for batch in batches)
+
+    def test_batch_timeout_flushes_partial_batch(self):
+        """Fonte lenta: lote parcial sai após batch_timeout em vez de esperar completar."""
+        batch_times = []
+
+        def slow_source():
+            for x in range(3):
+                yield x
+                time.sleep(0.3)
+
+        start = time.monotonic()
+        run_stages(
+            slow_source(),
+            [Stage("batch", lambda items: batch_times.append((time.monotonic() - start, len(items))),
+                   batch_size=10, batch_timeout=0.05)],
+            report_interval=0,
+        )
+
+        assert len(batch_times) == 3
+        assert batch_times[0][0] < 0.25
+
+    def test_failures_are_isolated(self):
+        """Erro em um item conta como falha; os demais seguem até o fim."""
+        out = []
+
+        def fragile(x):
+            if x % 5 == 0:
+                raise ValueError(f"item {x}")
+            return [x]
+
+        stats = run_stages(
+            range(20),
+            [Stage("fragile", fragile, workers=2), Stage("sink", lambda x: [x])],
+            report_interval=0,
+            sink=out.append,
+        )
+
+        assert sorted(out) == [x for x in range(20) if x % 5]
+        assert stats[0].failed == 4
+        assert stats[1].received == 16
+
+    def test_stats_and_live_report(self, caplog):
+        """Estatísticas por estágio e relatório ao vivo com backlog da fila."""
+        caplog.set_level("INFO", logger="train.scripts.stream_stages")
+
+        def slow(x):
+            time.sleep(0.02)
+            return [x]
+
+        stats = run_stages(range(10), [Stage("slow", slow, queue_size=4)], report_interval=0.05)
+
+        summary = stats[0].as_dict()
+        assert summary["received"] == 10
+        assert summary["items_per_second"] > 0
+        assert 0 < summary["utilization"] <= 1.0
+        assert any("slow: " in record.message and "fila " in record.message for record in caplog.records)
+
+    def test_empty_source(self):
+        """Fonte vazia termina sem travar."""
+        stats = run_stages([], [Stage("a", lambda x: [x], workers=3), Stage("b", lambda x: [x], workers=2)],
+                           report_interval=0)
+        assert [s.received for s in stats] == [0, 0]
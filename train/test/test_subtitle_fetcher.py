@@ -0,0 +1,185 @@
+"""
+Testes para subtitle_fetcher.py
+
+Download concorrente contra um servidor HTTP local (stub): rate limit
+compartilhado, backoff após 429, cache em disco e falhas isoladas por
+vídeo. O `resolve` do yt-dlp é substituído por URLs do servidor local.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import sys
+import threading
+import time
+
+# Setup paths
+TEST_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = TEST_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from train.scripts.subtitle_fetcher import HostBackoff, SubtitleFetcher, TokenBucket
+
+VTT = "WEBVTT\n\n00:00:00.000 --> 00:00:02.000\nolá mundo\n"
+
+
+class StubServer:
+    """Servidor HTTP local: /vtt/<id> responde VTT; 429 nas primeiras N requisições de /flaky"""
+
+    def __init__(self, flaky_failures: int = 0, retry_after: str | None = None):
+        self.requests: list[tuple[float, str]] = []
+        self.flaky_failures = flaky_failures
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append((time.monotonic(), self.path))
+                if self.path.startswith("/flaky") and stub.flaky_failures > 0:
+                    stub.flaky_failures -= 1
+                    self.send_response(429)
+                    if retry_after is not None:
+                        self.send_header("Retry-After", retry_after)
+                    self.end_headers()
+                    return
+                if self.path.startswith("/missing"):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = VTT.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/vtt")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_fetcher(tmp_path, server, path="vtt", **kwargs):
+    """Fetcher cujo resolve aponta para o servidor local"""
+    resolved = []
+
+    def resolve(youtube_url):
+        resolved.append(youtube_url)
+        video = youtube_url.rsplit("=", 1)[-1]
+        return [] if video.startswith("nosubs") else [("pt", "vtt", f"{server.url}/{path}/{video}")]
+
+    options = dict(langs=["pt"], formats=["vtt"], requests_per_second=0, backoff_base=0.05, backoff_max=0.5)
+    options.update(kwargs)
+    fetcher = SubtitleFetcher(tmp_path / "subtitles", resolve=resolve, **options)
+    return fetcher, resolved
+
+
+def videos(*ids):
+    return {video_id: f"https://www.youtube.com/watch?v={video_id}" for video_id in ids}
+
+
+class TestTokenBucket:
+    """Rate limit compartilhado."""
+
+    def test_limits_rate_across_threads(self):
+        """8 aquisições em 4 threads a 20/s (burst 1) levam ~0.35 s."""
+        bucket = TokenBucket(rate=20, capacity=1)
+        start = time.monotonic()
+        threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(2)]) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert time.monotonic() - start >= 0.3
+
+    def test_backoff_grows_per_host(self):
+        """Atraso dobra a cada falha do mesmo host; outros hosts não são afetados."""
+        backoff = HostBackoff(base=1.0, max_delay=100.0)
+        delays = [backoff.failure("a") for _ in range(4)]
+        assert [0.5 <= d / 2 ** i <= 1.0 for i, d in enumerate(delays)] == [True] * 4
+        assert backoff.failures("b") == 0
+        assert backoff.failure("a", retry_after=300) == 100.0  # Retry-After limitado ao máximo
+        backoff.success("a")
+        assert backoff.failures("a") == 0
+
+
+class TestSubtitleFetcher:
+    """Download concorrente contra servidor HTTP local."""
+
+    def test_fetches_all_videos_concurrently(self, tmp_path):
+        """Todos os vídeos baixados; vídeo sem legenda não entra no resultado."""
+        with StubServer() as server:
+            fetcher, _ = make_fetcher(tmp_path, server, workers=4)
+            results = fetcher.fetch_all(videos("1", "2", "3", "nosubs4"))
+
+        assert sorted(results) == ["1", "2", "3"]
+        assert results["1"].name == "video_00001.pt.vtt"
+        assert results["2"].read_text(encoding="utf-8") == VTT
+
+    def test_rerun_uses_disk_cache(self, tmp_path):
+        """Segunda execução não faz requisições (inclusive para vídeo sem legenda)."""
+        with StubServer() as server:
+            fetcher, _ = make_fetcher(tmp_path, server)
+            first = fetcher.fetch_all(videos("1", "2", "nosubs3"))
+
+            fetcher, resolved = make_fetcher(tmp_path, server)
+            requests_before = len(server.requests)
+            second = fetcher.fetch_all(videos("1", "2", "nosubs3"))
+
+        assert second == first
+        assert resolved == []
+        assert len(server.requests) == requests_before
+
+    def test_429_backs_off_and_retries(self, tmp_path):
+        """429 não aborta a etapa: backoff do host e nova tentativa."""
+        with StubServer(flaky_failures=2) as server:
+            fetcher, _ = make_fetcher(tmp_path, server, path="flaky", workers=2, max_attempts=4)
+            results = fetcher.fetch_all(videos("1", "2"))
+
+        assert sorted(results) == ["1", "2"]
+        assert len(server.requests) == 4
+        # Nova tentativa só depois do backoff (>= base * 0.5)
+        first_retry_gap = server.requests[2][0] - server.requests[0][0]
+        assert first_retry_gap >= 0.025
+
+    def test_retry_after_header_respected(self, tmp_path):
+        """Retry-After do servidor define o atraso mínimo."""
+        with StubServer(flaky_failures=1, retry_after="1") as server:
+            fetcher, _ = make_fetcher(tmp_path, server, path="flaky", backoff_max=2.0)
+            fetcher.fetch_all(videos("1"))
+
+        assert server.requests[1][0] - server.requests[0][0] >= 0.9
+
+    def test_failures_are_isolated_and_not_cached(self, tmp_path):
+        """Rate limit esgotado / 404 falham só aquele vídeo e são tentados no rerun."""
+        with StubServer(flaky_failures=100) as server:
+            fetcher, _ = make_fetcher(tmp_path, server, path="flaky", max_attempts=2)
+            assert fetcher.fetch_all(videos("1")) == {}
+
+            fetcher, _ = make_fetcher(tmp_path, server, path="missing")
+            assert fetcher.fetch_all(videos("1")) == {}
+
+            fetcher, resolved = make_fetcher(tmp_path, server)
+            results = fetcher.fetch_all(videos("1"))
+
+        assert resolved == ["https://www.youtube.com/watch?v=1"]
+        assert list(results) == ["1"]
+
+    def test_shared_rate_limit(self, tmp_path):
+        """Token bucket limita requisições somando todos os workers."""
+        with StubServer() as server:
+            fetcher, _ = make_fetcher(tmp_path, server, workers=4, requests_per_second=20, burst=1)
+            start = time.monotonic()
+            fetcher.fetch_all(videos("1", "2", "3", "4"))
+            elapsed = time.monotonic() - start
+
+        # 8 requisições (resolve + download por vídeo) a 20/s, burst 1
+        assert elapsed >= 0.3
@@ -0,0 +1,116 @@
+"""
+Testes para subtitle_index.py
+
+Valida parse de VTT/SRT com timestamps e a consulta por intervalo usada
+para alinhar legendas aos segmentos.
+"""
+
+import pytest
+from pathlib import Path
+import random
+import sys
+
+# Setup paths
+TEST_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = TEST_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from train.scripts.subtitle_index import SubtitleCue, SubtitleIndex, parse_subtitle_cues, parse_timestamp
+
+
+VTT = """WEBVTT
+Kind: captions
+Language: pt
+
+00:00:00.500 --> 00:00:02.000 align:start position:0%
+olá<00:00:00.900><c> pessoal</c>
+
+00:00:02.000 --> 00:00:02.010 align:start position:0%
+olá pessoal
+
+00:00:02.010 --> 00:00:04.500 align:start position:0%
+olá pessoal
+hoje<00:00:02.500><c> vamos</c><c> falar</c>
+
+00:00:04.500 --> 00:01:08.000
+de <i>áudio</i>
+"""
+
+SRT = """1
+00:00:01,000 --> 00:00:03,000
+Primeira fala
+
+2
+00:00:03,500 --> 00:00:06,000
+Segunda fala
+em duas linhas
+"""
+
+
+class TestParseSubtitles:
+    """Parse de VTT/SRT mantendo timestamps."""
+
+    def test_timestamps(self):
+        """Formatos com e sem horas, vírgula ou ponto."""
+        assert parse_timestamp("01:02:03.456") == pytest.approx(3723.456)
+        assert parse_timestamp("02:03,250") == pytest.approx(123.25)
+
+    def test_vtt_rolling_captions_deduplicated(self, tmp_path):
+        """Tags inline removidas e linhas repetidas do YouTube descartadas."""
+        path = tmp_path / "video_00001.pt.vtt"
+        path.write_text(VTT, encoding="utf-8")
+        cues = parse_subtitle_cues(path)
+        assert [c.text for c in cues] == ["olá pessoal", "hoje vamos falar", "de áudio"]
+        assert cues[1].start == pytest.approx(2.01)
+        assert cues[2].end == pytest.approx(68.0)
+
+    def test_srt(self, tmp_path):
+        """SRT com índice numérico e texto em várias linhas."""
+        path = tmp_path / "video_00001.pt.srt"
+        path.write_text(SRT, encoding="utf-8")
+        cues = parse_subtitle_cues(path)
+        assert cues == [
+            SubtitleCue(1.0, 3.0, "Primeira fala"),
+            SubtitleCue(3.5, 6.0, "Segunda fala em duas linhas"),
+        ]
+
+
+class TestSubtitleIndex:
+    """Consulta por intervalo."""
+
+    @pytest.fixture
+    def index(self):
+        return SubtitleIndex([
+            SubtitleCue(0.0, 2.0, "a"),
+            SubtitleCue(2.0, 4.0, "b"),
+            SubtitleCue(3.5, 5.0, "c"),   # sobreposto ao anterior
+            SubtitleCue(10.0, 12.0, "d"),
+        ])
+
+    def test_segment_gets_only_its_cues(self, index):
+        """Cada segmento recebe só os cues do seu intervalo."""
+        assert index.text_for_segment(0.0, 4.2) == "a b"
+        assert index.text_for_segment(4.2, 9.0) == "c"
+        assert index.text_for_segment(6.0, 9.0) == ""
+        assert index.text_for_segment(9.5, 13.0) == "d"
+
+    def test_boundary_cue_assigned_once(self, index):
+        """Cue cortado na borda vai para o segmento com o seu ponto médio."""
+        # "b" (2.0-4.0, meio 3.0) cruza a borda em 2.9
+        assert index.text_for_segment(0.0, 2.9) == "a"
+        assert index.text_for_segment(2.9, 6.0) == "b c"
+
+    def test_matches_linear_scan(self):
+        """Busca binária == varredura linear em cues aleatórios com sobreposição."""
+        rng = random.Random(0)
+        cues = []
+        for i in range(500):
+            start = rng.uniform(0, 1000)
+            cues.append(SubtitleCue(start, start + rng.uniform(0, 30), str(i)))
+        index = SubtitleIndex(cues)
+
+        for _ in range(200):
+            start = rng.uniform(0, 1000)
+            end = start + rng.uniform(0, 15)
+            expected = [c for c in index.cues if c.start < end and c.end > start]
+            assert index.overlapping(start, end) == expected
@@ -0,0 +1,108 @@
+"""
+Testes para transcript_store.py
+
+Valida o checkpoint JSONL append-only: resume, recuperação de escrita
+interrompida, fsync em lote e compactação para transcriptions.json.
+"""
+
+import json
+from pathlib import Path
+import sys
+from unittest.mock import patch
+
+# Setup paths
+TEST_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = TEST_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from train.scripts.transcript_store import TranscriptLog, resume_transcript_log
+
+
+def record(i, text=None):
+    return {"audio_path": f"processed/wavs/seg_{i:04d}.wav", "text": text or f"texto {i}", "char_count": 7}
+
+
+class TestTranscriptLog:
+    """Log JSONL append-only."""
+
+    def test_append_and_resume_index(self, tmp_path):
+        """Registros gravados aparecem no índice de resume."""
+        log = TranscriptLog(tmp_path / "transcriptions.jsonl")
+        with log:
+            for i in range(5):
+                log.append(record(i))
+
+        reopened = TranscriptLog(tmp_path / "transcriptions.jsonl")
+        assert reopened.load_index() == {record(i)["audio_path"] for i in range(5)}
+        assert [r["text"] for r in reopened.records()] == [f"texto {i}" for i in range(5)]
+
+    def test_torn_last_line_is_dropped_and_repaired(self, tmp_path):
+        """Crash no meio de um append: linha incompleta ignorada e removida ao reabrir."""
+        path = tmp_path / "transcriptions.jsonl"
+        with TranscriptLog(path) as log:
+            log.append(record(0))
+            log.append(record(1))
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"audio_path": "processed/wavs/seg_0002.wav", "te')
+
+        log = TranscriptLog(path)
+        assert len(log.load_index()) == 2
+        with log:
+            log.append(record(3))
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["audio_path"] for line in lines] == [record(i)["audio_path"] for i in (0, 1, 3)]
+
+    def test_fsync_is_batched(self, tmp_path):
+        """fsync a cada `fsync_every` registros, não a cada append."""
+        log = TranscriptLog(tmp_path / "transcriptions.jsonl", fsync_every=10, fsync_seconds=3600)
+        with patch("train.scripts.transcript_store.os.fsync") as fsync:
+            with log:
+                for i in range(25):
+                    log.append(record(i))
+            # 2 lotes completos + 1 no close
+            assert fsync.call_count == 3
+
+    def test_compact_orders_and_deduplicates(self, tmp_path):
+        """Compactação: ordem do mapping, último registro de cada segmento vence."""
+        log = TranscriptLog(tmp_path / "transcriptions.jsonl")
+        with log:
+            log.append(record(2))
+            log.append(record(0))
+            log.append(record(1))
+            log.append(record(0, "retranscrito"))
+
+        output = tmp_path / "transcriptions.json"
+        order = [record(i)["audio_path"] for i in range(3)]
+        records = log.compact(output, order)
+
+        assert [r["audio_path"] for r in records] == order
+        assert records[0]["text"] == "retranscrito"
+        assert json.loads(output.read_text(encoding="utf-8")) == records
+        assert not (tmp_path / "transcriptions.json.tmp").exists()
+
+
+class TestResume:
+    """Resume compartilhado pelos scripts de transcrição."""
+
+    def test_seeds_from_legacy_json(self, tmp_path):
+        """Sem log, importa o transcriptions.json de execuções anteriores."""
+        legacy = [record(i) for i in range(3)]
+        (tmp_path / "transcriptions.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+        log, processed = resume_transcript_log(tmp_path, {})
+        log.close()
+        assert processed == {r["audio_path"] for r in legacy}
+        assert (tmp_path / "transcriptions.jsonl").exists()
+
+    def test_resume_continues_existing_log(self, tmp_path):
+        """Segunda execução vê os registros da primeira e continua o mesmo arquivo."""
+        log, processed = resume_transcript_log(tmp_path, {"log_fsync_every": 2})
+        assert processed == set()
+        log.append(record(0))
+        log.close()
+
+        log, processed = resume_transcript_log(tmp_path, {})
+        assert processed == {record(0)["audio_path"]}
+        log.append(record(1))
+        log.close()
+        assert len(log.compact(tmp_path / "transcriptions.json")) == 2
@@ -0,0 +1,119 @@
+"""
+Testes para whisper_batch.py
+
+Valida agrupamento por duração, prefetch em background e leitura de
+áudio a 16 kHz (sem carregar modelo Whisper).
+"""
+
+import pytest
+from pathlib import Path
+import sys
+import threading
+import time
+import numpy as np
+import soundfile as sf
+
+# Setup paths
+TEST_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = TEST_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from train.scripts.whisper_batch import (
+    length_sorted_batches,
+    load_audio_16k,
+    prefetch,
+    segment_duration,
+)
+
+
+class TestLengthSortedBatches:
+    """Buckets por duração."""
+
+    def test_batches_cover_all_indices_once(self):
+        """Todos os índices aparecem exatamente uma vez."""
+        durations = list(np.random.default_rng(0).uniform(1, 12, size=53))
+        batches = length_sorted_batches(durations, 8)
+        flat = [i for batch in batches for i in batch]
+        assert sorted(flat) == list(range(53))
+        assert [len(b) for b in batches] == [8] * 6 + [5]
+
+    def test_batches_group_similar_durations(self):
+        """Lotes em ordem decrescente de duração, sem sobreposição entre lotes."""
+        durations = [3.0, 11.0, 7.5, 9.0, 1.0, 12.0, 8.0, 2.0]
+        batches = length_sorted_batches(durations, 3)
+        assert batches == [[5, 1, 3], [6, 2, 0], [7, 4]]
+        for previous, current in zip(batches, batches[1:]):
+            assert min(durations[i] for i in previous) >= max(durations[i] for i in current)
+
+    def test_empty_and_invalid_batch_size(self):
+        """Lista vazia e batch_size < 1."""
+        assert length_sorted_batches([], 4) == []
+        assert length_sorted_batches([1.0, 2.0], 0) == [[1], [0]]
+
+
+class TestPrefetch:
+    """Thread de prefetch."""
+
+    def test_preserves_order(self):
+        """Resultados na ordem dos itens."""
+        assert list(prefetch(range(20), lambda x: x * x, depth=3)) == [x * x for x in range(20)]
+
+    def test_runs_ahead_of_consumer(self):
+        """Carga do próximo item acontece enquanto o consumidor processa o atual."""
+        loaded = []
+
+        def load(item):
+            loaded.append(item)
+            return item
+
+        results = prefetch(range(5), load, depth=2)
+        assert next(results) == 0
+        deadline = time.time() + 2
+        while len(loaded) < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(loaded) >= 3  # item atual + até 2 à frente
+        assert list(results) == [1, 2, 3, 4]
+
+    def test_propagates_errors(self):
+        """Exceção na thread é relançada no consumidor."""
+        def load(item):
+            if item == 2:
+                raise ValueError("arquivo corrompido")
+            return item
+
+        results = []
+        with pytest.raises(ValueError, match="corrompido"):
+            for item in prefetch(range(5), load):
+                results.append(item)
+        assert results == [0, 1]
+
+    def test_close_stops_thread(self):
+        """Fechar o gerador encerra a thread de prefetch."""
+        results = prefetch(range(1000), lambda x: x, depth=1)
+        next(results)
+        results.close()
+        assert not any(t.name == "whisper-prefetch" for t in threading.enumerate())
+
+
+class TestAudioLoading:
+    """Leitura de segmentos para o Whisper."""
+
+    def test_load_audio_resamples_to_16k_mono(self, tmp_path):
+        """WAV 22050 Hz estéreo vira mono float32 a 16 kHz."""
+        path = tmp_path / "seg.wav"
+        sr = 22050
+        audio = np.stack([np.sin(np.linspace(0, 100, sr * 2))] * 2, axis=1).astype(np.float32) * 0.5
+        sf.write(str(path), audio, sr)
+
+        loaded = load_audio_16k(path)
+        assert loaded.dtype == np.float32
+        assert loaded.ndim == 1
+        assert abs(len(loaded) - 32000) <= 1
+
+    def test_segment_duration_falls_back_to_header(self, tmp_path):
+        """Sem `duration` no mapping, usa o cabeçalho do WAV."""
+        path = tmp_path / "seg.wav"
+        sf.write(str(path), np.zeros(16000 * 3, dtype=np.float32), 16000)
+        assert segment_duration({"duration": 7.5}, path) == 7.5
+        assert segment_duration({}, path) == pytest.approx(3.0)
+        assert segment_duration({}, tmp_path / "missing.wav") == 0.0
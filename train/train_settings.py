@@ -34,10 +34,41 @@ class TrainingSettings(BaseModel):
     sample_rate: int = Field(default=24000, description="Audio sample rate")
     batch_size: int = Field(default=2, description="Training batch size")
     num_workers: int = Field(default=2, description="DataLoader workers")
+    pin_memory: bool = Field(default=True, description="Batches em memória pinned (só CUDA)")
+    prefetch_factor: int = Field(default=2, description="Batches preparados à frente por worker")
+    bucket_by_length: bool = Field(default=True, description="Lotes de duração parecida (menos padding)")
+    bucket_size_multiplier: int = Field(default=50, description="Tamanho do bucket em lotes (maior = menos padding, menos aleatório)")
     max_train_samples: Optional[int] = Field(
         default=None,
         description="Limitar amostras de treino (None = dataset completo, 100 = teste rápido). Configurável via MAX_TRAIN_SAMPLES no .env"
-    )    # === Training Hyperparameters ===
+    )
+    use_packed_dataset: bool = Field(
+        default=True,
+        description="Usar shards memory-mapped (python -m train.scripts.packed_shards) quando atualizados"
+    )
+    packed_dataset_dir: Path = Field(
+        default=Path("train/data/MyTTSDataset/packed"),
+        description="Shards empacotados (train/ e val/)"
+    )
+    packed_audio_dtype: str = Field(default="int16", description="Áudio nos shards: int16 ou float16")
+    
+    # === Feature Cache (mels + latents de condicionamento) ===
+    use_feature_cache: bool = Field(
+        default=False,
+        description="Calcular mels/latents uma vez e ler do cache (feature_cache.py); o loss passa a ser sobre log-mel (escala ~100x diferente)"
+    )
+    feature_cache_dir: Path = Field(
+        default=Path("train/data/MyTTSDataset/feature_cache"),
+        description="Cache de features (um subdiretório por hash de dataset + config)"
+    )
+    mel_n_fft: int = Field(default=1024)
+    mel_hop_length: int = Field(default=256)
+    mel_win_length: int = Field(default=1024)
+    mel_n_mels: int = Field(default=80)
+    mel_fmin: float = Field(default=0.0)
+    mel_fmax: float = Field(default=8000.0)
+    num_reference_clips: int = Field(default=4, description="Clipes de referência com latents de condicionamento em cache")
+    gpt_cond_len: int = Field(default=6, description="Segundos de referência para o latent do GPT")    # === Training Hyperparameters ===
     num_epochs: int = Field(default=1000, description="Number of epochs")
     learning_rate: float = Field(default=1.0e-5, description="Learning rate")
     adam_beta1: float = Field(default=0.9)
@@ -123,5 +154,8 @@ def get_train_settings() -> TrainingSettings:
         
         if os.getenv("LOG_EVERY_N_STEPS"):
             _train_settings.log_every_n_steps = int(os.getenv("LOG_EVERY_N_STEPS"))
+        
+        if os.getenv("USE_FEATURE_CACHE"):
+            _train_settings.use_feature_cache = os.getenv("USE_FEATURE_CACHE").lower() in ("1", "true", "yes")
     
     return _train_settings